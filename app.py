@@ -332,6 +332,37 @@ def api_generate_batch_pdf(batch_id, index):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/generate_batch_pdfs/<batch_id>', methods=['POST'])
+def api_generate_batch_pdfs(batch_id):
+    """PDF 생성 API (일괄 작업 전체 — 아직 PDF가 없는 결과만, 브라우저 탭 병렬)"""
+    try:
+        results = database.get_batch_results(batch_id)
+
+        if not results:
+            return jsonify({'error': '결과를 찾을 수 없습니다.'}), 404
+
+        pending = [r for r in results if r['html_path'] and not r['pdf_path']]
+
+        # PDF 생성
+        pdf_generator = PDFGenerator()
+        generated = pdf_generator.generate_batch(pending)
+
+        # DB 업데이트
+        for item in generated:
+            if item['pdf_path']:
+                database.update_batch_result_pdf(batch_id, item['index_num'], item['pdf_path'])
+
+        failed = [item for item in generated if item['error']]
+        return jsonify({
+            'generated': len(generated) - len(failed),
+            'failed': [{'index': item['index_num'], 'error': item['error']} for item in failed],
+            'status': 'success' if not failed else 'partial'
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/download/<path:filename>')
 def api_download(filename):
     """파일 다운로드 API"""
@@ -136,6 +136,9 @@ def create_app(config_name='default'):
         if 'static' in response.headers.get('Content-Type', ''):
             # 정적 파일은 1년 캐싱 (CSS, JS, 이미지 등)
             response.headers['Cache-Control'] = 'public, max-age=31536000'
+        elif response.cache_control.private:
+            # 라우트가 직접 지정한 사용자 전용 캐시 (게시판 이미지 등)는 유지
+            pass
         elif response.mimetype and response.mimetype.startswith(('text/css', 'application/javascript', 'image/')):
             # CSS, JS, 이미지 파일 1년 캐싱
             response.headers['Cache-Control'] = 'public, max-age=31536000'
@@ -223,90 +226,15 @@ def create_app(config_name='default'):
     # Context processor: 미읽은 알림 카운트 주입
     @app.context_processor
     def inject_unread_counts():
-        default = {'homework': 0, 'announcement': 0, 'essay': 0,
-                   'feedback': 0, 'total': 0, 'assignments': 0, 'pending_users': 0,
-                   'hall_of_fame': 0}
+        from app.utils.unread_counts import default_counts, get_unread_counts
         try:
             from flask_login import current_user
-            from app.models.notification import Notification
 
             if not current_user.is_authenticated:
-                return {'unread_counts': default}
-
-            def _count(ntype):
-                if isinstance(ntype, list):
-                    return Notification.query.filter(
-                        Notification.user_id == current_user.user_id,
-                        Notification.is_read == False,
-                        Notification.notification_type.in_(ntype)
-                    ).count()
-                return Notification.query.filter_by(
-                    user_id=current_user.user_id,
-                    is_read=False,
-                    notification_type=ntype
-                ).count()
-
-            hw = _count('homework_assignment')
-            ann = _count('class_announcement')
-
-            # 관리자용: 승인 대기 회원 수 (거절된 사용자 제외)
-            pending_users = 0
-            if current_user.is_active and current_user.has_permission_level(2):
-                from app.models import User as _UserModel
-                # 거절됐거나 이미 한 번 승인된(정지 포함) 사용자 제외
-                exclude_ids = [
-                    n.user_id for n in Notification.query.filter(
-                        Notification.notification_type.in_(['account_rejected', 'account_approved'])
-                    ).with_entities(Notification.user_id).all()
-                ]
-                q = _UserModel.query.filter_by(is_active=False).filter(
-                    _UserModel.role.in_(['teacher', 'parent', 'student'])
-                )
-                if exclude_ids:
-                    q = q.filter(~_UserModel.user_id.in_(exclude_ids))
-                pending_users = q.count()
-
-            # DM 미읽은 수 (강사/관리자만)
-            dm_unread = 0
-            if current_user.role in ('admin', 'teacher'):
-                from app.models.conversation import Conversation, ConversationMessage
-                dm_unread = ConversationMessage.query.join(
-                    Conversation,
-                    ConversationMessage.conversation_id == Conversation.conversation_id
-                ).filter(
-                    db.or_(
-                        Conversation.user1_id == current_user.user_id,
-                        Conversation.user2_id == current_user.user_id
-                    ),
-                    ConversationMessage.sender_id != current_user.user_id,
-                    ConversationMessage.is_read == False
-                ).count()
-
-            # 명예의 전당 새 글 수 (마지막 열람 이후 게시된 글)
-            from datetime import datetime as _dt
-            from app.models.library import HallOfFame
-            hof_last_viewed = current_user.hall_of_fame_last_viewed_at or _dt(2000, 1, 1)
-            hall_of_fame_new = HallOfFame.query.filter(
-                HallOfFame.is_published == True,
-                HallOfFame.created_at > hof_last_viewed
-            ).count()
-
-            counts = {
-                'homework': hw,
-                'announcement': ann,
-                'assignments': hw + ann,
-                'essay': _count('essay_complete'),
-                'feedback': _count(['teacher_feedback', 'consultation']),
-                'new_submission': _count('essay_submitted'),  # 강사용: 새 제출 건수
-                'pending_users': pending_users,  # 관리자용: 승인 대기
-                'dm': dm_unread,  # DM 미읽은 수
-                'hall_of_fame': hall_of_fame_new,  # 명예의 전당 새 글 수
-                'total': Notification.query.filter_by(
-                    user_id=current_user.user_id, is_read=False
-                ).count(),
-            }
+                return {'unread_counts': default_counts()}
+            counts = get_unread_counts(current_user)
         except Exception:
-            counts = default
+            counts = default_counts()
 
         return {'unread_counts': counts}
 
@@ -317,26 +245,21 @@ def create_app(config_name='default'):
             from flask_login import current_user
             if not current_user.is_authenticated or current_user.role != 'parent':
                 return {'parent_survey_completed': True}
-            from app.models import ParentStudent, Student
             from app.models.student_profile import StudentProfile
+            from app.utils.principal import get_principal
 
-            # 연결된 모든 자녀 조회
-            children = db.session.query(Student).join(
-                ParentStudent, ParentStudent.student_id == Student.student_id
-            ).filter(
-                ParentStudent.parent_id == current_user.user_id,
-                ParentStudent.is_active == True
-            ).all()
+            # 연결된 모든 자녀 (요청 범위 캐시)
+            child_ids = get_principal().child_ids
 
-            if not children:
+            if not child_ids:
                 # 연결된 자녀 없음 → 설문 필요 (녹색)
                 return {'parent_survey_completed': False}
 
-            # 자녀 중 프로필(설문)이 없는 경우가 하나라도 있으면 녹색 유지
-            all_completed = all(
-                StudentProfile.query.filter_by(student_id=child.student_id).first() is not None
-                for child in children
-            )
+            # 자녀 중 프로필(설문)이 없는 경우가 하나라도 있으면 녹색 유지 — 프로필 있는 자녀 수 한 번에
+            profiled = db.session.query(db.func.count(db.distinct(StudentProfile.student_id))).filter(
+                StudentProfile.student_id.in_(child_ids)
+            ).scalar()
+            all_completed = profiled == len(set(child_ids))
             return {'parent_survey_completed': all_completed}
         except Exception:
             return {'parent_survey_completed': True}
@@ -503,6 +426,66 @@ def create_app(config_name='default'):
         except Exception:
             pass
 
+    # 첨삭 규칙 문서 / 시스템 프롬프트 미리 로드 (preload_app 시 fork 전에 공유)
+    from app.essays.prompt_cache import warm_up
+    warm_up(app)
+
+    # Web Push: 알림 커밋 후 발송 훅
+    from app.utils.push_utils import init_push
+    init_push(app)
+
+    # 미읽음 카운트 캐시: 알림/DM/회원 변경 커밋 시 무효화 훅
+    from app.utils.unread_counts import init_unread_counts
+    init_unread_counts(app)
+
+    # 현재 사용자 범위 캐시: 수강/자녀 연결/수업/학생 계정 연결 변경 커밋 시 무효화 훅
+    from app.utils.principal import init_principal
+    init_principal(app)
+
+    # 통합 검색 역색인: 검색 대상 모델 변경 시 같은 트랜잭션에서 토큰 갱신
+    from app.utils.search_index import init_search_index
+    init_search_index(app)
+
+    # 첨삭 HTML 버전 저장소: EssayVersion 저장 시 HTML을 압축 조각(내용 해시)으로 옮김
+    from app.utils.essay_store import init_essay_store
+    init_essay_store(app)
+
+    # 출결 집계: 출결/세션 변경 시 해당 (날짜, 수업) 집계 갱신
+    from app.utils.attendance_rollup import init_attendance_rollup
+    init_attendance_rollup(app)
+
+    # 수업 집계 컬럼: 수강/세션/출결 변경 시 수강생 수·완료 세션·출석 수 재계산
+    from app.utils.course_counters import init_course_counters
+    init_course_counters(app)
+
+    # 학생 위험도 스냅샷: 출결/상담/프로필 등 변경 시 해당 학생 스냅샷 무효화
+    from app.utils.student_insights import init_risk_snapshots
+    init_risk_snapshots(app)
+
+    # 강사 시수 스냅샷: 출결/세션/수업 변경 시 해당 (강사, 월) 스냅샷 무효화
+    from app.utils.hours_calculator import init_teacher_hours
+    init_teacher_hours(app)
+
+    # 학년별 첨삭 점수 분포: 점수 저장/첨삭 완료 시 해당 (작성일, 학년) 집계 갱신
+    from app.utils.score_cohorts import init_score_cohorts
+    init_score_cohorts(app)
+
+    # 퀴즈 문제은행 캐시: 어휘/스키마 문제 변경 커밋 시 무효화
+    from app.utils.quiz_engine import init_quiz_bank
+    init_quiz_bank(app)
+
+    # 게시판 이미지 파생본: 업로드 커밋 후 백그라운드에서 썸네일/중간/WebP 생성
+    from app.utils.image_utils import init_image_derivatives
+    init_image_derivatives(app)
+
+    # PDF 렌더 캐시: 첫 요청 시 사용 설명서 미리 생성 + 첨삭 완료 시 결과 PDF 미리 렌더링
+    from app.utils.pdf_render import init_pdf_render
+    init_pdf_render(app)
+
+    # 첨삭 작업 큐 내장 워커 (첫 요청 시 워커 프로세스마다 시작)
+    from app.essays.job_queue import init_correction_queue
+    init_correction_queue(app)
+
     # 수업 리마인더 스케줄러 시작
     try:
         from app.utils.scheduler import init_scheduler
@@ -39,7 +39,7 @@ def index():
     from app.models.parent_link_request import ParentLinkRequest
     from app.models.parent_student import ParentStudent
     from app.models.makeup_request import MakeupClassRequest
-    from sqlalchemy import func, extract, case
+    from sqlalchemy import func, extract
     from datetime import timedelta, date
     import json
 
@@ -81,18 +81,8 @@ def index():
     ).count()
 
     # 5. 이번 주 평균 출석률 (출석체크 완료된 세션만, 아직 진행 전 세션 제외)
-    weekly_attendance = db.session.query(
-        func.count(Attendance.attendance_id).label('total'),
-        func.sum(case((Attendance.status == 'present', 1), else_=0)).label('present')
-    ).join(CourseSession).filter(
-        CourseSession.session_date >= week_start,
-        CourseSession.session_date <= today,
-        CourseSession.attendance_checked == True
-    ).first()
-
-    attendance_rate = 0
-    if weekly_attendance and weekly_attendance.total > 0:
-        attendance_rate = round((weekly_attendance.present / weekly_attendance.total) * 100, 1)
+    from app.utils.attendance_rollup import period_totals
+    attendance_rate = period_totals({'week': (week_start, today)}, checked_only=True)['week']['rate']
 
     # 6. 대기 중 알림
     pending_parent_links = ParentLinkRequest.query.filter_by(status='pending').count()
@@ -1450,8 +1440,13 @@ def billing():
         is_prepaid = selected_period.start_date >= today
 
         # 해당 주기 활성 enrollment 전체 조회 (보강수업 제외)
+        # 화면에 쓰이는 학생/수업/강사는 함께 로드 (행마다 추가 쿼리 방지)
+        from sqlalchemy.orm import joinedload
         all_enrollments = CourseEnrollment.query.join(
             Course, CourseEnrollment.course_id == Course.course_id
+        ).options(
+            joinedload(CourseEnrollment.student),
+            joinedload(CourseEnrollment.course).joinedload(Course.teacher),
         ).filter(
             CourseEnrollment.status == 'active',
             ~Course.course_type.like('보강%')
@@ -1461,7 +1456,7 @@ def billing():
         from app.models.parent_student import ParentStudent as _PS
         from collections import defaultdict
         parent_to_students = defaultdict(list)
-        for ps in _PS.query.filter_by(is_active=True).all():
+        for ps in _PS.query.options(joinedload(_PS.student)).filter_by(is_active=True).all():
             parent_to_students[ps.parent_id].append((ps.student_id, ps.student.name if ps.student else ''))
         sibling_map = defaultdict(list)
         for siblings in parent_to_students.values():
@@ -1471,9 +1466,16 @@ def billing():
                         if other_sid != sid and other_name not in sibling_map[sid]:
                             sibling_map[sid].append(other_name)
 
+        # 이 기간에 이미 청구된 건: enrollment_id → Payment (쿼리 1회)
+        existing_by_enrollment = {
+            p.enrollment_id: p
+            for p in Payment.query.filter_by(period_id=period_id).all()
+        }
+
         billed_count = 0
         ready_count = 0
         setup_count = 0
+        to_calculate = []
 
         for enrollment in sorted(all_enrollments, key=lambda e: e.student.name if e.student else ''):
             # 결제 주기가 기간 유형과 다르면 건너뜀
@@ -1487,10 +1489,7 @@ def billing():
                 continue
 
             # 이미 청구된 건 확인
-            existing = Payment.query.filter_by(
-                enrollment_id=enrollment.enrollment_id,
-                period_id=period_id
-            ).first()
+            existing = existing_by_enrollment.get(enrollment.enrollment_id)
 
             if existing:
                 billing_rows.append({
@@ -1501,15 +1500,23 @@ def billing():
                 })
                 billed_count += 1
             else:
-                result = PaymentCalculator.calculate(enrollment, selected_period)
-                billing_rows.append({
+                row = {
                     'enrollment': enrollment,
-                    'result': result,
+                    'result': None,
                     'existing_payment': None,
                     'billed': False,
-                })
+                }
+                billing_rows.append(row)
+                to_calculate.append(row)
                 ready_count += 1
 
+        # 미청구 건 금액은 일괄 계산 (휴무/조정 조회를 기간 단위로 한 번만)
+        batch = PaymentCalculator.calculate_batch(
+            [row['enrollment'] for row in to_calculate], selected_period
+        )
+        for row, (_, result) in zip(to_calculate, batch):
+            row['result'] = result
+
         stats = {
             'total': ready_count + billed_count + setup_count,
             'ready': ready_count,
@@ -1554,23 +1561,35 @@ def create_invoices():
     skipped_count = 0
     error_count = 0
 
+    from sqlalchemy.orm import joinedload
+    enrollments_by_id = {
+        e.enrollment_id: e
+        for e in CourseEnrollment.query.options(joinedload(CourseEnrollment.course)).filter(
+            CourseEnrollment.enrollment_id.in_(enrollment_ids)
+        ).all()
+    }
+    billed_ids = {
+        row[0] for row in db.session.query(Payment.enrollment_id).filter(
+            Payment.period_id == period_id,
+            Payment.enrollment_id.in_(enrollment_ids)
+        ).all()
+    }
+
+    to_create = []
     for enrollment_id in enrollment_ids:
-        enrollment = CourseEnrollment.query.get(enrollment_id)
+        enrollment = enrollments_by_id.get(enrollment_id)
         if not enrollment or not enrollment.weekly_fee or not enrollment.payment_cycle:
             error_count += 1
             continue
 
-        # 이미 청구된 건 스킵
-        existing = Payment.query.filter_by(
-            enrollment_id=enrollment_id,
-            period_id=period_id
-        ).first()
-        if existing:
+        # 이미 청구된 건 스킵 (중복 선택 포함)
+        if enrollment_id in billed_ids:
             skipped_count += 1
             continue
+        billed_ids.add(enrollment_id)
+        to_create.append(enrollment)
 
-        result = PaymentCalculator.calculate(enrollment, period)
-
+    for enrollment, result in PaymentCalculator.calculate_batch(to_create, period):
         # 선불 납부 기한: 기간 시작일 (기간 시작 전날까지 납부가 이상적이나,
         # 시작일 당일까지로 설정. 필요 시 start_date - timedelta(days=1) 가능)
         payment = Payment(
@@ -1659,6 +1678,41 @@ def _build_sms_message(payment):
     return '\n'.join(lines)
 
 
+def _get_sms_recipients_bulk(payments):
+    """여러 청구서의 수신자 전화번호·이름 일괄 조회 (학부모 우선, 없으면 학생)
+
+    Returns:
+        {payment_id: (phone, name)}
+    """
+    from app.models.parent_student import ParentStudent
+    from app.models import User
+
+    payments = list(payments)
+    student_ids = {p.student_id for p in payments}
+    first_parent = {}
+    if student_ids:
+        rows = db.session.query(ParentStudent.student_id, User).join(
+            User, User.user_id == ParentStudent.parent_id
+        ).filter(
+            ParentStudent.student_id.in_(student_ids),
+            ParentStudent.is_active == True
+        ).order_by(ParentStudent.created_at, ParentStudent.relation_id).all()
+        for student_id, parent in rows:
+            first_parent.setdefault(student_id, parent)
+
+    result = {}
+    for payment in payments:
+        parent = first_parent.get(payment.student_id)
+        student = payment.student
+        if parent and parent.phone:
+            result[payment.payment_id] = (parent.phone, parent.name)
+        elif student and student.phone:
+            result[payment.payment_id] = (student.phone, student.name)
+        else:
+            result[payment.payment_id] = (None, None)
+    return result
+
+
 def _get_sms_recipient(payment):
     """수신자 전화번호·이름 반환 (학부모 우선, 없으면 학생)"""
     from app.models.parent_student import ParentStudent
@@ -1742,50 +1796,66 @@ def send_payment_sms():
 @login_required
 @requires_permission_level(2)
 def send_payment_sms_batch():
-    """청구서 일괄 문자 발송 (AJAX)
+    """청구서 일괄 문자 발송 (AJAX) — 발송 이력 기록 후 백그라운드 발송
     Body: { payment_ids: [...] }
+    진행 상황은 GET /billing/sms-batch/<batch_id> 로 조회
     """
-    from app.utils.sms import send_sms_message
+    from sqlalchemy.orm import joinedload
+    from app.utils.sms_dispatch import batch_counts, create_batch, dispatch_batch
 
     data = request.get_json() or {}
-    payment_ids = data.get('payment_ids', [])
+    payment_ids = list(dict.fromkeys(data.get('payment_ids', [])))
     if not payment_ids:
         return jsonify({'success': False, 'reason': 'payment_ids 필수'}), 400
 
-    results = []
+    payments = {
+        p.payment_id: p for p in Payment.query.options(
+            joinedload(Payment.student), joinedload(Payment.course)
+        ).filter(Payment.payment_id.in_(payment_ids)).all()
+    }
+    recipients = _get_sms_recipients_bulk(payments.values())
+
+    entries = []
+    missing = []
     for pid in payment_ids:
-        payment = Payment.query.get(pid)
+        payment = payments.get(pid)
         if not payment:
-            results.append({'payment_id': pid, 'success': False, 'reason': '청구서 없음'})
+            missing.append({'payment_id': pid, 'success': False, 'reason': '청구서 없음'})
             continue
-        if payment.sms_sent_at:
-            results.append({'payment_id': pid, 'success': True, 'reason': '이미 발송됨', 'skipped': True})
-            continue
-
-        phone, _ = _get_sms_recipient(payment)
-        if not phone:
-            results.append({'payment_id': pid, 'success': False, 'reason': '수신자 번호 없음'})
-            continue
-
-        message = _build_sms_message(payment)
-        success, reason = send_sms_message(phone, message)
-        if success:
-            payment.sms_sent_at = datetime.utcnow()
-        results.append({'payment_id': pid, 'success': success, 'reason': reason})
-
-    db.session.commit()
+        phone, name = recipients.get(pid, (None, None))
+        entries.append({
+            'payment_id': pid,
+            'receiver': phone,
+            'receiver_name': name,
+            'message': _build_sms_message(payment),
+            'skip_reason': '이미 발송됨' if payment.sms_sent_at else None,
+        })
 
-    sent = sum(1 for r in results if r.get('success') and not r.get('skipped'))
-    skipped = sum(1 for r in results if r.get('skipped'))
-    failed = sum(1 for r in results if not r.get('success'))
+    # 다른 배치에서 대기/발송 중인 청구서는 create_batch가 skipped로 기록
+    batch_id = create_batch(entries, created_by=current_user.user_id)
+    counts = batch_counts(batch_id)
+    dispatch_batch(current_app._get_current_object(), batch_id)
 
     return jsonify({
         'success': True,
-        'sent': sent,
-        'skipped': skipped,
-        'failed': failed,
-        'results': results,
-    })
+        'batch_id': batch_id,
+        'queued': counts['queued'],
+        'skipped': counts['skipped'],
+        'failed': len(missing) + counts['failed'],
+        'results': missing,
+    }), 202
+
+
+@admin_bp.route('/billing/sms-batch/<batch_id>')
+@login_required
+@requires_permission_level(2)
+def payment_sms_batch_status(batch_id):
+    """일괄 문자 발송 진행 상황 (AJAX 폴링)"""
+    from app.utils.sms_dispatch import get_batch_status
+    status = get_batch_status(batch_id)
+    if not status['total']:
+        return jsonify({'success': False, 'reason': '발송 배치를 찾을 수 없습니다.'}), 404
+    return jsonify({'success': True, **status})
 
 
 @admin_bp.route('/payments')
@@ -2595,7 +2665,6 @@ def attendance_status():
     """전체 출석 현황"""
     from datetime import timedelta
     import calendar as cal_module
-    from sqlalchemy import func
 
     # 주간/월별 통계 (항상 계산)
     today = datetime.utcnow().date()
@@ -2604,20 +2673,14 @@ def attendance_status():
     month_start = today.replace(day=1)
     month_end = today.replace(day=cal_module.monthrange(today.year, today.month)[1])
 
-    def _calc_stats(d_from, d_to):
-        q = Attendance.query\
-            .join(CourseSession, Attendance.session_id == CourseSession.session_id)\
-            .filter(CourseSession.session_date >= d_from, CourseSession.session_date <= d_to)
-        t = q.count()
-        p = q.filter(Attendance.status == 'present').count()
-        l = q.filter(Attendance.status == 'late').count()
-        a = q.filter(Attendance.status == 'absent').count()
-        e = q.filter(Attendance.status == 'excused').count()
-        return {'total': t, 'present': p, 'late': l, 'absent': a, 'excused': e,
-                'rate': round(p / t * 100, 1) if t > 0 else 0}
-
-    weekly_stats = _calc_stats(week_start, week_end)
-    monthly_stats = _calc_stats(month_start, month_end)
+    # 주간/월간 합계는 출결 집계 테이블에서 한 번에
+    from app.utils import attendance_rollup
+    period_stats = attendance_rollup.period_totals({
+        'weekly': (week_start, week_end),
+        'monthly': (month_start, month_end),
+    })
+    weekly_stats = period_stats['weekly']
+    monthly_stats = period_stats['monthly']
 
     # 필터 파라미터
     course_filter = request.args.get('course_id', '').strip()
@@ -2671,77 +2734,28 @@ def attendance_status():
     ).paginate(page=page, per_page=100, error_out=False)
     attendances = pagination.items
 
-    # 전체 통계
-    total_query = Attendance.query\
-        .join(CourseSession, Attendance.session_id == CourseSession.session_id)\
-        .join(Course, CourseSession.course_id == Course.course_id)\
-        .join(Student, Attendance.student_id == Student.student_id)
-    if date_from:
-        total_query = total_query.filter(CourseSession.session_date >= date_from)
-    if date_to:
-        total_query = total_query.filter(CourseSession.session_date <= date_to)
-    if course_filter:
-        total_query = total_query.filter(Course.course_id == course_filter)
-    if teacher_filter:
-        total_query = total_query.filter(Course.teacher_id == teacher_filter)
-    if student_filter:
-        total_query = total_query.filter(Student.student_id == student_filter)
-
-    total_count = total_query.count()
-    present_count = total_query.filter(Attendance.status == 'present').count()
-    late_count = total_query.filter(Attendance.status == 'late').count()
-    absent_count = total_query.filter(Attendance.status == 'absent').count()
-    excused_count = total_query.filter(Attendance.status == 'excused').count()
+    # 전체 통계 (출결 집계 테이블)
+    filtered = attendance_rollup.totals(date_from, date_to, course_id=course_filter or None,
+                                        teacher_id=teacher_filter or None,
+                                        student_id=student_filter or None)
+    total_count = filtered['total']
+    present_count = filtered['present']
+    late_count = filtered['late']
+    absent_count = filtered['absent']
+    excused_count = filtered['excused']
 
     attendance_rate = (present_count / total_count * 100) if total_count > 0 else 0
 
     # 반별 통계 (course_filter가 없을 때만)
     course_stats = []
     if not course_filter and not student_filter:
-        course_stats_query = db.session.query(
-            Course.course_id,
-            Course.course_name,
-            func.count(Attendance.attendance_id).label('total'),
-            func.sum(case((Attendance.status == 'present', 1), else_=0)).label('present'),
-            func.sum(case((Attendance.status == 'late', 1), else_=0)).label('late'),
-            func.sum(case((Attendance.status == 'absent', 1), else_=0)).label('absent')
-        ).join(CourseSession, Course.course_id == CourseSession.course_id)\
-         .join(Attendance, CourseSession.session_id == Attendance.session_id)
-
-        if date_from:
-            course_stats_query = course_stats_query.filter(CourseSession.session_date >= date_from)
-        if date_to:
-            course_stats_query = course_stats_query.filter(CourseSession.session_date <= date_to)
-
-        course_stats = course_stats_query.group_by(Course.course_id, Course.course_name)\
-                                         .order_by(func.count(Attendance.attendance_id).desc())\
-                                         .limit(10).all()
+        course_stats = attendance_rollup.course_breakdown(date_from, date_to, limit=10)
 
     # 학생별 통계 (student_filter가 없을 때만, course_filter가 있으면 해당 수업의 학생만)
     student_stats = []
     if not student_filter:
-        student_stats_query = db.session.query(
-            Student.student_id,
-            Student.name,
-            Student.grade,
-            func.count(Attendance.attendance_id).label('total'),
-            func.sum(case((Attendance.status == 'present', 1), else_=0)).label('present'),
-            func.sum(case((Attendance.status == 'late', 1), else_=0)).label('late'),
-            func.sum(case((Attendance.status == 'absent', 1), else_=0)).label('absent')
-        ).join(Attendance, Student.student_id == Attendance.student_id)\
-         .join(CourseSession, Attendance.session_id == CourseSession.session_id)
-
-        if date_from:
-            student_stats_query = student_stats_query.filter(CourseSession.session_date >= date_from)
-        if date_to:
-            student_stats_query = student_stats_query.filter(CourseSession.session_date <= date_to)
-        if course_filter:
-            student_stats_query = student_stats_query.join(Course, CourseSession.course_id == Course.course_id)\
-                                                     .filter(Course.course_id == course_filter)
-
-        student_stats = student_stats_query.group_by(Student.student_id, Student.name, Student.grade)\
-                                           .order_by(func.count(Attendance.attendance_id).desc())\
-                                           .limit(20).all()
+        student_stats = attendance_rollup.student_breakdown(date_from, date_to,
+                                                            course_id=course_filter or None, limit=20)
 
     # 전체 수업 목록 (필터용)
     courses = Course.query.order_by(Course.course_name).all()
@@ -5825,7 +5839,7 @@ def export_students():
     """학생 목록 Excel 내보내기"""
     from app.utils.export_utils import export_students_to_excel
 
-    students = Student.query.order_by(Student.name).all()
+    students = Student.query.order_by(Student.name)
 
     return export_students_to_excel(students)
 
@@ -5835,9 +5849,14 @@ def export_students():
 @requires_permission_level(2)
 def export_courses():
     """수업 목록 Excel 내보내기"""
+    from sqlalchemy.orm import joinedload, selectinload
     from app.utils.export_utils import export_courses_to_excel
 
-    courses = Course.query.order_by(Course.created_at.desc()).all()
+    courses = Course.query.options(
+        joinedload(Course.teacher),
+        selectinload(Course.enrollments),
+        selectinload(Course.sessions)
+    ).order_by(Course.created_at.desc())
 
     return export_courses_to_excel(courses)
 
@@ -5847,6 +5866,7 @@ def export_courses():
 @requires_permission_level(2)
 def export_payments():
     """결제 내역 Excel 내보내기"""
+    from sqlalchemy.orm import joinedload
     from app.utils.export_utils import export_payments_to_excel
     from datetime import datetime, timedelta
 
@@ -5854,9 +5874,12 @@ def export_payments():
     months = int(request.args.get('months', 3))
     start_date = datetime.utcnow() - timedelta(days=months*30)
 
-    payments = Payment.query.filter(
+    payments = Payment.query.options(
+        joinedload(Payment.student),
+        joinedload(Payment.course)
+    ).filter(
         Payment.created_at >= start_date
-    ).order_by(Payment.created_at.desc()).all()
+    ).order_by(Payment.created_at.desc())
 
     return export_payments_to_excel(payments)
 
@@ -5866,34 +5889,24 @@ def export_payments():
 @requires_permission_level(2)
 def export_attendance():
     """출석 내역 Excel 내보내기"""
-    from app.utils.export_utils import export_attendance_to_excel
+    from app.utils.export_utils import export_attendance_to_excel, attendance_export_row
     from datetime import datetime, timedelta
 
     # 기간 필터 (기본: 최근 1개월)
     months = int(request.args.get('months', 1))
     start_date = datetime.utcnow() - timedelta(days=months*30)
 
-    # 출석 데이터 조회
-    attendances = db.session.query(Attendance, CourseSession, Course, Student)\
+    # 출석 데이터 조회 (필요한 컬럼만, 나눠 읽으면서 바로 시트에 기록)
+    attendances = db.session.query(Attendance, CourseSession, Course.course_name, Student.name)\
         .join(CourseSession, Attendance.session_id == CourseSession.session_id)\
         .join(Course, CourseSession.course_id == Course.course_id)\
         .join(CourseEnrollment, Attendance.enrollment_id == CourseEnrollment.enrollment_id)\
         .join(Student, CourseEnrollment.student_id == Student.student_id)\
         .filter(CourseSession.session_date >= start_date.date())\
-        .order_by(CourseSession.session_date.desc()).all()
+        .order_by(CourseSession.session_date.desc()).yield_per(1000)
 
-    # 데이터 변환
-    attendance_data = []
-    for attendance, session, course, student in attendances:
-        attendance_data.append({
-            'date': session.session_date.strftime('%Y-%m-%d'),
-            'course_name': course.course_name,
-            'student_name': student.name,
-            'status': attendance.status,
-            'late_minutes': attendance.late_minutes if attendance.late_minutes else '-',
-            'notes': attendance.notes or '-',
-            'checked_at': attendance.checked_at.strftime('%Y-%m-%d %H:%M') if attendance.checked_at else '-'
-        })
+    attendance_data = (attendance_export_row(attendance, session, course_name, student_name)
+                       for attendance, session, course_name, student_name in attendances)
 
     return export_attendance_to_excel(attendance_data)
 
@@ -5903,7 +5916,8 @@ def export_attendance():
 @requires_permission_level(2)
 def export_monthly_report():
     """월간 종합 리포트 Excel 내보내기"""
-    from app.utils.export_utils import create_excel_workbook, create_excel_response, add_title_row, add_info_row, style_header_row, style_data_rows, auto_adjust_column_width
+    from sqlalchemy.orm import joinedload
+    from app.utils.export_utils import ExcelStream
     from datetime import datetime, timedelta
     from app.models.essay import Essay
 
@@ -5915,94 +5929,73 @@ def export_monthly_report():
     else:
         first_day_of_next_month = datetime(now.year, now.month + 1, 1)
 
-    wb, ws = create_excel_workbook("월간 리포트")
-
-    # 제목
     month_str = now.strftime('%Y년 %m월')
-    add_title_row(ws, f"{month_str} 종합 리포트", 5)
-    add_info_row(ws, f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}", 2)
+    sheet = ExcelStream("월간 리포트", widths=[30, 12, 14, 12, 10])
 
-    # 1. 전체 통계
-    ws.append([])
-    ws.append(['구분', '전체', '이번 달', '증감', ''])
+    def write():
+        sheet.title(f"{month_str} 종합 리포트")
+        sheet.created_info()
 
-    total_students = Student.query.count()
-    month_students = Student.query.filter(Student.created_at >= first_day_of_month).count()
+        # 1. 전체 통계
+        sheet.blank()
+        sheet.plain(['구분', '전체', '이번 달', '증감', ''])
 
-    total_courses = Course.query.count()
-    month_courses = Course.query.filter(
-        Course.status == 'active',
-        Course.created_at >= first_day_of_month
-    ).count()
+        total_students = Student.query.count()
+        month_students = Student.query.filter(Student.created_at >= first_day_of_month).count()
 
-    total_essays = Essay.query.count()
-    month_essays = Essay.query.filter(Essay.created_at >= first_day_of_month).count()
+        total_courses = Course.query.count()
+        month_courses = Course.query.filter(
+            Course.status == 'active',
+            Course.created_at >= first_day_of_month
+        ).count()
 
-    month_payments = Payment.query.filter(
-        Payment.created_at >= first_day_of_month,
-        Payment.status == 'completed'
-    ).all()
-    month_revenue = sum(p.amount for p in month_payments)
+        total_essays = Essay.query.count()
+        month_essays = Essay.query.filter(Essay.created_at >= first_day_of_month).count()
 
-    ws.append(['학생 수', total_students, month_students, f'+{month_students}', ''])
-    ws.append(['진행 중인 수업', total_courses, month_courses, f'+{month_courses}', ''])
-    ws.append(['첨삭 수', total_essays, month_essays, f'+{month_essays}', ''])
-    ws.append(['이번 달 수익', '', f'{month_revenue:,}원', '', ''])
-
-    # 2. 수업별 통계
-    ws.append([])
-    ws.append(['상위 5개 수업', '강사', '수강생', '세션', '출석률'])
-    style_header_row(ws, row_num=ws.max_row, column_count=5)
-
-    # 상위 수업 (Python에서 정렬)
-    all_active_courses = Course.query.all()
-    sorted_courses = sorted(all_active_courses, key=lambda c: c.enrolled_count, reverse=True)
-    top_courses = sorted_courses[:5]
-
-    for course in top_courses:
-        # 출석률 계산
-        total_attendance = db.session.query(func.count(Attendance.attendance_id))\
-            .join(CourseEnrollment)\
-            .filter(CourseEnrollment.course_id == course.course_id).scalar() or 0
-
-        present_count = db.session.query(func.count(Attendance.attendance_id))\
-            .join(CourseEnrollment)\
-            .filter(
-                CourseEnrollment.course_id == course.course_id,
-                Attendance.status == 'present'
-            ).scalar() or 0
+        month_revenue = db.session.query(func.coalesce(func.sum(Payment.amount), 0)).filter(
+            Payment.created_at >= first_day_of_month,
+            Payment.status == 'completed'
+        ).scalar()
+
+        sheet.plain(['학생 수', total_students, month_students, f'+{month_students}', ''])
+        sheet.plain(['진행 중인 수업', total_courses, month_courses, f'+{month_courses}', ''])
+        sheet.plain(['첨삭 수', total_essays, month_essays, f'+{month_essays}', ''])
+        sheet.plain(['이번 달 수익', '', f'{month_revenue:,}원', '', ''])
 
-        attendance_rate = (present_count / total_attendance * 100) if total_attendance > 0 else 0
+        # 2. 수업별 통계 — 수강생 수(active) 상위 5개를 집계 컬럼으로 DB에서 정렬
+        sheet.blank()
+        sheet.header(['상위 5개 수업', '강사', '수강생', '세션', '출석률'])
 
-        ws.append([
-            course.course_name,
-            course.teacher.name if course.teacher else '-',
-            f"{course.enrolled_count}/{course.max_students}",
-            f"{course.completed_sessions}/{course.total_sessions}",
-            f"{attendance_rate:.1f}%"
-        ])
+        top_courses = Course.query.options(joinedload(Course.teacher))\
+            .order_by(Course.enrolled_count.desc(), Course.created_at).limit(5).all()
 
-    # 3. 이번 달 신규 학생
-    ws.append([])
-    ws.append(['이번 달 신규 학생', '학년', '등급', '가입일', ''])
-    style_header_row(ws, row_num=ws.max_row, column_count=5)
+        for course in top_courses:
+            sheet.plain([
+                course.course_name,
+                course.teacher.name if course.teacher else '-',
+                f"{course.enrolled_count}/{course.max_students}",
+                f"{course.completed_sessions}/{course.total_sessions}",
+                f"{course.attendance_rate:.1f}%"
+            ])
 
-    new_students = Student.query.filter(
-        Student.created_at >= first_day_of_month
-    ).order_by(Student.created_at.desc()).all()
+        # 3. 이번 달 신규 학생
+        sheet.blank()
+        sheet.header(['이번 달 신규 학생', '학년', '등급', '가입일', ''])
 
-    for student in new_students[:10]:  # 최대 10명
-        ws.append([
-            student.name,
-            student.grade or '-',
-            student.tier or '-',
-            student.created_at.strftime('%Y-%m-%d'),
-            ''
-        ])
+        new_students = Student.query.filter(
+            Student.created_at >= first_day_of_month
+        ).order_by(Student.created_at.desc()).limit(10)  # 최대 10명
 
-    auto_adjust_column_width(ws)
+        for student in new_students:
+            sheet.plain([
+                student.name,
+                student.grade or '-',
+                student.tier or '-',
+                student.created_at.strftime('%Y-%m-%d'),
+                ''
+            ])
 
-    return create_excel_response(wb, f"월간리포트_{month_str}")
+    return sheet.response(f"월간리포트_{month_str}", write)
 
 
 # ==================== PDF 내보내기 ====================
@@ -6012,6 +6005,7 @@ def export_monthly_report():
 @requires_permission_level(2)
 def export_monthly_report_pdf():
     """월간 종합 리포트 PDF 내보내기"""
+    from sqlalchemy.orm import joinedload
     from app.utils.pdf_utils import generate_monthly_report_pdf
     from app.models.essay import Essay
 
@@ -6039,34 +6033,16 @@ def export_monthly_report_pdf():
     ).all()
     month_revenue = sum(p.amount for p in month_payments)
 
-    # 상위 수업 (Python에서 정렬)
-    all_active_courses = Course.query.all()
-
-    # enrolled_count로 정렬 (내림차순)
-    sorted_courses = sorted(all_active_courses, key=lambda c: c.enrolled_count, reverse=True)
-    top_courses = sorted_courses[:5]
+    # 상위 수업 (집계 컬럼으로 DB에서 정렬)
+    top_courses = Course.query.options(joinedload(Course.teacher))\
+        .order_by(Course.enrolled_count.desc(), Course.created_at).limit(5).all()
 
-    top_courses_data = []
-    for course in top_courses:
-        total_attendance = db.session.query(func.count(Attendance.attendance_id))\
-            .join(CourseEnrollment)\
-            .filter(CourseEnrollment.course_id == course.course_id).scalar() or 0
-
-        present_count = db.session.query(func.count(Attendance.attendance_id))\
-            .join(CourseEnrollment)\
-            .filter(
-                CourseEnrollment.course_id == course.course_id,
-                Attendance.status == 'present'
-            ).scalar() or 0
-
-        attendance_rate = (present_count / total_attendance * 100) if total_attendance > 0 else 0
-
-        top_courses_data.append({
-            'name': course.course_name,
-            'teacher': course.teacher.name if course.teacher else '-',
-            'students': f"{course.enrolled_count}/{course.max_students}",
-            'attendance_rate': f"{attendance_rate:.1f}%"
-        })
+    top_courses_data = [{
+        'name': course.course_name,
+        'teacher': course.teacher.name if course.teacher else '-',
+        'students': f"{course.enrolled_count}/{course.max_students}",
+        'attendance_rate': f"{course.attendance_rate:.1f}%"
+    } for course in top_courses]
 
     statistics = {
         'total_students': total_students,
@@ -7508,6 +7484,12 @@ def api_usage_dashboard():
                        key=lambda x: x['claude']['cost'] + x['gemini']['cost'],
                        reverse=True)
 
+    # ── 프롬프트 캐시 적중 (문서별, 5분 ephemeral 창 기준) ──
+    from app.essays.prompt_cache import get_prompt_cache_metrics
+    month_start = datetime(year, month, 1)
+    month_end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    prompt_cache_stats = get_prompt_cache_metrics(month_start, month_end)
+
     # ── 월 선택용 목록 ────────────────────────────────────
     month_options = []
     for i in range(12):
@@ -7528,6 +7510,7 @@ def api_usage_dashboard():
         days_in_month=days_in_month,
         user_list=user_list,
         month_options=month_options,
+        prompt_cache_stats=prompt_cache_stats,
         USD_TO_KRW=USD_TO_KRW,
     )
 
@@ -7620,9 +7603,7 @@ def help_page():
 @requires_permission_level(2)
 def teacher_hours():
     """강사 월별 시수 계산표"""
-    from collections import defaultdict
-    from app.utils.hours_calculator import build_teacher_monthly_data
-    from app.models.teacher_hours import TeacherHoursCorrection
+    from app.utils.hours_calculator import get_monthly_data
 
     year  = request.args.get('year',  date.today().year,  type=int)
     month = request.args.get('month', date.today().month, type=int)
@@ -7632,12 +7613,9 @@ def teacher_hours():
         User.is_active == True
     ).order_by(User.name).all()
 
-    data = {t.user_id: build_teacher_monthly_data(t.user_id, year, month) for t in teachers}
-
-    corrections = TeacherHoursCorrection.query.filter_by(year=year, month=month).all()
-    corrections_map = defaultdict(list)
-    for c in corrections:
-        corrections_map[c.teacher_id].append(c)
+    # 전체 강사 1쿼리 계산 (마감된 달은 스냅샷) + 보정
+    data = get_monthly_data([t.user_id for t in teachers], year, month)
+    corrections_map = {tid: d['corrections'] for tid, d in data.items()}
 
     return render_template(
         'admin/teacher_hours.html',
@@ -7768,7 +7746,7 @@ def push_notification_dashboard():
 @requires_permission_level(2)
 def push_test_send():
     """관리자 테스트 푸시 발송"""
-    from app.utils.push_utils import send_push_to_user
+    from app.utils.push_utils import send_push_to_user, send_push_to_users
     target = request.form.get('target', 'me')
 
     if target == 'me':
@@ -7783,13 +7761,12 @@ def push_test_send():
     elif target == 'all':
         from app.models.push_subscription import PushSubscription
         user_ids = [r.user_id for r in db.session.query(PushSubscription.user_id).distinct().all()]
-        for uid in user_ids:
-            send_push_to_user(
-                user_id=uid,
-                title='📢 공지 테스트',
-                body='관리자 테스트 알림입니다.',
-                url='/notifications'
-            )
+        send_push_to_users(
+            user_ids,
+            title='📢 공지 테스트',
+            body='관리자 테스트 알림입니다.',
+            url='/notifications'
+        )
         flash(f'{len(user_ids)}명에게 테스트 푸시를 발송했습니다.', 'success')
 
     return redirect(url_for('admin.push_notification_dashboard'))
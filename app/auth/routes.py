@@ -189,19 +189,18 @@ def signup():
         # 관리자에게 신규 가입 알림
         try:
             from app.models.notification import Notification as _Notif
-            admin_users = User.query.filter(
+            admin_ids = [uid for (uid,) in db.session.query(User.user_id).filter(
                 User.role.in_(['admin']),
                 User.is_active == True
-            ).all()
-            for admin in admin_users:
-                _Notif.create_notification(
-                    user_id=admin.user_id,
-                    notification_type='new_user_pending',
-                    title='새 회원가입 승인 대기',
-                    message=f'{user.name} ({user.role}) 님이 회원가입했습니다. 승인이 필요합니다.',
-                    link_url=url_for('admin.pending_users'),
-                    related_user_id=user.user_id
-                )
+            ).all()]
+            _Notif.create_bulk(
+                admin_ids,
+                notification_type='new_user_pending',
+                title='새 회원가입 승인 대기',
+                message=f'{user.name} ({user.role}) 님이 회원가입했습니다. 승인이 필요합니다.',
+                link_url=url_for('admin.pending_users'),
+                related_user_id=user.user_id
+            )
         except Exception:
             pass
 
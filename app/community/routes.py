@@ -452,10 +452,16 @@ def tag_posts(tag_name):
 @community_bp.route('/post-images/<filename>')
 @login_required
 def serve_post_image(filename):
-    """게시판 이미지 서빙 (전체 게시판 공용)"""
+    """게시판 이미지 서빙 (전체 게시판 공용) — 원본/파생 이미지 모두 UUID 파일명이라 장기 캐시"""
     from flask import send_from_directory
+    from app.utils.image_utils import IMAGE_CACHE_MAX_AGE
     images_folder = current_app.config['POST_IMAGES_FOLDER']
-    return send_from_directory(images_folder, filename)
+    response = send_from_directory(images_folder, filename, max_age=IMAGE_CACHE_MAX_AGE)
+    # 로그인 사용자 전용이므로 공유 캐시(프록시)에는 저장하지 않음
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
 
 
 # 에디터 이미지 업로드 (모든 게시판 공용 AJAX)
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """Gemini 기반 첨삭 서비스 - MOMOAIService와 동일한 인터페이스"""
 import time
-import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Tuple
@@ -11,9 +10,10 @@ from flask import current_app
 
 from app.models import db, Essay, EssayVersion, EssayResult, EssayScore, EssayNote
 from app.essays.score_parser import get_parser
+from app.essays import prompt_cache
+from app.utils import essay_store
 
-# 동시 호출 제한 (momoai_service와 공유하지 않고 별도 관리)
-_gemini_semaphore = threading.Semaphore(2)
+# 동시 호출 제한은 첨삭 작업 큐(app.essays.job_queue)의 provider별 slot으로 관리
 
 
 class GeminiCorrectionService:
@@ -34,12 +34,7 @@ class GeminiCorrectionService:
 
     def _load_system_prompt(self, correction_model: str = 'standard') -> str:
         """correction_model에 맞는 시스템 프롬프트 로드"""
-        if correction_model == 'harkness':
-            doc_path = current_app.config.get('MOMOAI_DOC_PATH')
-        else:
-            doc_path = current_app.config.get('MOMOAI_STANDARD_DOC_PATH')
-        with open(doc_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return prompt_cache.get_document('full' if correction_model == 'harkness' else 'standard')
 
     def _create_prompt(self, student_name: str, grade: str, essay_text: str,
                        notes: Optional[str] = None,
@@ -110,8 +105,7 @@ v3.3.0 필수 포함 사항:
         delays = [30, 60, 120]
         for attempt in range(max_retries):
             try:
-                with _gemini_semaphore:
-                    response = model.generate_content(user_prompt)
+                response = model.generate_content(user_prompt)
                 return response.text
             except Exception as e:
                 print(f'[Gemini 오류] 시도 {attempt + 1}/{max_retries}: {e}')
@@ -215,7 +209,7 @@ v3.3.0 필수 포함 사항:
 
         try:
             if is_finalized and essay.latest_version:
-                essay_text = essay.latest_version.html_content
+                essay_text = essay_store.load_html(essay.latest_version)
                 notes = None
                 is_revision_of_completed = True
             else:
@@ -5,10 +5,10 @@ import time
 import json
 import random
 import threading
-import PIL.Image
 from google import genai
 from google.genai import types
 from config import Config
+from app.utils.image_utils import prepare_ocr_image
 
 
 def _repair_json(raw: str) -> str:
@@ -69,6 +69,11 @@ class GeminiOCRService:
         self.model_name = 'gemini-2.5-flash'
         self.client = genai.Client(api_key=self.api_key)
 
+    def _image_part(self, image_path):
+        """OCR 입력 이미지를 회전 보정 + 축소한 JPEG Part로 변환 (폰 원본 사진 전송량 절감)"""
+        data, mime_type = prepare_ocr_image(image_path, max_side=Config.OCR_IMAGE_MAX_SIDE)
+        return types.Part.from_bytes(data=data, mime_type=mime_type)
+
     def _log_gemini_usage(self, response, user_id=None, essay_id=None, usage_type='ocr'):
         try:
             from app.models.api_usage_log import ApiUsageLog
@@ -130,12 +135,11 @@ class GeminiOCRService:
                             except Exception:
                                 pass
                     else:
-                        with PIL.Image.open(image_path) as img:
-                            response = self.client.models.generate_content(
-                                model=self.model_name,
-                                contents=[img, self._PROMPT],
-                                config=config,
-                            )
+                        response = self.client.models.generate_content(
+                            model=self.model_name,
+                            contents=[self._image_part(image_path), self._PROMPT],
+                            config=config,
+                        )
 
                 raw = response.text or ''
                 # 코드블록 제거 (```json ... ```)
@@ -183,14 +187,13 @@ class GeminiOCRService:
         """간단한 텍스트 추출만 수행 (분석/교정 없음)"""
         start_time = time.time()
         try:
-            with PIL.Image.open(image_path) as img:
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=[
-                        img,
-                        "이미지의 모든 텍스트를 정확하게 추출해주세요. 텍스트만 반환하고 다른 설명은 하지 마세요.",
-                    ],
-                )
+            response = self.client.models.generate_content(
+                model=self.model_name,
+                contents=[
+                    self._image_part(image_path),
+                    "이미지의 모든 텍스트를 정확하게 추출해주세요. 텍스트만 반환하고 다른 설명은 하지 마세요.",
+                ],
+            )
             return response.text.strip(), time.time() - start_time
         except Exception as e:
             raise Exception(f'Gemini OCR 처리 중 오류가 발생했습니다: {str(e)}')
@@ -0,0 +1,870 @@
+# -*- coding: utf-8 -*-
+"""첨삭 작업 큐 (DB 기반)
+
+요청마다 daemon 스레드를 띄우는 대신 correction_jobs 테이블에 작업을 쌓고
+CorrectionWorker가 리스(lease)를 잡아 처리한다.
+
+- 동시 처리 한도: provider별 slot 유니크 제약 → 모든 gunicorn 워커/노드 공통
+- 하트비트: 처리 중인 작업의 리스를 주기적으로 연장
+- 고아 작업 복구: 리스가 만료된 running 작업(워커 재시작 등)은 재대기,
+  재시도 한도를 넘기면 실패 처리
+"""
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db
+from app.models.correction_job import CorrectionJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = {'claude': 2, 'gemini': 2}
+DEFAULT_LEASE_SECONDS = 120
+# 일괄 첨삭(Message Batches) 작업 — slot을 점유하지 않고 app.essays.message_batch가 처리
+BATCH_PROVIDER = 'claude_batch'
+
+
+def _concurrency():
+    return current_app.config.get('CORRECTION_CONCURRENCY') or DEFAULT_CONCURRENCY
+
+
+def _lease_seconds():
+    return current_app.config.get('CORRECTION_LEASE_SECONDS') or DEFAULT_LEASE_SECONDS
+
+
+def _save_essay_error(essay_id: str, error_msg: str) -> None:
+    """첨삭 실패 에러 메시지를 DB에 저장 (컬럼 없으면 조용히 무시)."""
+    try:
+        from sqlalchemy import text
+        db.session.execute(
+            text("UPDATE essays SET error_message = :msg WHERE essay_id = :id"),
+            {"msg": str(error_msg)[:2000], "id": essay_id}
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+# ------------------------------------------------------------------ #
+#  큐 조작                                                             #
+# ------------------------------------------------------------------ #
+
+def enqueue_correction(essay, job_type='correction', student_name=None,
+                       teacher_name=None, revision_note=None, notify=False, batch=False):
+    """
+    첨삭 작업 등록
+
+    Args:
+        essay: Essay 객체 (status는 호출 측에서 'processing'으로 설정)
+        job_type: correction / quick / regenerate
+        student_name: 학생 이름
+        teacher_name: 첨삭자 이름 (사인용)
+        revision_note: 수정 요청 내용 (재생성 시)
+        notify: 완료 후 자동 완료 처리 + 학생/학부모 알림 발송 여부
+        batch: 일괄 첨삭(Message Batches)으로 처리 — Claude 신규 첨삭만 지원
+
+    Returns:
+        생성된 CorrectionJob
+    """
+    if batch:
+        provider = BATCH_PROVIDER
+    else:
+        provider = essay.api_provider if essay.api_provider in _concurrency() else 'claude'
+    payload = {
+        'student_name': student_name,
+        'teacher_name': teacher_name,
+        'revision_note': revision_note,
+        'notify': notify,
+        # 재시도 시 버전 번호가 중복 증가하지 않도록 기준 버전 기록
+        'base_version': essay.current_version,
+    }
+    job = CorrectionJob(
+        essay_id=essay.essay_id,
+        job_type=job_type,
+        provider=provider,
+        correction_model=essay.correction_model,
+        payload=json.dumps(payload, ensure_ascii=False),
+        max_attempts=current_app.config.get('CORRECTION_MAX_ATTEMPTS', 3),
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    if not batch:
+        ensure_worker(current_app._get_current_object())
+        wake_worker()
+    return job
+
+
+def cancel_jobs_for_essay(essay_id):
+    """
+    Essay의 작업 취소
+
+    대기 중인 작업은 즉시 cancelled로, 처리 중인 작업은 cancel_requested를 세워
+    스트리밍 리스너가 다음 청크에서 업스트림 요청을 중단하도록 한다.
+    """
+    result = db.session.execute(
+        update(CorrectionJob)
+        .where(CorrectionJob.essay_id == essay_id, CorrectionJob.status == 'queued')
+        .values(status='cancelled', finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(CorrectionJob)
+        .where(CorrectionJob.essay_id == essay_id, CorrectionJob.status == 'running')
+        .values(cancel_requested=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def _try_claim(job_id, slot, worker_id):
+    """queued 작업을 slot과 함께 running으로 전환 (compare-and-set)"""
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(CorrectionJob)
+        .where(CorrectionJob.job_id == job_id, CorrectionJob.status == 'queued')
+        .values(
+            status='running',
+            slot=slot,
+            worker_id=worker_id,
+            attempts=CorrectionJob.attempts + 1,
+            started_at=now,
+            heartbeat_at=now,
+            lease_expires_at=now + timedelta(seconds=_lease_seconds()),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def claim_next_job(worker_id):
+    """
+    다음 작업 1건 점유
+
+    provider별 빈 slot이 있을 때만 가장 오래된 queued 작업을 가져온다.
+    다른 워커와 같은 slot을 동시에 잡으면 유니크 제약 위반 → 다음 slot 시도.
+    """
+    for provider, limit in _concurrency().items():
+        used = {
+            s for (s,) in db.session.query(CorrectionJob.slot).filter(
+                CorrectionJob.provider == provider,
+                CorrectionJob.status == 'running',
+            ).all()
+        }
+        free_slots = [s for s in range(limit) if s not in used]
+        if not free_slots:
+            continue
+
+        candidates = db.session.query(CorrectionJob.job_id).filter(
+            CorrectionJob.provider == provider,
+            CorrectionJob.status == 'queued',
+        ).order_by(CorrectionJob.created_at, CorrectionJob.job_id).limit(5).all()
+
+        for (job_id,) in candidates:
+            for slot in free_slots:
+                try:
+                    if _try_claim(job_id, slot, worker_id):
+                        return CorrectionJob.query.get(job_id)
+                    break  # 다른 워커가 먼저 가져감 → 다음 후보
+                except IntegrityError:
+                    db.session.rollback()  # slot 선점됨 → 다음 slot
+    return None
+
+
+def heartbeat(job_ids, worker_id):
+    """처리 중인 작업들의 리스 연장"""
+    if not job_ids:
+        return
+    now = datetime.utcnow()
+    db.session.execute(
+        update(CorrectionJob)
+        .where(
+            CorrectionJob.job_id.in_(job_ids),
+            CorrectionJob.worker_id == worker_id,
+            CorrectionJob.status == 'running',
+        )
+        .values(heartbeat_at=now,
+                lease_expires_at=now + timedelta(seconds=_lease_seconds()))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def finish_job(job_id, worker_id, status, error_message=None):
+    """
+    작업 종료 처리 (slot 반환). 리스를 잃은 워커는 덮어쓰지 않음.
+
+    완료(done)되면 완성본이 Essay 버전으로 저장되므로 스트리밍 중간 결과(partial_output)는 비운다.
+    취소/실패 작업은 확인용으로 남긴다.
+    """
+    values = {
+        'status': status,
+        'slot': None,
+        'finished_at': datetime.utcnow(),
+        'error_message': str(error_message)[:2000] if error_message else None,
+    }
+    if status == 'done':
+        values['partial_output'] = None
+    db.session.execute(
+        update(CorrectionJob)
+        .where(
+            CorrectionJob.job_id == job_id,
+            CorrectionJob.worker_id == worker_id,
+            CorrectionJob.status == 'running',
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def requeue_expired_jobs():
+    """
+    리스가 만료된 running 작업 복구 (워커 재시작/비정상 종료 대비)
+
+    재시도 횟수가 남아 있으면 queued로 되돌리고, 아니면 작업과 Essay를 실패 처리한다.
+
+    Returns:
+        (재대기 건수, 실패 처리 건수)
+    """
+    from app.models import Essay
+
+    now = datetime.utcnow()
+    expired = CorrectionJob.query.filter(
+        CorrectionJob.status == 'running',
+        CorrectionJob.lease_expires_at < now,
+    ).all()
+
+    requeued = 0
+    failed_essay_ids = []
+    for job in expired:
+        retry = job.attempts < job.max_attempts
+        values = {'slot': None, 'worker_id': None, 'lease_expires_at': None}
+        if retry:
+            values['status'] = 'queued'
+        else:
+            values.update(status='failed', finished_at=now,
+                          error_message='처리 워커 응답 없음 (재시도 한도 초과)')
+        result = db.session.execute(
+            update(CorrectionJob)
+            .where(
+                CorrectionJob.job_id == job.job_id,
+                CorrectionJob.status == 'running',
+                CorrectionJob.lease_expires_at == job.lease_expires_at,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            continue
+        if retry:
+            requeued += 1
+        else:
+            failed_essay_ids.append(job.essay_id)
+            essay = Essay.query.get(job.essay_id)
+            if essay and essay.status == 'processing':
+                essay.status = 'failed'
+    db.session.commit()
+
+    for essay_id in failed_essay_ids:
+        _save_essay_error(essay_id, '첨삭 처리 중 서버가 재시작되어 작업이 중단되었습니다.')
+
+    if requeued or failed_essay_ids:
+        logger.warning(f'[CorrectionQueue] 만료 작업 복구: 재대기 {requeued}건, 실패 {len(failed_essay_ids)}건')
+    return requeued, len(failed_essay_ids)
+
+
+# ------------------------------------------------------------------ #
+#  큐 현황 / 예상 대기 시간                                            #
+# ------------------------------------------------------------------ #
+
+# 이력이 없을 때 사용할 기본 소요 시간 (초) — correction_model 기준
+# harkness는 전체 규칙 문서(MOMOAI_v3_3_0_final)를 사용하는 full 모드
+DEFAULT_LATENCY = {
+    'standard':   {'p50': 180, 'p95': 300},
+    'elementary': {'p50': 120, 'p95': 240},
+    'harkness':   {'p50': 300, 'p95': 540},
+}
+# 일괄 첨삭은 배치 제출 주기 + 배치 처리 시간 (대부분 1시간 이내, 최대 24시간)
+DEFAULT_BATCH_LATENCY = {'p50': 1800, 'p95': 3600}
+LATENCY_SAMPLE_SIZE = 50   # provider·모드별 최근 완료 작업 수
+LATENCY_CACHE_TTL = 60     # 초
+
+_latency_cache = {'at': 0.0, 'stats': None}
+_latency_lock = threading.Lock()
+
+
+def _percentile(sorted_values, pct):
+    """nearest-rank 백분위수"""
+    import math
+
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def get_latency_stats(force=False):
+    """
+    provider·모드별 최근 첨삭 소요 시간 p50/p95 (초)
+
+    완료(done)된 작업의 started_at~finished_at 기준, 프로세스 내 60초 캐시.
+
+    Returns:
+        dict: {(provider, correction_model): {'p50', 'p95', 'samples'}}
+    """
+    import time
+
+    now = time.monotonic()
+    with _latency_lock:
+        if not force and _latency_cache['stats'] is not None \
+                and now - _latency_cache['at'] < LATENCY_CACHE_TTL:
+            return _latency_cache['stats']
+
+    since = datetime.utcnow() - timedelta(days=30)
+    rows = db.session.query(
+        CorrectionJob.provider, CorrectionJob.correction_model,
+        CorrectionJob.started_at, CorrectionJob.finished_at,
+    ).filter(
+        CorrectionJob.status == 'done',
+        CorrectionJob.started_at.isnot(None),
+        CorrectionJob.finished_at.isnot(None),
+        CorrectionJob.finished_at >= since,
+    ).order_by(CorrectionJob.finished_at.desc()).limit(2000).all()
+
+    samples = {}
+    for provider, model, started, finished in rows:
+        key = (provider, model or 'standard')
+        bucket = samples.setdefault(key, [])
+        if len(bucket) < LATENCY_SAMPLE_SIZE:
+            bucket.append(max(0.0, (finished - started).total_seconds()))
+
+    stats = {}
+    for key, values in samples.items():
+        values.sort()
+        stats[key] = {
+            'p50': _percentile(values, 50),
+            'p95': _percentile(values, 95),
+            'samples': len(values),
+        }
+
+    with _latency_lock:
+        _latency_cache['stats'] = stats
+        _latency_cache['at'] = now
+    return stats
+
+
+def _latency_for(stats, provider, model):
+    """provider·모드 소요 시간 (이력 부족 시 기본값)"""
+    model = model or 'standard'
+    entry = stats.get((provider, model))
+    if entry and entry['samples'] >= 3:
+        return entry['p50'], entry['p95']
+    if provider == BATCH_PROVIDER:
+        return DEFAULT_BATCH_LATENCY['p50'], DEFAULT_BATCH_LATENCY['p95']
+    default = DEFAULT_LATENCY.get(model, DEFAULT_LATENCY['standard'])
+    return default['p50'], default['p95']
+
+
+def _simulate_finish(lanes, running, queued_ahead, own_latency, stats, provider, pct_index):
+    """
+    slot(lane) 단위로 앞선 작업을 배정해 이 작업의 완료 예상 시각(초 후) 계산
+
+    Args:
+        lanes: provider 동시 처리 한도
+        running: [(correction_model, 경과 초)]
+        queued_ahead: [correction_model] (앞선 대기 작업, 오래된 순)
+        own_latency: (p50, p95)
+        pct_index: 0=p50, 1=p95
+    """
+    import heapq
+
+    free_at = []
+    for model, elapsed in running[:lanes]:
+        expected = _latency_for(stats, provider, model)[pct_index]
+        free_at.append(max(0.0, expected - elapsed))
+    free_at += [0.0] * max(0, lanes - len(free_at))
+    heapq.heapify(free_at)
+
+    for model in queued_ahead:
+        start = heapq.heappop(free_at)
+        heapq.heappush(free_at, start + _latency_for(stats, provider, model)[pct_index])
+
+    return heapq.heappop(free_at) + own_latency[pct_index]
+
+
+def get_queue_state(essay_id):
+    """
+    Essay의 큐 상태 + 예상 완료 시간 (모든 워커 공통 DB 기준)
+
+    Returns:
+        dict: job_status, position(대기 순번, 처리 중이면 0), ahead(앞선 대기 건수),
+              running(처리 중 건수), queued(전체 대기 건수) — 실시간 큐 기준,
+              eta_seconds(p50 기준), eta_p95_seconds, elapsed_seconds,
+              batch(일괄 첨삭 작업 여부)
+    """
+
+    counts = dict(
+        db.session.query(CorrectionJob.status, func.count(CorrectionJob.job_id))
+        .filter(CorrectionJob.status.in_(['queued', 'running']),
+                CorrectionJob.provider != BATCH_PROVIDER)
+        .group_by(CorrectionJob.status).all()
+    )
+    state = {
+        'job_status': None,
+        'position': 0,
+        'ahead': 0,
+        'running': counts.get('running', 0),
+        'queued': counts.get('queued', 0),
+        'eta_seconds': None,
+        'eta_p95_seconds': None,
+        'elapsed_seconds': None,
+        'progress': None,
+        'batch': False,
+    }
+
+    job = CorrectionJob.query.filter(
+        CorrectionJob.essay_id == essay_id,
+        CorrectionJob.status.in_(['queued', 'running']),
+    ).order_by(CorrectionJob.created_at.desc()).first()
+    if not job:
+        return state
+
+    now = datetime.utcnow()
+    stats = get_latency_stats()
+    own = _latency_for(stats, job.provider, job.correction_model)
+    state['job_status'] = job.status
+
+    if job.provider == BATCH_PROVIDER:
+        # 일괄 첨삭: 대기 작업 전체가 한 배치로 함께 처리되므로 순번 대신 등록 후 경과 시간 기준
+        elapsed = (now - job.created_at).total_seconds() if job.created_at else 0.0
+        state['batch'] = True
+        state['elapsed_seconds'] = int(elapsed)
+        state['eta_seconds'] = int(max(0.0, own[0] - elapsed))
+        state['eta_p95_seconds'] = int(max(0.0, own[1] - elapsed))
+        return state
+
+    if job.status == 'running':
+        elapsed = (now - job.started_at).total_seconds() if job.started_at else 0.0
+        state['elapsed_seconds'] = int(elapsed)
+        state['progress'] = job.progress_dict or None
+        state['eta_seconds'] = int(max(0.0, own[0] - elapsed))
+        state['eta_p95_seconds'] = int(max(0.0, own[1] - elapsed))
+        return state
+
+    ahead_models = [
+        m for (m,) in db.session.query(CorrectionJob.correction_model).filter(
+            CorrectionJob.provider == job.provider,
+            CorrectionJob.status == 'queued',
+            CorrectionJob.created_at < job.created_at,
+        ).order_by(CorrectionJob.created_at).all()
+    ]
+    running = [
+        (m, (now - started).total_seconds() if started else 0.0)
+        for m, started in db.session.query(
+            CorrectionJob.correction_model, CorrectionJob.started_at
+        ).filter(
+            CorrectionJob.provider == job.provider,
+            CorrectionJob.status == 'running',
+        ).all()
+    ]
+    lanes = max(1, _concurrency().get(job.provider, 1))
+
+    state['ahead'] = len(ahead_models)
+    state['position'] = len(ahead_models) + 1
+    state['elapsed_seconds'] = int((now - job.created_at).total_seconds()) if job.created_at else 0
+    state['eta_seconds'] = int(_simulate_finish(lanes, running, ahead_models, own, stats, job.provider, 0))
+    state['eta_p95_seconds'] = int(_simulate_finish(lanes, running, ahead_models, own, stats, job.provider, 1))
+    return state
+
+
+def get_partial_output(essay_id, offset=0):
+    """
+    처리 중인 작업의 스트리밍 중간 결과 (offset 글자 이후만)
+
+    Returns:
+        dict: job_status, length(전체 글자 수), html(offset 이후 부분),
+              reset(재시도로 중간 결과가 다시 시작되어 html이 처음부터인지) — 처리 중 작업이 없으면 None
+    """
+    offset = max(0, int(offset or 0))
+    row = db.session.query(
+        CorrectionJob.status,
+        func.length(CorrectionJob.partial_output),
+        func.substr(CorrectionJob.partial_output, offset + 1),
+    ).filter(
+        CorrectionJob.essay_id == essay_id,
+        CorrectionJob.status.in_(['queued', 'running']),
+    ).order_by(CorrectionJob.created_at.desc()).first()
+    if not row:
+        return None
+    status, length, html = row
+    length = length or 0
+    if offset > length:
+        # 재시도로 중간 결과가 다시 시작됨 → 처음부터
+        partial = get_partial_output(essay_id, 0)
+        if partial:
+            partial['reset'] = True
+        return partial
+    return {'job_status': status, 'length': length, 'html': html or '', 'reset': False}
+
+
+# ------------------------------------------------------------------ #
+#  스트리밍 진행 상황                                                  #
+# ------------------------------------------------------------------ #
+
+# 리포트 섹션 제목 (harkness: section-header, standard/elementary: sh)
+_SECTION_PATTERN = re.compile(r'class="(?:section-header|section-title|sh)"[^>]*>\s*([^<]{1,60})<')
+
+
+class JobStreamListener:
+    """
+    스트리밍 응답 청크 기록 + 진행 상황/취소 확인 (MOMOAIService.stream_listener)
+
+    FLUSH_INTERVAL마다 받은 텍스트를 correction_jobs.partial_output에 이어 붙이고
+    progress를 같은 UPDATE로 갱신한 뒤 cancel_requested를 확인한다.
+    처리 화면은 /essays/api/partial/<essay_id>로 partial_output을 읽어 미리보기를 보여준다.
+    """
+
+    FLUSH_INTERVAL = 2.0  # 초
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.cancelled = False
+        self._reset()
+
+    def _reset(self):
+        self.tokens = 0
+        self.chars = 0
+        self.sections = []
+        self._pending = []
+        self._tail = ''
+        self._last_flush = 0.0
+
+    def begin(self):
+        """API 호출(재시도 포함) 시작 — 이전 시도 내용 초기화"""
+        import time
+
+        self._reset()
+        self._last_flush = time.monotonic()
+        self._write_progress(state='streaming', partial_output='')
+
+    def on_text(self, text):
+        """텍스트 델타 수신. False를 반환하면 스트림 중단."""
+        import time
+
+        self.tokens += 1  # 텍스트 델타 ≈ 토큰 (최종 사용량은 end에서 보정)
+        self.chars += len(text)
+        self._pending.append(text)
+        if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+        return not self.cancelled
+
+    def end(self, output_tokens=None):
+        """응답 완료 — 남은 청크 기록 및 실제 출력 토큰 반영"""
+        if output_tokens:
+            self.tokens = output_tokens
+        self.flush(state='finalizing')
+
+    def flush(self, state='streaming'):
+        import time
+
+        self._last_flush = time.monotonic()
+        chunk = ''.join(self._pending)
+        self._pending = []
+        partial_output = None
+        if chunk:
+            # 전체를 다시 쓰지 않고 DB에서 이어 붙임
+            partial_output = func.coalesce(CorrectionJob.partial_output, '') + chunk
+            scan = self._tail + chunk
+            for m in _SECTION_PATTERN.finditer(scan):
+                if m.end() > len(self._tail):  # tail 안에서 끝난 제목은 이미 집계됨
+                    self.sections.append(m.group(1).strip())
+            self._tail = scan[-200:]
+        self._write_progress(state=state, partial_output=partial_output)
+
+    def _write_progress(self, state, partial_output=None):
+        progress = {
+            'state': state,
+            'tokens': self.tokens,
+            'chars': self.chars,
+            'sections': len(self.sections),
+            'last_section': self.sections[-1] if self.sections else None,
+        }
+        values = {'progress': json.dumps(progress, ensure_ascii=False)}
+        if partial_output is not None:
+            values['partial_output'] = partial_output
+        try:
+            db.session.execute(
+                update(CorrectionJob)
+                .where(CorrectionJob.job_id == self.job_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            requested = db.session.query(CorrectionJob.cancel_requested).filter(
+                CorrectionJob.job_id == self.job_id).scalar()
+            if requested:
+                self.cancelled = True
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f'[CorrectionQueue] 진행 상황 기록 실패: {e}')
+
+
+# ------------------------------------------------------------------ #
+#  작업 실행                                                           #
+# ------------------------------------------------------------------ #
+
+def _build_service(provider):
+    """provider에 맞는 첨삭 서비스 생성"""
+    if provider == 'gemini':
+        from app.essays.gemini_correction_service import GeminiCorrectionService
+        return GeminiCorrectionService()
+    from app.essays.momoai_service import MOMOAIService
+    return MOMOAIService(current_app.config.get('ANTHROPIC_API_KEY'))
+
+
+def _notify_essay_complete(essay, student_name):
+    """첨삭 완료 알림 (학생 + 연결된 학부모)"""
+    from app.models import ParentStudent, Notification
+    from app.models.user import User
+
+    title = essay.title or f'{student_name}의 논술'
+    student_user = User.query.filter_by(email=essay.student.email).first() if essay.student.email else None
+    if student_user:
+        Notification.create_bulk(
+            [student_user.user_id],
+            notification_type='essay_complete',
+            title='첨삭이 완료되었습니다',
+            message=f'"{title}" 첨삭이 완료되었습니다. 확인해보세요!',
+            link_url=f'/student/essays/{essay.essay_id}',
+            related_entity_type='essay',
+            related_entity_id=essay.essay_id,
+            commit=False
+        )
+    parent_ids = [pid for (pid,) in db.session.query(ParentStudent.parent_id).filter_by(
+        student_id=essay.student.student_id, is_active=True
+    ).all()]
+    Notification.create_bulk(
+        parent_ids,
+        notification_type='essay_complete',
+        title='자녀의 첨삭이 완료되었습니다',
+        message=f'{student_name} 학생의 "{title}" 첨삭이 완료되었습니다.',
+        link_url=f'/parent/essays/{essay.student.student_id}/{essay.essay_id}',
+        related_entity_type='essay',
+        related_entity_id=essay.essay_id,
+        commit=False
+    )
+    db.session.commit()
+
+
+def _finalize_and_notify(service, essay, student_name):
+    service.finalize_essay(essay)
+    try:
+        _notify_essay_complete(essay, student_name)
+    except Exception as notif_err:
+        db.session.rollback()
+        print(f'[알림 발송 오류] {notif_err}')
+
+
+def run_job(job_id, worker_id):
+    """점유한 작업 1건 실행 (app context 안에서 호출)"""
+    from app.models import Essay
+
+    job = CorrectionJob.query.get(job_id)
+    if not job:
+        return
+    payload = job.payload_dict
+    student_name = payload.get('student_name')
+    teacher_name = payload.get('teacher_name')
+
+    essay = Essay.query.get(job.essay_id)
+    if not essay:
+        finish_job(job_id, worker_id, 'cancelled', '첨삭 대상이 삭제되었습니다.')
+        return
+
+    # 재시도 작업: 이전 시도에서 이미 끝났거나 취소된 경우
+    if essay.status != 'processing':
+        if essay.status == 'failed':
+            finish_job(job_id, worker_id, 'cancelled')
+            return
+        if essay.status == 'reviewing' and payload.get('notify'):
+            _finalize_and_notify(_build_service(job.provider), essay, student_name)
+        finish_job(job_id, worker_id, 'done')
+        return
+
+    from app.essays.momoai_service import CorrectionCancelled
+
+    try:
+        service = _build_service(job.provider)
+        if job.provider == 'claude' and current_app.config.get('CORRECTION_STREAMING', True):
+            service.stream_listener = JobStreamListener(job.job_id)
+
+        if job.job_type == 'regenerate':
+            base_version = payload.get('base_version')
+            if base_version:
+                essay.current_version = base_version
+            service.regenerate_essay(essay, student_name, payload.get('revision_note'), teacher_name)
+        else:
+            service.process_essay(essay, student_name, teacher_name)
+            if payload.get('notify'):
+                _finalize_and_notify(service, essay, student_name)
+        finish_job(job_id, worker_id, 'done')
+
+    except CorrectionCancelled:
+        print(f'[첨삭 취소] {job.essay_id} — 스트리밍 중단')
+        db.session.rollback()
+        # 재생성은 API 호출 전에 버전 번호를 올려 커밋하므로 기준 버전으로 되돌림
+        base_version = payload.get('base_version')
+        if job.job_type == 'regenerate' and base_version:
+            essay = Essay.query.get(job.essay_id)
+            if essay and essay.current_version != base_version:
+                essay.current_version = base_version
+                db.session.commit()
+        finish_job(job_id, worker_id, 'cancelled')
+
+    except Exception as e:
+        label = {'regenerate': '재생성 오류', 'quick': '임시 첨삭 오류'}.get(job.job_type, '첨삭 오류')
+        print(f'[{label}] {e}')
+        db.session.rollback()
+        essay = Essay.query.get(job.essay_id)
+        if essay:
+            essay.status = 'failed'
+            db.session.commit()
+        _save_essay_error(job.essay_id, str(e))
+        finish_job(job_id, worker_id, 'failed', str(e))
+
+
+class CorrectionWorker:
+    """첨삭 큐 워커 (처리 스레드 N개 + 하트비트/복구 스레드 1개)"""
+
+    def __init__(self, app, concurrency=None, poll_interval=5.0):
+        self.app = app
+        limits = app.config.get('CORRECTION_CONCURRENCY') or DEFAULT_CONCURRENCY
+        self.concurrency = concurrency or sum(limits.values())
+        self.poll_interval = poll_interval
+        self.pid = os.getpid()
+        self.worker_id = f'{socket.gethostname()}:{self.pid}:{uuid.uuid4().hex[:6]}'
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._active = set()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    @property
+    def active_count(self):
+        with self._lock:
+            return len(self._active)
+
+    def start(self):
+        with self.app.app_context():
+            try:
+                requeue_expired_jobs()
+            except Exception as e:
+                logger.error(f'[CorrectionQueue] 시작 시 복구 실패: {e}')
+
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._run_loop, name=f'correction-worker-{i}', daemon=True)
+            t.start()
+            self._threads.append(t)
+        hb = threading.Thread(target=self._heartbeat_loop, name='correction-heartbeat', daemon=True)
+        hb.start()
+        self._threads.append(hb)
+        logger.info(f'[CorrectionQueue] 워커 시작 {self.worker_id} (스레드 {self.concurrency}개)')
+
+    def stop(self, timeout=None):
+        """새 작업 점유 중단 후 처리 중 작업 완료 대기"""
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def _run_loop(self):
+        while not self._stop.is_set():
+            job_id = None
+            try:
+                with self.app.app_context():
+                    job = claim_next_job(self.worker_id)
+                    if job:
+                        job_id = job.job_id
+                        with self._lock:
+                            self._active.add(job_id)
+                        run_job(job_id, self.worker_id)
+            except Exception as e:
+                logger.error(f'[CorrectionQueue] 작업 처리 오류 {job_id}: {e}')
+            finally:
+                if job_id:
+                    with self._lock:
+                        self._active.discard(job_id)
+
+            if job_id is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _heartbeat_loop(self):
+        with self.app.app_context():
+            interval = max(5, _lease_seconds() // 4)
+        while not self._stop.wait(interval):
+            try:
+                with self._lock:
+                    active = list(self._active)
+                with self.app.app_context():
+                    heartbeat(active, self.worker_id)
+                    requeue_expired_jobs()
+            except Exception as e:
+                logger.error(f'[CorrectionQueue] 하트비트 오류: {e}')
+
+
+# ------------------------------------------------------------------ #
+#  프로세스 내장 워커 (CORRECTION_WORKER_MODE=embedded)                #
+# ------------------------------------------------------------------ #
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def ensure_worker(app):
+    """현재 프로세스의 내장 워커 시작 (fork 이후 프로세스마다 1개)"""
+    global _worker
+    if app.config.get('CORRECTION_WORKER_MODE', 'embedded') != 'embedded':
+        return None
+    with _worker_lock:
+        if _worker is None or _worker.pid != os.getpid():
+            _worker = CorrectionWorker(app)
+            _worker.start()
+    return _worker
+
+
+def wake_worker():
+    """대기 중인 내장 워커 깨우기 (새 작업 등록 직후)"""
+    if _worker is not None and _worker.pid == os.getpid():
+        _worker.wake()
+
+
+def init_correction_queue(app):
+    """
+    첫 요청 시 내장 워커 시작
+
+    gunicorn preload_app 환경에서 마스터 프로세스가 아닌 각 워커 프로세스에서 시작되도록
+    create_app 시점이 아닌 첫 요청 시점에 띄운다 (관리 스크립트에서는 시작되지 않음).
+    """
+    if app.config.get('CORRECTION_WORKER_MODE', 'embedded') != 'embedded':
+        return
+
+    @app.before_request
+    def _start_correction_worker():
+        if _worker is None or _worker.pid != os.getpid():
+            ensure_worker(app)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""첨삭 목록 조회 (키셋 페이지네이션)
+
+첨삭이 수만 건이 되어도 목록 화면 / API가 한 페이지 분량만 읽도록 한다.
+
+- 가시 범위: visible_essays(user) — 관리자/매니저는 전체, 강사는 본인 생성·담당·수강 학생 첨삭
+- 목록 행: original_text / teacher_guide 같은 큰 컬럼은 읽지 않고, 미리보기(앞 200자)만 SQL에서 자른다
+- 최신 결과 / 버전: 첨삭별 최신 EssayResult(ROW_NUMBER)와 MAX(version_number) 서브쿼리를 조인
+  → 행마다 result / versions를 따로 조회하지 않음
+- 페이지: 정렬 키 + (created_at, essay_id)로 이어지는 커서 (OFFSET 없음)
+- 집계: 상태별 건수는 GROUP BY 한 번 (status_counts)
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy.orm import aliased, contains_eager, defer, joinedload, with_expression
+
+from app.models import db, Essay, EssayResult, EssayVersion, Student, User
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+PREVIEW_LENGTH = 200
+NO_SCORE = -1      # 점수 없는 결과는 점수 정렬에서 맨 뒤(내림차순) / 맨 앞(오름차순)
+
+SORTS = ('date_desc', 'date_asc', 'score_desc', 'score_asc', 'student')
+
+
+def is_manager(user):
+    """관리자/매니저 여부 (전체 첨삭 조회 가능)"""
+    return user.role in ('admin', 'manager') or bool(user.role_level and user.role_level <= 2)
+
+
+def visible_essays(user):
+    """사용자가 볼 수 있는 첨삭 쿼리 → (query, Student 조인 여부)"""
+    if is_manager(user):
+        return Essay.query, False
+
+    from app.utils.enrollment_utils import get_active_student_ids_subquery
+    course_student_ids = get_active_student_ids_subquery(user.user_id)
+    query = Essay.query.outerjoin(Student).filter(
+        db.or_(
+            Essay.user_id == user.user_id,
+            Student.teacher_id == user.user_id,
+            Student.student_id.in_(course_student_ids)
+        )
+    )
+    return query, True
+
+
+def _latest_result():
+    """첨삭별 최신 EssayResult 1건 (재생성으로 여러 건이어도 목록 행은 1개)"""
+    ranked = db.session.query(
+        EssayResult,
+        db.func.row_number().over(
+            partition_by=EssayResult.essay_id,
+            order_by=(EssayResult.created_at.desc(), EssayResult.result_id.desc()),
+        ).label('rn'),
+    ).subquery()
+    latest = aliased(EssayResult, ranked)
+    return latest, ranked.c.rn
+
+
+def _latest_version():
+    return db.session.query(
+        EssayVersion.essay_id.label('essay_id'),
+        db.func.max(EssayVersion.version_number).label('version_number'),
+    ).group_by(EssayVersion.essay_id).subquery()
+
+
+class EssayListing:
+    """
+    필터가 적용된 첨삭 목록
+
+        listing = EssayListing(current_user, request.args)
+        rows, next_cursor = listing.page(cursor, limit)
+        counts = listing.status_counts()
+    """
+
+    def __init__(self, user, args=None):
+        args = args or {}
+        self.sort = args.get('sort', 'date_desc')
+        if self.sort not in SORTS:
+            self.sort = 'date_desc'
+
+        query, student_joined = visible_essays(user)
+        self.result, rn = _latest_result()
+        query = query.outerjoin(self.result, db.and_(self.result.essay_id == Essay.essay_id, rn == 1))
+
+        student_id = (args.get('student_id') or '').strip()
+        if student_id:
+            query = query.filter(Essay.student_id == student_id)
+
+        # Essay.status 명시 (Student.status 모호성 방지)
+        status = (args.get('status') or '').strip()
+        if status:
+            query = query.filter(Essay.status == status)
+
+        grade = (args.get('grade') or '').strip()
+        if grade:
+            query = query.filter(self.result.final_grade == grade)
+
+        teacher_id = (args.get('teacher_id') or '').strip()
+        if teacher_id:
+            query = query.filter(Essay.user_id == teacher_id)
+
+        # 통합 검색 (학생명 / 강사명 / 제목)
+        search = (args.get('search') or '').strip()
+        if search:
+            student_ids = db.select(Student.student_id).where(Student.name.contains(search))
+            teacher_ids = db.select(User.user_id).where(User.name.contains(search))
+            query = query.filter(db.or_(
+                Essay.title.contains(search),
+                Essay.student_id.in_(student_ids),
+                Essay.user_id.in_(teacher_ids),
+            ))
+
+        if self.sort in ('score_desc', 'score_asc'):
+            # 이전과 같이 결과가 있는 첨삭만
+            query = query.filter(self.result.result_id.isnot(None))
+        if self.sort == 'student' and not student_joined:
+            query = query.join(Student, Student.student_id == Essay.student_id)
+
+        self.filtered = query
+
+    # ------------------------------------------------------------------ #
+    #  정렬 / 커서                                                         #
+    # ------------------------------------------------------------------ #
+
+    def _keys(self):
+        """[(식, 내림차순 여부, 커서 값 변환)] — 마지막 두 키는 항상 created_at, essay_id"""
+        score = db.func.coalesce(self.result.total_score, NO_SCORE)
+        if self.sort == 'date_asc':
+            return [(Essay.created_at, False, _parse_datetime), (Essay.essay_id, False, str)]
+        if self.sort == 'score_desc':
+            return [(score, True, Decimal), (Essay.created_at, True, _parse_datetime), (Essay.essay_id, True, str)]
+        if self.sort == 'score_asc':
+            return [(score, False, Decimal), (Essay.created_at, True, _parse_datetime), (Essay.essay_id, True, str)]
+        if self.sort == 'student':
+            return [(Student.name, False, str), (Essay.created_at, True, _parse_datetime),
+                    (Essay.essay_id, True, str)]
+        return [(Essay.created_at, True, _parse_datetime), (Essay.essay_id, True, str)]
+
+    def _after(self, keys, values):
+        """커서 다음 행 조건 — (k1 > v1) OR (k1 = v1 AND k2 > v2) ... (키마다 방향이 달라도 됨)"""
+        clauses = []
+        for i, (expr, desc, _) in enumerate(keys):
+            step = expr < values[i] if desc else expr > values[i]
+            equal = [keys[j][0] == values[j] for j in range(i)]
+            clauses.append(db.and_(*equal, step))
+        return db.or_(*clauses)
+
+    def encode_cursor(self, row):
+        essay, _ = row
+        values = []
+        for expr, _, _ in self._keys():
+            if expr is Essay.created_at:
+                values.append(essay.created_at.isoformat())
+            elif expr is Essay.essay_id:
+                values.append(essay.essay_id)
+            elif expr is Student.name:
+                values.append(essay.student.name)
+            else:
+                score = essay.result.total_score if essay.result else None
+                values.append(str(score if score is not None else NO_SCORE))
+        token = json.dumps([self.sort] + values, ensure_ascii=False, separators=(',', ':'))
+        return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """커서 → 키 값 목록 (형식이 틀리거나 다른 정렬의 커서면 ValueError)"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            keys = self._keys()
+            if not isinstance(data, list) or data[0] != self.sort or len(data) != len(keys) + 1:
+                raise ValueError
+            return [parse(value) for (_, _, parse), value in zip(keys, data[1:])]
+        except Exception:
+            raise ValueError('잘못된 목록 커서입니다.')
+
+    # ------------------------------------------------------------------ #
+    #  조회                                                                #
+    # ------------------------------------------------------------------ #
+
+    def page(self, cursor=None, limit=PAGE_SIZE):
+        """
+        한 페이지 조회 → ([(essay, 최신 버전 번호)], 다음 커서 또는 None)
+
+        essay.result는 최신 결과로 채워지고, original_text는 읽지 않는다 (essay.preview_text 사용).
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        keys = self._keys()
+        latest_version = _latest_version()
+
+        query = self.filtered\
+            .outerjoin(latest_version, latest_version.c.essay_id == Essay.essay_id)\
+            .add_columns(latest_version.c.version_number)\
+            .options(
+                defer(Essay.original_text),
+                defer(Essay.teacher_guide),
+                with_expression(Essay.preview_text, db.func.substr(Essay.original_text, 1, PREVIEW_LENGTH + 1)),
+                contains_eager(Essay.result.of_type(self.result)),
+                joinedload(Essay.student).load_only(Student.name, Student.grade),
+                joinedload(Essay.user).load_only(User.name),
+            )
+        if cursor:
+            query = query.filter(self._after(keys, self.decode_cursor(cursor)))
+        query = query.order_by(*[expr.desc() if desc else expr.asc() for expr, desc, _ in keys])
+
+        rows = [tuple(row) for row in query.limit(limit + 1).all()]
+        next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def status_counts(self):
+        """필터 범위의 상태별 건수 {status: count} — GROUP BY 한 번"""
+        rows = self.filtered.order_by(None)\
+            .with_entities(Essay.status, db.func.count(Essay.essay_id))\
+            .group_by(Essay.status).all()
+        return {status: count for status, count in rows}
+
+
+def status_summary(query):
+    """첨삭 쿼리 → {'total', 'completed', 'pending'} (대시보드 카드)"""
+    rows = query.order_by(None)\
+        .with_entities(Essay.status, db.func.count(Essay.essay_id))\
+        .group_by(Essay.status).all()
+    counts = dict(rows)
+    return {
+        'total': sum(counts.values()),
+        'completed': counts.get('completed', 0),
+        'pending': counts.get('draft', 0),
+    }
+
+
+def essay_item(essay, latest_version):
+    """목록 API 항목"""
+    result = essay.result
+    preview = essay.preview_text or ''
+    return {
+        'essay_id': essay.essay_id,
+        'title': essay.title,
+        'student_id': essay.student_id,
+        'student_name': essay.student.name if essay.student else None,
+        'student_grade': essay.student.grade if essay.student else None,
+        'teacher_name': essay.user.name if essay.user else None,
+        'status': essay.status,
+        'is_finalized': bool(essay.is_finalized),
+        'current_version': essay.current_version,
+        'latest_version': latest_version,
+        'total_score': float(result.total_score) if result and result.total_score is not None else None,
+        'final_grade': result.final_grade if result else None,
+        'preview': preview[:PREVIEW_LENGTH] + ('...' if len(preview) > PREVIEW_LENGTH else ''),
+        'has_attachment': bool(essay.attachment_path),
+        'created_at': essay.created_at.isoformat() if essay.created_at else None,
+    }
+
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value)
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""일괄 첨삭 (Anthropic Message Batches)
+
+학기말 일괄 업로드처럼 급하지 않은 첨삭은 실시간 큐(slot 2개) 대신
+대기 중인 작업을 하나의 Message Batch로 묶어 제출하고, 완료되면 결과를
+EssayVersion/EssayScore로 반영한다 (배치 단가 50%).
+
+- 등록: enqueue_correction(..., batch=True) → provider='claude_batch' 로 queued
+  (실시간 워커는 claude/gemini slot만 점유하므로 이 작업을 가져가지 않음)
+- 제출: submit_pending_batch() — queued 작업을 running으로 점유 후 batches.create
+  (worker_id = 'batch:<message_batch_id>')
+- 반영: poll_batches() — 종료된 배치의 결과를 custom_id(job_id)로 매칭해 저장
+- 스케줄러(process_correction_batches)가 주기적으로 두 함수를 호출한다.
+
+테스트 시 ANTHROPIC_BASE_URL 환경 변수로 로컬 스텁 서버를 지정할 수 있다.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update
+
+from app.models import db, Essay
+from app.models.correction_job import CorrectionJob
+from app.essays.job_queue import (
+    BATCH_PROVIDER, finish_job, _finalize_and_notify, _save_essay_error,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKER_PREFIX = 'batch:'
+PENDING_PREFIX = BATCH_WORKER_PREFIX + 'pending:'
+DEFAULT_MAX_REQUESTS = 500
+# 점유 후 제출 전에 프로세스가 죽으면 이 시간 뒤 requeue_expired_jobs가 재대기 처리
+SUBMIT_LEASE_SECONDS = 600
+
+RESULT_ERRORS = {
+    'errored': '배치 첨삭 요청이 실패했습니다.',
+    'expired': '배치 처리 시간(24시간)이 초과되었습니다.',
+    'canceled': '배치 첨삭이 취소되었습니다.',
+}
+
+
+def _build_service():
+    from app.essays.momoai_service import MOMOAIService
+    return MOMOAIService(current_app.config.get('ANTHROPIC_API_KEY'))
+
+
+def _fail_job(job, worker_id, error_msg):
+    """작업 + Essay 실패 처리"""
+    db.session.rollback()
+    essay = Essay.query.get(job.essay_id)
+    if essay and essay.status == 'processing':
+        essay.status = 'failed'
+        db.session.commit()
+    _save_essay_error(job.essay_id, error_msg)
+    finish_job(job.job_id, worker_id, 'failed', error_msg)
+
+
+def _log_usage(essay, usage, model_name):
+    """배치 사용량 로그 (배치 할인 단가 적용)"""
+    try:
+        from app.models.api_usage_log import ApiUsageLog
+        input_tok = getattr(usage, 'input_tokens', 0) or 0
+        output_tok = getattr(usage, 'output_tokens', 0) or 0
+        cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_write = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        model = essay.correction_model or 'standard'
+        db.session.add(ApiUsageLog(
+            user_id=essay.user_id,
+            api_type='claude',
+            model_name=model_name,
+            usage_type='correction' if model == 'harkness' else model,
+            essay_id=essay.essay_id,
+            input_tokens=input_tok,
+            output_tokens=output_tok,
+            cache_read_tokens=cache_read,
+            cache_write_tokens=cache_write,
+            cost_usd=ApiUsageLog.calc_claude_cost(input_tok, output_tok, cache_read, cache_write,
+                                                  batch=True),
+        ))
+        db.session.commit()
+    except Exception as log_err:
+        db.session.rollback()
+        print(f"[사용량 로그 저장 실패] {log_err}")
+
+
+def submit_pending_batch():
+    """
+    대기 중인 일괄 첨삭 작업을 하나의 Message Batch로 제출
+
+    Returns:
+        (message_batch_id 또는 None, 제출 건수)
+    """
+    limit = current_app.config.get('CORRECTION_BATCH_MAX_REQUESTS') or DEFAULT_MAX_REQUESTS
+    job_ids = [
+        job_id for (job_id,) in db.session.query(CorrectionJob.job_id).filter(
+            CorrectionJob.provider == BATCH_PROVIDER,
+            CorrectionJob.status == 'queued',
+        ).order_by(CorrectionJob.created_at, CorrectionJob.job_id).limit(limit).all()
+    ]
+    if not job_ids:
+        return None, 0
+
+    # 다른 워커와 중복 제출하지 않도록 먼저 점유 (compare-and-set)
+    claim_id = f'{PENDING_PREFIX}{uuid.uuid4().hex[:12]}'
+    now = datetime.utcnow()
+    db.session.execute(
+        update(CorrectionJob)
+        .where(CorrectionJob.job_id.in_(job_ids), CorrectionJob.status == 'queued')
+        .values(status='running', worker_id=claim_id,
+                attempts=CorrectionJob.attempts + 1,
+                started_at=now, heartbeat_at=now,
+                lease_expires_at=now + timedelta(seconds=SUBMIT_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    jobs = CorrectionJob.query.filter_by(worker_id=claim_id, status='running').all()
+    if not jobs:
+        return None, 0
+
+    service = _build_service()
+    requests = []
+    for job in jobs:
+        essay = Essay.query.get(job.essay_id)
+        if not essay or essay.status != 'processing':
+            finish_job(job.job_id, claim_id, 'cancelled')
+            continue
+        payload = job.payload_dict
+        try:
+            params = service.build_correction_request(
+                essay, payload.get('student_name'), payload.get('teacher_name'))
+        except Exception as e:
+            _fail_job(job, claim_id, f'일괄 첨삭 요청 구성 실패: {e}')
+            continue
+        requests.append({'custom_id': job.job_id, 'params': params})
+
+    if not requests:
+        return None, 0
+
+    try:
+        batch = service.client.messages.batches.create(requests=requests)
+    except Exception as e:
+        # 제출 실패 → 리스 만료 처리와 동일하게 재대기 (재시도 한도 초과 시 실패)
+        logger.error(f'[MessageBatch] 제출 실패 ({len(requests)}건): {e}')
+        db.session.rollback()
+        db.session.execute(
+            update(CorrectionJob)
+            .where(CorrectionJob.worker_id == claim_id, CorrectionJob.status == 'running')
+            .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        from app.essays.job_queue import requeue_expired_jobs
+        requeue_expired_jobs()
+        return None, 0
+
+    # 배치 결과가 나올 때까지는 리스 만료 대상이 아님 (최대 24시간, poll_batches가 정리)
+    db.session.execute(
+        update(CorrectionJob)
+        .where(CorrectionJob.worker_id == claim_id, CorrectionJob.status == 'running')
+        .values(worker_id=f'{BATCH_WORKER_PREFIX}{batch.id}', lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    logger.info(f'[MessageBatch] {batch.id} 제출: {len(requests)}건')
+    return batch.id, len(requests)
+
+
+def _apply_result(service, entry, worker_id):
+    """배치 결과 1건 반영. Returns: 완료 여부"""
+    job = CorrectionJob.query.get(entry.custom_id)
+    if not job or job.worker_id != worker_id or job.status != 'running':
+        return False
+
+    essay = Essay.query.get(job.essay_id)
+    if not essay or essay.status != 'processing':
+        # 대기 중 사용자 취소 / 삭제
+        finish_job(job.job_id, worker_id, 'cancelled')
+        return False
+
+    result = entry.result
+    if result.type != 'succeeded':
+        detail = getattr(getattr(result, 'error', None), 'error', None)
+        msg = RESULT_ERRORS.get(result.type, '배치 첨삭 실패')
+        if detail is not None and getattr(detail, 'message', None):
+            msg = f'{msg} ({detail.message})'
+        _fail_job(job, worker_id, msg)
+        return False
+
+    payload = job.payload_dict
+    student_name = payload.get('student_name')
+    message = result.message
+    try:
+        if message.stop_reason == 'max_tokens':
+            print(f"⚠️ [일괄 첨삭] {essay.essay_id} max_tokens 초과로 응답이 잘렸습니다!")
+        html_content = service.render_correction_result(
+            essay, message.content[0].text, payload.get('teacher_name'))
+        service.save_correction_result(essay, student_name, html_content)
+        _log_usage(essay, message.usage, getattr(message, 'model', None) or service.MODEL_NAME)
+        if payload.get('notify'):
+            _finalize_and_notify(service, essay, student_name)
+        finish_job(job.job_id, worker_id, 'done')
+        return True
+    except Exception as e:
+        print(f'[일괄 첨삭 오류] {e}')
+        _fail_job(job, worker_id, str(e))
+        return False
+
+
+def poll_batches():
+    """
+    제출된 Message Batch 상태 확인 후 종료된 배치 결과 반영
+
+    처리 중인 배치의 작업이 모두 취소 요청되었으면 업스트림 배치도 취소한다.
+
+    Returns:
+        반영(완료)된 작업 수
+    """
+    worker_ids = [
+        wid for (wid,) in db.session.query(CorrectionJob.worker_id).filter(
+            CorrectionJob.provider == BATCH_PROVIDER,
+            CorrectionJob.status == 'running',
+            CorrectionJob.worker_id.like(f'{BATCH_WORKER_PREFIX}%'),
+            ~CorrectionJob.worker_id.like(f'{PENDING_PREFIX}%'),
+        ).distinct().all()
+    ]
+    if not worker_ids:
+        return 0
+
+    service = _build_service()
+    done = 0
+    for worker_id in worker_ids:
+        batch_id = worker_id[len(BATCH_WORKER_PREFIX):]
+        try:
+            batch = service.client.messages.batches.retrieve(batch_id)
+        except Exception as e:
+            logger.error(f'[MessageBatch] {batch_id} 조회 실패: {e}')
+            continue
+
+        if batch.processing_status != 'ended':
+            pending_cancel = db.session.query(CorrectionJob.job_id).filter(
+                CorrectionJob.worker_id == worker_id,
+                CorrectionJob.status == 'running',
+                CorrectionJob.cancel_requested == False,  # noqa: E712
+            ).first()
+            if pending_cancel is None and batch.processing_status == 'in_progress':
+                try:
+                    service.client.messages.batches.cancel(batch_id)
+                    logger.info(f'[MessageBatch] {batch_id} 전체 취소 요청')
+                except Exception as e:
+                    logger.error(f'[MessageBatch] {batch_id} 취소 실패: {e}')
+            continue
+
+        try:
+            for entry in service.client.messages.batches.results(batch_id):
+                if _apply_result(service, entry, worker_id):
+                    done += 1
+        except Exception as e:
+            logger.error(f'[MessageBatch] {batch_id} 결과 반영 오류: {e}')
+            db.session.rollback()
+            continue
+
+        # 결과에 포함되지 않은 작업 정리
+        for job in CorrectionJob.query.filter_by(worker_id=worker_id, status='running').all():
+            _fail_job(job, worker_id, '배치 결과에 포함되지 않았습니다.')
+        logger.info(f'[MessageBatch] {batch_id} 반영 완료')
+    return done
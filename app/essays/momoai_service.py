@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """MOMOAI 첨삭 서비스 (SQLAlchemy 연동)"""
 import anthropic
-import threading
 import time
 from pathlib import Path
 from datetime import datetime
@@ -10,14 +9,24 @@ from flask import current_app
 
 from app.models import db, Essay, EssayVersion, EssayResult, EssayScore, EssayNote
 from app.essays.score_parser import get_parser
+from app.essays import prompt_cache
+from app.utils import essay_store
 
-# 동시 API 호출 제한 (최대 2개 동시 처리, 나머지는 큐 대기)
-_api_semaphore = threading.Semaphore(2)
+# 동시 API 호출 제한은 첨삭 작업 큐(app.essays.job_queue)가 전체 워커 공통으로 관리
+
+
+class CorrectionCancelled(Exception):
+    """사용자 취소 요청으로 스트리밍 응답을 중단함"""
 
 
 class MOMOAIService:
     """MOMOAI 첨삭 서비스 클래스"""
 
+    MODEL_NAME = 'claude-sonnet-4-6'
+
+    # 스트리밍 진행 상황 리스너 (job_queue.JobStreamListener). None이면 일괄 응답 모드
+    stream_listener = None
+
     def __init__(self, api_key: str):
         """
         Initialize MOMOAI Service
@@ -29,14 +38,20 @@ class MOMOAIService:
         self.system_prompt = self.load_momoai_document()
 
     def load_momoai_document(self) -> str:
-        """MOMOAI 규칙 문서 로드"""
+        """MOMOAI 규칙 문서 로드 (프로세스 공용 캐시)"""
         try:
-            doc_path = current_app.config.get('MOMOAI_DOC_PATH')
-            with open(doc_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return prompt_cache.get_document('full')
         except Exception as e:
             raise Exception(f"MOMOAI 문서를 로드할 수 없습니다: {e}")
 
+    @staticmethod
+    def _system_blocks(doc_key: str, text: str) -> list:
+        """system 파라미터 블록 — 캐시된 문서와 같으면 미리 만든 블록 재사용"""
+        blocks = prompt_cache.get_system_blocks(doc_key)
+        if blocks[0]['text'] is text or blocks[0]['text'] == text:
+            return blocks
+        return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
     def create_analysis_prompt(self, student_name: str, grade: str,
                               essay_text: str, notes: Optional[str] = None,
                               revision_note: Optional[str] = None,
@@ -124,17 +139,33 @@ v3.3.0 필수 포함 사항:
             teacher_name, is_revision_of_completed
         )
 
-        print(f"\n{'='*60}")
-        print(f"[첨삭 대기] {student_name} 학생 - {grade} (슬롯 획득 시도)")
-        print(f"{'='*60}\n")
+        return self._call_api_with_retry(
+            student_name, grade, user_prompt,
+            user_id=user_id,
+            essay_id=essay_id,
+            usage_type=usage_type,
+        )
+
+    def _create_message(self, **kwargs):
+        """
+        messages.create 래퍼
 
-        with _api_semaphore:  # 동시 2개 제한 — 나머지는 여기서 대기
-            return self._call_api_with_retry(
-                student_name, grade, user_prompt,
-                user_id=user_id,
-                essay_id=essay_id,
-                usage_type=usage_type,
-            )
+        stream_listener가 설정되어 있으면 스트리밍으로 받아 청크 단위로 진행 상황을 기록하고,
+        취소 요청 시 스트림을 닫아 업스트림 요청을 즉시 중단한다.
+        반환값은 messages.create와 동일한 Message 객체.
+        """
+        listener = self.stream_listener
+        if listener is None:
+            return self.client.messages.create(**kwargs)
+
+        listener.begin()
+        with self.client.messages.stream(**kwargs) as stream:
+            for text in stream.text_stream:
+                if not listener.on_text(text):
+                    raise CorrectionCancelled('사용자 요청으로 첨삭이 취소되었습니다.')
+            message = stream.get_final_message()
+        listener.end(getattr(message.usage, 'output_tokens', None))
+        return message
 
     def _call_api_with_retry(self, student_name: str, grade: str, user_prompt: str,
                               user_id=None, essay_id=None, usage_type='correction') -> str:
@@ -154,17 +185,11 @@ v3.3.0 필수 포함 사항:
                 start_time = time.time()
 
                 # Prompt Caching 적용: system prompt를 5분간 캐싱
-                response = self.client.messages.create(
-                    model="claude-sonnet-4-6",
+                response = self._create_message(
+                    model=self.MODEL_NAME,
                     max_tokens=64000,
                     timeout=600.0,
-                    system=[
-                        {
-                            "type": "text",
-                            "text": self.system_prompt,
-                            "cache_control": {"type": "ephemeral"}  # 5분간 캐싱
-                        }
-                    ],
+                    system=self._system_blocks('full', self.system_prompt),
                     messages=[
                         {"role": "user", "content": user_prompt}
                     ]
@@ -213,7 +238,7 @@ v3.3.0 필수 포함 사항:
                     log = ApiUsageLog(
                         user_id=user_id,
                         api_type='claude',
-                        model_name='claude-sonnet-4-6',
+                        model_name=self.MODEL_NAME,
                         usage_type=usage_type,
                         essay_id=essay_id,
                         input_tokens=input_tok,
@@ -227,32 +252,7 @@ v3.3.0 필수 포함 사항:
                 except Exception as log_err:
                     print(f"[사용량 로그 저장 실패] {log_err}")
 
-                # Extract HTML from response
-                html_content = response.content[0].text
-
-                # Remove markdown code blocks if present
-                if '```html' in html_content:
-                    start = html_content.find('```html') + 7
-                    end = html_content.find('```', start)
-                    if end != -1:
-                        html_content = html_content[start:end].strip()
-                elif '```' in html_content:
-                    start = html_content.find('```') + 3
-                    end = html_content.find('```', start)
-                    if end != -1:
-                        html_content = html_content[start:end].strip()
-
-                # Find DOCTYPE or <html tag
-                if '<!DOCTYPE' in html_content or '<html' in html_content:
-                    if '<!DOCTYPE' in html_content:
-                        html_start = html_content.find('<!DOCTYPE')
-                        html_content = html_content[html_start:]
-                    elif '<html' in html_content:
-                        html_start = html_content.find('<html')
-                        html_content = html_content[html_start:]
-                    return html_content
-                else:
-                    raise Exception("API 응답에서 HTML을 찾을 수 없습니다.")
+                return self._extract_full_html(response.content[0].text)
 
             except anthropic.RateLimitError as e:
                 # Rate Limit: 재시도
@@ -272,28 +272,50 @@ v3.3.0 필수 포함 사항:
                     continue
                 raise Exception(f"첨삭 중 API 오류가 발생했습니다: {e}")
 
+            except CorrectionCancelled:
+                raise
+
             except Exception as e:
                 raise Exception(f"첨삭 중 오류가 발생했습니다: {e}")
 
+    def _extract_full_html(self, text: str) -> str:
+        """하크니스 응답에서 완전한 HTML 문서 추출"""
+        html_content = text
+
+        # Remove markdown code blocks if present
+        if '```html' in html_content:
+            start = html_content.find('```html') + 7
+            end = html_content.find('```', start)
+            if end != -1:
+                html_content = html_content[start:end].strip()
+        elif '```' in html_content:
+            start = html_content.find('```') + 3
+            end = html_content.find('```', start)
+            if end != -1:
+                html_content = html_content[start:end].strip()
+
+        # Find DOCTYPE or <html tag
+        if '<!DOCTYPE' in html_content:
+            return html_content[html_content.find('<!DOCTYPE'):]
+        if '<html' in html_content:
+            return html_content[html_content.find('<html'):]
+        raise Exception("API 응답에서 HTML을 찾을 수 없습니다.")
+
     # ------------------------------------------------------------------ #
     #  스탠다드 모델 (3단계 체인 호출)                                     #
     # ------------------------------------------------------------------ #
 
     def _load_standard_document(self) -> str:
-        """스탠다드 모델 규칙 문서 로드"""
+        """스탠다드 모델 규칙 문서 로드 (프로세스 공용 캐시)"""
         try:
-            doc_path = current_app.config.get('MOMOAI_STANDARD_DOC_PATH')
-            with open(doc_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return prompt_cache.get_document('standard')
         except Exception as e:
             raise Exception(f"스탠다드 모델 문서를 로드할 수 없습니다: {e}")
 
     def _load_elem_document(self) -> str:
-        """초등 모델 규칙 문서 로드"""
+        """초등 모델 규칙 문서 로드 (프로세스 공용 캐시)"""
         try:
-            doc_path = current_app.config.get('MOMOAI_ELEM_DOC_PATH')
-            with open(doc_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return prompt_cache.get_document('elementary')
         except Exception as e:
             raise Exception(f"초등 모델 문서를 로드할 수 없습니다: {e}")
 
@@ -325,17 +347,11 @@ v3.3.0 필수 포함 사항:
                       + (f" (재시도 {attempt})" if attempt > 0 else ""))
                 start_time = time.time()
 
-                response = self.client.messages.create(
-                    model="claude-sonnet-4-6",
+                response = self._create_message(
+                    model=self.MODEL_NAME,
                     max_tokens=32000,
                     timeout=600.0,
-                    system=[
-                        {
-                            "type": "text",
-                            "text": standard_system,
-                            "cache_control": {"type": "ephemeral"}
-                        }
-                    ],
+                    system=self._system_blocks('standard', standard_system),
                     messages=messages,
                 )
 
@@ -364,7 +380,7 @@ v3.3.0 필수 포함 사항:
                     log = ApiUsageLog(
                         user_id=user_id,
                         api_type='claude',
-                        model_name='claude-sonnet-4-6',
+                        model_name=self.MODEL_NAME,
                         usage_type='standard',
                         essay_id=essay_id,
                         input_tokens=input_tok,
@@ -404,30 +420,36 @@ v3.3.0 필수 포함 사항:
         """
         standard_system = self._load_standard_document()
 
+        user_content = self._report_user_content(student_name, grade, essay_text, notes,
+                                                 "전체 리포트를 생성하세요.")
+
+        resp = self._call_standard_single(
+            standard_system,
+            [{"role": "user", "content": user_content}],
+            student_name, user_id=user_id, essay_id=essay_id,
+        )
+
+        return self._append_teacher_sign(self._extract_html_block(resp), teacher_name)
+
+    def _report_user_content(self, student_name: str, grade: str, essay_text: str,
+                             notes: Optional[str], instruction: str) -> str:
+        """스탠다드/초등 모델 user 메시지 구성"""
         user_content = (
             f"[학생 정보]\n- 이름: {student_name}\n- 학년: {grade}\n\n"
             f"[학생 원문]\n{essay_text}"
         )
         if notes:
             user_content += f"\n\n[교사 지시]\n{notes}"
-        user_content += "\n\n전체 리포트를 생성하세요."
-
-        with _api_semaphore:
-            resp = self._call_standard_single(
-                standard_system,
-                [{"role": "user", "content": user_content}],
-                student_name, user_id=user_id, essay_id=essay_id,
-            )
-
-        html_content = self._extract_html_block(resp)
+        return user_content + f"\n\n{instruction}"
 
+    def _append_teacher_sign(self, html_content: str, teacher_name: Optional[str]) -> str:
+        """</body> 직전에 첨삭자 사인 삽입"""
         if teacher_name and '</body>' in html_content:
             sign = (
                 f'\n<div style="text-align:right;margin-top:50px;padding:20px;'
                 f'color:#666;font-style:italic;">첨삭: {teacher_name}</div>\n'
             )
             html_content = html_content.replace('</body>', sign + '</body>', 1)
-
         return html_content
 
     def analyze_essay_elementary(self, student_name: str, grade: str, essay_text: str,
@@ -443,33 +465,22 @@ v3.3.0 필수 포함 사항:
         """
         elem_system = self._load_elem_document()
 
-        user_content = (
-            f"[학생 정보]\n- 이름: {student_name}\n- 학년: {grade}\n\n"
-            f"[학생 원문]\n{essay_text}"
-        )
-        if notes:
-            user_content += f"\n\n[교사 지시]\n{notes}"
-        user_content += "\n\n리포트를 생성하세요."
+        user_content = self._report_user_content(student_name, grade, essay_text, notes,
+                                                 "리포트를 생성하세요.")
 
-        with _api_semaphore:
-            resp = self._call_elem_single(
-                elem_system,
-                [{"role": "user", "content": user_content}],
-                student_name, user_id=user_id, essay_id=essay_id,
-            )
+        resp = self._call_elem_single(
+            elem_system,
+            [{"role": "user", "content": user_content}],
+            student_name, user_id=user_id, essay_id=essay_id,
+        )
 
         html_body = self._extract_html_block(resp)
-        css = self._extract_css_from_elem_doc(elem_system)
+        css = prompt_cache.get_elem_css()
         return self._wrap_elem_html(html_body, css, teacher_name)
 
     def _extract_css_from_elem_doc(self, doc: str) -> str:
         """초등 프롬프트 문서에서 CSS 블록 추출"""
-        if '```css' in doc:
-            start = doc.find('```css') + 6
-            end = doc.find('```', start)
-            if end != -1:
-                return doc[start:end].strip()
-        return ''
+        return prompt_cache.extract_css(doc)
 
     def _wrap_elem_html(self, html_body: str, css: str, teacher_name: Optional[str] = None) -> str:
         """초등 API 응답(body HTML)을 완전한 HTML 문서로 래핑"""
@@ -503,17 +514,11 @@ v3.3.0 필수 포함 사항:
                       + (f" (재시도 {attempt})" if attempt > 0 else ""))
                 start_time = time.time()
 
-                response = self.client.messages.create(
-                    model="claude-sonnet-4-6",
+                response = self._create_message(
+                    model=self.MODEL_NAME,
                     max_tokens=32000,
                     timeout=300.0,
-                    system=[
-                        {
-                            "type": "text",
-                            "text": elem_system,
-                            "cache_control": {"type": "ephemeral"}
-                        }
-                    ],
+                    system=self._system_blocks('elementary', elem_system),
                     messages=messages,
                 )
 
@@ -542,7 +547,7 @@ v3.3.0 필수 포함 사항:
                     log = ApiUsageLog(
                         user_id=user_id,
                         api_type='claude',
-                        model_name='claude-sonnet-4-6',
+                        model_name=self.MODEL_NAME,
                         usage_type='elementary',
                         essay_id=essay_id,
                         input_tokens=input_tok,
@@ -662,13 +667,7 @@ v3.3.0 필수 포함 사항:
         db.session.commit()
 
         try:
-            # 주의사항 + 강사 가이드 합산
-            parts = []
-            if essay.notes:
-                parts.append('\n'.join([note.content for note in essay.notes]))
-            if getattr(essay, 'teacher_guide', None):
-                parts.append(f'[강사 가이드]\n{essay.teacher_guide}')
-            notes = '\n\n'.join(parts) if parts else None
+            notes = self._combine_notes(essay)
 
             # 모델에 따라 첨삭 수행
             model = getattr(essay, 'correction_model', 'standard') or 'standard'
@@ -705,50 +704,120 @@ v3.3.0 필수 포함 사항:
                     essay_id=essay.essay_id,
                 )
 
-            # HTML 저장
-            filename = self.generate_filename(
-                student_name=student_name,
-                grade=essay.grade,
-                version=essay.current_version
-            )
-            html_path = self.save_html(html_content, filename)
+            return self.save_correction_result(essay, student_name, html_content)
 
-            # 버전 생성
-            version = EssayVersion(
-                essay_id=essay.essay_id,
-                version_number=essay.current_version,
-                html_content=html_content,
-                html_path=html_path
-            )
-            db.session.add(version)
+        except Exception as e:
+            essay.status = 'failed'
+            db.session.commit()
+            raise e
 
-            # 결과 생성
-            result = EssayResult(
-                essay_id=essay.essay_id,
-                version_id=version.version_id,
-                html_path=html_path
-            )
-            db.session.add(result)
+    def _combine_notes(self, essay: Essay) -> Optional[str]:
+        """주의사항 + 강사 가이드 합산"""
+        parts = []
+        if essay.notes:
+            parts.append('\n'.join([note.content for note in essay.notes]))
+        if getattr(essay, 'teacher_guide', None):
+            parts.append(f'[강사 가이드]\n{essay.teacher_guide}')
+        return '\n\n'.join(parts) if parts else None
+
+    def save_correction_result(self, essay: Essay, student_name: str,
+                               html_content: str) -> Tuple[EssayVersion, str]:
+        """
+        첨삭 결과 저장 (HTML 파일 + EssayVersion/EssayResult + 점수 파싱)
 
-            # 상태 업데이트
-            essay.status = 'reviewing'
-            essay.completed_at = datetime.utcnow()
+        Returns:
+            (EssayVersion, html_path) 튜플
+        """
+        # HTML 저장
+        filename = self.generate_filename(
+            student_name=student_name,
+            grade=essay.grade,
+            version=essay.current_version
+        )
+        html_path = self.save_html(html_content, filename)
+
+        # 버전 생성
+        version = EssayVersion(
+            essay_id=essay.essay_id,
+            version_number=essay.current_version,
+            html_content=html_content,
+            html_path=html_path
+        )
+        db.session.add(version)
 
-            db.session.commit()
+        # 결과 생성
+        result = EssayResult(
+            essay_id=essay.essay_id,
+            version_id=version.version_id,
+            html_path=html_path
+        )
+        db.session.add(result)
 
-            # Phase 2: 점수 파싱 및 저장
-            self.parse_and_save_scores(
-                html_content=html_content,
-                essay_id=essay.essay_id,
-                version_id=version.version_id
-            )
+        # 상태 업데이트
+        essay.status = 'reviewing'
+        essay.completed_at = datetime.utcnow()
 
-            return version, html_path
+        db.session.commit()
 
-        except Exception as e:
-            essay.status = 'failed'
-            db.session.commit()
-            raise e
+        # Phase 2: 점수 파싱 및 저장
+        self.parse_and_save_scores(
+            html_content=html_content,
+            essay_id=essay.essay_id,
+            version_id=version.version_id
+        )
+
+        return version, html_path
+
+    # ------------------------------------------------------------------ #
+    #  Message Batches (일괄 첨삭) — 요청 구성 / 응답 변환                 #
+    # ------------------------------------------------------------------ #
+
+    def build_correction_request(self, essay: Essay, student_name: str,
+                                 teacher_name: Optional[str] = None) -> dict:
+        """
+        process_essay와 동일한 첨삭 요청을 messages.create 파라미터로 구성 (배치 제출용)
+
+        Returns:
+            dict: model, max_tokens, system, messages
+        """
+        model = getattr(essay, 'correction_model', 'standard') or 'standard'
+        notes = self._combine_notes(essay)
+
+        if model == 'harkness':
+            user_content = self.create_analysis_prompt(
+                student_name, essay.grade, essay.original_text, notes,
+                teacher_name=teacher_name,
+            )
+            system = self._system_blocks('full', self.system_prompt)
+            max_tokens = 64000
+        elif model == 'elementary':
+            user_content = self._report_user_content(student_name, essay.grade, essay.original_text,
+                                                     notes, "리포트를 생성하세요.")
+            system = prompt_cache.get_system_blocks('elementary')
+            max_tokens = 32000
+        else:  # standard
+            user_content = self._report_user_content(student_name, essay.grade, essay.original_text,
+                                                     notes, "전체 리포트를 생성하세요.")
+            system = prompt_cache.get_system_blocks('standard')
+            max_tokens = 32000
+
+        return {
+            'model': self.MODEL_NAME,
+            'max_tokens': max_tokens,
+            'system': system,
+            'messages': [{'role': 'user', 'content': user_content}],
+        }
+
+    def render_correction_result(self, essay: Essay, text: str,
+                                 teacher_name: Optional[str] = None) -> str:
+        """배치 응답 텍스트 → 완성 HTML (모델별 후처리는 analyze_* 와 동일)"""
+        model = getattr(essay, 'correction_model', 'standard') or 'standard'
+        if model == 'harkness':
+            return self._extract_full_html(text)
+        if model == 'elementary':
+            return self._wrap_elem_html(self._extract_html_block(text),
+                                        prompt_cache.get_elem_css(), teacher_name)
+        return self._append_teacher_sign(self._extract_html_block(text), teacher_name)
 
     def regenerate_essay(self, essay: Essay, student_name: str,
                         revision_note: str, teacher_name: Optional[str] = None) -> Tuple[EssayVersion, str]:
@@ -804,7 +873,7 @@ v3.3.0 필수 포함 사항:
             else:
                 # 완료된 첨삭의 경우 이전 버전의 HTML 내용을 기반으로 수정
                 if is_finalized and essay.latest_version:
-                    essay_text = essay.latest_version.html_content
+                    essay_text = essay_store.load_html(essay.latest_version)
                     notes = None
                     is_revision_of_completed = True
                 else:
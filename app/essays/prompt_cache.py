@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""MOMOAI 규칙 문서 / 시스템 프롬프트 캐시 (프로세스 공용)
+
+첨삭마다 대용량 규칙 문서를 디스크에서 다시 읽고 파싱하지 않도록
+문서 본문과 파생 결과(cache_control 시스템 블록, 초등 CSS)를 파일 mtime 기준으로 캐싱한다.
+문서 파일이 교체되면 다음 조회 시 자동으로 다시 읽는다.
+
+Anthropic 프롬프트 캐시(ephemeral, 5분) 적중 현황은 ApiUsageLog에서 집계한다.
+"""
+import os
+import threading
+from datetime import timedelta
+
+from flask import current_app
+
+# 문서 종류 → config 키
+DOC_CONFIG_KEYS = {
+    'full': 'MOMOAI_DOC_PATH',               # 하크니스 (v3.3.0 전체 규칙)
+    'standard': 'MOMOAI_STANDARD_DOC_PATH',
+    'elementary': 'MOMOAI_ELEM_DOC_PATH',
+}
+
+# ApiUsageLog.usage_type → 문서 종류
+USAGE_TYPE_DOCS = {
+    'correction': 'full',
+    'regeneration': 'full',
+    'standard': 'standard',
+    'elementary': 'elementary',
+}
+
+EPHEMERAL_TTL = timedelta(minutes=5)
+
+_cache = {}   # path → {'mtime', 'size', 'text', 'derived': {}}
+_lock = threading.Lock()
+
+
+def _doc_path(doc_key):
+    key = DOC_CONFIG_KEYS.get(doc_key)
+    if not key:
+        raise ValueError(f'알 수 없는 문서 종류: {doc_key}')
+    return current_app.config.get(key)
+
+
+def _load_entry(path):
+    """문서 캐시 엔트리 (mtime/size가 바뀌었으면 다시 읽음)"""
+    stat = os.stat(path)
+    with _lock:
+        entry = _cache.get(path)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry
+
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    entry = {'mtime': stat.st_mtime, 'size': stat.st_size, 'text': text, 'derived': {}}
+    with _lock:
+        _cache[path] = entry
+    return entry
+
+
+def get_document(doc_key):
+    """규칙 문서 본문 (full / standard / elementary)"""
+    return _load_entry(_doc_path(doc_key))['text']
+
+
+def _derived(doc_key, name, builder):
+    entry = _load_entry(_doc_path(doc_key))
+    with _lock:
+        if name in entry['derived']:
+            return entry['derived'][name]
+    value = builder(entry['text'])
+    with _lock:
+        entry['derived'][name] = value
+    return value
+
+
+def get_system_blocks(doc_key):
+    """
+    Anthropic system 파라미터용 블록 (cache_control 포함)
+
+    동일 객체를 재사용하므로 호출 측에서 수정하지 말 것.
+    """
+    return _derived(doc_key, 'system_blocks', lambda text: [
+        {
+            'type': 'text',
+            'text': text,
+            'cache_control': {'type': 'ephemeral'},  # 5분간 캐싱
+        }
+    ])
+
+
+def extract_css(doc):
+    """초등 프롬프트 문서에서 CSS 블록 추출"""
+    if '```css' in doc:
+        start = doc.find('```css') + 6
+        end = doc.find('```', start)
+        if end != -1:
+            return doc[start:end].strip()
+    return ''
+
+
+def get_elem_css():
+    """초등 리포트 래핑용 CSS"""
+    return _derived('elementary', 'css', extract_css)
+
+
+def warm_up(app):
+    """앱 시작 시 문서와 파생 결과를 미리 로드 (배포 직후 첫 첨삭 지연 방지)"""
+    with app.app_context():
+        for doc_key in DOC_CONFIG_KEYS:
+            try:
+                get_system_blocks(doc_key)
+            except Exception as e:
+                app.logger.warning(f'[PromptCache] {doc_key} 문서 로드 실패: {e}')
+        try:
+            get_elem_css()
+        except Exception:
+            pass
+
+
+# ------------------------------------------------------------------ #
+#  Anthropic 프롬프트 캐시 적중 집계                                   #
+# ------------------------------------------------------------------ #
+
+def get_prompt_cache_metrics(start, end):
+    """
+    기간 내 문서별 프롬프트 캐시 적중 현황 (ApiUsageLog 기준, 모든 워커 합산)
+
+    같은 문서를 쓰는 호출 간격이 5분을 넘으면 ephemeral 캐시가 만료되어
+    다음 호출이 캐시 쓰기(1.25배 단가)가 되므로, 간격 분포를 함께 반환한다.
+
+    Returns:
+        list[dict]: doc_key, calls, reads, writes, hit_rate, read_tokens, write_tokens,
+                    expired_gaps(5분 초과 간격 수), median_gap_sec
+    """
+    from app.models.api_usage_log import ApiUsageLog
+
+    rows = ApiUsageLog.query.with_entities(
+        ApiUsageLog.usage_type, ApiUsageLog.created_at,
+        ApiUsageLog.cache_read_tokens, ApiUsageLog.cache_write_tokens,
+    ).filter(
+        ApiUsageLog.api_type == 'claude',
+        ApiUsageLog.created_at >= start,
+        ApiUsageLog.created_at < end,
+    ).order_by(ApiUsageLog.created_at).all()
+
+    buckets = {}
+    for usage_type, created_at, read_tok, write_tok in rows:
+        doc_key = USAGE_TYPE_DOCS.get(usage_type)
+        if not doc_key:
+            continue
+        b = buckets.setdefault(doc_key, {
+            'doc_key': doc_key, 'calls': 0, 'reads': 0, 'writes': 0,
+            'read_tokens': 0, 'write_tokens': 0, 'gaps': [], 'last': None,
+        })
+        b['calls'] += 1
+        b['reads'] += 1 if read_tok else 0
+        b['writes'] += 1 if write_tok else 0
+        b['read_tokens'] += read_tok or 0
+        b['write_tokens'] += write_tok or 0
+        if b['last'] and created_at:
+            b['gaps'].append((created_at - b['last']).total_seconds())
+        b['last'] = created_at
+
+    result = []
+    ttl = EPHEMERAL_TTL.total_seconds()
+    for doc_key in DOC_CONFIG_KEYS:
+        b = buckets.get(doc_key)
+        if not b:
+            continue
+        gaps = sorted(b.pop('gaps'))
+        b.pop('last')
+        b['hit_rate'] = round(b['reads'] / b['calls'] * 100, 1) if b['calls'] else 0.0
+        b['expired_gaps'] = sum(1 for g in gaps if g > ttl)
+        b['median_gap_sec'] = int(gaps[len(gaps) // 2]) if gaps else None
+        result.append(b)
+    return result
@@ -15,24 +15,15 @@ from app.essays.forms import NewEssayForm, RevisionRequestForm
 from app.essays.momoai_service import MOMOAIService
 from app.essays.ocr_service import OCRService
 from app.essays.gemini_ocr_service import GeminiOCRService
+from app.essays.job_queue import enqueue_correction, cancel_jobs_for_essay, get_queue_state, get_partial_output
+from app.essays.listing import EssayListing, essay_item, status_summary, PAGE_SIZE
+from app.utils.principal import current_student
 from app.models import db, Student, Essay, EssayVersion, Notification, OCRHistory
 from app.models.book import EssayBook
+from app.utils import essay_store
 from config import Config
 
 
-def _save_essay_error(essay_id: str, error_msg: str) -> None:
-    """첨삭 실패 에러 메시지를 DB에 저장 (컬럼 없으면 조용히 무시)."""
-    try:
-        from sqlalchemy import text
-        db.session.execute(
-            text("UPDATE essays SET error_message = :msg WHERE essay_id = :id"),
-            {"msg": str(error_msg)[:2000], "id": essay_id}
-        )
-        db.session.commit()
-    except Exception:
-        pass
-
-
 def _can_access_essay(essay):
     """
     현재 로그인 유저가 해당 essay에 접근 가능한지 확인.
@@ -68,8 +59,6 @@ def _can_access_essay(essay):
 @login_required
 def index():
     """첨삭 목록 (필터링, 검색, 정렬 지원)"""
-    from app.models import EssayResult
-
     # 강사: essay_submitted 알림 읽음 처리
     if current_user.role == 'teacher':
         unread = Notification.query.filter(
@@ -82,86 +71,24 @@ def index():
                 n.is_read = True
             db.session.commit()
 
-    # 기본 쿼리 - 관리자/매니저는 모든 첨삭 조회, 강사는 본인이 생성하거나 담당 학생의 첨삭 조회
-    if current_user.role in ('admin', 'manager') or (
-            current_user.role_level and current_user.role_level <= 2):
-        query = Essay.query
-    else:
-        from app.utils.enrollment_utils import get_active_student_ids_subquery
-        course_student_ids = get_active_student_ids_subquery(current_user.user_id)
-
-        query = Essay.query.outerjoin(Student).filter(
-            db.or_(
-                Essay.user_id == current_user.user_id,
-                Student.teacher_id == current_user.user_id,
-                Student.student_id.in_(course_student_ids)
-            )
-        )
-
-    # Phase 2: 필터링
-    is_teacher = current_user.role not in ('admin', 'manager') and not (
-        current_user.role_level and current_user.role_level <= 2)
-    essay_result_joined = False
-
-    # 1. 학생별 필터
+    # 필터링 / 정렬 / 키셋 페이지 (original_text 등 큰 컬럼은 읽지 않음)
+    listing = EssayListing(current_user, request.args)
     student_filter = request.args.get('student_id', '').strip()
-    if student_filter:
-        query = query.filter(Essay.student_id == student_filter)
-
-    # 2. 상태별 필터 (명시적으로 Essay.status 사용해 Student.status 모호성 방지)
     status_filter = request.args.get('status', '').strip()
-    if status_filter:
-        query = query.filter(Essay.status == status_filter)
-
-    # 3. 등급별 필터
     grade_filter = request.args.get('grade', '').strip()
-    if grade_filter:
-        query = query.join(EssayResult).filter(EssayResult.final_grade == grade_filter)
-        essay_result_joined = True
-
-    # 4. 강사별 필터 (관리자/매니저 전용)
     teacher_filter = request.args.get('teacher_id', '').strip()
-    if teacher_filter:
-        query = query.filter(Essay.user_id == teacher_filter)
-
-    # 5. 통합 검색 (학생명 / 강사명 / 제목)
     search = request.args.get('search', '').strip()
-    if search:
-        from app.models.user import User as UserModel
-        student_ids_sub = db.session.query(Student.student_id)\
-            .filter(Student.name.contains(search)).subquery()
-        teacher_ids_sub = db.session.query(UserModel.user_id)\
-            .filter(UserModel.name.contains(search)).subquery()
-        query = query.filter(db.or_(
-            Essay.title.contains(search),
-            Essay.student_id.in_(student_ids_sub),
-            Essay.user_id.in_(teacher_ids_sub),
-        ))
-
-    # Phase 3: 정렬
-    sort_by = request.args.get('sort', 'date_desc')
-
-    if sort_by == 'date_asc':
-        query = query.order_by(Essay.created_at.asc())
-    elif sort_by == 'date_desc':
-        query = query.order_by(Essay.created_at.desc())
-    elif sort_by == 'score_desc':
-        if not essay_result_joined:
-            query = query.join(EssayResult)
-        query = query.order_by(EssayResult.total_score.desc())
-    elif sort_by == 'score_asc':
-        if not essay_result_joined:
-            query = query.join(EssayResult)
-        query = query.order_by(EssayResult.total_score.asc())
-    elif sort_by == 'student':
-        # 강사 쿼리는 Student를 이미 outerjoin 했으므로 중복 join 방지
-        if not is_teacher:
-            query = query.join(Student)
-        query = query.order_by(Student.name.asc())
-    else:
-        query = query.order_by(Essay.created_at.desc())
+    sort_by = listing.sort
 
-    essays = query.all()
+    cursor = request.args.get('cursor', '').strip() or None
+    try:
+        rows, next_cursor = listing.page(cursor)
+    except ValueError:
+        cursor = None
+        rows, next_cursor = listing.page()
+    essays = [essay for essay, _ in rows]
+    status_counts = listing.status_counts()
+    total_count = sum(status_counts.values())
 
     # 필터 옵션용 데이터 - 관리자/매니저는 모든 학생, 강사는 본인 학생만
     from app.models.user import User
@@ -185,20 +112,9 @@ def index():
         # 이번 달 1일 00:00
         month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-        week_all = Essay.query.filter(Essay.created_at >= week_start).all()
-        month_all = Essay.query.filter(Essay.created_at >= month_start).all()
-
         dashboard_stats = {
-            'week': {
-                'total': len(week_all),
-                'completed': sum(1 for e in week_all if e.status == 'completed'),
-                'pending': sum(1 for e in week_all if e.status == 'draft'),
-            },
-            'month': {
-                'total': len(month_all),
-                'completed': sum(1 for e in month_all if e.status == 'completed'),
-                'pending': sum(1 for e in month_all if e.status == 'draft'),
-            },
+            'week': status_summary(Essay.query.filter(Essay.created_at >= week_start)),
+            'month': status_summary(Essay.query.filter(Essay.created_at >= month_start)),
         }
 
         # 강사 목록
@@ -223,21 +139,11 @@ def index():
                         Student.teacher_id == selected_teacher_id,
                         Student.student_id.in_(course_student_ids)
                     )
-                ).all()
+                )
 
-            t_week = _teacher_essays(week_start)
-            t_month = _teacher_essays(month_start)
             dashboard_stats['teacher_stats'] = {
-                'week': {
-                    'total': len(t_week),
-                    'completed': sum(1 for e in t_week if e.status == 'completed'),
-                    'pending': sum(1 for e in t_week if e.status == 'draft'),
-                },
-                'month': {
-                    'total': len(t_month),
-                    'completed': sum(1 for e in t_month if e.status == 'completed'),
-                    'pending': sum(1 for e in t_month if e.status == 'draft'),
-                },
+                'week': status_summary(_teacher_essays(week_start)),
+                'month': status_summary(_teacher_essays(month_start)),
             }
 
     return render_template('essays/index.html',
@@ -250,9 +156,41 @@ def index():
                          grade_filter=grade_filter,
                          search=search,
                          sort_by=sort_by,
+                         cursor=cursor,
+                         next_cursor=next_cursor,
+                         total_count=total_count,
+                         status_counts=status_counts,
                          dashboard_stats=dashboard_stats)
 
 
+@essays_bp.route('/api/list')
+@login_required
+def api_list():
+    """
+    첨삭 목록 API (키셋 페이지네이션)
+
+    쿼리: student_id, status, grade, teacher_id, search, sort, limit, cursor
+    응답의 next_cursor를 cursor로 넘기면 다음 페이지. 첫 페이지(cursor 없음)에만 상태별 건수 포함.
+    """
+    listing = EssayListing(current_user, request.args)
+    cursor = request.args.get('cursor', '').strip() or None
+    limit = request.args.get('limit', PAGE_SIZE, type=int)
+    try:
+        rows, next_cursor = listing.page(cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    data = {
+        'items': [essay_item(essay, latest_version) for essay, latest_version in rows],
+        'next_cursor': next_cursor,
+        'sort': listing.sort,
+    }
+    if not cursor:
+        data['status_counts'] = listing.status_counts()
+        data['total'] = sum(data['status_counts'].values())
+    return jsonify(data)
+
+
 @essays_bp.route('/new', methods=['GET', 'POST'])
 @login_required
 def new():
@@ -404,77 +342,14 @@ def new():
                 db.session.add(essay_book)
             db.session.commit()
 
-        # 백그라운드 스레드로 첨삭 처리
+        # 첨삭 작업 큐에 등록 (완료 후 자동 완료 처리 + 학생/학부모 알림)
         essay_id_val = essay.essay_id
-        student_name = student.name
-        teacher_name = current_user.name
-        api_key = Config.ANTHROPIC_API_KEY
-        chosen_provider = api_provider
-        app = current_app._get_current_object()
-
         essay.status = 'processing'
         db.session.commit()
-
-        def do_correction():
-            with app.app_context():
-                from app.models import db as _db, Essay as _Essay
-                essay_obj = _Essay.query.get(essay_id_val)
-                if not essay_obj:
-                    return
-                try:
-                    if chosen_provider == 'gemini':
-                        from app.essays.gemini_correction_service import GeminiCorrectionService
-                        svc = GeminiCorrectionService()
-                    else:
-                        from app.essays.momoai_service import MOMOAIService as _Service
-                        svc = _Service(api_key)
-                    svc.process_essay(essay_obj, student_name, teacher_name)
-
-                    # 첨삭 완료 후 자동 완료 처리 + 학생/학부모 알림 발송
-                    svc.finalize_essay(essay_obj)
-                    try:
-                        from app.models.user import User as _User
-                        from app.models import ParentStudent
-                        from app.models.notification import Notification as _Notif
-                        from flask import url_for as _url_for
-                        _title = essay_obj.title or f'{student_name}의 논술'
-                        student_user = _User.query.filter_by(email=essay_obj.student.email).first()
-                        if student_user:
-                            _Notif.create_notification(
-                                user_id=student_user.user_id,
-                                notification_type='essay_complete',
-                                title='첨삭이 완료되었습니다',
-                                message=f'"{_title}" 첨삭이 완료되었습니다. 확인해보세요!',
-                                link_url=_url_for('student.view_essay', essay_id=essay_obj.essay_id),
-                                related_entity_type='essay',
-                                related_entity_id=essay_obj.essay_id
-                            )
-                        parent_relations = ParentStudent.query.filter_by(
-                            student_id=essay_obj.student.student_id, is_active=True
-                        ).all()
-                        for rel in parent_relations:
-                            _Notif.create_notification(
-                                user_id=rel.parent_id,
-                                notification_type='essay_complete',
-                                title='자녀의 첨삭이 완료되었습니다',
-                                message=f'{student_name} 학생의 "{_title}" 첨삭이 완료되었습니다.',
-                                link_url=_url_for('parent.view_essay',
-                                                  student_id=essay_obj.student.student_id,
-                                                  essay_id=essay_obj.essay_id),
-                                related_entity_type='essay',
-                                related_entity_id=essay_obj.essay_id
-                            )
-                    except Exception as notif_err:
-                        print(f'[알림 발송 오류] {notif_err}')
-
-                except Exception as e:
-                    print(f'[첨삭 오류] {e}')
-                    essay_obj.status = 'failed'
-                    _db.session.commit()
-                    _save_essay_error(essay_id_val, str(e))
-
-        t = threading.Thread(target=do_correction, daemon=True)
-        t.start()
+        enqueue_correction(essay, job_type='correction',
+                           student_name=student.name,
+                           teacher_name=current_user.name,
+                           notify=True)
 
         return redirect(url_for('essays.processing', essay_id=essay_id_val))
 
@@ -572,35 +447,10 @@ def quick():
         essay.teacher_guide = request.form.get('teacher_guide', '').strip() or None
         db.session.commit()
 
-        # 백그라운드 스레드로 첨삭 처리
-        essay_id_val   = essay.essay_id
-        api_key        = Config.ANTHROPIC_API_KEY
-        chosen_prov    = api_provider
-        teacher_name_q = current_user.name
-        app = current_app._get_current_object()
-
-        def do_quick_correction():
-            with app.app_context():
-                from app.models import db as _db, Essay as _Essay
-                essay_obj = _Essay.query.get(essay_id_val)
-                if not essay_obj:
-                    return
-                try:
-                    if chosen_prov == 'gemini':
-                        from app.essays.gemini_correction_service import GeminiCorrectionService
-                        service = GeminiCorrectionService()
-                    else:
-                        from app.essays.momoai_service import MOMOAIService as _Service
-                        service = _Service(api_key)
-                    service.process_essay(essay_obj, student_name, teacher_name_q)
-                except Exception as e:
-                    print(f'[임시 첨삭 오류] {e}')
-                    essay_obj.status = 'failed'
-                    _db.session.commit()
-                    _save_essay_error(essay_obj.essay_id, str(e))
-
-        t = threading.Thread(target=do_quick_correction, daemon=True)
-        t.start()
+        # 첨삭 작업 큐에 등록
+        enqueue_correction(essay, job_type='quick',
+                           student_name=student_name,
+                           teacher_name=current_user.name)
 
         return redirect(url_for('essays.processing', essay_id=essay.essay_id))
 
@@ -657,16 +507,8 @@ def result(essay_id):
         flash('첨삭 결과를 찾을 수 없습니다.', 'error')
         return redirect(url_for('essays.index'))
 
-    # HTML 내용 읽기 (파일 우선, 실패 시 DB fallback)
-    html_content = None
-    if version.html_path:
-        try:
-            with open(version.html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-        except Exception:
-            pass
-    if not html_content and version.html_content:
-        html_content = version.html_content
+    # HTML 내용 읽기 (버전 저장소)
+    html_content = essay_store.load_html(version)
     if not html_content:
         flash('첨삭 결과를 불러올 수 없습니다. 관리자에게 문의해주세요.', 'error')
         return redirect(url_for('essays.index'))
@@ -744,6 +586,7 @@ def api_cancel(essay_id):
 
     essay.status = 'failed'
     db.session.commit()
+    cancel_jobs_for_essay(essay.essay_id)
 
     return jsonify({'success': True})
 
@@ -765,39 +608,13 @@ def api_regenerate(essay_id):
     if not revision_note:
         return jsonify({'error': '수정 요청 내용을 찾을 수 없습니다.'}), 400
 
-    # 세션에서 미리 값 추출 (스레드는 요청 컨텍스트 없음)
+    # 수정 요청은 작업 payload에 보관되므로 세션에서 제거
     session.pop(f'revision_note_{essay_id}', None)
 
-    student_name = essay.student.name
-    teacher_name = current_user.name
-    essay_id_val = essay.essay_id
-    api_key = Config.ANTHROPIC_API_KEY
-    chosen_provider = getattr(essay, 'api_provider', 'claude') or 'claude'
-    app = current_app._get_current_object()
-
-    def do_regenerate():
-        with app.app_context():
-            from app.models import db as _db, Essay as _Essay
-            essay_obj = _Essay.query.get(essay_id_val)
-            if not essay_obj:
-                return
-            try:
-                provider = getattr(essay_obj, 'api_provider', 'claude') or 'claude'
-                if chosen_provider == 'gemini' or provider == 'gemini':
-                    from app.essays.gemini_correction_service import GeminiCorrectionService
-                    service = GeminiCorrectionService()
-                else:
-                    from app.essays.momoai_service import MOMOAIService as _Service
-                    service = _Service(api_key)
-                service.regenerate_essay(essay_obj, student_name, revision_note, teacher_name)
-            except Exception as e:
-                print(f'[재생성 오류] {e}')
-                essay_obj.status = 'failed'
-                _db.session.commit()
-                _save_essay_error(essay_obj.essay_id, str(e))
-
-    t = threading.Thread(target=do_regenerate, daemon=True)
-    t.start()
+    enqueue_correction(essay, job_type='regenerate',
+                       student_name=essay.student.name,
+                       teacher_name=current_user.name,
+                       revision_note=revision_note)
 
     return jsonify({'success': True, 'message': '재생성을 시작했습니다.'})
 
@@ -826,31 +643,33 @@ def finalize(essay_id):
     # 1. 학생 알림
     student_user = _User.query.filter_by(email=essay.student.email).first()
     if student_user:
-        Notification.create_notification(
-            user_id=student_user.user_id,
+        Notification.create_bulk(
+            [student_user.user_id],
             notification_type='essay_complete',
             title='첨삭이 완료되었습니다',
             message=f'"{_title}" 첨삭이 완료되었습니다. 확인해보세요!',
             link_url=url_for('student.view_essay', essay_id=essay.essay_id),
             related_entity_type='essay',
-            related_entity_id=essay.essay_id
+            related_entity_id=essay.essay_id,
+            commit=False
         )
 
     # 2. 학부모 알림
-    parent_relations = ParentStudent.query.filter_by(
+    parent_ids = [pid for (pid,) in db.session.query(ParentStudent.parent_id).filter_by(
         student_id=essay.student.student_id,
         is_active=True
-    ).all()
-    for rel in parent_relations:
-        Notification.create_notification(
-            user_id=rel.parent_id,
-            notification_type='essay_complete',
-            title='자녀의 첨삭이 완료되었습니다',
-            message=f'{essay.student.name} 학생의 "{_title}" 첨삭이 완료되었습니다.',
-            link_url=url_for('parent.view_essay', student_id=essay.student.student_id, essay_id=essay.essay_id),
-            related_entity_type='essay',
-            related_entity_id=essay.essay_id
-        )
+    ).all()]
+    Notification.create_bulk(
+        parent_ids,
+        notification_type='essay_complete',
+        title='자녀의 첨삭이 완료되었습니다',
+        message=f'{essay.student.name} 학생의 "{_title}" 첨삭이 완료되었습니다.',
+        link_url=url_for('parent.view_essay', student_id=essay.student.student_id, essay_id=essay.essay_id),
+        related_entity_type='essay',
+        related_entity_id=essay.essay_id,
+        commit=False
+    )
+    db.session.commit()
 
     flash(f'{essay.student.name} 학생의 첨삭이 완료되었습니다.', 'success')
     return redirect(url_for('essays.result', essay_id=essay.essay_id))
@@ -1011,11 +830,7 @@ def manual_correction(essay_id):
     # GET - 기존 최신 버전 내용 불러오기
     existing_content = ''
     if essay.latest_version:
-        try:
-            with open(essay.latest_version.html_path, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
-        except Exception:
-            existing_content = essay.latest_version.html_content or ''
+        existing_content = essay_store.load_html(essay.latest_version) or ''
 
     existing_score = ''
     existing_grade = ''
@@ -1031,6 +846,24 @@ def manual_correction(essay_id):
                            existing_grade=existing_grade)
 
 
+def _resolve_correction_model(essay, requested_model):
+    """요청한 첨삭 모델 검증 (하크니스는 하크니스 수업 수강생 또는 관리자만)"""
+    if requested_model == 'harkness':
+        # 관리자는 하크니스 수업 수강 여부 무관하게 항상 사용 가능
+        if current_user.role == 'admin':
+            return 'harkness'
+        from app.models import CourseEnrollment, Course as _Course
+        is_harkness = db.session.query(CourseEnrollment).join(_Course).filter(
+            CourseEnrollment.student_id == essay.student_id,
+            CourseEnrollment.status == 'active',
+            _Course.course_type == '하크니스'
+        ).count() > 0
+        return 'harkness' if is_harkness else 'standard'
+    if requested_model == 'elementary':
+        return 'elementary'
+    return 'standard'
+
+
 @essays_bp.route('/<essay_id>/start', methods=['POST'])
 @login_required
 def start_correction(essay_id):
@@ -1048,23 +881,8 @@ def start_correction(essay_id):
         return redirect(url_for('essays.result', essay_id=essay.essay_id))
 
     # 첨삭 모델 선택 반영
-    from app.models import CourseEnrollment, Course as _Course
-    requested_model = request.form.get('correction_model', 'standard')
-    if requested_model == 'harkness':
-        # 관리자는 하크니스 수업 수강 여부 무관하게 항상 사용 가능
-        if current_user.role == 'admin':
-            essay.correction_model = 'harkness'
-        else:
-            is_harkness = db.session.query(CourseEnrollment).join(_Course).filter(
-                CourseEnrollment.student_id == essay.student_id,
-                CourseEnrollment.status == 'active',
-                _Course.course_type == '하크니스'
-            ).count() > 0
-            essay.correction_model = 'harkness' if is_harkness else 'standard'
-    elif requested_model == 'elementary':
-        essay.correction_model = 'elementary'
-    else:
-        essay.correction_model = 'standard'
+    essay.correction_model = _resolve_correction_model(
+        essay, request.form.get('correction_model', 'standard'))
 
     # API 제공자 선택 반영 (claude / gemini)
     requested_provider = request.form.get('api_provider', 'claude')
@@ -1073,79 +891,48 @@ def start_correction(essay_id):
     # 강사 가이드
     essay.teacher_guide = request.form.get('teacher_guide', '').strip() or None
 
-    # 백그라운드 스레드로 처리 시작
+    # 첨삭 작업 큐에 등록 (완료 후 자동 완료 처리 + 학생/학부모 알림)
     essay.status = 'processing'
     db.session.commit()
+    enqueue_correction(essay, job_type='correction',
+                       student_name=essay.student.name,
+                       teacher_name=current_user.name,
+                       notify=True)
 
-    student_name = essay.student.name
-    teacher_name = current_user.name
-    essay_id_val = essay.essay_id
-    api_key = Config.ANTHROPIC_API_KEY
-    chosen_provider = essay.api_provider
-    app = current_app._get_current_object()
-
-    def do_correction():
-        with app.app_context():
-            from app.models import db as _db, Essay as _Essay
-            essay_obj = _Essay.query.get(essay_id_val)
-            if not essay_obj:
-                return
-            try:
-                if chosen_provider == 'gemini':
-                    from app.essays.gemini_correction_service import GeminiCorrectionService
-                    service = GeminiCorrectionService()
-                else:
-                    from app.essays.momoai_service import MOMOAIService as _Service
-                    service = _Service(api_key)
-                service.process_essay(essay_obj, student_name, teacher_name)
-
-                # 첨삭 완료 후 자동 완료 처리 + 학생/학부모 알림 발송
-                service.finalize_essay(essay_obj)
-                try:
-                    from app.models.user import User as _User
-                    from app.models import ParentStudent
-                    from app.models.notification import Notification as _Notif
-                    from flask import url_for as _url_for
-                    _title = essay_obj.title or f'{student_name}의 논술'
-                    student_user = _User.query.filter_by(email=essay_obj.student.email).first()
-                    if student_user:
-                        _Notif.create_notification(
-                            user_id=student_user.user_id,
-                            notification_type='essay_complete',
-                            title='첨삭이 완료되었습니다',
-                            message=f'"{_title}" 첨삭이 완료되었습니다. 확인해보세요!',
-                            link_url=_url_for('student.view_essay', essay_id=essay_obj.essay_id),
-                            related_entity_type='essay',
-                            related_entity_id=essay_obj.essay_id
-                        )
-                    parent_relations = ParentStudent.query.filter_by(
-                        student_id=essay_obj.student.student_id, is_active=True
-                    ).all()
-                    for rel in parent_relations:
-                        _Notif.create_notification(
-                            user_id=rel.parent_id,
-                            notification_type='essay_complete',
-                            title='자녀의 첨삭이 완료되었습니다',
-                            message=f'{student_name} 학생의 "{_title}" 첨삭이 완료되었습니다.',
-                            link_url=_url_for('parent.view_essay',
-                                              student_id=essay_obj.student.student_id,
-                                              essay_id=essay_obj.essay_id),
-                            related_entity_type='essay',
-                            related_entity_id=essay_obj.essay_id
-                        )
-                except Exception as notif_err:
-                    print(f'[알림 발송 오류] {notif_err}')
+    return redirect(url_for('essays.processing', essay_id=essay.essay_id))
 
-            except Exception as e:
-                print(f'[첨삭 오류] {e}')
-                essay_obj.status = 'failed'
-                _db.session.commit()
-                _save_essay_error(essay_obj.essay_id, str(e))
 
-    t = threading.Thread(target=do_correction, daemon=True)
-    t.start()
+@essays_bp.route('/batch-start', methods=['POST'])
+@login_required
+def batch_start():
+    """선택한 미첨삭 글 일괄 첨삭 (Message Batches — 급하지 않은 대량 첨삭용, 비용 50%)"""
+    essay_ids = request.form.getlist('essay_ids')
+    if not essay_ids:
+        flash('일괄 첨삭할 글을 선택해주세요.', 'warning')
+        return redirect(url_for('essays.index'))
 
-    return redirect(url_for('essays.processing', essay_id=essay.essay_id))
+    requested_model = request.form.get('correction_model', 'standard')
+    essays = Essay.query.filter(Essay.essay_id.in_(essay_ids), Essay.status == 'draft').all()
+
+    queued = 0
+    for essay in essays:
+        if not _can_access_essay(essay):
+            continue
+        essay.correction_model = _resolve_correction_model(essay, requested_model)
+        essay.api_provider = 'claude'
+        essay.status = 'processing'
+        db.session.commit()
+        enqueue_correction(essay, job_type='correction',
+                           student_name=essay.student.name,
+                           teacher_name=current_user.name,
+                           notify=True, batch=True)
+        queued += 1
+
+    if queued:
+        flash(f'{queued}건을 일괄 첨삭으로 등록했습니다. 완료되면 학생/학부모에게 알림이 발송됩니다 (보통 1시간 이내).', 'success')
+    else:
+        flash('일괄 첨삭할 수 있는 글이 없습니다. (미첨삭 상태만 가능)', 'warning')
+    return redirect(url_for('essays.index'))
 
 
 @essays_bp.route('/<essay_id>/version/<int:version_number>')
@@ -1165,16 +952,8 @@ def view_version(essay_id, version_number):
         version_number=version_number
     ).first_or_404()
 
-    # HTML 내용 읽기
-    html_content = None
-    if version.html_path:
-        try:
-            with open(version.html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-        except Exception:
-            pass
-    if not html_content and version.html_content:
-        html_content = version.html_content
+    # HTML 내용 읽기 (버전 저장소)
+    html_content = essay_store.load_html(version)
     if not html_content:
         flash('HTML 파일을 읽을 수 없습니다.', 'error')
         return redirect(url_for('essays.result', essay_id=essay.essay_id))
@@ -1195,6 +974,34 @@ def view_version(essay_id, version_number):
                          reference_books=reference_books)
 
 
+@essays_bp.route('/<essay_id>/version/<int:version_number>/html')
+@login_required
+def version_html(essay_id, version_number):
+    """첨삭 버전 HTML 원문 (압축 저장본을 그대로 전송, ETag로 변경 없으면 304)"""
+    essay = Essay.query.get_or_404(essay_id)
+
+    if not _can_access_essay(essay) and not _can_download_essay(essay):
+        return "접근 권한이 없습니다.", 403
+
+    version = EssayVersion.query.filter_by(
+        essay_id=essay.essay_id,
+        version_number=version_number
+    ).first_or_404()
+
+    download_name = _version_filename(version, '.html') if request.args.get('download') else None
+    response = essay_store.version_response(version, download_name=download_name)
+    if response is None:
+        return "파일을 찾을 수 없습니다.", 404
+    return response
+
+
+def _version_filename(version, suffix):
+    """다운로드 파일명 — 저장 당시 HTML 파일명 기준"""
+    if version.html_path:
+        return Path(version.html_path).stem + suffix
+    return f"essay_{version.essay_id}_v{version.version_number}{suffix}"
+
+
 # API 라우트 (AJAX 폴링용)
 @essays_bp.route('/api/status/<essay_id>')
 @login_required
@@ -1206,23 +1013,42 @@ def api_status(essay_id):
     if not _can_access_essay(essay):
         return jsonify({'error': '접근 권한이 없습니다.'}), 403
 
-    # 현재 처리 중인 총 건수 (큐 대기 현황)
-    from app.essays.momoai_service import _api_semaphore
-    processing_count = Essay.query.filter_by(status='processing').count()
-    # 세마포어 여유 슬롯 계산 (최대 2)
-    available_slots = _api_semaphore._value
-    queue_waiting = max(0, processing_count - available_slots)
+    # 큐 대기 현황 + 예상 완료 시간 (모든 워커 공통 correction_jobs 기준)
+    queue = get_queue_state(essay.essay_id)
 
     return jsonify({
         'essay_id': essay.essay_id,
         'status': essay.status,
         'current_version': essay.current_version,
         'is_finalized': essay.is_finalized,
-        'processing_count': processing_count,
-        'queue_waiting': queue_waiting,
+        'processing_count': queue['running'] + queue['queued'],
+        'running_count': queue['running'],
+        'job_status': queue['job_status'],
+        'queue_position': queue['position'],
+        'queue_waiting': queue['ahead'],
+        'eta_seconds': queue['eta_seconds'],
+        'eta_p95_seconds': queue['eta_p95_seconds'],
+        'elapsed_seconds': queue['elapsed_seconds'],
+        'progress': queue['progress'],
+        'batch': queue['batch'],
     })
 
 
+@essays_bp.route('/api/partial/<essay_id>')
+@login_required
+def api_partial(essay_id):
+    """스트리밍 중간 결과 조회 API (?offset=이미 받은 글자 수)"""
+    essay = Essay.query.get_or_404(essay_id)
+
+    if not _can_access_essay(essay):
+        return jsonify({'error': '접근 권한이 없습니다.'}), 403
+
+    partial = get_partial_output(essay.essay_id, request.args.get('offset', 0, type=int)) or {
+        'job_status': None, 'length': 0, 'html': '', 'reset': True,
+    }
+    return jsonify({'essay_id': essay.essay_id, **partial})
+
+
 @essays_bp.route('/correction-attachment/<attachment_id>')
 @login_required
 def serve_correction_attachment(attachment_id):
@@ -1233,7 +1059,7 @@ def serve_correction_attachment(attachment_id):
 
     # 학생 본인 접근 허용 (완료된 첨삭)
     if current_user.role == 'student':
-        student = Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
         if not student or essay.student_id != student.student_id or not essay.is_finalized:
             flash('접근 권한이 없습니다.', 'error')
             return redirect(url_for('student.my_essays'))
@@ -1315,31 +1141,45 @@ def download_attachment(essay_id):
         return redirect(url_for('essays.result', essay_id=essay_id))
 
 
-@essays_bp.route('/print/<essay_id>')
-@login_required
-def print_essay(essay_id):
-    """첨삭 결과 인쇄 전용 페이지"""
-    essay = Essay.query.get_or_404(essay_id)
-
-    # 권한 확인 - 학생, 강사, 학부모, 관리자 모두 접근 가능
+def _can_download_essay(essay):
+    """
+    첨삭 결과 인쇄/다운로드 권한.
+    - admin: 항상 허용
+    - teacher: 자신이 담당한 첨삭
+    - student: 자신의 첨삭
+    - parent: 자녀의 첨삭
+    """
     has_permission = False
 
     if current_user.role == 'admin':
         has_permission = True
     elif current_user.role == 'teacher':
+        # 강사는 자신이 담당한 첨삭만
         has_permission = (essay.user_id == current_user.user_id)
     elif current_user.role == 'student':
-        from app.models import Student
-        student = Student.query.filter_by(email=current_user.email).first()
+        # 학생은 자신의 첨삭만
+        student = current_student()
         if student:
             has_permission = (essay.student_id == student.student_id)
     elif current_user.role == 'parent':
+        # 학부모는 자녀의 첨삭만
         from app.models import ParentStudent
         linked_students = ParentStudent.query.filter_by(
             parent_id=current_user.user_id
         ).all()
         student_ids = [link.student_id for link in linked_students]
         has_permission = (essay.student_id in student_ids)
+    return has_permission
+
+
+@essays_bp.route('/print/<essay_id>')
+@login_required
+def print_essay(essay_id):
+    """첨삭 결과 인쇄 전용 페이지"""
+    essay = Essay.query.get_or_404(essay_id)
+
+    # 권한 확인 - 학생, 강사, 학부모, 관리자 모두 접근 가능
+    has_permission = _can_download_essay(essay)
 
     if not has_permission:
         flash('접근 권한이 없습니다.', 'error')
@@ -1352,16 +1192,8 @@ def print_essay(essay_id):
         flash('첨삭 결과를 찾을 수 없습니다.', 'error')
         return redirect(url_for('essays.index'))
 
-    # HTML 내용 읽기
-    html_content = None
-    if version.html_path:
-        try:
-            with open(version.html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-        except Exception:
-            pass
-    if not html_content and version.html_content:
-        html_content = version.html_content
+    # HTML 내용 읽기 (버전 저장소)
+    html_content = essay_store.load_html(version)
     if not html_content:
         flash('첨삭 결과를 불러올 수 없습니다.', 'error')
         return redirect(url_for('essays.index'))
@@ -1377,34 +1209,12 @@ def print_essay(essay_id):
 @login_required
 def download_pdf(essay_id):
     """첨삭 결과 PDF 다운로드 (HTML을 PDF로 변환)"""
-    from xhtml2pdf import pisa
-    from pathlib import Path
-    import io
+    from app.utils import pdf_render
 
     essay = Essay.query.get_or_404(essay_id)
 
     # 권한 확인 - 학생, 강사, 학부모, 관리자 모두 접근 가능
-    has_permission = False
-
-    if current_user.role == 'admin':
-        has_permission = True
-    elif current_user.role == 'teacher':
-        # 강사는 자신이 담당한 첨삭만
-        has_permission = (essay.user_id == current_user.user_id)
-    elif current_user.role == 'student':
-        # 학생은 자신의 첨삭만
-        from app.models import Student
-        student = Student.query.filter_by(email=current_user.email).first()
-        if student:
-            has_permission = (essay.student_id == student.student_id)
-    elif current_user.role == 'parent':
-        # 학부모는 자녀의 첨삭만
-        from app.models import ParentStudent
-        linked_students = ParentStudent.query.filter_by(
-            parent_id=current_user.user_id
-        ).all()
-        student_ids = [link.student_id for link in linked_students]
-        has_permission = (essay.student_id in student_ids)
+    has_permission = _can_download_essay(essay)
 
     if not has_permission:
         flash('접근 권한이 없습니다.', 'error')
@@ -1413,48 +1223,26 @@ def download_pdf(essay_id):
     # 최신 버전 가져오기
     version = essay.latest_version
 
-    if not version or not version.html_path:
+    if not version:
         flash('첨삭 결과를 찾을 수 없습니다.', 'error')
         return redirect(url_for('essays.result', essay_id=essay_id))
 
     try:
-        # PDF 파일명 생성
-        html_path = Path(version.html_path)
-        pdf_filename = html_path.stem + '.pdf'
-        pdf_folder = Path(current_app.config['PDF_FOLDER'])
-        pdf_folder.mkdir(parents=True, exist_ok=True)
-        pdf_path = pdf_folder / pdf_filename
-
-        # HTML 파일이 존재하지 않으면 에러
-        if not html_path.exists():
+        # HTML 내용 읽기 (버전 저장소)
+        html_content = essay_store.load_html(version)
+        if not html_content:
             flash('HTML 파일을 찾을 수 없습니다.', 'error')
             return redirect(url_for('essays.result', essay_id=essay_id))
 
-        # PDF가 이미 존재하고 HTML보다 최신이면 재사용
-        if pdf_path.exists() and pdf_path.stat().st_mtime > html_path.stat().st_mtime:
-            return send_file(pdf_path, as_attachment=True, download_name=pdf_filename)
-
-        # HTML 내용 읽기
-        with open(html_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-
-        # HTML을 PDF로 변환
-        with open(pdf_path, 'wb') as pdf_file:
-            pisa_status = pisa.CreatePDF(
-                html_content,
-                dest=pdf_file,
-                encoding='utf-8'
-            )
-
-        if pisa_status.err:
-            raise Exception('PDF 생성 중 오류가 발생했습니다.')
+        # 내용 해시 캐시 조회 (완료 처리 시 미리 렌더링됨, 없으면 렌더 워커에서 변환)
+        pdf_path = pdf_render.render_html(html_content)
 
         # EssayResult에 PDF 경로 저장 (있으면)
-        if essay.result:
+        if essay.result and essay.result.pdf_path != str(pdf_path):
             essay.result.pdf_path = str(pdf_path)
             db.session.commit()
 
-        return send_file(pdf_path, as_attachment=True, download_name=pdf_filename)
+        return send_file(pdf_path, as_attachment=True, download_name=_version_filename(version, '.pdf'))
 
     except Exception as e:
         current_app.logger.error(f'PDF 생성 오류: {str(e)}')
@@ -1884,7 +1672,10 @@ def reset_essay(essay_id):
     # 3. 결과 삭제 (essay_results)
     EssayResult.query.filter_by(essay_id=essay_id).delete(synchronize_session=False)
 
-    # 4. 버전 삭제 (essay_versions)
+    # 4. 버전 삭제 (essay_versions + 조각 순서 — 공유 조각은 migrate_essay_store.py --prune 으로 정리)
+    from app.models.essay import EssayVersionChunk
+    version_ids = db.session.query(EssayVersion.version_id).filter_by(essay_id=essay_id)
+    EssayVersionChunk.query.filter(EssayVersionChunk.version_id.in_(version_ids)).delete(synchronize_session=False)
     EssayVersion.query.filter_by(essay_id=essay_id).delete(synchronize_session=False)
 
     # 5. OCR 히스토리 삭제
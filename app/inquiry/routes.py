@@ -143,18 +143,20 @@ def new_inquiry():
             push_recipients.append(recipient_id)
         else:
             # 관리자 전체에게 알림
-            admins = User.query.filter(User.role_level <= 2, User.is_active == True).all()
-            for admin in admins:
-                db.session.add(Notification(
-                    user_id=admin.user_id,
-                    notification_type='inquiry',
-                    title=notif_title,
-                    message=notif_message,
-                    related_entity_type='inquiry',
-                    related_entity_id=post.inquiry_id,
-                    link_url=notif_link
-                ))
-                push_recipients.append(admin.user_id)
+            admin_ids = [uid for (uid,) in db.session.query(User.user_id).filter(
+                User.role_level <= 2, User.is_active == True).all()]
+            Notification.create_bulk(
+                admin_ids,
+                notification_type='inquiry',
+                title=notif_title,
+                message=notif_message,
+                related_entity_type='inquiry',
+                related_entity_id=post.inquiry_id,
+                link_url=notif_link,
+                push=False,
+                commit=False
+            )
+            push_recipients.extend(admin_ids)
 
         # 이미지 업로드 처리 (최대 10장)
         from app.utils.image_utils import save_post_images
@@ -166,9 +168,8 @@ def new_inquiry():
 
         # Web Push 알림
         try:
-            from app.utils.push_utils import send_push_to_user
-            for uid in push_recipients:
-                send_push_to_user(uid, '📬 ' + notif_title, notif_message, notif_link)
+            from app.utils.push_utils import send_push_to_users
+            send_push_to_users(push_recipients, '📬 ' + notif_title, notif_message, notif_link)
         except Exception:
             pass
 
@@ -11,8 +11,8 @@ import os
 from app.library import library_bp
 from app.models import db, Book, Video, Student
 from app.models.library import HallOfFame, AdmissionInfo
-from app.models.parent_student import ParentStudent
 from app.utils.content_access import can_access_content
+from app.utils.principal import current_student, get_principal
 
 
 class _SimplePagination:
@@ -59,12 +59,9 @@ def _can_view_video(video, user):
     if user.role in ('admin', 'teacher'):
         return True
     if user.role == 'student':
-        student = Student.query.filter_by(user_id=user.user_id).first() or \
-                  Student.query.filter_by(email=user.email).first()
-        return can_access_content(video, user, student)
+        return can_access_content(video, user, get_principal(user).student)
     if user.role == 'parent':
-        relations = ParentStudent.query.filter_by(parent_id=user.user_id, is_active=True).all()
-        return any(can_access_content(video, user, pr.student) for pr in relations if pr.student)
+        return any(can_access_content(video, user, child) for child in get_principal(user).children)
     return False
 
 # 학년 → LV 태그 매핑
@@ -196,18 +193,14 @@ def books():
     if grade_param is None:
         # 학생: 본인 학년으로 자동 설정
         if current_user.role == 'student':
-            student = Student.query.filter_by(email=current_user.email).first()
+            student = current_student()
             if student and student.grade:
                 auto_grade = GRADE_TO_LV.get(student.grade, '')
         # 학부모: 연계된 자녀 중 가장 높은 학년으로 설정
         elif current_user.role == 'parent':
-            parent_relations = ParentStudent.query.filter_by(
-                parent_id=current_user.user_id, is_active=True
-            ).all()
             child_lvs = []
-            for pr in parent_relations:
-                child = pr.student
-                if child and child.grade:
+            for child in get_principal().children:
+                if child.grade:
                     lv = GRADE_TO_LV.get(child.grade, '')
                     if lv:
                         child_lvs.append(lv)
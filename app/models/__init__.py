@@ -8,7 +8,7 @@ db = SQLAlchemy()
 # 모델 import (순환 참조 방지를 위해 db 정의 후 import)
 from app.models.user import User
 from app.models.student import Student
-from app.models.essay import Essay, EssayVersion, EssayResult, CorrectionAttachment
+from app.models.essay import Essay, EssayVersion, EssayBlob, EssayVersionChunk, EssayResult, CorrectionAttachment
 from app.models.essay_score import EssayScore, EssayNote
 from app.models.book import Book, EssayBook, BookRating
 from app.models.community import Post, Comment, PostLike
@@ -50,7 +50,7 @@ from app.models.notification_reply import NotificationReply
 from app.models.api_usage_log import ApiUsageLog
 from app.models.reminder_log import ReminderLog
 from app.models.push_subscription import PushSubscription
-from app.models.teacher_hours import TeacherHoursCorrection
+from app.models.teacher_hours import TeacherHoursCorrection, TeacherHoursSnapshot
 from app.models.teacher_prompt import TeacherPromptTemplate
 from app.models.conversation import Conversation, ConversationMessage
 from app.models.student_caution import StudentCaution
@@ -59,6 +59,13 @@ from app.models.session_adjustment import SessionAdjustment
 from app.models.action_item import ActionItem
 from app.models.absence_notice import AbsenceNotice
 from app.models.enrollment_schedule import EnrollmentSchedule
+from app.models.correction_job import CorrectionJob
+from app.models.sms_delivery_log import SmsDeliveryLog
+from app.models.search_index import SearchToken
+from app.models.attendance_rollup import AttendanceDailyStat
+from app.models.student_risk import StudentRiskSnapshot
+from app.models.score_cohort import ScoreCohortStat
+from app.models.scheduler_lease import SchedulerLease
 
 __all__ = [
     'db',
@@ -66,6 +73,8 @@ __all__ = [
     'Student',
     'Essay',
     'EssayVersion',
+    'EssayBlob',
+    'EssayVersionChunk',
     'EssayResult',
     'CorrectionAttachment',
     'EssayScore',
@@ -126,10 +135,18 @@ __all__ = [
     'NotificationReply',
     'PushSubscription',
     'TeacherHoursCorrection',
+    'TeacherHoursSnapshot',
     'PaymentPeriod',
     'HolidayWeek',
     'SessionAdjustment',
     'ActionItem',
     'AbsenceNotice',
     'EnrollmentSchedule',
+    'CorrectionJob',
+    'SmsDeliveryLog',
+    'SearchToken',
+    'AttendanceDailyStat',
+    'StudentRiskSnapshot',
+    'ScoreCohortStat',
+    'SchedulerLease',
 ]
@@ -11,6 +11,9 @@ CLAUDE_PRICING = {
     'cache_read':  0.30,
 }
 
+# Message Batches API 할인율 (일괄 첨삭)
+CLAUDE_BATCH_DISCOUNT = 0.5
+
 GEMINI_PRICING = {
     'gemini-2.0-flash': {'input': 0.075, 'output': 0.30},
     'gemini-1.5-flash': {'input': 0.075, 'output': 0.30},
@@ -41,15 +44,17 @@ class ApiUsageLog(db.Model):
     # ── 비용 계산 ─────────────────────────────────────────
     @staticmethod
     def calc_claude_cost(input_tokens, output_tokens,
-                         cache_read=0, cache_write=0):
+                         cache_read=0, cache_write=0, batch=False):
         p = CLAUDE_PRICING
-        return round(
+        cost = (
             input_tokens  * p['input']       / 1_000_000 +
             output_tokens * p['output']      / 1_000_000 +
             cache_read    * p['cache_read']  / 1_000_000 +
-            cache_write   * p['cache_write'] / 1_000_000,
-            6
+            cache_write   * p['cache_write'] / 1_000_000
         )
+        if batch:
+            cost *= CLAUDE_BATCH_DISCOUNT
+        return round(cost, 6)
 
     @staticmethod
     def calc_gemini_cost(model_name, input_tokens, output_tokens):
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""출결 일별 집계 모델 (대시보드/출석 현황용)"""
+from app.models import db
+
+
+class AttendanceDailyStat(db.Model):
+    """수업일 × 수업 × 학생 단위 출결 집계
+
+    Attendance ⋈ CourseSession 원본을 (session_date, course_id, student_id)로 묶은 값.
+    출결/세션이 바뀌면 app.utils.attendance_rollup 세션 훅이 해당 (날짜, 수업) 구간을
+    다시 집계한다. checked_* 는 출석체크 완료(attendance_checked) 세션만 센 값.
+    """
+    __tablename__ = 'attendance_daily_stats'
+
+    stat_date = db.Column(db.Date, primary_key=True)
+    course_id = db.Column(db.String(36), db.ForeignKey('courses.course_id', ondelete='CASCADE'),
+                          primary_key=True)
+    student_id = db.Column(db.String(36), db.ForeignKey('students.student_id', ondelete='CASCADE'),
+                           primary_key=True)
+
+    total = db.Column(db.Integer, nullable=False, default=0)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
+    checked_total = db.Column(db.Integer, nullable=False, default=0)
+    checked_present = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_attendance_daily_stats_course_date', 'course_id', 'stat_date'),
+        db.Index('ix_attendance_daily_stats_student_date', 'student_id', 'stat_date'),
+    )
+
+    def __repr__(self):
+        return f'<AttendanceDailyStat {self.stat_date} {self.course_id} {self.student_id}>'
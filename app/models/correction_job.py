@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""첨삭 작업 큐 모델 (전체 워커 공유, 리스 + 하트비트 기반)"""
+import json
+from datetime import datetime
+from app.models import db
+
+
+class CorrectionJob(db.Model):
+    """첨삭 작업 큐 항목
+
+    status: queued(대기) → running(처리 중) → done / failed / cancelled
+    running 상태의 작업은 provider별 slot(0 ~ 한도-1)을 점유하며,
+    (provider, slot) 유니크 제약으로 모든 gunicorn 워커·노드에 걸친 동시 처리 한도를 보장한다.
+    """
+    __tablename__ = 'correction_jobs'
+
+    job_id = db.Column(db.String(36), primary_key=True)
+    essay_id = db.Column(db.String(36), db.ForeignKey('essays.essay_id', ondelete='CASCADE'),
+                         nullable=False, index=True)
+    # job_type: correction(신규/제출글 첨삭), quick(임시 첨삭), regenerate(재생성)
+    job_type = db.Column(db.String(20), nullable=False, default='correction')
+    provider = db.Column(db.String(20), nullable=False, default='claude')  # claude / gemini
+    correction_model = db.Column(db.String(20), nullable=True)  # standard / elementary / harkness
+    payload = db.Column(db.Text, nullable=True)  # JSON (학생명, 첨삭자명, 수정요청 등)
+
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    slot = db.Column(db.Integer, nullable=True)  # running 중에만 값 존재
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+
+    worker_id = db.Column(db.String(100), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True, index=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    # 스트리밍 진행 상황 (JSON: tokens, chars, sections, last_section) / 취소 요청 플래그
+    progress = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    # 스트리밍 중 지금까지 받은 응답 HTML (처리 화면 미리보기용, 완료되면 비움)
+    partial_output = db.Column(db.Text, nullable=True)
+
+    error_message = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    essay = db.relationship('Essay', backref=db.backref('correction_jobs',
+                                                         cascade='all, delete-orphan',
+                                                         passive_deletes=True))
+
+    __table_args__ = (
+        db.UniqueConstraint('provider', 'slot', name='uq_correction_job_slot'),
+    )
+
+    def __repr__(self):
+        return f'<CorrectionJob {self.job_id} {self.job_type} {self.status}>'
+
+    def __init__(self, **kwargs):
+        super(CorrectionJob, self).__init__(**kwargs)
+        if not self.job_id:
+            import uuid
+            self.job_id = str(uuid.uuid4())
+
+    @property
+    def payload_dict(self):
+        """payload JSON → dict"""
+        if not self.payload:
+            return {}
+        try:
+            return json.loads(self.payload)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+
+    @property
+    def progress_dict(self):
+        """progress JSON → dict"""
+        if not self.progress:
+            return {}
+        try:
+            return json.loads(self.progress)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+
+    @property
+    def is_active(self):
+        """대기 또는 처리 중 여부"""
+        return self.status in ('queued', 'running')
@@ -57,6 +57,12 @@ class Course(db.Model):
     # 보강수업 신청 가능 여부
     makeup_class_allowed = db.Column(db.Boolean, default=False)
 
+    # 집계 (app.utils.course_counters 세션 훅이 유지 — 직접 수정하지 않음)
+    enrolled_count = db.Column(db.Integer, nullable=False, default=0)       # 현재 수강 중인(active) 학생 수
+    completed_sessions = db.Column(db.Integer, nullable=False, default=0)   # 완료된 세션 수
+    attendance_total = db.Column(db.Integer, nullable=False, default=0)     # 출석 레코드 수
+    attendance_present = db.Column(db.Integer, nullable=False, default=0)   # 출석(present) 수
+
     # 메타 정보
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -79,11 +85,6 @@ class Course(db.Model):
         if not self.course_id:
             self.course_id = str(uuid.uuid4())
 
-    @property
-    def enrolled_count(self):
-        """현재 수강 중인 학생 수"""
-        return len([e for e in self.enrollments if e.status == 'active'])
-
     @property
     def is_full(self):
         """정원 초과 여부"""
@@ -95,9 +96,11 @@ class Course(db.Model):
         return self.price_per_session * self.total_sessions
 
     @property
-    def completed_sessions(self):
-        """완료된 세션 수"""
-        return len([s for s in self.sessions if s.status == 'completed'])
+    def attendance_rate(self):
+        """수업 전체 출석률"""
+        if not self.attendance_total:
+            return 0
+        return round((self.attendance_present / self.attendance_total) * 100, 1)
 
 
 class CourseEnrollment(db.Model):
@@ -131,7 +134,7 @@ class CourseEnrollment(db.Model):
     # 'employee': 직원 50%
     # 'scholarship': 장학 100%
 
-    # 출석 통계
+    # 출석 통계 (오늘 이전 세션 기준, app.utils.course_counters 세션 훅이 유지)
     attended_sessions = db.Column(db.Integer, default=0)
     absent_sessions = db.Column(db.Integer, default=0)
     late_sessions = db.Column(db.Integer, default=0)
@@ -194,6 +197,10 @@ class CourseSession(db.Model):
     attendance_checked_at = db.Column(db.DateTime, nullable=True)
     attendance_checked_by = db.Column(db.String(36), db.ForeignKey('users.user_id', ondelete='SET NULL'))
 
+    # 출석 집계 (app.utils.course_counters 세션 훅이 유지)
+    attendance_count = db.Column(db.Integer, nullable=False, default=0)   # 출석 학생 수
+    total_students = db.Column(db.Integer, nullable=False, default=0)     # 출석 레코드 수
+
     # 메타 정보
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -212,16 +219,6 @@ class CourseSession(db.Model):
         if not self.session_id:
             self.session_id = str(uuid.uuid4())
 
-    @property
-    def attendance_count(self):
-        """출석 학생 수"""
-        return len([a for a in self.attendance_records if a.status == 'present'])
-
-    @property
-    def total_students(self):
-        """총 수강 학생 수"""
-        return len(self.attendance_records)
-
     @property
     def attendance_rate(self):
         """출석률"""
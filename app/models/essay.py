@@ -58,6 +58,14 @@ class Essay(db.Model):
     notes = db.relationship('EssayNote', back_populates='essay',
                            cascade='all, delete-orphan')
 
+    # 목록 조회 시 original_text 대신 앞부분만 SQL에서 잘라 채움 (app.essays.listing)
+    preview_text = db.query_expression()
+
+    __table_args__ = (
+        # 목록 키셋 페이지네이션 (created_at, essay_id)
+        db.Index('ix_essays_created_at_essay_id', 'created_at', 'essay_id'),
+    )
+
     def __repr__(self):
         return f'<Essay {self.essay_id} - {self.student.name if self.student else "Unknown"}>'
 
@@ -79,10 +87,11 @@ class Essay(db.Model):
 
     @property
     def latest_version(self):
-        """최신 버전"""
-        if self.versions:
-            return self.versions[-1]
-        return None
+        """최신 버전 (versions를 이미 읽었으면 그대로, 아니면 최신 1건만 조회)"""
+        if 'versions' in self.__dict__:
+            return self.versions[-1] if self.versions else None
+        return EssayVersion.query.filter_by(essay_id=self.essay_id)\
+            .order_by(EssayVersion.version_number.desc()).first()
 
 
 class EssayVersion(db.Model):
@@ -93,13 +102,18 @@ class EssayVersion(db.Model):
     essay_id = db.Column(db.String(36), db.ForeignKey('essays.essay_id', ondelete='CASCADE'),
                         nullable=False, index=True)
     version_number = db.Column(db.Integer, nullable=False)
-    html_content = db.Column(db.Text, nullable=False)
+    # 저장 시 버전 저장소(essay_blobs)로 옮기고 비워 둔다 — 읽기는 essay_store.load_html()
+    html_content = db.deferred(db.Column(db.Text, nullable=False, default=''))
     html_path = db.Column(db.String(500), nullable=True)
+    content_digest = db.Column(db.String(64), nullable=True)  # 전체 HTML sha256 (ETag)
+    content_size = db.Column(db.Integer, nullable=True)       # 원본 바이트 수
     revision_note = db.Column(db.Text, nullable=True)  # 수정 요청 내용
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
     essay = db.relationship('Essay', back_populates='versions')
+    chunks = db.relationship('EssayVersionChunk', cascade='all, delete-orphan',
+                             order_by='EssayVersionChunk.seq')
 
     __table_args__ = (
         db.UniqueConstraint('essay_id', 'version_number', name='uq_essay_version'),
@@ -115,6 +129,34 @@ class EssayVersion(db.Model):
             self.version_id = str(uuid.uuid4())
 
 
+class EssayBlob(db.Model):
+    """첨삭 HTML 조각 (내용 주소 지정 — sha256 같은 조각은 한 번만 압축 저장)"""
+    __tablename__ = 'essay_blobs'
+
+    digest = db.Column(db.String(64), primary_key=True)      # 원본 조각 sha256
+    codec = db.Column(db.String(10), nullable=False)         # 'zstd' / 'gzip'
+    data = db.Column(db.LargeBinary, nullable=False)         # 압축된 바이트
+    raw_size = db.Column(db.Integer, nullable=False)
+    stored_size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<EssayBlob {self.digest[:12]} {self.codec}>'
+
+
+class EssayVersionChunk(db.Model):
+    """첨삭 버전 → 조각 순서 (버전 HTML = 조각을 seq 순서로 이어 붙인 것)"""
+    __tablename__ = 'essay_version_chunks'
+
+    version_id = db.Column(db.String(36), db.ForeignKey('essay_versions.version_id', ondelete='CASCADE'),
+                           primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), db.ForeignKey('essay_blobs.digest'), nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<EssayVersionChunk {self.version_id} #{self.seq}>'
+
+
 class EssayResult(db.Model):
     """첨삭 결과 모델"""
     __tablename__ = 'essay_results'
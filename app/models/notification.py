@@ -53,34 +53,61 @@ class Notification(db.Model):
     @staticmethod
     def create_notification(user_id, notification_type, title, message,
                           link_url=None, related_user_id=None,
-                          related_entity_type=None, related_entity_id=None):
+                          related_entity_type=None, related_entity_id=None, commit=True):
         """알림 생성 헬퍼 메서드"""
-        notification = Notification(
-            user_id=user_id,
-            notification_type=notification_type,
-            title=title,
-            message=message,
-            link_url=link_url,
-            related_user_id=related_user_id,
-            related_entity_type=related_entity_type,
-            related_entity_id=related_entity_id
-        )
-        db.session.add(notification)
-        db.session.commit()
+        return Notification.create_bulk(
+            [user_id], notification_type, title, message,
+            link_url=link_url, related_user_id=related_user_id,
+            related_entity_type=related_entity_type, related_entity_id=related_entity_id,
+            commit=commit,
+        )[0]
 
-        # Web Push 알림 발송 (구독자에게만, 실패해도 무시)
-        try:
-            from app.utils.push_utils import send_push_to_user
-            send_push_to_user(
-                user_id=user_id,
+    @staticmethod
+    def create_bulk(user_ids, notification_type, title, message,
+                    link_url=None, related_user_id=None,
+                    related_entity_type=None, related_entity_id=None,
+                    push=True, commit=True):
+        """
+        여러 사용자에게 같은 알림을 한 번에 생성
+
+        알림 행은 한 트랜잭션으로 추가하고, Web Push는 커밋이 성공한 뒤에만
+        발송기 큐에 등록된다 (롤백 시 발송 안 함).
+
+        Args:
+            commit: False면 호출 측 트랜잭션에 포함 (호출 측에서 commit)
+
+        Returns:
+            list[Notification] (중복 user_id 제거, 입력 순서 유지)
+        """
+        user_ids = list(dict.fromkeys(uid for uid in user_ids if uid))
+        notifications = [
+            Notification(
+                user_id=uid,
+                notification_type=notification_type,
                 title=title,
-                body=message,
-                url=link_url or '/notifications'
+                message=message,
+                link_url=link_url,
+                related_user_id=related_user_id,
+                related_entity_type=related_entity_type,
+                related_entity_id=related_entity_id
             )
-        except Exception:
-            pass
-
-        return notification
+            for uid in user_ids
+        ]
+        if not notifications:
+            return notifications
+        db.session.add_all(notifications)
+
+        # Web Push 알림 (구독자에게만, 커밋 후 발송 · 실패해도 무시)
+        if push:
+            try:
+                from app.utils.push_utils import queue_push
+                queue_push(user_ids, title, message, link_url or '/notifications')
+            except Exception:
+                pass
+
+        if commit:
+            db.session.commit()
+        return notifications
 
     @staticmethod
     def get_unread_count(user_id):
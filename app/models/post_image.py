@@ -31,6 +31,12 @@ class PostImage(db.Model):
                             db.ForeignKey('users.user_id', ondelete='SET NULL'),
                             nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # 파생 이미지 (app.utils.image_utils가 커밋 후 백그라운드에서 생성)
+    # None: 생성 전 / {}: 원본만 사용 (애니메이션 GIF 등)
+    # {'thumb': {'width', 'height', 'jpeg', 'webp'}, 'medium': {...}}
+    width = db.Column(db.Integer)    # EXIF 회전 반영 원본 크기
+    height = db.Column(db.Integer)
+    variants = db.Column(db.JSON(none_as_null=True))
 
     # Relationships
     uploader = db.relationship('User', foreign_keys=[uploaded_by])
@@ -49,6 +55,23 @@ class PostImage(db.Model):
         from flask import url_for
         return url_for('community.serve_post_image', filename=self.stored_filename)
 
+    def variant_url(self, name='medium', fmt='jpeg'):
+        """파생 이미지 URL (아직 생성 전이면 원본 URL)"""
+        from flask import url_for
+        variant = (self.variants or {}).get(name)
+        filename = variant.get(fmt) if variant else None
+        return url_for('community.serve_post_image', filename=filename or self.stored_filename)
+
+    def srcset(self, fmt='jpeg'):
+        """<img srcset> 값 ('URL 400w, URL 1280w'), 파생 이미지가 없으면 빈 문자열"""
+        from flask import url_for
+        entries, widths = [], set()
+        for variant in sorted((self.variants or {}).values(), key=lambda v: v['width']):
+            if variant.get(fmt) and variant['width'] not in widths:
+                widths.add(variant['width'])
+                entries.append(f"{url_for('community.serve_post_image', filename=variant[fmt])} {variant['width']}w")
+        return ', '.join(entries)
+
     @property
     def file_size_str(self):
         """파일 크기를 읽기 쉬운 형태로 변환"""
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""예약 작업 리더 리스 모델 (앱 노드 전체 공유)"""
+from app.models import db
+
+
+class SchedulerLease(db.Model):
+    """예약 작업 실행 리더 리스
+
+    name마다 1행. holder(호스트:PID)가 expires_at 전에 갱신하는 동안 리더를 유지하고,
+    만료되면 다른 노드가 조건부 UPDATE로 가져간다. 여러 앱 노드가 같은 DB를 쓰더라도
+    예약 작업은 리스를 가진 한 프로세스에서만 실행된다.
+    """
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    acquired_at = db.Column(db.DateTime, nullable=True)
+    renewed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} {self.holder} ~{self.expires_at}>'
@@ -73,6 +73,7 @@ class SchemaQuizSession(db.Model):
     # 세션 정보
     subject = db.Column(db.String(50), nullable=False)  # 'social' or 'science'
     grade = db.Column(db.String(10), nullable=False)
+    question_ids = db.Column(db.JSON)  # 시작 시 고정한 문제 순서 (app.utils.quiz_engine)
 
     # 결과
     total_questions = db.Column(db.Integer, default=0)
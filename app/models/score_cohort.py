@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""학년별 첨삭 점수 분포 집계 모델 (리포트 동급생 비교용)"""
+from app.models import db
+
+
+class ScoreCohortStat(db.Model):
+    """작성일 × 학년 × 지표 × 점수 구간 단위 첨삭 점수 집계
+
+    완료된 첨삭의 최신 버전 점수(EssayResult.total_score, EssayScore 18개 지표)를
+    (작성일, 학생 학년, 지표, 점수 구간)으로 묶은 값. metric은 'total' 또는 지표명,
+    bucket은 점수 ÷ 구간 폭(총점 1점, 지표 0.5점)의 정수부.
+    구간별 count/합/제곱합을 합치면 평균·표준편차·백분위를 한 쿼리로 구할 수 있다.
+    점수/첨삭/학년이 바뀌면 app.utils.score_cohorts 세션 훅이 해당 (날짜, 학년)을 다시 집계한다.
+    """
+    __tablename__ = 'score_cohort_stats'
+
+    stat_date = db.Column(db.Date, primary_key=True)
+    grade = db.Column(db.String(20), primary_key=True)
+    metric = db.Column(db.String(50), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+    score_sq_sum = db.Column(db.Float, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_score_cohort_stats_grade_date', 'grade', 'stat_date'),
+    )
+
+    def __repr__(self):
+        return f'<ScoreCohortStat {self.stat_date} {self.grade} {self.metric}[{self.bucket}]>'
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""통합 검색 역색인 (토큰 → 문서)"""
+from app.models import db
+
+
+class SearchToken(db.Model):
+    """검색 토큰 1개가 문서 1개의 한 필드에 등장한 기록
+
+    토큰은 app.utils.search_index.tokenize()가 만든 2-gram / 초성 2-gram / 1글자(제목만).
+    weight = 필드 가중치 × 등장 횟수. 검색 시 토큰별 weight 합계로 순위를 매긴다.
+    """
+    __tablename__ = 'search_tokens'
+
+    token = db.Column(db.String(16), primary_key=True)
+    entity_type = db.Column(db.String(20), primary_key=True)   # student, course, material, ...
+    entity_id = db.Column(db.String(36), primary_key=True)
+    field = db.Column(db.String(10), primary_key=True)         # title / body
+    weight = db.Column(db.Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        db.Index('ix_search_tokens_entity', 'entity_type', 'entity_id'),
+    )
+
+    def __repr__(self):
+        return f'<SearchToken {self.token} {self.entity_type}:{self.entity_id}>'
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""문자 발송 이력 모델 (일괄 발송 배치 단위 진행 상황 조회용)"""
+from datetime import datetime
+from app.models import db
+
+
+class SmsDeliveryLog(db.Model):
+    """문자 1건 발송 이력
+
+    status: queued(대기) → sending(발송 중) → sent / failed
+            skipped(발송 대상 아님: 이미 발송, 번호 없음 등 — reason 참고)
+            unknown(발송 중 스레드가 사라져 결과를 알 수 없음 — 다시 보내지 않고 수동 확인)
+    같은 batch_id로 묶인 건들은 알리고 대량 발송(send_mass) 요청으로 함께 전송된다.
+    """
+    __tablename__ = 'sms_delivery_logs'
+
+    log_id = db.Column(db.String(36), primary_key=True)
+    batch_id = db.Column(db.String(36), nullable=False, index=True)
+    payment_id = db.Column(db.String(36), db.ForeignKey('payments.payment_id', ondelete='SET NULL'),
+                           nullable=True, index=True)
+
+    receiver = db.Column(db.String(20), nullable=True)
+    receiver_name = db.Column(db.String(100), nullable=True)
+    message = db.Column(db.Text, nullable=False)
+    msg_type = db.Column(db.String(10), nullable=False, default='SMS')  # SMS / LMS
+    title = db.Column(db.String(100), nullable=True)
+
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    reason = db.Column(db.String(500), nullable=True)    # 실패/제외 사유 또는 결과 메시지
+    provider_msg_id = db.Column(db.String(50), nullable=True)  # 알리고 msg_id
+
+    created_by = db.Column(db.String(36), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)  # queued → sending 전환 시각 (멈춤 판단 기준)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __init__(self, **kwargs):
+        super(SmsDeliveryLog, self).__init__(**kwargs)
+        if not self.log_id:
+            import uuid
+            self.log_id = str(uuid.uuid4())
+
+    def __repr__(self):
+        return f'<SmsDeliveryLog {self.log_id} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'log_id': self.log_id,
+            'payment_id': self.payment_id,
+            'receiver': self.receiver,
+            'receiver_name': self.receiver_name,
+            'status': self.status,
+            'attempts': self.attempts,
+            'reason': self.reason,
+            'sent_at': self.sent_at.strftime('%m/%d %H:%M') if self.sent_at else None,
+        }
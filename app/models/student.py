@@ -12,14 +12,14 @@ class Student(db.Model):
     teacher_id = db.Column(db.String(36), db.ForeignKey('users.user_id', ondelete='CASCADE'),
                           nullable=False, index=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.user_id', ondelete='SET NULL'),
-                       nullable=True)  # Phase 4에서 사용 (학생 계정 연결)
+                       nullable=True, index=True)  # Phase 4에서 사용 (학생 계정 연결)
     name = db.Column(db.String(100), nullable=False, index=True)
     grade = db.Column(db.String(20), nullable=False)  # 초1~고3 (구체적 학년)
     school = db.Column(db.String(200), nullable=True)  # 학교명
     birth_date = db.Column(db.Date, nullable=True)  # 생년월일
     tier = db.Column(db.String(20), nullable=True, index=True)  # A, B, C, VIP 등 등급
     tier_updated_at = db.Column(db.DateTime, nullable=True)  # 등급 변경 일시
-    email = db.Column(db.String(255), nullable=True)
+    email = db.Column(db.String(255), nullable=True, index=True)  # 학생 계정 ↔ 학생 레코드 연결 키
     phone = db.Column(db.String(50), nullable=True)
     country = db.Column(db.String(100), nullable=True)   # 거주 국가
     city = db.Column(db.String(100), nullable=True)      # 거주 도시
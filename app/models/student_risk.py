@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""학생 위험도 스냅샷 (위험도 분석 대시보드용)"""
+from datetime import datetime
+
+from app.models import db
+
+
+class StudentRiskSnapshot(db.Model):
+    """학생 1명의 위험도 분석 결과
+
+    app.utils.student_insights.refresh_risk_snapshots()가 일괄 계산해 저장한다.
+    출결/상담/프로필/MBTI/학부모 연결/수강이 바뀌면 세션 훅이 해당 학생 행을 지우고,
+    점수가 날짜 기준(최근 2주 출석, 마지막 상담 경과일)이라 computed_at이 오늘 이전이면
+    다시 계산한다. 매일 새벽 스케줄러가 전체를 갱신한다.
+    """
+    __tablename__ = 'student_risk_snapshots'
+
+    student_id = db.Column(db.String(36), db.ForeignKey('students.student_id', ondelete='CASCADE'),
+                           primary_key=True)
+    risk_score = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False)          # high_risk, medium_risk, low_risk
+    label = db.Column(db.String(50), nullable=False)
+    risk_count = db.Column(db.Integer, nullable=False, default=0)
+    warning_count = db.Column(db.Integer, nullable=False, default=0)
+    recent_attendance = db.Column(db.Float)                    # 최근 2주 출석률 (출결 없으면 NULL)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f'<StudentRiskSnapshot {self.student_id} {self.status}>'
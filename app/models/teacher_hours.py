@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-"""강사 시수 보정 모델"""
+"""강사 시수 보정 / 월별 스냅샷 모델"""
 from datetime import datetime
 from app.models import db
 
@@ -25,3 +25,24 @@ class TeacherHoursCorrection(db.Model):
 
     def __repr__(self):
         return f'<TeacherHoursCorrection teacher={self.teacher_id} {self.year}-{self.month:02d} delta={self.hours_delta:+.1f}>'
+
+
+class TeacherHoursSnapshot(db.Model):
+    """강사 1명의 월별 자동 시수 계산 결과 (보정 제외)
+
+    app.utils.hours_calculator.get_monthly_data()가 여러 강사를 한 번에 계산해 저장한다.
+    지난달 이전(마감된 달)은 is_closed=True로 고정하고, 이번 달은 HOURS_SNAPSHOT_TTL이
+    지나면 다시 계산한다. 출결/세션/수업이 바뀌면 세션 훅이 해당 (강사, 월) 행을 지운다.
+    보정(TeacherHoursCorrection)은 스냅샷에 넣지 않고 조회 때마다 더한다.
+    """
+    __tablename__ = 'teacher_hours_snapshots'
+
+    teacher_id = db.Column(db.String(36), db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    data_json = db.Column(db.Text, nullable=False)          # build_monthly_data() 결과 (JSON)
+    is_closed = db.Column(db.Boolean, nullable=False, default=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f'<TeacherHoursSnapshot teacher={self.teacher_id} {self.year}-{self.month:02d} closed={self.is_closed}>'
@@ -20,6 +20,7 @@ from app.models.consultation import ConsultationRecord
 from app.utils.decorators import requires_role
 from app.utils.course_utils import calculate_tuition_amount
 from app.utils.content_access import can_access_content, format_file_size, extract_youtube_video_id
+from app.utils.principal import get_principal
 from app.utils.enrollment_utils import get_essay_student_ids
 from app.parent_portal.forms import StudentRegistrationSurveyForm
 
@@ -544,10 +545,7 @@ def all_feedback():
 @requires_role('parent', 'admin')
 def absence_notice_index():
     """결석 예고 - 자녀 선택"""
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id, is_active=True
-    ).all()
-    children = [pr.student for pr in parent_relations if pr.student]
+    children = get_principal().children
     return render_template('parent/absence_notice_index.html', children=children)
 
 
@@ -864,12 +862,7 @@ def cancel_makeup_request(student_id, request_id):
 def makeup_classes_index():
     """보강수업 신청 - 자녀 선택"""
     # 내 자녀 목록
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     return render_template('parent/makeup_classes_index.html',
                          children=children)
@@ -921,12 +914,7 @@ def makeup_classes_history(student_id):
 @requires_role('parent', 'admin')
 def courses_index():
     """수업 목록 - 자녀 선택"""
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     # 자녀가 1명이면 바로 해당 자녀의 수업 목록으로 이동
     if len(children) == 1:
@@ -973,12 +961,7 @@ def child_courses(student_id):
 def attendance_index():
     """출결 현황 - 자녀 선택"""
     # 내 자녀 목록
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     return render_template('parent/attendance_index.html',
                          children=children)
@@ -1145,15 +1128,8 @@ def view_essay(student_id, essay_id):
     if essay.is_finalized:
         version = essay.latest_version
         if version:
-            if version.html_path:
-                try:
-                    with open(version.html_path, 'r', encoding='utf-8') as f:
-                        html_content = f.read()
-                except Exception:
-                    pass
-            # 파일 읽기 실패 시 DB에 저장된 html_content로 fallback
-            if not html_content and version.html_content:
-                html_content = version.html_content
+            from app.utils import essay_store
+            html_content = essay_store.load_html(version)
 
     return render_template('parent/view_essay.html',
                          student=student,
@@ -1172,11 +1148,7 @@ def submit_essay():
     from app.models.course import Course
 
     # 내 자녀 목록
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     if not children:
         flash('연결된 자녀가 없습니다. 먼저 자녀를 연결해주세요.', 'error')
@@ -1321,12 +1293,7 @@ def submit_essay():
 def materials_list():
     """교재 목록 - 자녀 선택"""
     # 내 자녀 목록
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     return render_template('parent/materials_index.html',
                          children=children)
@@ -1509,12 +1476,7 @@ def download_child_material(student_id, material_id):
 def videos_list():
     """동영상 목록 - 자녀 선택"""
     # 내 자녀 목록
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     return render_template('parent/videos_index.html',
                          children=children)
@@ -1812,7 +1774,7 @@ def view_announcement(announcement_id):
 @requires_role('parent', 'admin')
 def export_child_attendance(student_id):
     """자녀 출석 내역 Excel 내보내기"""
-    from app.utils.export_utils import export_attendance_to_excel
+    from app.utils.export_utils import export_attendance_to_excel, attendance_export_row
 
     # 권한 확인
     relation = ParentStudent.query.filter_by(
@@ -1827,30 +1789,16 @@ def export_child_attendance(student_id):
 
     student = Student.query.get_or_404(student_id)
 
-    # 출석 데이터 조회
-    enrollments = CourseEnrollment.query.filter_by(
-        student_id=student_id
-    ).all()
-
-    attendance_data = []
-    for enrollment in enrollments:
-        attendances = Attendance.query.filter_by(
-            enrollment_id=enrollment.enrollment_id
-        ).join(CourseSession).order_by(CourseSession.session_date.desc()).all()
+    # 출석 데이터 조회 (수업/회차를 한 번에 조인해 나눠 읽으면서 바로 시트에 기록)
+    attendances = db.session.query(Attendance, CourseSession, Course.course_name)\
+        .join(CourseSession, Attendance.session_id == CourseSession.session_id)\
+        .join(CourseEnrollment, Attendance.enrollment_id == CourseEnrollment.enrollment_id)\
+        .join(Course, CourseEnrollment.course_id == Course.course_id)\
+        .filter(CourseEnrollment.student_id == student_id)\
+        .order_by(CourseSession.session_date.desc()).yield_per(1000)
 
-        for attendance in attendances:
-            session = CourseSession.query.get(attendance.session_id)
-            if not session:
-                continue
-            attendance_data.append({
-                'date': session.session_date.strftime('%Y-%m-%d'),
-                'course_name': enrollment.course.course_name,
-                'student_name': student.name,
-                'status': attendance.status,
-                'late_minutes': attendance.late_minutes if attendance.late_minutes else '-',
-                'notes': attendance.notes or '-',
-                'checked_at': attendance.checked_at.strftime('%Y-%m-%d %H:%M') if attendance.checked_at else '-'
-            })
+    attendance_data = (attendance_export_row(attendance, session, course_name, student.name)
+                       for attendance, session, course_name in attendances)
 
     return export_attendance_to_excel(attendance_data, course_name=f"{student.name} 학생")
 
@@ -2047,12 +1995,7 @@ def reading_mbti():
     from app.models.reading_mbti import ReadingMBTITest, ReadingMBTIResult
 
     # 내 자녀 목록
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     # 각 자녀의 검사 이력 통계 (학년별 맞춤 테스트 포함)
     children_stats = []
@@ -2250,12 +2193,7 @@ def ace_evaluation():
     from app.models.ace_evaluation import AceEvaluation, WeeklyEvaluation
 
     # 내 자녀 목록
-    parent_relations = ParentStudent.query.filter_by(
-        parent_id=current_user.user_id,
-        is_active=True
-    ).all()
-
-    children = [pr.student for pr in parent_relations]
+    children = get_principal().children
 
     # 각 자녀의 평가 통계
     children_stats = []
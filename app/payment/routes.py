@@ -23,9 +23,9 @@ def _can_pay(payment):
     if current_user.role == 'admin':
         return True
     if current_user.role == 'student':
-        from app.models import Student
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-        return student and payment.student_id == student.student_id
+        from app.utils.principal import linked_student_id
+        student_id = linked_student_id()
+        return bool(student_id) and payment.student_id == student_id
     if current_user.role == 'parent':
         from app.models import ParentStudent
         linked = ParentStudent.query.filter_by(
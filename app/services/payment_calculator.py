@@ -5,6 +5,10 @@
     result = PaymentCalculator.calculate(enrollment, period)
     print(result.final_amount)
     print(result.to_dict())
+
+    # 청구 화면처럼 여러 건을 계산할 때 (휴무/조정 일괄 조회)
+    for enrollment, result in PaymentCalculator.calculate_batch(enrollments, period):
+        ...
 """
 from datetime import timedelta
 from app.models.session_adjustment import SessionAdjustment
@@ -110,6 +114,9 @@ class PaymentCalculator:
     # 분기 결제 주당 할인액
     QUARTERLY_DISCOUNT_PER_WEEK = 5000
 
+    # 일괄 계산 시 IN 절 최대 개수
+    IN_CHUNK = 500
+
     @classmethod
     def calculate(cls, enrollment, period):
         """선불 방식 수강료 계산.
@@ -123,6 +130,30 @@ class PaymentCalculator:
         Returns:
             PaymentCalculationResult
         """
+        # 기간 전체 수업 주차 수 (휴무 제외)
+        weeks_in_period = cls._count_class_weeks(enrollment, period, period.start_date)
+
+        # 중간 합류 여부: 수강 시작일이 기간 시작일보다 늦으면 pro-rate
+        enrolled_date = enrollment.enrolled_at.date() if enrollment.enrolled_at else None
+        if enrolled_date and enrolled_date > period.start_date:
+            weeks_charged = cls._count_class_weeks(enrollment, period, enrolled_date)
+            is_prorated = True
+        else:
+            weeks_charged = weeks_in_period
+            is_prorated = False
+
+        # 선불 방식: 청구 기간 시작일 이전에 발생한 pending 조정만 반영
+        # (당월 기간 중 발생하는 미래 조정은 다음 기간 청구서에서 처리)
+        adjustments = SessionAdjustment.get_pending_before(
+            enrollment.enrollment_id, period.start_date
+        )
+        return cls._build_result(enrollment, period, weeks_in_period, weeks_charged,
+                                 is_prorated, adjustments)
+
+    @classmethod
+    def _build_result(cls, enrollment, period, weeks_in_period, weeks_charged,
+                      is_prorated, adjustments):
+        """주차 수·조정 건이 정해진 뒤의 금액 계산 (단건/일괄 공통)"""
         result = PaymentCalculationResult()
         result.enrollment_id = enrollment.enrollment_id
         result.period_id = period.period_id
@@ -131,18 +162,10 @@ class PaymentCalculator:
         weekly_fee = enrollment.weekly_fee or 0
         result.weekly_fee = weekly_fee
 
-        # 2. 기간 전체 수업 주차 수 (휴무 제외)
-        weeks_in_period = cls._count_class_weeks(enrollment, period, period.start_date)
+        # 2. 수업 주차 수
         result.weeks_in_period = weeks_in_period
-
-        # 중간 합류 여부: 수강 시작일이 기간 시작일보다 늦으면 pro-rate
-        enrolled_date = enrollment.enrolled_at.date() if enrollment.enrolled_at else None
-        if enrolled_date and enrolled_date > period.start_date:
-            weeks_charged = cls._count_class_weeks(enrollment, period, enrolled_date)
-            result.is_prorated = True
-        else:
-            weeks_charged = weeks_in_period
         result.weeks_charged = weeks_charged
+        result.is_prorated = is_prorated
 
         # 3. 기본 금액
         base_amount = weekly_fee * weeks_charged
@@ -167,11 +190,6 @@ class PaymentCalculator:
         result.subtotal = max(0, base_amount - result.total_discount)
 
         # 6. 이월/무료수업 차감
-        # 선불 방식: 청구 기간 시작일 이전에 발생한 pending 조정만 반영
-        # (당월 기간 중 발생하는 미래 조정은 다음 기간 청구서에서 처리)
-        adjustments = SessionAdjustment.get_pending_before(
-            enrollment.enrollment_id, period.start_date
-        )
         rollover_sessions = sum(a.sessions_count for a in adjustments
                                 if a.adjustment_type == 'rollover')
         free_sessions = sum(a.sessions_count for a in adjustments
@@ -194,12 +212,98 @@ class PaymentCalculator:
 
     @classmethod
     def calculate_batch(cls, enrollments, period):
-        """여러 enrollment를 한 번에 계산
+        """여러 enrollment를 한 번에 계산 (calculate와 동일한 결과)
+
+        휴무 주·pending 조정을 기간 전체에 대해 한 번씩만 조회하고,
+        수업 주차 수는 요일별 산술 계산으로 구한다.
+        enrollment.course는 미리 로드해 두면 추가 쿼리가 없다.
 
         Returns:
             list of (enrollment, PaymentCalculationResult)
         """
-        return [(e, cls.calculate(e, period)) for e in enrollments]
+        enrollments = list(enrollments)
+        holiday_mondays, effective_weeks = cls._load_holidays(period)
+        adjustments_by_enrollment = cls._load_pending_adjustments(
+            [e.enrollment_id for e in enrollments], period.start_date
+        )
+
+        results = []
+        for enrollment in enrollments:
+            weeks_in_period = cls._count_class_weeks_fast(
+                enrollment, period, period.start_date, holiday_mondays, effective_weeks)
+
+            enrolled_date = enrollment.enrolled_at.date() if enrollment.enrolled_at else None
+            if enrolled_date and enrolled_date > period.start_date:
+                weeks_charged = cls._count_class_weeks_fast(
+                    enrollment, period, enrolled_date, holiday_mondays, effective_weeks)
+                is_prorated = True
+            else:
+                weeks_charged = weeks_in_period
+                is_prorated = False
+
+            results.append((enrollment, cls._build_result(
+                enrollment, period, weeks_in_period, weeks_charged, is_prorated,
+                adjustments_by_enrollment.get(enrollment.enrollment_id, [])
+            )))
+        return results
+
+    @classmethod
+    def _load_holidays(cls, period):
+        """기간 내 휴무 주 월요일 집합 + effective_weeks (쿼리 1회)"""
+        holiday_weeks = HolidayWeek.query.filter(
+            HolidayWeek.week_start >= period.start_date,
+            HolidayWeek.week_start <= period.end_date
+        ).all()
+        return ({hw.week_start for hw in holiday_weeks},
+                period.weeks_count - len(holiday_weeks))
+
+    @classmethod
+    def _load_pending_adjustments(cls, enrollment_ids, before_date):
+        """enrollment별 pending 조정 (get_pending_before와 같은 조건, IN 쿼리)"""
+        from datetime import datetime
+        cutoff = datetime(before_date.year, before_date.month, before_date.day)
+        by_enrollment = {}
+        for i in range(0, len(enrollment_ids), cls.IN_CHUNK):
+            chunk = enrollment_ids[i:i + cls.IN_CHUNK]
+            for adj in SessionAdjustment.query.filter(
+                SessionAdjustment.enrollment_id.in_(chunk),
+                SessionAdjustment.status == 'pending',
+                SessionAdjustment.created_at < cutoff
+            ).all():
+                by_enrollment.setdefault(adj.enrollment_id, []).append(adj)
+        return by_enrollment
+
+    @classmethod
+    def _count_class_weeks_fast(cls, enrollment, period, from_date,
+                                holiday_mondays, effective_weeks):
+        """_count_class_weeks의 산술 버전 (휴무 주 미리 로드)
+
+        수업일은 first_class부터 7일 간격이므로 전체 횟수는 나눗셈으로,
+        휴무 주는 해당 주의 수업일이 범위 안에 있는 경우만 뺀다.
+        """
+        course = enrollment.course
+        if not course or course.weekday is None:
+            if from_date <= period.start_date:
+                return effective_weeks
+            total_days = (period.end_date - period.start_date).days + 1
+            remain_days = (period.end_date - from_date).days + 1
+            return round(effective_weeks * remain_days / total_days)
+
+        weekday = course.weekday
+        effective_start = max(from_date, period.start_date)
+        first_class = effective_start + timedelta(days=(weekday - effective_start.weekday()) % 7)
+        if first_class > period.end_date:
+            return 0
+
+        count = (period.end_date - first_class).days // 7 + 1
+        for monday in holiday_mondays:
+            # 월요일이 아닌 week_start는 단건 계산에서도 매칭되지 않음
+            if monday.weekday() != 0:
+                continue
+            class_day = monday + timedelta(days=weekday)
+            if first_class <= class_day <= period.end_date:
+                count -= 1
+        return count
 
     @classmethod
     def _get_holiday_mondays(cls, period):
@@ -16,10 +16,10 @@ def check_student_status():
     if request.endpoint in allowed_endpoints:
         return
 
-    from app.models import Student
+    from app.utils.principal import current_student
     from datetime import datetime, timedelta
 
-    student = Student.query.filter_by(email=current_user.email).first()
+    student = current_student()
     if not student or student.status != 'withdrawn':
         return
 
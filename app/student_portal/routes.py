@@ -26,6 +26,7 @@ from app.utils.progress_tracker import ProgressTracker
 from app.utils.decorators import requires_role
 from app.utils.content_access import can_access_content, format_file_size, extract_youtube_video_id
 from app.utils.enrollment_utils import get_essay_student_ids
+from app.utils.principal import current_student, get_principal
 
 
 @student_bp.route('/')
@@ -36,8 +37,7 @@ def index():
     # 학생 정보 조회
     if current_user.role == 'student':
         # student 계정인 경우 user_id로 student 정보 찾기
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
         if not student:
             flash('학생 정보를 찾을 수 없습니다.', 'error')
             return redirect(url_for('student.index'))
@@ -217,8 +217,7 @@ def index():
 def courses():
     """내 수업 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -279,8 +278,7 @@ def courses():
 def course_detail(course_id):
     """수업 상세 정보"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -345,8 +343,7 @@ def course_detail(course_id):
 def submit_essay():
     """새 과제 제출"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -494,8 +491,7 @@ def submit_essay():
 def my_essays():
     """내 첨삭 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -518,8 +514,7 @@ def my_essays():
 def view_essay(essay_id):
     """첨삭 보기"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -540,15 +535,8 @@ def view_essay(essay_id):
     if essay.status in ['reviewing', 'completed'] and essay.is_finalized:
         version = essay.latest_version
         if version:
-            if version.html_path:
-                try:
-                    with open(version.html_path, 'r', encoding='utf-8') as f:
-                        html_content = f.read()
-                except Exception:
-                    pass
-            # 파일 읽기 실패 시 DB에 저장된 html_content로 fallback
-            if not html_content and version.html_content:
-                html_content = version.html_content
+            from app.utils import essay_store
+            html_content = essay_store.load_html(version)
 
     # 참고 도서 가져오기
     from app.models import Book, EssayBook
@@ -587,8 +575,7 @@ def attendance():
     """학생 출결 현황"""
     import math
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -670,8 +657,7 @@ def attendance():
 def announcements():
     """공지사항 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -715,8 +701,7 @@ def announcements():
 def view_announcement(announcement_id):
     """공지사항 상세"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -756,8 +741,7 @@ def view_announcement(announcement_id):
 def materials():
     """학습 자료 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -808,8 +792,7 @@ def download_material(material_id):
     import os
 
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -853,8 +836,7 @@ def download_material(material_id):
 def assignments():
     """과제 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -903,8 +885,7 @@ def assignments():
 def assignment_detail(assignment_id):
     """과제 상세"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -944,8 +925,7 @@ def submit_assignment(assignment_id):
     import uuid
 
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1019,8 +999,7 @@ def download_assignment_file(submission_id):
     import os
 
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1064,8 +1043,7 @@ def my_payments():
     from app.models import Payment
 
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1108,8 +1086,7 @@ def progress():
     import json
 
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1171,8 +1148,7 @@ def progress():
 def download_essay_attachment(essay_id):
     """첨삭 첨부 파일 다운로드"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1235,8 +1211,7 @@ def makeup_classes():
     """보강수업 신청 가능한 수업 목록"""
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1279,8 +1254,7 @@ def request_makeup_class(course_id):
     """보강수업 신청"""
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1364,8 +1338,7 @@ def cancel_makeup_request(request_id):
     """보강수업 신청 취소"""
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1400,8 +1373,7 @@ def makeup_classes_history():
     """보강수업 신청 전체 이력"""
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1436,8 +1408,7 @@ def makeup_classes_history():
 def teaching_materials():
     """학습 교재 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1497,8 +1468,7 @@ def teaching_materials():
 def teaching_material_detail(material_id):
     """교재 상세 정보"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1528,8 +1498,7 @@ def teaching_material_detail(material_id):
 def download_teaching_material(material_id):
     """교재 다운로드"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1592,8 +1561,7 @@ def download_teaching_material(material_id):
 def teaching_videos():
     """학습 동영상 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1653,8 +1621,7 @@ def teaching_videos():
 def teaching_video_player(video_id):
     """동영상 플레이어"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1697,7 +1664,7 @@ def teaching_video_player(video_id):
 @requires_role('student', 'admin')
 def my_assignments():
     """과제 보기 — 정식 Assignment + 수업 공지/과제 알림 통합"""
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = current_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
@@ -1811,8 +1778,7 @@ def download_class_board_attachment(attachment_id):
 def class_board():
     """내 수업 목록 (클래스 게시판용)"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1852,8 +1818,7 @@ def class_board():
 def class_board_posts(course_id):
     """수업 게시판 게시글 목록"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1894,8 +1859,7 @@ def class_board_posts(course_id):
 def create_class_board_post(course_id):
     """게시글 작성"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -1986,8 +1950,7 @@ def create_class_board_post(course_id):
 def class_board_post_detail(course_id, post_id):
     """게시글 상세"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2032,8 +1995,7 @@ def class_board_post_detail(course_id, post_id):
 def edit_class_board_post(course_id, post_id):
     """게시글 수정"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2149,8 +2111,7 @@ def delete_class_board_post(course_id, post_id):
 def add_class_board_comment(course_id, post_id):
     """댓글 작성"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2251,12 +2212,11 @@ def delete_class_board_comment(comment_id):
 @requires_role('student', 'admin')
 def export_my_attendance():
     """내 출석 내역 Excel 내보내기"""
-    from app.utils.export_utils import export_attendance_to_excel
+    from app.utils.export_utils import export_attendance_to_excel, attendance_export_row
 
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2264,28 +2224,16 @@ def export_my_attendance():
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
 
-    # 출석 데이터 조회
-    enrollments = CourseEnrollment.query.filter_by(
-        student_id=student.student_id
-    ).all()
+    # 출석 데이터 조회 (수업/회차를 한 번에 조인해 나눠 읽으면서 바로 시트에 기록)
+    attendances = db.session.query(Attendance, CourseSession, Course.course_name)\
+        .join(CourseSession, Attendance.session_id == CourseSession.session_id)\
+        .join(CourseEnrollment, Attendance.enrollment_id == CourseEnrollment.enrollment_id)\
+        .join(Course, CourseEnrollment.course_id == Course.course_id)\
+        .filter(CourseEnrollment.student_id == student.student_id)\
+        .order_by(CourseSession.session_date.desc()).yield_per(1000)
 
-    attendance_data = []
-    for enrollment in enrollments:
-        attendances = Attendance.query.filter_by(
-            enrollment_id=enrollment.enrollment_id
-        ).join(CourseSession).order_by(CourseSession.session_date.desc()).all()
-
-        for attendance in attendances:
-            session = CourseSession.query.get(attendance.session_id)
-            attendance_data.append({
-                'date': session.session_date.strftime('%Y-%m-%d'),
-                'course_name': enrollment.course.course_name,
-                'student_name': student.name,
-                'status': attendance.status,
-                'late_minutes': attendance.late_minutes if attendance.late_minutes else '-',
-                'notes': attendance.notes or '-',
-                'checked_at': attendance.checked_at.strftime('%Y-%m-%d %H:%M') if attendance.checked_at else '-'
-            })
+    attendance_data = (attendance_export_row(attendance, session, course_name, student.name)
+                       for attendance, session, course_name in attendances)
 
     return export_attendance_to_excel(attendance_data, course_name=f"{student.name} 학생")
 
@@ -2300,8 +2248,7 @@ def export_my_report():
 
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2350,8 +2297,7 @@ def export_my_report_pdf():
 
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first() or \
-                  Student.query.filter_by(email=current_user.email).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2398,7 +2344,7 @@ def reading_mbti():
     """독서 논술 MBTI 테스트 메인 페이지"""
     from app.models.reading_mbti import ReadingMBTITest, ReadingMBTIResult
 
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = current_student()
 
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
@@ -2437,7 +2383,7 @@ def take_reading_mbti(test_id):
     """독서 논술 MBTI 테스트 응시 페이지"""
     from app.models.reading_mbti import ReadingMBTITest, ReadingMBTIQuestion
 
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = current_student()
 
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
@@ -2483,7 +2429,7 @@ def submit_reading_mbti(test_id):
         validate_responses
     )
 
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = current_student()
 
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
@@ -2567,7 +2513,7 @@ def view_mbti_result(result_id):
     """독서 논술 MBTI 테스트 결과 보기"""
     from app.models.reading_mbti import ReadingMBTIResult
 
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = current_student()
 
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
@@ -2593,7 +2539,7 @@ def view_mbti_result(result_id):
 def vocabulary_quiz():
     """어휘퀴즈 메인 페이지"""
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2615,7 +2561,7 @@ def schema_quiz():
     from app.models.schema_quiz import SchemaQuizSession
 
     if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
+        student = current_student()
     else:
         student = Student.query.first()
 
@@ -2636,18 +2582,60 @@ def schema_quiz():
                            student=student,
                            recent_sessions=recent_sessions)
 
+def _quiz_student():
+    """퀴즈 응시 학생 (관리자는 첫 번째 학생으로 미리보기)"""
+    if current_user.role == 'student':
+        return current_student()
+    return Student.query.first()
+
+
+def _quiz_answers():
+    """제출 답안 → {quiz_id: 답안} (JSON 일괄 제출 또는 기존 폼 단건 제출)"""
+    data = request.get_json(silent=True) or {}
+    if isinstance(data.get('answers'), dict):
+        return {str(k): str(v or '') for k, v in data['answers'].items()}
+    quiz_id = request.form.get('quiz_id')
+    return {quiz_id: request.form.get('answer', '')} if quiz_id else {}
+
+
+def _submit_quiz(kind, session_model, session_id):
+    """답안 일괄 채점 후 1회 커밋 (어휘/스키마 공용)"""
+    from app.utils import quiz_engine
+
+    student = _quiz_student()
+    if not student:
+        return jsonify({'success': False, 'message': '학생 정보를 찾을 수 없습니다.'})
+
+    session = session_model.query.get_or_404(session_id)
+    if session.student_id != student.student_id:
+        return jsonify({'success': False, 'message': '권한이 없습니다.'}), 403
+    if session.completed_at:
+        return jsonify({'success': False, 'message': '이미 완료된 퀴즈입니다.', 'completed': True})
+
+    graded = quiz_engine.submit_answers(kind, session, student.student_id, _quiz_answers())
+    db.session.commit()
+
+    if not graded:
+        return jsonify({'success': False, 'message': '이미 제출했거나 출제되지 않은 문제입니다.'})
+
+    return jsonify({
+        'success': True,
+        'is_correct': graded[-1]['is_correct'],     # 단건 제출 호환
+        'results': graded,
+        'completed': session.completed_at is not None,
+        'score': session.score,
+    })
+
+
 @student_bp.route('/vocabulary-quiz/start/<int:level>')
 @login_required
 @requires_role('student', 'admin')
 def vocabulary_quiz_start(level):
-    """어휘퀴즈 시작"""
-    from app.models.vocabulary_quiz import VocabularyQuiz, VocabularyQuizSession
-
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
+    """어휘퀴즈 시작 — 문제 세트를 이때 한 번 뽑아 세션에 고정"""
+    from app.models.vocabulary_quiz import VocabularyQuizSession
+    from app.utils import quiz_engine
 
+    student = _quiz_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
@@ -2658,6 +2646,9 @@ def vocabulary_quiz_start(level):
         level=level,
         grade=student.grade
     )
+    if not quiz_engine.freeze_questions(quiz_engine.VOCABULARY, session):
+        flash('문제가 없습니다.', 'error')
+        return redirect(url_for('student.vocabulary_quiz'))
     db.session.add(session)
     db.session.commit()
 
@@ -2668,16 +2659,11 @@ def vocabulary_quiz_start(level):
 @login_required
 @requires_role('student', 'admin')
 def vocabulary_quiz_take(session_id):
-    """어휘퀴즈 풀이"""
-    from app.models.vocabulary_quiz import VocabularyQuiz, VocabularyQuizSession, VocabularyQuizResult
-    import json
-    import random
-
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
+    """어휘퀴즈 풀이 — 고정된 문제 세트(정답 제외)를 한 화면에 내려주고 답안마다 서버 채점"""
+    from app.models.vocabulary_quiz import VocabularyQuizSession
+    from app.utils import quiz_engine
 
+    student = _quiz_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
@@ -2689,87 +2675,39 @@ def vocabulary_quiz_take(session_id):
         flash('권한이 없습니다.', 'error')
         return redirect(url_for('student.vocabulary_quiz'))
 
-    # 해당 레벨의 문제 가져오기 (10문제)
-    all_quizzes = VocabularyQuiz.query.filter_by(level=session.level).all()
+    if session.completed_at:
+        return redirect(url_for('student.vocabulary_quiz_result', session_id=session_id))
 
-    if not all_quizzes:
+    newly_frozen = session.question_ids is None     # 도입 이전에 시작한 세션
+    questions = quiz_engine.session_questions(quiz_engine.VOCABULARY, session)
+    if newly_frozen:
+        db.session.commit()
+
+    if not questions:
         flash('문제가 없습니다.', 'error')
         return redirect(url_for('student.vocabulary_quiz'))
 
-    # 랜덤하게 10문제 선택 (문제가 10개 미만이면 전체)
-    quiz_count = min(10, len(all_quizzes))
-    selected_quizzes = random.sample(all_quizzes, quiz_count)
-
-    # 현재 문제 인덱스 (쿼리 파라미터)
-    current_index = int(request.args.get('q', 0))
-
-    if current_index >= len(selected_quizzes):
+    answered = session.total_questions or 0
+    if answered >= len(questions):
         # 퀴즈 완료
         return redirect(url_for('student.vocabulary_quiz_result', session_id=session_id))
 
-    current_quiz = selected_quizzes[current_index]
-
-    # 선택지 파싱
-    try:
-        options = json.loads(current_quiz.options)
-    except:
-        options = [current_quiz.correct_answer, "오답1", "오답2", "오답3"]
-
-    # 선택지 섞기
-    random.shuffle(options)
-
     return render_template('student/vocabulary_quiz/take.html',
                            student=student,
-                           session=session,
-                           quiz=current_quiz,
-                           options=options,
-                           current_index=current_index,
-                           total_count=len(selected_quizzes),
-                           quiz_ids=[q.quiz_id for q in selected_quizzes])
+                           quiz_session=session,
+                           questions=quiz_engine.public_questions(quiz_engine.VOCABULARY, questions),
+                           start_index=answered,
+                           total_count=len(questions))
 
 
 @student_bp.route('/vocabulary-quiz/submit/<session_id>', methods=['POST'])
 @login_required
 @requires_role('student', 'admin')
 def vocabulary_quiz_submit(session_id):
-    """어휘퀴즈 답안 제출"""
-    from app.models.vocabulary_quiz import VocabularyQuiz, VocabularyQuizSession, VocabularyQuizResult
-
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
-
-    if not student:
-        return jsonify({'success': False, 'message': '학생 정보를 찾을 수 없습니다.'})
-
-    session = VocabularyQuizSession.query.get_or_404(session_id)
-
-    quiz_id = request.form.get('quiz_id')
-    answer = request.form.get('answer', '').strip()
-
-    quiz = VocabularyQuiz.query.get_or_404(quiz_id)
-
-    # 정답 확인
-    is_correct = (answer == quiz.correct_answer)
-
-    # 결과 저장
-    result = VocabularyQuizResult(
-        student_id=student.student_id,
-        quiz_id=quiz_id,
-        student_answer=answer,
-        is_correct=is_correct
-    )
-    db.session.add(result)
-
-    # 세션 통계 업데이트
-    session.total_questions = (session.total_questions or 0) + 1
-    if is_correct:
-        session.correct_count = (session.correct_count or 0) + 1
-
-    db.session.commit()
-
-    return jsonify({'success': True, 'is_correct': is_correct})
+    """어휘퀴즈 답안 제출 (JSON {'answers': {quiz_id: 답안}} 일괄 또는 폼 단건)"""
+    from app.models.vocabulary_quiz import VocabularyQuizSession
+    from app.utils import quiz_engine
+    return _submit_quiz(quiz_engine.VOCABULARY, VocabularyQuizSession, session_id)
 
 
 @student_bp.route('/vocabulary-quiz/result/<session_id>')
@@ -2778,12 +2716,9 @@ def vocabulary_quiz_submit(session_id):
 def vocabulary_quiz_result(session_id):
     """어휘퀴즈 결과"""
     from app.models.vocabulary_quiz import VocabularyQuizSession
+    from app.utils import quiz_engine
 
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
-
+    student = _quiz_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
@@ -2795,15 +2730,14 @@ def vocabulary_quiz_result(session_id):
         flash('권한이 없습니다.', 'error')
         return redirect(url_for('student.vocabulary_quiz'))
 
-    # 점수 계산
-    if session.total_questions and session.total_questions > 0:
-        session.score = (session.correct_count / session.total_questions) * 100
-        session.completed_at = datetime.utcnow()
+    # 중간에 그만둔 세션은 푼 문제까지로 점수 확정
+    if not session.completed_at and session.total_questions:
+        quiz_engine.finish_session(session)
         db.session.commit()
 
     return render_template('student/vocabulary_quiz/result.html',
                            student=student,
-                           session=session)
+                           quiz_session=session)
 
 
 # ==================== 스키마퀴즈 라우트 ====================
@@ -2812,14 +2746,11 @@ def vocabulary_quiz_result(session_id):
 @login_required
 @requires_role('student', 'admin')
 def schema_quiz_start(subject):
-    """스키마퀴즈 시작"""
-    from app.models.schema_quiz import SchemaQuiz, SchemaQuizSession
-
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
+    """스키마퀴즈 시작 — 문제 세트를 이때 한 번 뽑아 세션에 고정"""
+    from app.models.schema_quiz import SchemaQuizSession
+    from app.utils import quiz_engine
 
+    student = _quiz_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
@@ -2830,6 +2761,9 @@ def schema_quiz_start(subject):
         subject=subject,
         grade=student.grade
     )
+    if not quiz_engine.freeze_questions(quiz_engine.SCHEMA, session):
+        flash('문제가 없습니다.', 'error')
+        return redirect(url_for('student.schema_quiz'))
     db.session.add(session)
     db.session.commit()
 
@@ -2840,16 +2774,11 @@ def schema_quiz_start(subject):
 @login_required
 @requires_role('student', 'admin')
 def schema_quiz_take(session_id):
-    """스키마퀴즈 풀이"""
-    from app.models.schema_quiz import SchemaQuiz, SchemaQuizSession, SchemaQuizResult
-    from app.utils.korean_utils import get_chosung
-    import random
-
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
+    """스키마퀴즈 풀이 — 고정된 문제 세트(정답 제외)를 한 화면에 내려주고 답안마다 서버 채점"""
+    from app.models.schema_quiz import SchemaQuizSession
+    from app.utils import quiz_engine
 
+    student = _quiz_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
@@ -2861,83 +2790,39 @@ def schema_quiz_take(session_id):
         flash('권한이 없습니다.', 'error')
         return redirect(url_for('student.schema_quiz'))
 
-    # 해당 주제의 문제 가져오기 (10문제)
-    all_quizzes = SchemaQuiz.query.filter_by(subject=session.subject).all()
+    if session.completed_at:
+        return redirect(url_for('student.schema_quiz_result', session_id=session_id))
+
+    newly_frozen = session.question_ids is None     # 도입 이전에 시작한 세션
+    questions = quiz_engine.session_questions(quiz_engine.SCHEMA, session)
+    if newly_frozen:
+        db.session.commit()
 
-    if not all_quizzes:
+    if not questions:
         flash('문제가 없습니다.', 'error')
         return redirect(url_for('student.schema_quiz'))
 
-    # 랜덤하게 10문제 선택
-    quiz_count = min(10, len(all_quizzes))
-    selected_quizzes = random.sample(all_quizzes, quiz_count)
-
-    # 현재 문제 인덱스
-    current_index = int(request.args.get('q', 0))
-
-    if current_index >= len(selected_quizzes):
+    answered = session.total_questions or 0
+    if answered >= len(questions):
         # 퀴즈 완료
         return redirect(url_for('student.schema_quiz_result', session_id=session_id))
 
-    current_quiz = selected_quizzes[current_index]
-
-    # 초성 힌트 생성 (정답 용어의 초성)
-    chosung_hint = get_chosung(current_quiz.term)
-
     return render_template('student/schema_quiz/take.html',
                            student=student,
-                           session=session,
-                           quiz=current_quiz,
-                           chosung_hint=chosung_hint,
-                           current_index=current_index,
-                           total_count=len(selected_quizzes),
-                           quiz_ids=[q.quiz_id for q in selected_quizzes])
+                           quiz_session=session,
+                           questions=quiz_engine.public_questions(quiz_engine.SCHEMA, questions),
+                           start_index=answered,
+                           total_count=len(questions))
 
 
 @student_bp.route('/schema-quiz/submit/<session_id>', methods=['POST'])
 @login_required
 @requires_role('student', 'admin')
 def schema_quiz_submit(session_id):
-    """스키마퀴즈 답안 제출"""
-    from app.models.schema_quiz import SchemaQuiz, SchemaQuizSession, SchemaQuizResult
-    from app.utils.korean_utils import check_answer_similarity
-
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
-
-    if not student:
-        return jsonify({'success': False, 'message': '학생 정보를 찾을 수 없습니다.'})
-
-    session = SchemaQuizSession.query.get_or_404(session_id)
-
-    quiz_id = request.form.get('quiz_id')
-    answer = request.form.get('answer', '').strip()
-
-    quiz = SchemaQuiz.query.get_or_404(quiz_id)
-
-    # 정답 확인 (용어와 비교)
-    is_correct = check_answer_similarity(answer, quiz.term)
-
-    # 결과 저장
-    result = SchemaQuizResult(
-        student_id=student.student_id,
-        quiz_id=quiz_id,
-        session_id=session_id,
-        student_answer=answer,
-        is_correct=is_correct
-    )
-    db.session.add(result)
-
-    # 세션 통계 업데이트
-    session.total_questions = (session.total_questions or 0) + 1
-    if is_correct:
-        session.correct_count = (session.correct_count or 0) + 1
-
-    db.session.commit()
-
-    return jsonify({'success': True, 'is_correct': is_correct})
+    """스키마퀴즈 답안 제출 (JSON {'answers': {quiz_id: 답안}} 일괄 또는 폼 단건)"""
+    from app.models.schema_quiz import SchemaQuizSession
+    from app.utils import quiz_engine
+    return _submit_quiz(quiz_engine.SCHEMA, SchemaQuizSession, session_id)
 
 
 @student_bp.route('/schema-quiz/result/<session_id>')
@@ -2945,13 +2830,11 @@ def schema_quiz_submit(session_id):
 @requires_role('student', 'admin')
 def schema_quiz_result(session_id):
     """스키마퀴즈 결과"""
+    from sqlalchemy.orm import joinedload
     from app.models.schema_quiz import SchemaQuizSession, SchemaQuizResult
+    from app.utils import quiz_engine
 
-    if current_user.role == 'student':
-        student = Student.query.filter_by(user_id=current_user.user_id).first()
-    else:
-        student = Student.query.first()
-
+    student = _quiz_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'error')
         return redirect(url_for('student.index'))
@@ -2963,20 +2846,21 @@ def schema_quiz_result(session_id):
         flash('권한이 없습니다.', 'error')
         return redirect(url_for('student.schema_quiz'))
 
-    # 점수 계산
-    if session.total_questions and session.total_questions > 0:
-        session.score = (session.correct_count / session.total_questions) * 100
-        session.completed_at = datetime.utcnow()
+    # 중간에 그만둔 세션은 푼 문제까지로 점수 확정
+    if not session.completed_at and session.total_questions:
+        quiz_engine.finish_session(session)
         db.session.commit()
 
-    # 이 세션의 모든 결과 가져오기 (답안 비교용)
-    results = SchemaQuizResult.query.filter_by(
+    # 이 세션의 모든 결과 가져오기 (답안 비교용, 문제 함께 로드 — 출제 순서대로)
+    results = SchemaQuizResult.query.options(joinedload(SchemaQuizResult.quiz)).filter_by(
         session_id=session_id
     ).order_by(SchemaQuizResult.attempted_at).all()
+    order = {quiz_id: i for i, quiz_id in enumerate(session.question_ids or [])}
+    results.sort(key=lambda r: order.get(r.quiz_id, len(order)))
 
     return render_template('student/schema_quiz/result.html',
                            student=student,
-                           session=session,
+                           quiz_session=session,
                            results=results)
 
 
@@ -2989,7 +2873,7 @@ def weekly_evaluation():
 
     # 학생 정보 조회
     if current_user.role == 'student':
-        student = Student.query.filter_by(email=current_user.email).first_or_404()
+        student = current_student() or abort(404)
     else:
         # 관리자의 경우 student_id 파라미터 필요
         student_id = request.args.get('student_id')
@@ -3132,7 +3016,7 @@ def zoom_classes():
     from app.utils.zoom_utils import decrypt_zoom_link, log_zoom_access
     from flask import request as req
 
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = current_student()
     if not student:
         return jsonify({'error': '학생 정보를 찾을 수 없습니다.'}), 404
 
@@ -3190,7 +3074,7 @@ def zoom_log():
     from app.utils.zoom_utils import log_zoom_access
     from flask import request as req
 
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = current_student()
     if not student:
         return jsonify({'ok': False}), 404
 
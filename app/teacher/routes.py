@@ -131,8 +131,8 @@ def index():
 
     # 차트 데이터: 월별 첨삭 수 (내가 담당한 학생들)
     six_months_ago = datetime.utcnow() - timedelta(days=180)
-    from app.utils.enrollment_utils import get_active_student_ids_for_teacher
-    my_student_ids = get_active_student_ids_for_teacher(current_user.user_id)
+    from app.utils.principal import get_principal
+    my_student_ids = list(get_principal().taught_student_ids)
 
     monthly_essays = db.session.query(
         extract('year', Essay.created_at).label('year'),
@@ -443,16 +443,17 @@ def create_absence_notice():
     db.session.flush()
 
     # 관리자에게 알림 (관리자가 확인해야 함)
-    admins = User.query.filter(User.role_level <= 2, User.is_active == True).all()
-    for admin in admins:
-        Notification.create_notification(
-            user_id=admin.user_id,
-            notification_type='absence_notice',
-            title=f'[{notice_label} 예고 등록] {student.name} ({absence_date.strftime("%m/%d")})',
-            message=(f'{current_user.name} 강사가 {student.name} 학생의 '
-                     f'{absence_date.strftime("%Y년 %m월 %d일")} {course.course_name} {notice_label}을 등록했습니다. 사유: {reason}'),
-            link_url='/admin/absence-notices'
-        )
+    admin_ids = [uid for (uid,) in db.session.query(User.user_id).filter(
+        User.role_level <= 2, User.is_active == True).all()]
+    Notification.create_bulk(
+        admin_ids,
+        notification_type='absence_notice',
+        title=f'[{notice_label} 예고 등록] {student.name} ({absence_date.strftime("%m/%d")})',
+        message=(f'{current_user.name} 강사가 {student.name} 학생의 '
+                 f'{absence_date.strftime("%Y년 %m월 %d일")} {course.course_name} {notice_label}을 등록했습니다. 사유: {reason}'),
+        link_url='/admin/absence-notices',
+        commit=False
+    )
 
     db.session.commit()
     flash(f'결석 예고가 등록되었습니다. 관리자에게 알림을 보냈습니다.', 'success')
@@ -990,29 +991,20 @@ def update_attendance(attendance_id):
     if new_status in ('absent', 'late') and session.status != 'pending_review':
         try:
             from app.models.notification import Notification
-            from app.utils.push_utils import send_push_to_user
             student = attendance.student
             status_label = '결석' if new_status == 'absent' else '지각'
             date_str = session.session_date.strftime('%m/%d')
             msg = f'{date_str} {course.course_name} 수업에 {status_label} 처리되었습니다.'
-            parents = ParentStudent.query.filter_by(
+            parent_ids = [pid for (pid,) in db.session.query(ParentStudent.parent_id).filter_by(
                 student_id=student.student_id, is_active=True
-            ).all()
-            for ps in parents:
-                db.session.add(Notification(
-                    user_id=ps.parent_id,
-                    notification_type='attendance_absent',
-                    title=f'{student.name} 학생 {status_label} 알림',
-                    message=msg,
-                    link_url='/parent/attendance'
-                ))
-                send_push_to_user(
-                    user_id=ps.parent_id,
-                    title=f'{student.name} 학생 {status_label} 알림',
-                    body=msg,
-                    url='/parent/attendance'
-                )
-            db.session.commit()
+            ).all()]
+            Notification.create_bulk(
+                parent_ids,
+                notification_type='attendance_absent',
+                title=f'{student.name} 학생 {status_label} 알림',
+                message=msg,
+                link_url='/parent/attendance'
+            )
         except Exception as e:
             current_app.logger.warning(f'[Push] 결석 알림 오류: {e}')
 
@@ -1282,31 +1274,31 @@ def complete_session(session_id):
     if was_pending_review:
         try:
             from app.models.notification import Notification
-            from app.utils.push_utils import send_push_to_user
-            att_records = Attendance.query.filter_by(session_id=session.session_id).all()
+            att_records = [
+                att for att in Attendance.query.filter_by(session_id=session.session_id).all()
+                if att.status in ('absent', 'late')
+            ]
+            # 학부모 관계 한 번에 조회
+            parents_by_student = {}
+            if att_records:
+                for ps in ParentStudent.query.filter(
+                    ParentStudent.student_id.in_([att.student_id for att in att_records]),
+                    ParentStudent.is_active == True
+                ).all():
+                    parents_by_student.setdefault(ps.student_id, []).append(ps.parent_id)
+            date_str = session.session_date.strftime('%m/%d')
             for att in att_records:
-                if att.status in ('absent', 'late'):
-                    student = att.student
-                    status_label = '결석' if att.status == 'absent' else '지각'
-                    date_str = session.session_date.strftime('%m/%d')
-                    msg = f'{date_str} {course.course_name} 수업에 {status_label} 처리되었습니다.'
-                    parents = ParentStudent.query.filter_by(
-                        student_id=student.student_id, is_active=True
-                    ).all()
-                    for ps in parents:
-                        db.session.add(Notification(
-                            user_id=ps.parent_id,
-                            notification_type='attendance_absent',
-                            title=f'{student.name} 학생 {status_label} 알림',
-                            message=msg,
-                            link_url='/parent/attendance'
-                        ))
-                        send_push_to_user(
-                            user_id=ps.parent_id,
-                            title=f'{student.name} 학생 {status_label} 알림',
-                            body=msg,
-                            url='/parent/attendance'
-                        )
+                student = att.student
+                status_label = '결석' if att.status == 'absent' else '지각'
+                msg = f'{date_str} {course.course_name} 수업에 {status_label} 처리되었습니다.'
+                Notification.create_bulk(
+                    parents_by_student.get(student.student_id, []),
+                    notification_type='attendance_absent',
+                    title=f'{student.name} 학생 {status_label} 알림',
+                    message=msg,
+                    link_url='/parent/attendance',
+                    commit=False
+                )
             db.session.commit()
         except Exception as e:
             current_app.logger.warning(f'[Push] 확인보류→완료 알림 오류: {e}')
@@ -3693,7 +3685,8 @@ def export_my_students():
 @requires_role('teacher', 'admin')
 def export_course_attendance(course_id):
     """수업별 출석부 Excel 내보내기"""
-    from app.utils.export_utils import create_excel_workbook, create_excel_response, add_title_row, add_info_row, style_header_row, style_data_rows, auto_adjust_column_width
+    from sqlalchemy.orm import contains_eager
+    from app.utils.export_utils import ExcelStream
 
     course = Course.query.get_or_404(course_id)
 
@@ -3710,51 +3703,47 @@ def export_course_attendance(course_id):
     enrollments = CourseEnrollment.query.filter_by(
         course_id=course_id,
         status='active'
-    ).order_by(Student.name).join(Student).all()
-
-    wb, ws = create_excel_workbook("출석부")
-
-    # 제목
-    add_title_row(ws, f"{course.course_name} 출석부", len(sessions) + 3)
-    add_info_row(ws, f"강사: {course.teacher.name} | 생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}", 2)
+    ).order_by(Student.name).join(Student).options(contains_eager(CourseEnrollment.student)).all()
+
+    # 수업 전체 출석 기록을 한 번에 조회 (학생 x 세션마다 조회하지 않음)
+    attendance_status = {
+        (enrollment_id, session_id): status
+        for enrollment_id, session_id, status in db.session.query(
+            Attendance.enrollment_id, Attendance.session_id, Attendance.status
+        ).join(CourseSession, Attendance.session_id == CourseSession.session_id)
+        .filter(CourseSession.course_id == course_id)
+    }
+    status_symbols = {
+        'present': 'O',
+        'late': '△',
+        'absent': 'X',
+        'excused': '결'
+    }
 
     # 헤더 (학생명 + 각 세션 날짜)
     headers = ['번호', '학생명', '출석률']
     for session in sessions:
         headers.append(session.session_date.strftime('%m/%d'))
 
-    ws.append([])
-    ws.append(headers)
-    style_header_row(ws, row_num=4, column_count=len(headers))
+    sheet = ExcelStream("출석부", widths=[8, 14, 10] + [10] * len(sessions))
 
-    # 데이터 (학생별 출석 현황)
-    for idx, enrollment in enumerate(enrollments, start=1):
-        student = enrollment.student
-        row_data = [idx, student.name, f"{enrollment.attendance_rate:.1f}%"]
-
-        for session in sessions:
-            attendance = Attendance.query.filter_by(
-                enrollment_id=enrollment.enrollment_id,
-                session_id=session.session_id
-            ).first()
-
-            if attendance:
-                status_symbol = {
-                    'present': 'O',
-                    'late': '△',
-                    'absent': 'X',
-                    'excused': '결'
-                }.get(attendance.status, '-')
-                row_data.append(status_symbol)
-            else:
-                row_data.append('-')
+    def write():
+        sheet.title(f"{course.course_name} 출석부")
+        sheet.created_info(f"강사: {course.teacher.name} | ")
+        sheet.blank()
+        sheet.header(headers)
 
-        ws.append(row_data)
+        # 데이터 (학생별 출석 현황)
+        for idx, enrollment in enumerate(enrollments, start=1):
+            row_data = [idx, enrollment.student.name, f"{enrollment.attendance_rate:.1f}%"]
 
-    style_data_rows(ws, start_row=5, column_count=len(headers))
-    auto_adjust_column_width(ws)
+            for session in sessions:
+                status = attendance_status.get((enrollment.enrollment_id, session.session_id))
+                row_data.append(status_symbols.get(status, '-'))
+
+            sheet.row(row_data)
 
-    return create_excel_response(wb, f"{course.course_name}_출석부")
+    return sheet.response(f"{course.course_name}_출석부", write)
 
 
 @teacher_bp.route('/export/student-report/<student_id>')
@@ -4159,29 +4148,20 @@ def ace_weekly():
             # 주간 평가 등록 → 학부모 Push
             try:
                 from app.models.notification import Notification
-                from app.utils.push_utils import send_push_to_user
                 student_obj = Student.query.get(student_id)
                 if student_obj:
                     grade_label = weekly_eval.grade or ''
                     msg = f'{student_obj.name} 학생의 {eval_date.strftime("%m/%d")} 주차 평가가 등록되었습니다. (등급: {grade_label})'
-                    parents = ParentStudent.query.filter_by(
+                    parent_ids = [pid for (pid,) in db.session.query(ParentStudent.parent_id).filter_by(
                         student_id=student_id, is_active=True
-                    ).all()
-                    for ps in parents:
-                        db.session.add(Notification(
-                            user_id=ps.parent_id,
-                            notification_type='weekly_eval',
-                            title=f'{student_obj.name} 주간 평가 등록',
-                            message=msg,
-                            link_url='/parent/ace-evaluation'
-                        ))
-                        send_push_to_user(
-                            user_id=ps.parent_id,
-                            title=f'{student_obj.name} 주간 평가 등록',
-                            body=msg,
-                            url='/parent/ace-evaluation'
-                        )
-                    db.session.commit()
+                    ).all()]
+                    Notification.create_bulk(
+                        parent_ids,
+                        notification_type='weekly_eval',
+                        title=f'{student_obj.name} 주간 평가 등록',
+                        message=msg,
+                        link_url='/parent/ace-evaluation'
+                    )
             except Exception as e:
                 current_app.logger.warning(f'[Push] 주간 평가 알림 오류: {e}')
 
@@ -4558,16 +4538,13 @@ def help_page():
 @requires_role('teacher', 'admin')
 def my_hours():
     """강사 본인 월별 시수 확인"""
-    from app.utils.hours_calculator import build_teacher_monthly_data
-    from app.models.teacher_hours import TeacherHoursCorrection
+    from app.utils.hours_calculator import get_monthly_data
 
     year  = request.args.get('year',  date.today().year,  type=int)
     month = request.args.get('month', date.today().month, type=int)
 
-    data = build_teacher_monthly_data(current_user.user_id, year, month)
-    corrections = TeacherHoursCorrection.query.filter_by(
-        teacher_id=current_user.user_id, year=year, month=month
-    ).order_by(TeacherHoursCorrection.created_at).all()
+    data = get_monthly_data([current_user.user_id], year, month)[current_user.user_id]
+    corrections = data['corrections']
 
     return render_template(
         'teacher/my_hours.html',
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""출결 집계 테이블(attendance_daily_stats) 유지/조회
+
+출석 현황·대시보드가 Attendance ⋈ CourseSession 원본에 상태별 count()를 여러 번
+날리지 않도록 (수업일, 수업, 학생) 단위 집계를 유지한다.
+
+- 갱신: 세션 flush 훅이 바뀐 Attendance / CourseSession(날짜·수업·출석체크 여부)을 보고
+  영향받은 (날짜, 수업) 구간만 원본에서 다시 집계해 같은 트랜잭션 안에서 교체한다.
+  델타를 더하지 않고 구간을 재집계하므로 상태 변경·일정 변경·삭제 모두 정확히 반영된다.
+- 조회: period_totals / totals / course_breakdown / student_breakdown (각 1쿼리)
+- 점검/복구: find_mismatches() 로 원본과 비교, rebuild() 로 기간 재생성
+  (check_attendance_rollup.py)
+
+Query.update() 같은 일괄 변경은 감지하지 않으므로 그런 경우 rebuild()로 맞춘다.
+"""
+from sqlalchemy import and_, case, delete, event, func, inspect, insert, or_, select
+
+STATUSES = ('present', 'late', 'absent', 'excused')
+PAIR_CHUNK = 200
+
+
+def _aggregate_select(*conditions):
+    """원본 Attendance ⋈ CourseSession → 집계 행 SELECT"""
+    from app.models import Attendance, CourseSession
+    checked = CourseSession.attendance_checked == True
+    return select(
+        CourseSession.session_date,
+        CourseSession.course_id,
+        Attendance.student_id,
+        func.count(Attendance.attendance_id),
+        *[func.sum(case((Attendance.status == s, 1), else_=0)) for s in STATUSES],
+        func.sum(case((checked, 1), else_=0)),
+        func.sum(case((and_(checked, Attendance.status == 'present'), 1), else_=0)),
+    ).join(
+        CourseSession, Attendance.session_id == CourseSession.session_id
+    ).where(*conditions).group_by(
+        CourseSession.session_date, CourseSession.course_id, Attendance.student_id
+    )
+
+
+_COLUMNS = ('stat_date', 'course_id', 'student_id', 'total') + STATUSES + ('checked_total', 'checked_present')
+
+
+def _refresh_pairs(connection, pairs):
+    """(날짜, 수업) 구간 집계를 원본 기준으로 교체"""
+    from app.models import CourseSession
+    from app.models.attendance_rollup import AttendanceDailyStat
+    table = AttendanceDailyStat.__table__
+    pairs = list(pairs)
+    for i in range(0, len(pairs), PAIR_CHUNK):
+        chunk = pairs[i:i + PAIR_CHUNK]
+        connection.execute(delete(table).where(or_(*[
+            and_(table.c.stat_date == d, table.c.course_id == c) for d, c in chunk
+        ])))
+        connection.execute(insert(table).from_select(_COLUMNS, _aggregate_select(or_(*[
+            and_(CourseSession.session_date == d, CourseSession.course_id == c) for d, c in chunk
+        ]))))
+
+
+def refresh(pairs):
+    """세션 훅을 거치지 않은 변경(일괄 INSERT 등)의 (날짜, 수업) 구간 재집계. 커밋은 호출 측에서."""
+    from app.models import db
+    if pairs:
+        _refresh_pairs(db.session.connection(), pairs)
+
+
+def _range_conditions(column, date_from, date_to):
+    conditions = []
+    if date_from:
+        conditions.append(column >= date_from)
+    if date_to:
+        conditions.append(column <= date_to)
+    return conditions
+
+
+def rebuild(date_from=None, date_to=None):
+    """기간(미지정 시 전체) 집계를 원본에서 다시 생성. 커밋은 호출 측에서.
+
+    Returns:
+        생성된 집계 행 수
+    """
+    from app.models import db, CourseSession
+    from app.models.attendance_rollup import AttendanceDailyStat
+    table = AttendanceDailyStat.__table__
+    connection = db.session.connection()
+    connection.execute(delete(table).where(*_range_conditions(table.c.stat_date, date_from, date_to)))
+    connection.execute(insert(table).from_select(_COLUMNS, _aggregate_select(
+        *_range_conditions(CourseSession.session_date, date_from, date_to))))
+    return connection.execute(
+        select(func.count()).select_from(table).where(
+            *_range_conditions(table.c.stat_date, date_from, date_to))
+    ).scalar()
+
+
+def find_mismatches(date_from=None, date_to=None):
+    """원본 Attendance와 집계가 다른 (날짜, 수업, 학생) 목록
+
+    Returns:
+        [(key, 원본 값 dict 또는 None, 집계 값 dict 또는 None), ...]
+    """
+    from app.models import db, CourseSession
+    from app.models.attendance_rollup import AttendanceDailyStat
+    table = AttendanceDailyStat.__table__
+
+    def _rows(stmt):
+        return {tuple(row[:3]): dict(zip(_COLUMNS[3:], row[3:])) for row in db.session.execute(stmt)}
+
+    expected = _rows(_aggregate_select(*_range_conditions(CourseSession.session_date, date_from, date_to)))
+    actual = _rows(select(*[table.c[name] for name in _COLUMNS]).where(
+        *_range_conditions(table.c.stat_date, date_from, date_to)))
+    return [
+        (key, expected.get(key), actual.get(key))
+        for key in sorted(set(expected) | set(actual), key=str)
+        if expected.get(key) != actual.get(key)
+    ]
+
+
+# ════════════════════════════════════════════════════════
+# 증분 갱신 (세션 훅)
+# ════════════════════════════════════════════════════════
+
+def _old_and_new(state, attr):
+    history = state.attrs[attr].history
+    values = list(history.added or ()) + list(history.deleted or ())
+    if not history.has_changes():
+        values.append(getattr(state.obj(), attr))
+    return values
+
+
+def _after_flush(session, flush_context):
+    from app.models import Attendance, CourseSession
+
+    pairs = set()
+    session_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Attendance):
+            state = inspect(obj)
+            if obj in session.dirty and not any(
+                state.attrs[a].history.has_changes() for a in ('status', 'session_id', 'student_id')
+            ):
+                continue
+            session_ids.update(v for v in _old_and_new(state, 'session_id') if v)
+        elif isinstance(obj, CourseSession):
+            state = inspect(obj)
+            if obj in session.new:
+                continue
+            if obj in session.dirty and not any(
+                state.attrs[a].history.has_changes()
+                for a in ('session_date', 'course_id', 'attendance_checked')
+            ):
+                continue
+            for d in _old_and_new(state, 'session_date'):
+                for c in _old_and_new(state, 'course_id'):
+                    if d and c:
+                        pairs.add((d, c))
+
+    # 같은 flush에서 삭제된 세션은 아래 조회에 안 잡히지만 위에서 (날짜, 수업)을 이미 넣었다
+    if session_ids:
+        connection = session.connection()
+        ids = list(session_ids)
+        for i in range(0, len(ids), PAIR_CHUNK):
+            pairs.update(tuple(row) for row in connection.execute(
+                select(CourseSession.session_date, CourseSession.course_id)
+                .where(CourseSession.session_id.in_(ids[i:i + PAIR_CHUNK]))
+            ))
+
+    if pairs:
+        _refresh_pairs(session.connection(), pairs)
+
+
+def init_attendance_rollup(app):
+    """출결 집계 갱신용 세션 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+
+
+# ════════════════════════════════════════════════════════
+# 조회
+# ════════════════════════════════════════════════════════
+
+def _stats(total, present, late=0, absent=0, excused=0):
+    total = int(total or 0)
+    present = int(present or 0)
+    return {'total': total, 'present': present, 'late': int(late or 0),
+            'absent': int(absent or 0), 'excused': int(excused or 0),
+            'rate': round(present / total * 100, 1) if total > 0 else 0}
+
+
+def _filtered(query, course_id=None, teacher_id=None, student_id=None):
+    from app.models import Course
+    from app.models.attendance_rollup import AttendanceDailyStat as S
+    if course_id:
+        query = query.filter(S.course_id == course_id)
+    if student_id:
+        query = query.filter(S.student_id == student_id)
+    if teacher_id:
+        query = query.join(Course, S.course_id == Course.course_id).filter(Course.teacher_id == teacher_id)
+    return query
+
+
+def period_totals(periods, checked_only=False):
+    """여러 기간의 상태별 합계를 한 쿼리로
+
+    Args:
+        periods: {이름: (시작일, 종료일)}
+        checked_only: 출석체크 완료 세션만 (total/present만 의미 있음)
+    Returns:
+        {이름: {'total', 'present', 'late', 'absent', 'excused', 'rate'}}
+    """
+    from app.models import db
+    from app.models.attendance_rollup import AttendanceDailyStat as S
+    if not periods:
+        return {}
+    names = list(periods)
+    columns = []
+    for name in names:
+        d_from, d_to = periods[name]
+        in_range = and_(S.stat_date >= d_from, S.stat_date <= d_to)
+        if checked_only:
+            fields = (S.checked_total, S.checked_present)
+        else:
+            fields = (S.total, S.present, S.late, S.absent, S.excused)
+        columns.extend(func.sum(case((in_range, f), else_=0)) for f in fields)
+    row = db.session.query(*columns).select_from(S).filter(
+        S.stat_date >= min(p[0] for p in periods.values()),
+        S.stat_date <= max(p[1] for p in periods.values()),
+    ).one()
+
+    width = 2 if checked_only else 5
+    return {name: _stats(*row[i * width:(i + 1) * width]) for i, name in enumerate(names)}
+
+
+def totals(date_from=None, date_to=None, course_id=None, teacher_id=None, student_id=None):
+    """필터 조건의 상태별 합계 (1쿼리)"""
+    from app.models import db
+    from app.models.attendance_rollup import AttendanceDailyStat as S
+    query = db.session.query(
+        func.sum(S.total), func.sum(S.present), func.sum(S.late),
+        func.sum(S.absent), func.sum(S.excused),
+    ).select_from(S).filter(*_range_conditions(S.stat_date, date_from, date_to))
+    return _stats(*_filtered(query, course_id, teacher_id, student_id).one())
+
+
+def course_breakdown(date_from=None, date_to=None, limit=10):
+    """수업별 합계 (총 건수 많은 순)"""
+    from app.models import db, Course
+    from app.models.attendance_rollup import AttendanceDailyStat as S
+    total = func.sum(S.total)
+    return db.session.query(
+        Course.course_id, Course.course_name,
+        total.label('total'),
+        func.sum(S.present).label('present'),
+        func.sum(S.late).label('late'),
+        func.sum(S.absent).label('absent'),
+    ).join(S, S.course_id == Course.course_id).filter(
+        *_range_conditions(S.stat_date, date_from, date_to)
+    ).group_by(Course.course_id, Course.course_name).order_by(total.desc()).limit(limit).all()
+
+
+def student_breakdown(date_from=None, date_to=None, course_id=None, limit=20):
+    """학생별 합계 (총 건수 많은 순)"""
+    from app.models import db, Student
+    from app.models.attendance_rollup import AttendanceDailyStat as S
+    total = func.sum(S.total)
+    query = db.session.query(
+        Student.student_id, Student.name, Student.grade,
+        total.label('total'),
+        func.sum(S.present).label('present'),
+        func.sum(S.late).label('late'),
+        func.sum(S.absent).label('absent'),
+    ).join(S, S.student_id == Student.student_id).filter(
+        *_range_conditions(S.stat_date, date_from, date_to)
+    )
+    if course_id:
+        query = query.filter(S.course_id == course_id)
+    return query.group_by(Student.student_id, Student.name, Student.grade)\
+                .order_by(total.desc()).limit(limit).all()
@@ -3,7 +3,7 @@
 import json
 import re
 from datetime import date
-from app.models.course import CourseEnrollment
+from app.utils.principal import enrolled_courses
 
 
 # Grade mapping from broad to specific grades
@@ -23,6 +23,9 @@ def can_access_content(content, user, student=None):
         user: User object (current_user)
         student: Student object (for student/parent access)
 
+    Enrolled courses come from the request-scoped principal when the student
+    is the user's own record or a linked child (no per-call queries).
+
     Returns:
         bool: True if access is allowed
     """
@@ -61,14 +64,9 @@ def can_access_content(content, user, student=None):
         student_grades = set(GRADE_MAP.get(student.grade, [student.grade]))
 
         # 수강 중인 수업 학년도 포함 (중1 학생이 초6 수업 수강 시 초6 교재 접근 허용)
-        enrollments = CourseEnrollment.query.filter_by(
-            student_id=student.student_id, status='active'
-        ).all()
-        from app.models.course import Course
-        for e in enrollments:
-            course = Course.query.get(e.course_id)
-            if course and course.grade:
-                student_grades.update(GRADE_MAP.get(course.grade, [course.grade]))
+        for _, course_grade, _ in enrolled_courses(student.student_id, user):
+            if course_grade:
+                student_grades.update(GRADE_MAP.get(course_grade, [course_grade]))
 
         return any(g in target_grades for g in student_grades)
 
@@ -78,11 +76,7 @@ def can_access_content(content, user, student=None):
         if not target_course_ids:  # Empty = all courses
             return True
 
-        enrollments = CourseEnrollment.query.filter_by(
-            student_id=student.student_id,
-            status='active'
-        ).all()
-        enrolled_ids = [e.course_id for e in enrollments]
+        enrolled_ids = [course_id for course_id, _, _ in enrolled_courses(student.student_id, user)]
         return any(cid in target_course_ids for cid in enrolled_ids)
 
     return False
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""수업 집계 컬럼 유지 (수강생 수 / 완료 세션 / 출석 수)
+
+수업 목록·내보내기가 수업마다 enrollments / sessions / attendance_records 컬렉션을
+읽어 Python에서 세지 않도록 집계 값을 컬럼에 둔다.
+
+- Course: enrolled_count(active 수강), completed_sessions, attendance_total / attendance_present
+- CourseSession: attendance_count(출석), total_students(출석 레코드 수)
+- CourseEnrollment: attended_sessions / late_sessions / absent_sessions (오늘 이전 세션만)
+
+- 갱신: 세션 flush 훅이 바뀐 CourseEnrollment / CourseSession / Attendance를 보고
+  영향받은 행만 원본에서 다시 센 값(UPDATE ... SET = (SELECT count ...))으로 같은 트랜잭션 안에서 교체한다.
+  이미 로드된 객체의 집계 속성은 flush 후 만료시켜 다음 접근 때 다시 읽는다.
+- 날짜 경계: 수강 출석 통계는 '오늘 이전 세션'만 세므로 매일 refresh_due_enrollments()로
+  오늘 세션이 있는 수강만 다시 센다 (스케줄러).
+- 점검/복구: find_mismatches() / reconcile() (reconcile_course_counters.py)
+
+Query.update() 같은 일괄 변경은 감지하지 않으므로 그런 경우 refresh() 또는 reconcile()로 맞춘다.
+"""
+from datetime import date
+
+from sqlalchemy import event, func, inspect, select, update
+
+ID_CHUNK = 200
+
+COURSE_COUNTERS = ('enrolled_count', 'completed_sessions', 'attendance_total', 'attendance_present')
+SESSION_COUNTERS = ('attendance_count', 'total_students')
+ENROLLMENT_COUNTERS = ('attended_sessions', 'late_sessions', 'absent_sessions')
+
+_PENDING_KEY = 'course_counters_expire'
+
+
+# ════════════════════════════════════════════════════════
+# 원본 집계 (상관 서브쿼리)
+# ════════════════════════════════════════════════════════
+
+def _course_values(table):
+    from app.models import Attendance, CourseEnrollment, CourseSession
+
+    def _count(*where, select_from=None):
+        stmt = select(func.count())
+        if select_from is not None:
+            stmt = stmt.select_from(select_from)
+        return stmt.where(*where).correlate(table).scalar_subquery()
+
+    joined = Attendance.__table__.join(
+        CourseSession.__table__, Attendance.session_id == CourseSession.session_id)
+    return {
+        'enrolled_count': _count(CourseEnrollment.course_id == table.c.course_id,
+                                 CourseEnrollment.status == 'active'),
+        'completed_sessions': _count(CourseSession.course_id == table.c.course_id,
+                                     CourseSession.status == 'completed'),
+        'attendance_total': _count(CourseSession.course_id == table.c.course_id, select_from=joined),
+        'attendance_present': _count(CourseSession.course_id == table.c.course_id,
+                                     Attendance.status == 'present', select_from=joined),
+    }
+
+
+def _session_values(table):
+    from app.models import Attendance
+
+    def _count(*where):
+        return select(func.count()).where(
+            Attendance.session_id == table.c.session_id, *where
+        ).correlate(table).scalar_subquery()
+
+    return {
+        'attendance_count': _count(Attendance.status == 'present'),
+        'total_students': _count(),
+    }
+
+
+def _enrollment_values(table, today=None):
+    from app.models import Attendance, CourseSession
+    today = today or date.today()
+
+    def _count(status):
+        return select(func.count()).select_from(Attendance).join(
+            CourseSession, Attendance.session_id == CourseSession.session_id
+        ).where(
+            Attendance.enrollment_id == table.c.enrollment_id,
+            CourseSession.session_date <= today,
+            Attendance.status == status,
+        ).correlate(table).scalar_subquery()
+
+    return {
+        'attended_sessions': _count('present'),
+        'late_sessions': _count('late'),
+        'absent_sessions': _count('absent'),
+    }
+
+
+def _targets():
+    from app.models import Course, CourseEnrollment, CourseSession
+    return (
+        (Course, 'course_id', _course_values),
+        (CourseSession, 'session_id', _session_values),
+        (CourseEnrollment, 'enrollment_id', _enrollment_values),
+    )
+
+
+def _refresh(connection, model, key, values_of, ids):
+    table = model.__table__
+    values = values_of(table)
+    if 'updated_at' in table.c:
+        values['updated_at'] = table.c.updated_at    # 집계 갱신은 수정 시각을 바꾸지 않음 (onupdate 방지)
+    ids = list(ids)
+    for i in range(0, len(ids), ID_CHUNK):
+        connection.execute(update(table).where(table.c[key].in_(ids[i:i + ID_CHUNK])).values(**values))
+
+
+def _refresh_all(connection, courses=(), sessions=(), enrollments=()):
+    ids = (courses, sessions, enrollments)
+    for (model, key, values_of), targets in zip(_targets(), ids):
+        targets = {t for t in targets if t}
+        if targets:
+            _refresh(connection, model, key, values_of, targets)
+
+
+def _expire_loaded(session, courses=(), sessions=(), enrollments=()):
+    """이미 로드된 객체의 집계 속성 만료 (다음 접근 때 DB 값을 읽음)"""
+    from app.models import Course, CourseEnrollment, CourseSession
+    targets = {
+        Course: (set(courses), 'course_id', COURSE_COUNTERS),
+        CourseSession: (set(sessions), 'session_id', SESSION_COUNTERS),
+        CourseEnrollment: (set(enrollments), 'enrollment_id', ENROLLMENT_COUNTERS),
+    }
+    for obj in list(session.identity_map.values()):
+        target = targets.get(type(obj))
+        if target and getattr(obj, target[1]) in target[0]:
+            session.expire(obj, list(target[2]))
+
+
+def refresh(courses=(), sessions=(), enrollments=()):
+    """세션 훅을 거치지 않은 변경(일괄 INSERT 등)의 집계 재계산. 커밋은 호출 측에서."""
+    from app.models import db
+    _refresh_all(db.session.connection(), courses, sessions, enrollments)
+    _expire_loaded(db.session, courses, sessions, enrollments)
+
+
+def refresh_due_enrollments(today=None):
+    """오늘 날짜 세션에 출석 레코드가 있는 수강의 출석 통계 재계산 (날짜가 바뀌어 새로 세어질 세션)
+
+    Returns:
+        재계산한 수강 수
+    """
+    from app.models import db, Attendance, CourseSession
+    today = today or date.today()
+    ids = [row[0] for row in db.session.query(Attendance.enrollment_id).join(
+        CourseSession, Attendance.session_id == CourseSession.session_id
+    ).filter(CourseSession.session_date == today, Attendance.enrollment_id.isnot(None)).distinct()]
+    if ids:
+        refresh(enrollments=ids)
+    return len(ids)
+
+
+# ════════════════════════════════════════════════════════
+# 점검 / 복구
+# ════════════════════════════════════════════════════════
+
+def find_mismatches():
+    """집계 컬럼이 원본과 다른 행
+
+    Returns:
+        [(모델 이름, id, {컬럼: (원본, 저장 값)}), ...]
+    """
+    from app.models import db
+    mismatches = []
+    for model, key, values_of in _targets():
+        table = model.__table__
+        expected = values_of(table)
+        names = list(expected)
+        rows = db.session.execute(select(
+            table.c[key], *[expected[n] for n in names], *[table.c[n] for n in names]
+        )).all()
+        for row in rows:
+            diff = {
+                name: (row[1 + i], row[1 + len(names) + i])
+                for i, name in enumerate(names)
+                if row[1 + i] != row[1 + len(names) + i]
+            }
+            if diff:
+                mismatches.append((model.__name__, row[0], diff))
+    return mismatches
+
+
+def reconcile(mismatches=None):
+    """어긋난 행(미지정 시 전체)을 원본으로 다시 계산. 커밋은 호출 측에서.
+
+    Returns:
+        재계산한 행 수
+    """
+    from app.models import db
+    connection = db.session.connection()
+    if mismatches is None:
+        count = 0
+        for model, key, values_of in _targets():
+            table = model.__table__
+            values = values_of(table)
+            if 'updated_at' in table.c:
+                values['updated_at'] = table.c.updated_at
+            count += connection.execute(update(table).values(**values)).rowcount
+        counters = {model: names for (model, _, _), names in
+                    zip(_targets(), (COURSE_COUNTERS, SESSION_COUNTERS, ENROLLMENT_COUNTERS))}
+        for obj in list(db.session.identity_map.values()):
+            if type(obj) in counters:
+                db.session.expire(obj, list(counters[type(obj)]))
+        return count
+
+    by_model = {}
+    for name, key, _ in mismatches:
+        by_model.setdefault(name, set()).add(key)
+    courses = by_model.get('Course', ())
+    sessions = by_model.get('CourseSession', ())
+    enrollments = by_model.get('CourseEnrollment', ())
+    refresh(courses, sessions, enrollments)
+    return len(courses) + len(sessions) + len(enrollments)
+
+
+# ════════════════════════════════════════════════════════
+# 증분 갱신 (세션 훅)
+# ════════════════════════════════════════════════════════
+
+def _changed(obj, session, attrs):
+    if obj not in session.dirty:
+        return True
+    state = inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in attrs)
+
+
+def _after_flush(session, flush_context):
+    from app.models import Attendance, CourseEnrollment, CourseSession
+    from app.utils.attendance_rollup import _old_and_new
+
+    courses, sessions, enrollments = set(), set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, CourseEnrollment):
+            if _changed(obj, session, ('status', 'course_id')):
+                courses.update(_old_and_new(inspect(obj), 'course_id'))
+                if obj not in session.deleted:
+                    enrollments.add(obj.enrollment_id)
+        elif isinstance(obj, CourseSession):
+            if _changed(obj, session, ('status', 'course_id', 'session_date')):
+                courses.update(_old_and_new(inspect(obj), 'course_id'))
+                if obj in session.dirty and inspect(obj).attrs.session_date.history.has_changes():
+                    # 날짜가 오늘 경계를 넘나들면 수강 출석 통계가 달라짐
+                    enrollments.update(row[0] for row in session.connection().execute(
+                        select(Attendance.enrollment_id).where(Attendance.session_id == obj.session_id)))
+        elif isinstance(obj, Attendance):
+            if _changed(obj, session, ('status', 'session_id', 'enrollment_id')):
+                state = inspect(obj)
+                sessions.update(_old_and_new(state, 'session_id'))
+                enrollments.update(_old_and_new(state, 'enrollment_id'))
+
+    sessions.discard(None)
+    if sessions:
+        ids = list(sessions)
+        for i in range(0, len(ids), ID_CHUNK):
+            courses.update(row[0] for row in session.connection().execute(
+                select(CourseSession.course_id).where(CourseSession.session_id.in_(ids[i:i + ID_CHUNK]))))
+
+    courses.discard(None)
+    enrollments.discard(None)
+    if courses or sessions or enrollments:
+        _refresh_all(session.connection(), courses, sessions, enrollments)
+        pending = session.info.setdefault(_PENDING_KEY, [set(), set(), set()])
+        for target, ids in zip(pending, (courses, sessions, enrollments)):
+            target.update(ids)
+
+
+def _after_flush_postexec(session, flush_context):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _expire_loaded(session, *pending)
+
+
+def init_course_counters(app):
+    """수업 집계 컬럼 갱신용 세션 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+    if not event.contains(db.session, 'after_flush_postexec', _after_flush_postexec):
+        event.listen(db.session, 'after_flush_postexec', _after_flush_postexec)
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """수업 관리 유틸리티 함수"""
+import uuid
 from datetime import datetime, timedelta, time, date as _date
-from sqlalchemy import func
+from sqlalchemy import case, func
 from app.models import db, Course, CourseSession, CourseEnrollment, Attendance
 
 # 강좌 개설 시 초기 생성 범위 (일). 이후 세션은 주간 스케줄러가 롤링 생성.
@@ -11,7 +12,7 @@ SESSION_INITIAL_LOOKAHEAD_DAYS = 14
 def generate_course_sessions(course):
     """
     수업 생성 시 근미래 세션만 생성 (weekly: 약 14일, custom/단일: 변동 없음).
-    이후 세션은 매주 일요일 자정 스케줄러가 extend_sessions_for_course()로 롤링 추가.
+    이후 세션은 매주 일요일 자정 스케줄러가 generate_sessions_bulk()로 전체 수업을 한 번에 롤링 추가.
 
     Returns:
         생성된 CourseSession 객체 리스트
@@ -80,72 +81,208 @@ def generate_course_sessions(course):
     return sessions
 
 
-def extend_sessions_for_course(course, from_date, to_date):
+def _weekly_dates(weekday, from_date, to_date):
+    """from_date~to_date(포함) 안의 해당 요일 날짜 목록"""
+    current = from_date + timedelta(days=(weekday - from_date.weekday()) % 7)
+    dates = []
+    while current <= to_date:
+        dates.append(current)
+        current += timedelta(days=7)
+    return dates
+
+
+def plan_weekly_sessions(from_date, to_date, course_ids=None):
     """
-    지정 날짜 범위 안에 누락된 주간 세션을 생성한다 (idempotent).
-    매주 일요일 자정 스케줄러 및 수동 보완에서 호출.
+    날짜 범위 안에 누락된 주간 세션 계산 (DB 변경 없음).
+
+    대상 수업 1쿼리 + 범위 안 기존 세션 날짜 1쿼리 + 수업별 최대 회차 1쿼리로
+    (수업, 날짜) 전체를 한 번에 비교한다.
 
     Args:
-        course:     Course 객체
         from_date:  생성 시작일 (inclusive)
         to_date:    생성 종료일 (inclusive)
+        course_ids: 대상 수업 ID 목록 (None이면 진행 중인 주간 수업 전체)
 
     Returns:
-        새로 생성된 CourseSession 리스트
+        [{'session_id', 'course_id', 'session_number', 'session_date', 'start_time', 'end_time'}, ...]
+        (수업별 날짜순, 회차는 기존 최대 회차 다음부터)
     """
-    if course.schedule_type != 'weekly' or course.weekday is None:
-        return []
-    if course.start_date == course.end_date:  # 1회성 수업
+    query = db.session.query(
+        Course.course_id, Course.weekday, Course.start_date, Course.end_date,
+        Course.start_time, Course.end_time
+    ).filter(
+        Course.schedule_type == 'weekly',
+        Course.weekday.isnot(None),
+        Course.start_date != Course.end_date,      # 1회성 수업 제외
+        Course.start_date <= to_date,
+        Course.end_date >= from_date,
+    )
+    if course_ids is None:
+        query = query.filter(Course.status == 'active', Course.is_terminated == False)
+    else:
+        query = query.filter(Course.course_id.in_(list(course_ids)))
+    courses = query.order_by(Course.course_id).all()
+    if not courses:
         return []
 
-    # 실제 범위: 수업 기간과 교집합
-    actual_from = max(from_date, course.start_date)
-    actual_to = min(to_date, course.end_date)
-    if actual_from > actual_to:
+    ids = [c.course_id for c in courses]
+    existing = set(db.session.query(CourseSession.course_id, CourseSession.session_date).filter(
+        CourseSession.course_id.in_(ids),
+        CourseSession.session_date.between(from_date, to_date)
+    ).all())
+    max_numbers = dict(db.session.query(
+        CourseSession.course_id, func.max(CourseSession.session_number)
+    ).filter(CourseSession.course_id.in_(ids)).group_by(CourseSession.course_id).all())
+
+    planned = []
+    for course in courses:
+        number = max_numbers.get(course.course_id) or 0
+        dates = _weekly_dates(course.weekday, max(from_date, course.start_date), min(to_date, course.end_date))
+        for session_date in dates:
+            if (course.course_id, session_date) in existing:
+                continue
+            number += 1
+            planned.append({
+                'session_id': str(uuid.uuid4()),
+                'course_id': course.course_id,
+                'session_number': number,
+                'session_date': session_date,
+                'start_time': course.start_time,
+                'end_time': course.end_time,
+            })
+    return planned
+
+
+def plan_session_attendance(planned, default_status='present'):
+    """
+    계획된 세션의 출석 레코드 계산 (DB 변경 없음, 활성 수강생 1쿼리).
+
+    create_attendance_records_for_session()과 같은 규칙 — 오늘 이후 세션은 만들지 않고,
+    입반일 이전 세션은 건너뛴다. 새 세션이므로 기존 레코드 확인은 필요 없다.
+    """
+    today = _date.today()
+    past = [s for s in planned if s['session_date'] <= today]
+    if not past:
         return []
 
-    # 이미 존재하는 세션 날짜 (중복 방지)
-    existing_dates = {
-        s.session_date
-        for s in course.sessions
-        if actual_from <= s.session_date <= actual_to
-    }
+    enrollments = {}
+    for course_id, enrollment_id, student_id, enrolled_at in db.session.query(
+        CourseEnrollment.course_id, CourseEnrollment.enrollment_id,
+        CourseEnrollment.student_id, CourseEnrollment.enrolled_at
+    ).filter(
+        CourseEnrollment.course_id.in_({s['course_id'] for s in past}),
+        CourseEnrollment.status == 'active'
+    ):
+        enrollments.setdefault(course_id, []).append(
+            (enrollment_id, student_id, enrolled_at.date() if enrolled_at else None))
+
+    rows = []
+    for session in past:
+        for enrollment_id, student_id, enrolled_on in enrollments.get(session['course_id'], ()):
+            if enrolled_on and enrolled_on > session['session_date']:
+                continue
+            rows.append({
+                'attendance_id': str(uuid.uuid4()),
+                'session_id': session['session_id'],
+                'student_id': student_id,
+                'enrollment_id': enrollment_id,
+                'status': default_status,
+                'checkin_method': 'manual',
+            })
+    return rows
+
+
+def generate_sessions_bulk(from_date, to_date, course_ids=None, dry_run=False):
+    """
+    날짜 범위 안에 누락된 주간 세션과 출석 레코드를 일괄 생성 (idempotent, 커밋은 호출 측에서).
 
-    # 현재 최대 session_number
-    max_num = db.session.query(func.max(CourseSession.session_number)).filter(
-        CourseSession.course_id == course.course_id
-    ).scalar() or 0
-
-    # 범위 내 첫 번째 해당 요일 탐색
-    current = actual_from
-    while current.weekday() != course.weekday:
-        current += timedelta(days=1)
-        if current > actual_to:
-            return []
-
-    created = []
-    session_num = max_num
-    while current <= actual_to:
-        if current not in existing_dates:
-            session_num += 1
-            session = CourseSession(
-                course_id=course.course_id,
-                session_number=session_num,
-                session_date=current,
-                start_time=course.start_time,
-                end_time=course.end_time,
-                status='scheduled'
-            )
-            db.session.add(session)
-            db.session.flush()
-            create_attendance_records_for_session(session)
-            created.append(session)
-        current += timedelta(days=7)
+    세션·출석 레코드는 각각 executemany INSERT 한 번으로 넣고, 수업별 total_sessions는
+    UPDATE 한 번으로 올린다. 일괄 INSERT는 세션 flush 훅을 거치지 않으므로
+    출결 집계, 수업 집계 컬럼과 위험도 스냅샷은 여기서 직접 갱신한다.
+
+    Args:
+        from_date:  생성 시작일 (inclusive)
+        to_date:    생성 종료일 (inclusive)
+        course_ids: 대상 수업 ID 목록 (None이면 진행 중인 주간 수업 전체)
+        dry_run:    True면 계산만 하고 DB는 변경하지 않음
 
-    if created:
-        course.total_sessions = (course.total_sessions or 0) + len(created)
+    Returns:
+        dict: {'sessions': 계획/생성된 세션 dict 리스트, 'attendance': 출석 레코드 수, 'courses': 세션이 추가된 수업 수}
+    """
+    from sqlalchemy import bindparam, insert, update
+
+    planned = plan_weekly_sessions(from_date, to_date, course_ids)
+    attendance = plan_session_attendance(planned)
+    added = {}
+    for session in planned:
+        added[session['course_id']] = added.get(session['course_id'], 0) + 1
+    result = {'sessions': planned, 'attendance': len(attendance), 'courses': len(added)}
+    if dry_run or not planned:
+        return result
+
+    # 새 세션·수업의 출석 집계 컬럼은 넣는 레코드로 바로 계산 (course_counters 훅을 거치지 않음)
+    session_counts = {}
+    course_counts = {}
+    course_of = {session['session_id']: session['course_id'] for session in planned}
+    for row in attendance:
+        present = 1 if row['status'] == 'present' else 0
+        for counts, key in ((session_counts, row['session_id']), (course_counts, course_of[row['session_id']])):
+            total, present_total = counts.get(key, (0, 0))
+            counts[key] = (total + 1, present_total + present)
+
+    db.session.execute(insert(CourseSession.__table__), [
+        dict(session, status='scheduled',
+             total_students=session_counts.get(session['session_id'], (0, 0))[0],
+             attendance_count=session_counts.get(session['session_id'], (0, 0))[1])
+        for session in planned
+    ])
+    if attendance:
+        db.session.execute(insert(Attendance.__table__), attendance)
+
+    course_table = Course.__table__
+    db.session.execute(
+        update(course_table)
+        .where(course_table.c.course_id == bindparam('b_course_id'))
+        .values(total_sessions=func.coalesce(course_table.c.total_sessions, 0) + bindparam('b_added'),
+                attendance_total=course_table.c.attendance_total + bindparam('b_attendance'),
+                attendance_present=course_table.c.attendance_present + bindparam('b_present')),
+        [{'b_course_id': course_id, 'b_added': count,
+          'b_attendance': course_counts.get(course_id, (0, 0))[0],
+          'b_present': course_counts.get(course_id, (0, 0))[1]} for course_id, count in added.items()]
+    )
+
+    # 이미 로드된 수업 객체의 회차 수/출석 집계/세션 목록은 다시 읽도록 만료
+    for obj in list(db.session.identity_map.values()):
+        if isinstance(obj, Course) and obj.course_id in added:
+            db.session.expire(obj, ['total_sessions', 'attendance_total', 'attendance_present', 'sessions'])
+
+    if attendance:
+        from app.utils.attendance_rollup import refresh
+        from app.utils.student_insights import invalidate_snapshots
+        dates = {s['session_id']: (s['session_date'], s['course_id']) for s in planned}
+        refresh({dates[row['session_id']] for row in attendance})
+        invalidate_snapshots({row['student_id'] for row in attendance})
+
+        from app.utils import course_counters
+        course_counters.refresh(enrollments={row['enrollment_id'] for row in attendance})
+
+    return result
+
+
+def extend_sessions_for_course(course, from_date, to_date):
+    """
+    지정 날짜 범위 안에 누락된 주간 세션을 생성한다 (idempotent).
+    수동 보완용 — 여러 수업은 generate_sessions_bulk()로 한 번에 처리한다.
+
+    Args:
+        course:     Course 객체
+        from_date:  생성 시작일 (inclusive)
+        to_date:    생성 종료일 (inclusive)
 
-    return created
+    Returns:
+        새로 생성된 세션 dict 리스트
+    """
+    return generate_sessions_bulk(from_date, to_date, course_ids=[course.course_id])['sessions']
 
 
 def create_attendance_records_for_enrollment(enrollment):
@@ -264,22 +401,10 @@ def update_enrollment_attendance_stats(enrollment_id):
     if not enrollment:
         return None
 
-    # 출석 레코드 조회 (오늘 이전 진행된 세션만)
-    from app.models.course import CourseSession
-    from datetime import date
-    attendance_records = Attendance.query.filter_by(
-        enrollment_id=enrollment_id
-    ).join(CourseSession, Attendance.session_id == CourseSession.session_id).filter(
-        CourseSession.session_date <= date.today()
-    ).all()
-
-    attended = sum(1 for a in attendance_records if a.status == 'present')
-    absent = sum(1 for a in attendance_records if a.status == 'absent')
-    late = sum(1 for a in attendance_records if a.status == 'late')
-
-    enrollment.attended_sessions = attended
-    enrollment.absent_sessions = absent
-    enrollment.late_sessions = late
+    # 출석 통계는 course_counters 세션 훅이 flush 때 다시 센다 (오늘 이전 세션만)
+    from app.utils.course_counters import refresh
+    db.session.flush()
+    refresh(enrollments=[enrollment_id])
 
     return enrollment
 
@@ -345,24 +470,24 @@ def get_course_statistics(course_id):
     if not course:
         return None
 
-    # 수강생 수
-    total_students = len([e for e in course.enrollments if e.status == 'active'])
-
-    # 완료된 세션 수
-    completed_sessions = len([s for s in course.sessions if s.status == 'completed'])
+    # 수강생 수 / 완료된 세션 수 (집계 컬럼)
+    total_students = course.enrolled_count
+    completed_sessions = course.completed_sessions
 
     # 예정된 세션 수
-    scheduled_sessions = len([s for s in course.sessions if s.status == 'scheduled'])
+    scheduled_sessions = CourseSession.query.filter_by(course_id=course_id, status='scheduled').count()
 
-    # 전체 출석률
-    total_attendance_records = Attendance.query.join(CourseSession).filter(
+    # 전체 출석률 (완료 세션 기준, 지각 포함)
+    total_records, present_count = db.session.query(
+        func.count(Attendance.attendance_id),
+        func.sum(case((Attendance.status.in_(['present', 'late']), 1), else_=0))
+    ).join(CourseSession).filter(
         CourseSession.course_id == course_id,
         CourseSession.status == 'completed'
-    ).all()
+    ).one()
 
-    if total_attendance_records:
-        present_count = sum(1 for a in total_attendance_records if a.status in ['present', 'late'])
-        attendance_rate = (present_count / len(total_attendance_records)) * 100
+    if total_records:
+        attendance_rate = ((present_count or 0) / total_records) * 100
     else:
         attendance_rate = 0
 
@@ -548,26 +673,28 @@ def _notify_parents_on_enrollment(course, student_id):
 
         # 학생 본인 알림
         if student.user_id:
-            Notification.create_notification(
-                user_id=student.user_id,
+            Notification.create_bulk(
+                [student.user_id],
                 notification_type='enrollment_applied',
                 title=title,
                 message=message,
-                link_url='/student/courses'
+                link_url='/student/courses',
+                commit=False
             )
 
         # 학부모 알림
-        parents = ParentStudent.query.filter_by(
+        parent_ids = [pid for (pid,) in db.session.query(ParentStudent.parent_id).filter_by(
             student_id=student_id, is_active=True
-        ).all()
-        for ps in parents:
-            Notification.create_notification(
-                user_id=ps.parent_id,
-                notification_type='enrollment_applied',
-                title=title,
-                message=message,
-                link_url='/parent/courses'
-            )
+        ).all()]
+        Notification.create_bulk(
+            parent_ids,
+            notification_type='enrollment_applied',
+            title=title,
+            message=message,
+            link_url='/parent/courses',
+            commit=False
+        )
+        db.session.commit()
     except Exception as e:
         logger.error(f'[입반알림] student_id={student_id} course_id={course.course_id}: {e}', exc_info=True)
 
@@ -87,8 +87,8 @@ def requires_tier(*tiers):
 
             # 학생인 경우 티어 확인
             if current_user.role == 'student':
-                from app.models import Student
-                student = Student.query.filter_by(user_id=current_user.user_id).first()
+                from app.utils.principal import linked_student
+                student = linked_student()
 
                 if not student or not student.has_tier_access(list(tiers)):
                     flash('이 콘텐츠에 접근할 권한이 없습니다.', 'error')
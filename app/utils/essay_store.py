@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""첨삭 HTML 버전 저장소 (압축 + 내용 주소 지정 조각)
+
+버전 HTML을 <style> 블록 경계로 조각내고, 조각마다 sha256을 키로 한 번만 압축 저장한다.
+초등 리포트의 공통 CSS(_wrap_elem_html)처럼 버전마다 같은 조각은 essay_blobs 한 행을 공유하고,
+버전은 essay_version_chunks에 조각 순서만 남긴다.
+
+- 저장: EssayVersion(html_content=...)를 flush하면 세션 훅이 조각을 저장하고 html_content는 비운다
+  → 기존 저장 코드(첨삭/재생성/수동 첨삭/배치)를 바꾸지 않아도 된다
+- 읽기: load_html(version) — 저장소 → (이전 행) html_content → html_path 파일 순서
+- 전송: version_response() — 조각이 1개이거나 zstd 조각이면 압축 바이트를 그대로 보낸다
+  (zstd 프레임은 이어 붙여도 규격상 하나의 스트림으로 해제됨). gzip 여러 멤버를 이어 붙인 본문은
+  첫 멤버만 푸는 클라이언트/프록시가 있어 풀어서 보내고 압축은 Flask-Compress에 맡긴다.
+  ETag = 전체 HTML sha256
+- 압축: ESSAY_STORE_CODEC (기본 gzip, zstandard 패키지가 있으면 zstd 선택 가능)
+
+조각은 여러 버전이 공유하므로 버전을 지워도 바로 지우지 않는다.
+참조가 없어진 조각 정리와 이전 행 이관은 migrate_essay_store.py 로 한다.
+"""
+import gzip
+import hashlib
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from sqlalchemy import event, exists, insert, inspect, select
+from sqlalchemy.exc import IntegrityError
+
+try:
+    import zstandard
+except ImportError:       # 선택 의존성 — 없으면 gzip만 사용
+    zstandard = None
+
+DEFAULT_CODEC = 'gzip'
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 19
+MIN_SHARED_BLOCK = 256     # 이보다 짧은 <style> 블록은 따로 떼지 않음
+
+_STYLE_RE = re.compile(r'<style\b[^>]*>.*?</style>', re.IGNORECASE | re.DOTALL)
+
+
+# ------------------------------------------------------------------ #
+#  조각 / 압축                                                         #
+# ------------------------------------------------------------------ #
+
+def split_blocks(html):
+    """HTML → 조각 목록 (<style> 블록을 앞뒤 본문과 분리, 이어 붙이면 원문)"""
+    blocks = []
+    pos = 0
+    for m in _STYLE_RE.finditer(html):
+        if m.end() - m.start() < MIN_SHARED_BLOCK:
+            continue
+        if m.start() > pos:
+            blocks.append(html[pos:m.start()])
+        blocks.append(m.group(0))
+        pos = m.end()
+    if pos < len(html) or not blocks:
+        blocks.append(html[pos:])
+    return blocks
+
+
+def content_digest(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _codec():
+    try:
+        from flask import current_app
+        codec = current_app.config.get('ESSAY_STORE_CODEC', DEFAULT_CODEC)
+    except RuntimeError:
+        codec = DEFAULT_CODEC
+    return 'zstd' if codec == 'zstd' and zstandard is not None else 'gzip'
+
+
+def compress(raw, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd로 저장된 첨삭 HTML을 읽으려면 zstandard 패키지가 필요합니다.')
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+# ------------------------------------------------------------------ #
+#  저장                                                                #
+# ------------------------------------------------------------------ #
+
+def _insert_blobs(connection, blobs):
+    """없는 조각만 INSERT (다른 요청이 먼저 넣은 조각은 건너뜀)"""
+    from app.models.essay import EssayBlob
+
+    if not blobs:
+        return
+    found = set(connection.execute(
+        select(EssayBlob.digest).where(EssayBlob.digest.in_(list(blobs)))
+    ).scalars())
+    codec = _codec()
+    for digest, raw in blobs.items():
+        if digest in found:
+            continue
+        data = compress(raw, codec)
+        savepoint = connection.begin_nested()
+        try:
+            connection.execute(insert(EssayBlob), {
+                'digest': digest, 'codec': codec, 'data': data,
+                'raw_size': len(raw), 'stored_size': len(data),
+            })
+            savepoint.commit()
+        except IntegrityError:
+            savepoint.rollback()
+
+
+def store_versions(session, items):
+    """[(EssayVersion, html)] 저장 — 조각 INSERT 후 버전에 조각 순서/ETag를 기록하고 html_content를 비움"""
+    from app.models.essay import EssayVersionChunk
+
+    blobs = {}
+    plans = []
+    for version, html in items:
+        raw = html.encode('utf-8')
+        digests = []
+        for block in split_blocks(html):
+            data = block.encode('utf-8')
+            digest = content_digest(data)
+            blobs.setdefault(digest, data)
+            digests.append(digest)
+        plans.append((version, raw, digests))
+
+    _insert_blobs(session.connection(), blobs)
+
+    for version, raw, digests in plans:
+        version.chunks = [EssayVersionChunk(seq=i, digest=d) for i, d in enumerate(digests)]
+        version.content_digest = content_digest(raw)
+        version.content_size = len(raw)
+        version.html_content = ''
+
+
+def _before_flush(session, flush_context, instances):
+    from app.models.essay import EssayVersion
+
+    items = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, EssayVersion):
+            continue
+        added = inspect(obj).attrs.html_content.history.added
+        if added and added[-1]:
+            items.append((obj, added[-1]))
+    if items:
+        store_versions(session, items)
+
+
+def init_essay_store(app):
+    """EssayVersion 저장 시 HTML을 버전 저장소로 옮기는 세션 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'before_flush', _before_flush):
+        event.listen(db.session, 'before_flush', _before_flush)
+
+
+# ------------------------------------------------------------------ #
+#  읽기 / 전송                                                         #
+# ------------------------------------------------------------------ #
+
+def _load_blobs(version_id):
+    """버전 조각 [(codec, data)] — seq 순서, 쿼리 1회"""
+    from app.models import db
+    from app.models.essay import EssayBlob, EssayVersionChunk
+
+    return db.session.execute(
+        select(EssayBlob.codec, EssayBlob.data)
+        .join(EssayVersionChunk, EssayVersionChunk.digest == EssayBlob.digest)
+        .where(EssayVersionChunk.version_id == version_id)
+        .order_by(EssayVersionChunk.seq)
+    ).all()
+
+
+def _load_legacy(version):
+    """저장소 이관 전 행 — DB html_content, 없으면 html_path 파일"""
+    if version.html_content:
+        return version.html_content
+    if version.html_path:
+        try:
+            return Path(version.html_path).read_text(encoding='utf-8')
+        except Exception:
+            pass
+    return None
+
+
+def load_html(version):
+    """첨삭 버전 HTML (없으면 None)"""
+    if version is None:
+        return None
+    if version.content_digest:
+        blobs = _load_blobs(version.version_id)
+        if blobs:
+            return b''.join(decompress(data, codec) for codec, data in blobs).decode('utf-8')
+    return _load_legacy(version)
+
+
+def version_response(version, download_name=None):
+    """
+    첨삭 버전 HTML 응답 — 조건부 요청(If-None-Match)이면 304
+
+    클라이언트가 저장 코덱을 받으면 압축 조각을 풀지 않고 보낸다 — 조각이 1개이거나 zstd일 때만.
+    gzip 조각이 여러 개면 풀어서 보내고 압축은 Flask-Compress가 한 번 한다.
+    """
+    from flask import make_response, request
+
+    blobs = _load_blobs(version.version_id) if version.content_digest else []
+    codecs = {codec for codec, _ in blobs}
+    passthrough = len(codecs) == 1 and (len(blobs) == 1 or codecs == {'zstd'})
+    if passthrough and request.accept_encodings[next(iter(codecs))]:
+        response = make_response(b''.join(data for _, data in blobs))
+        response.headers['Content-Encoding'] = codecs.pop()
+    else:
+        html = (b''.join(decompress(data, codec) for codec, data in blobs).decode('utf-8')
+                if blobs else _load_legacy(version))
+        if html is None:
+            return None
+        response = make_response(html)
+
+    response.mimetype = 'text/html'
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'private, no-cache'
+    if download_name:
+        response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+    if version.content_digest:
+        response.set_etag(version.content_digest, weak=True)   # 압축 표현과 공유하므로 약한 ETag
+        response = response.make_conditional(request)
+    return response
+
+
+# ------------------------------------------------------------------ #
+#  이관 / 정리                                                         #
+# ------------------------------------------------------------------ #
+
+def migrate_versions(batch_size=200):
+    """저장소 이관 전 버전(content_digest 없음)을 조각 저장으로 옮김 → (이관 수, 내용 없어 건너뛴 수)"""
+    from sqlalchemy.orm import undefer
+    from app.models import db
+    from app.models.essay import EssayVersion
+
+    migrated = 0
+    empty = []
+    while True:
+        q = EssayVersion.query.options(undefer(EssayVersion.html_content))\
+            .filter(EssayVersion.content_digest.is_(None))
+        if empty:
+            q = q.filter(EssayVersion.version_id.notin_(empty))
+        versions = q.order_by(EssayVersion.version_id).limit(batch_size).all()
+        if not versions:
+            return migrated, len(empty)
+
+        items = []
+        for version in versions:
+            html = _load_legacy(version)
+            if html:
+                items.append((version, html))
+            else:
+                empty.append(version.version_id)
+        if items:
+            store_versions(db.session, items)
+            migrated += len(items)
+        db.session.commit()
+
+
+def prune_blobs():
+    """어느 버전도 참조하지 않는 조각 삭제 → 삭제 수"""
+    from app.models import db
+    from app.models.essay import EssayBlob, EssayVersionChunk
+
+    orphan = ~exists().where(EssayVersionChunk.digest == EssayBlob.digest)
+    return db.session.query(EssayBlob).filter(orphan).delete(synchronize_session=False)
+
+
+def store_stats():
+    """{'versions', 'raw_bytes', 'blobs', 'stored_bytes'} — 저장 효율 확인용"""
+    from app.models import db
+    from app.models.essay import EssayBlob, EssayVersion
+
+    versions, raw_bytes = db.session.query(
+        db.func.count(EssayVersion.version_id), db.func.coalesce(db.func.sum(EssayVersion.content_size), 0)
+    ).filter(EssayVersion.content_digest.isnot(None)).one()
+    blobs, stored_bytes = db.session.query(
+        db.func.count(EssayBlob.digest), db.func.coalesce(db.func.sum(EssayBlob.stored_size), 0)
+    ).one()
+    return {'versions': versions, 'raw_bytes': int(raw_bytes), 'blobs': blobs, 'stored_bytes': int(stored_bytes)}
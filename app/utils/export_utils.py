@@ -1,17 +1,31 @@
 # -*- coding: utf-8 -*-
-"""데이터 내보내기 유틸리티"""
+"""데이터 내보내기 유틸리티
+
+내보내기 함수(export_*_to_excel)는 ExcelStream(쓰기 전용 워크시트)으로 행을 받는 즉시
+임시 파일에 기록하고 응답을 청크 단위로 스트리밍한다. 행 인자로 쿼리(yield_per)나
+제너레이터를 넘기면 전체 결과를 메모리에 올리지 않고 내보낼 수 있다.
+create_excel_workbook() 등 일반 워크북 헬퍼는 소량의 임의 형식 시트용으로 남겨 둔다.
+"""
+import itertools
+import tempfile
+import unicodedata
 from io import BytesIO
 from datetime import datetime
-from flask import send_file
+from urllib.parse import quote
+from flask import send_file, Response, current_app, stream_with_context
 
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
     from openpyxl.utils import get_column_letter
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 def create_excel_workbook(title="Report"):
     """
@@ -173,61 +187,213 @@ def create_excel_response(wb, filename):
     wb.save(output)
     output.seek(0)
 
-    # 파일명 생성 (날짜 포함)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    full_filename = f"{filename}_{timestamp}.xlsx"
-
     return send_file(
         output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        mimetype=XLSX_MIMETYPE,
         as_attachment=True,
-        download_name=full_filename
+        download_name=_download_name(filename)
     )
 
 
+def _download_name(filename):
+    """파일명 생성 (날짜 포함)"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"{filename}_{timestamp}.xlsx"
+
+
+def _content_disposition(filename):
+    """첨부 파일 헤더 (한글 파일명은 RFC 5987 형식 — send_file과 동일)"""
+    try:
+        filename.encode('ascii')
+        return f'attachment; filename="{filename}"'
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        quoted = quote(filename, safe="!#$&+^`|~")
+        return f'attachment; filename="{simple}"; filename*=UTF-8\'\'{quoted}'
+
+
+# ==================== 스트리밍 내보내기 ====================
+
+def _named_styles():
+    """스트리밍 시트용 셀 스타일 (워크북에 한 번 등록하고 셀에는 이름만 지정)"""
+    thin = Side(style='thin', color='000000')
+    light = Side(style='thin', color='CCCCCC')
+    data = dict(font=Font(name='맑은 고딕', size=10),
+                alignment=Alignment(horizontal='left', vertical='center'),
+                border=Border(left=light, right=light, top=light, bottom=light))
+    return [
+        NamedStyle(name='momoai_title', font=Font(name='맑은 고딕', size=14, bold=True, color='1F4E78'),
+                   alignment=Alignment(horizontal='center', vertical='center')),
+        NamedStyle(name='momoai_info', font=Font(name='맑은 고딕', size=9, color='666666'),
+                   alignment=Alignment(horizontal='left', vertical='center')),
+        NamedStyle(name='momoai_header', font=Font(name='맑은 고딕', size=11, bold=True, color='FFFFFF'),
+                   fill=PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid'),
+                   alignment=Alignment(horizontal='center', vertical='center'),
+                   border=Border(left=thin, right=thin, top=thin, bottom=thin)),
+        NamedStyle(name='momoai_data', **data),
+        NamedStyle(name='momoai_data_even',
+                   fill=PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid'), **data),
+        NamedStyle(name='momoai_total', font=Font(name='맑은 고딕', size=11, bold=True)),
+        NamedStyle(name='momoai_total_amount', font=Font(name='맑은 고딕', size=11, bold=True, color='FF0000')),
+    ]
+
+
+class ExcelStream:
+    """
+    쓰기 전용(write-only) 워크시트 기반 Excel 내보내기
+
+    행은 추가하는 즉시 임시 파일로 기록되므로 행 수와 무관하게 메모리 사용량이 일정하다.
+    셀을 다시 훑지 않도록 컬럼 너비는 생성 시 지정하고, 스타일은 행을 쓸 때 바로 적용한다
+    (짝수 행 배경 / 테두리는 style_data_rows()와 동일).
+
+    사용 예:
+        sheet = ExcelStream("결제 내역", widths=[12, 12, 20])
+
+        def write():
+            sheet.title("결제 내역")
+            sheet.header(['날짜', '학생명', '수업명'])
+            for payment in query.yield_per(500):
+                sheet.row([...])
+
+        return sheet.response("결제내역", write)
+    """
+
+    def __init__(self, sheet_title, widths):
+        if not OPENPYXL_AVAILABLE:
+            raise ImportError("openpyxl이 설치되어 있지 않습니다. pip install openpyxl을 실행하세요.")
+
+        self.wb = Workbook(write_only=True)
+        for style in _named_styles():
+            self.wb.add_named_style(style)
+        self.ws = self.wb.create_sheet(sheet_title[:31])  # Excel 시트 이름은 최대 31자
+        self.column_count = len(widths)
+        self.row_count = 0
+        for col, width in enumerate(widths, start=1):
+            self.ws.column_dimensions[get_column_letter(col)].width = width
+
+    def cell(self, value, style=None):
+        """스타일을 지정한 셀 (plain()/append()에 값 대신 넣을 수 있음)"""
+        cell = WriteOnlyCell(self.ws, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def append(self, cells):
+        self.ws.append(cells)
+        self.row_count += 1
+
+    def title(self, text):
+        """제목 행 (전체 컬럼 병합)"""
+        self.ws.row_dimensions[self.row_count + 1].height = 30
+        self.append([self.cell(text, 'momoai_title')])
+        if self.column_count > 1:
+            self.ws.merged_cells.add(f'A{self.row_count}:{get_column_letter(self.column_count)}{self.row_count}')
+
+    def info(self, text):
+        """정보 행 (날짜, 생성자 등)"""
+        self.append([self.cell(text, 'momoai_info')])
+
+    def created_info(self, prefix=''):
+        self.info(f"{prefix}생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}")
+
+    def blank(self):
+        self.append([])
+
+    def plain(self, values):
+        """스타일 없는 행"""
+        self.append(list(values))
+
+    def header(self, values):
+        self.append([self.cell(v, 'momoai_header') for v in values])
+
+    def row(self, values, styles=None):
+        """
+        데이터 행
+
+        Args:
+            values: 셀 값 목록
+            styles: {컬럼 인덱스(0부터): 스타일 이름} — 지정하면 해당 셀은 데이터 스타일 대신 사용
+        """
+        style = 'momoai_data_even' if (self.row_count + 1) % 2 == 0 else 'momoai_data'
+        styles = styles or {}
+        self.append([self.cell(v, styles.get(i, style)) for i, v in enumerate(values)])
+
+    def _chunks(self):
+        """저장된 xlsx를 청크 단위로 읽기 (임시 파일 경유)"""
+        with tempfile.TemporaryFile() as output:
+            self.wb.save(output)
+            output.seek(0)
+            while True:
+                chunk = output.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def response(self, filename, write):
+        """
+        청크 스트리밍 다운로드 응답
+
+        Args:
+            filename: 파일명 (확장자 제외, 날짜가 붙음)
+            write: 시트에 행을 쓰는 함수 — 응답 본문을 보내기 시작할 때 요청 컨텍스트 안에서 호출
+        """
+        def generate():
+            yield b''       # 응답 헤더를 먼저 보내 다운로드가 바로 시작되도록
+            try:
+                write()
+            except Exception:
+                current_app.logger.exception(f'Excel 내보내기 오류: {filename}')
+                raise
+            yield from self._chunks()
+
+        headers = {
+            'Content-Disposition': _content_disposition(_download_name(filename)),
+            'X-Accel-Buffering': 'no',      # nginx가 응답을 모았다가 보내지 않도록
+        }
+        return Response(stream_with_context(generate()), mimetype=XLSX_MIMETYPE, headers=headers)
+
+
 # ==================== 특정 데이터 내보내기 함수 ====================
 
+ATTENDANCE_STATUS_TEXT = {
+    'present': '출석',
+    'late': '지각',
+    'absent': '결석',
+    'excused': '결석(사유)'
+}
+
+
 def export_students_to_excel(students):
     """
     학생 목록을 Excel로 내보내기
 
     Args:
-        students: Student 객체 리스트
+        students: Student 객체 iterable (쿼리를 넘기면 yield_per로 나눠 읽음)
 
     Returns:
-        Flask response
+        Flask response (스트리밍)
     """
-    wb, ws = create_excel_workbook("학생 목록")
-
-    # 제목 추가
-    add_title_row(ws, "전체 학생 목록", 7)
-    add_info_row(ws, f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}", 2)
-
-    # 헤더
     headers = ['번호', '이름', '학년', '등급', '이메일', '연락처', '생년월일']
-    ws.append([])  # 빈 행
-    ws.append(headers)
+    sheet = ExcelStream("학생 목록", widths=[8, 14, 10, 10, 32, 16, 12])
 
-    # 헤더 스타일
-    style_header_row(ws, row_num=4, column_count=len(headers))
+    def write():
+        sheet.title("전체 학생 목록")
+        sheet.created_info()
+        sheet.blank()
+        sheet.header(headers)
 
-    # 데이터
-    for idx, student in enumerate(students, start=1):
-        ws.append([
-            idx,
-            student.name,
-            student.grade or '-',
-            student.tier or '-',
-            student.email or '-',
-            student.phone or '-',
-            student.birth_date.strftime('%Y-%m-%d') if student.birth_date else '-'
-        ])
+        for idx, student in enumerate(_iter_rows(students), start=1):
+            sheet.row([
+                idx,
+                student.name,
+                student.grade or '-',
+                student.tier or '-',
+                student.email or '-',
+                student.phone or '-',
+                student.birth_date.strftime('%Y-%m-%d') if student.birth_date else '-'
+            ])
 
-    # 스타일링
-    style_data_rows(ws, start_row=5, column_count=len(headers))
-    auto_adjust_column_width(ws)
-
-    return create_excel_response(wb, "학생목록")
+    return sheet.response("학생목록", write)
 
 
 def export_courses_to_excel(courses):
@@ -235,41 +401,33 @@ def export_courses_to_excel(courses):
     수업 목록을 Excel로 내보내기
 
     Args:
-        courses: Course 객체 리스트
+        courses: Course 객체 iterable
 
     Returns:
-        Flask response
+        Flask response (스트리밍)
     """
-    wb, ws = create_excel_workbook("수업 목록")
-
-    # 제목 추가
-    add_title_row(ws, "전체 수업 목록", 8)
-    add_info_row(ws, f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}", 2)
-
-    # 헤더
     headers = ['번호', '수업명', '수업코드', '강사', '등급', '수강생', '세션', '상태']
-    ws.append([])
-    ws.append(headers)
+    sheet = ExcelStream("수업 목록", widths=[8, 30, 14, 12, 10, 10, 10, 10])
 
-    style_header_row(ws, row_num=4, column_count=len(headers))
+    def write():
+        sheet.title("전체 수업 목록")
+        sheet.created_info()
+        sheet.blank()
+        sheet.header(headers)
 
-    # 데이터
-    for idx, course in enumerate(courses, start=1):
-        ws.append([
-            idx,
-            course.course_name,
-            course.course_code or '-',
-            course.teacher.name if course.teacher else '미배정',
-            course.tier or '-',
-            f"{course.enrolled_count}/{course.max_students}",
-            f"{course.completed_sessions}/{course.total_sessions}",
-            '진행중' if course.status == 'active' else '완료' if course.status == 'completed' else '취소'
-        ])
+        for idx, course in enumerate(_iter_rows(courses), start=1):
+            sheet.row([
+                idx,
+                course.course_name,
+                course.course_code or '-',
+                course.teacher.name if course.teacher else '미배정',
+                course.tier or '-',
+                f"{course.enrolled_count}/{course.max_students}",
+                f"{course.completed_sessions}/{course.total_sessions}",
+                '진행중' if course.status == 'active' else '완료' if course.status == 'completed' else '취소'
+            ])
 
-    style_data_rows(ws, start_row=5, column_count=len(headers))
-    auto_adjust_column_width(ws)
-
-    return create_excel_response(wb, "수업목록")
+    return sheet.response("수업목록", write)
 
 
 def export_attendance_to_excel(attendance_data, course_name=None):
@@ -277,49 +435,46 @@ def export_attendance_to_excel(attendance_data, course_name=None):
     출석 데이터를 Excel로 내보내기
 
     Args:
-        attendance_data: 출석 데이터 리스트 (dict 형태)
+        attendance_data: 출석 데이터 iterable (dict 형태, 제너레이터 가능)
         course_name: 수업명 (선택)
 
     Returns:
-        Flask response
+        Flask response (스트리밍)
     """
-    wb, ws = create_excel_workbook("출석부")
-
-    # 제목
-    title = f"{course_name} 출석부" if course_name else "전체 출석부"
-    add_title_row(ws, title, 7)
-    add_info_row(ws, f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}", 2)
-
-    # 헤더
     headers = ['날짜', '수업명', '학생명', '출석상태', '지각시간', '비고', '체크시간']
-    ws.append([])
-    ws.append(headers)
-
-    style_header_row(ws, row_num=4, column_count=len(headers))
-
-    # 데이터
-    for data in attendance_data:
-        status_text = {
-            'present': '출석',
-            'late': '지각',
-            'absent': '결석',
-            'excused': '결석(사유)'
-        }.get(data.get('status'), '-')
-
-        ws.append([
-            data.get('date', '-'),
-            data.get('course_name', '-'),
-            data.get('student_name', '-'),
-            status_text,
-            data.get('late_minutes', '-'),
-            data.get('notes', '-'),
-            data.get('checked_at', '-')
-        ])
-
-    style_data_rows(ws, start_row=5, column_count=len(headers))
-    auto_adjust_column_width(ws)
-
-    return create_excel_response(wb, "출석부")
+    sheet = ExcelStream("출석부", widths=[12, 30, 12, 10, 10, 30, 18])
+
+    def write():
+        sheet.title(f"{course_name} 출석부" if course_name else "전체 출석부")
+        sheet.created_info()
+        sheet.blank()
+        sheet.header(headers)
+
+        for data in attendance_data:
+            sheet.row([
+                data.get('date', '-'),
+                data.get('course_name', '-'),
+                data.get('student_name', '-'),
+                ATTENDANCE_STATUS_TEXT.get(data.get('status'), '-'),
+                data.get('late_minutes', '-'),
+                data.get('notes', '-'),
+                data.get('checked_at', '-')
+            ])
+
+    return sheet.response("출석부", write)
+
+
+def attendance_export_row(attendance, session, course_name, student_name):
+    """출석 1건 → export_attendance_to_excel() 입력 dict"""
+    return {
+        'date': session.session_date.strftime('%Y-%m-%d'),
+        'course_name': course_name,
+        'student_name': student_name,
+        'status': attendance.status,
+        'late_minutes': '-',    # 지각 시간은 Attendance에 기록하지 않음
+        'notes': attendance.notes or '-',
+        'checked_at': attendance.checked_at.strftime('%Y-%m-%d %H:%M') if attendance.checked_at else '-'
+    }
 
 
 def export_payments_to_excel(payments):
@@ -327,55 +482,41 @@ def export_payments_to_excel(payments):
     결제 내역을 Excel로 내보내기
 
     Args:
-        payments: Payment 객체 리스트
+        payments: Payment 객체 iterable (student/course를 함께 로드해 두면 행마다 조회하지 않음)
 
     Returns:
-        Flask response
+        Flask response (스트리밍)
     """
-    wb, ws = create_excel_workbook("결제 내역")
-
-    # 제목 추가
-    add_title_row(ws, "결제 내역", 8)
-    add_info_row(ws, f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}", 2)
-
-    # 헤더
     headers = ['날짜', '학생명', '수업명', '금액', '회차', '결제방법', '상태', '비고']
-    ws.append([])
-    ws.append(headers)
-
-    style_header_row(ws, row_num=4, column_count=len(headers))
+    sheet = ExcelStream("결제 내역", widths=[12, 12, 30, 12, 8, 12, 10, 30])
 
-    # 데이터
-    total_amount = 0
-    for payment in payments:
-        ws.append([
-            payment.created_at.strftime('%Y-%m-%d'),
-            payment.student.name if payment.student else '-',
-            payment.course.course_name if payment.course else '-',
-            payment.amount,
-            payment.sessions_covered or '-',
-            payment.payment_method or '-',
-            '완료' if payment.status == 'completed' else '대기' if payment.status == 'pending' else '취소',
-            payment.notes or '-'
-        ])
+    def write():
+        sheet.title("결제 내역")
+        sheet.created_info()
+        sheet.blank()
+        sheet.header(headers)
 
-        if payment.status == 'completed':
-            total_amount += payment.amount
+        total_amount = 0
+        for payment in _iter_rows(payments):
+            sheet.row([
+                payment.created_at.strftime('%Y-%m-%d'),
+                payment.student.name if payment.student else '-',
+                payment.course.course_name if payment.course else '-',
+                payment.amount,
+                payment.sessions_covered or '-',
+                payment.payment_method or '-',
+                '완료' if payment.status == 'completed' else '대기' if payment.status == 'pending' else '취소',
+                payment.notes or '-'
+            ])
 
-    # 합계 행
-    total_row = ws.max_row + 1
-    ws.append(['', '', '합계', total_amount, '', '', '', ''])
+            if payment.status == 'completed':
+                total_amount += payment.amount
 
-    # 합계 행 스타일
-    total_cell = ws.cell(row=total_row, column=3)
-    total_cell.font = Font(name='맑은 고딕', size=11, bold=True)
-    amount_cell = ws.cell(row=total_row, column=4)
-    amount_cell.font = Font(name='맑은 고딕', size=11, bold=True, color='FF0000')
+        # 합계 행
+        sheet.plain(['', '', sheet.cell('합계', 'momoai_total'),
+                     sheet.cell(total_amount, 'momoai_total_amount'), '', '', '', ''])
 
-    style_data_rows(ws, start_row=5, end_row=total_row-1, column_count=len(headers))
-    auto_adjust_column_width(ws)
-
-    return create_excel_response(wb, "결제내역")
+    return sheet.response("결제내역", write)
 
 
 def export_student_report_to_excel(student, enrollments, essays, attendance_stats):
@@ -385,60 +526,68 @@ def export_student_report_to_excel(student, enrollments, essays, attendance_stat
     Args:
         student: Student 객체
         enrollments: CourseEnrollment 객체 리스트
-        essays: Essay 객체 리스트
+        essays: Essay 객체 iterable (최근순, 앞 20개만 사용)
         attendance_stats: 출석 통계 dict
 
     Returns:
-        Flask response
+        Flask response (스트리밍)
+    """
+    sheet = ExcelStream("학생 리포트", widths=[16, 24, 12, 14])
+
+    def write():
+        sheet.title(f"{student.name} 학생 종합 리포트")
+        sheet.created_info()
+
+        # 학생 기본 정보
+        sheet.blank()
+        sheet.plain(['학생 정보', '', '', ''])
+        sheet.plain(['이름', student.name, '학년', student.grade or '-'])
+        sheet.plain(['이메일', student.email or '-', '등급', student.tier or '-'])
+        sheet.plain(['연락처', student.phone or '-', '생년월일',
+                     student.birth_date.strftime('%Y-%m-%d') if student.birth_date else '-'])
+
+        # 출석 통계
+        sheet.blank()
+        sheet.plain(['출석 통계', '', '', ''])
+        sheet.plain(['총 세션', attendance_stats.get('total_sessions', 0), '출석', attendance_stats.get('present', 0)])
+        sheet.plain(['지각', attendance_stats.get('late', 0), '결석', attendance_stats.get('absent', 0)])
+        sheet.plain(['출석률', f"{attendance_stats.get('attendance_rate', 0):.1f}%", '', ''])
+
+        # 수강 중인 수업
+        sheet.blank()
+        sheet.plain(['수강 중인 수업', '', '', ''])
+        sheet.header(['수업명', '강사', '출석률', '상태'])
+
+        for enrollment in enrollments:
+            sheet.plain([
+                enrollment.course.course_name,
+                enrollment.course.teacher.name if enrollment.course.teacher else '-',
+                f"{enrollment.attendance_rate:.1f}%",
+                '진행중' if enrollment.status == 'active' else '완료'
+            ])
+
+        # 첨삭 기록
+        sheet.blank()
+        sheet.plain(['첨삭 기록', '', '', ''])
+        sheet.header(['제출일', '버전', '상태', '점수'])
+
+        for essay in itertools.islice(essays, 20):  # 최근 20개
+            sheet.plain([
+                essay.created_at.strftime('%Y-%m-%d'),
+                f"v{essay.current_version}",
+                '완료' if essay.is_finalized else '진행중',
+                '-'  # 점수는 EssayResult에서 가져와야 함
+            ])
+
+    return sheet.response(f"{student.name}_종합리포트", write)
+
+
+def _iter_rows(rows, batch_size=500):
+    """
+    쿼리면 yield_per로 나눠 읽기 (PostgreSQL에서는 서버 측 커서 사용)
+
+    이미 yield_per 등 실행 옵션을 지정한 쿼리나 리스트/제너레이터는 그대로 순회한다.
     """
-    wb, ws = create_excel_workbook("학생 리포트")
-
-    # 제목
-    add_title_row(ws, f"{student.name} 학생 종합 리포트", 4)
-    add_info_row(ws, f"생성일시: {datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}", 2)
-
-    # 학생 기본 정보
-    ws.append([])
-    ws.append(['학생 정보', '', '', ''])
-    ws.append(['이름', student.name, '학년', student.grade or '-'])
-    ws.append(['이메일', student.email or '-', '등급', student.tier or '-'])
-    ws.append(['연락처', student.phone or '-', '생년월일', student.birth_date.strftime('%Y-%m-%d') if student.birth_date else '-'])
-
-    # 출석 통계
-    ws.append([])
-    ws.append(['출석 통계', '', '', ''])
-    ws.append(['총 세션', attendance_stats.get('total_sessions', 0), '출석', attendance_stats.get('present', 0)])
-    ws.append(['지각', attendance_stats.get('late', 0), '결석', attendance_stats.get('absent', 0)])
-    ws.append(['출석률', f"{attendance_stats.get('attendance_rate', 0):.1f}%", '', ''])
-
-    # 수강 중인 수업
-    ws.append([])
-    ws.append(['수강 중인 수업', '', '', ''])
-    ws.append(['수업명', '강사', '출석률', '상태'])
-    style_header_row(ws, row_num=ws.max_row, column_count=4)
-
-    for enrollment in enrollments:
-        ws.append([
-            enrollment.course.course_name,
-            enrollment.course.teacher.name if enrollment.course.teacher else '-',
-            f"{enrollment.attendance_rate:.1f}%",
-            '진행중' if enrollment.status == 'active' else '완료'
-        ])
-
-    # 첨삭 기록
-    ws.append([])
-    ws.append(['첨삭 기록', '', '', ''])
-    ws.append(['제출일', '버전', '상태', '점수'])
-    style_header_row(ws, row_num=ws.max_row, column_count=4)
-
-    for essay in essays[:20]:  # 최근 20개
-        ws.append([
-            essay.created_at.strftime('%Y-%m-%d'),
-            f"v{essay.current_version}",
-            '완료' if essay.is_finalized else '진행중',
-            '-'  # 점수는 EssayResult에서 가져와야 함
-        ])
-
-    auto_adjust_column_width(ws)
-
-    return create_excel_response(wb, f"{student.name}_종합리포트")
+    if hasattr(rows, 'yield_per') and not rows.get_execution_options().get('yield_per'):
+        return rows.yield_per(batch_size)
+    return rows
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 """하크니스 게시판 유틸리티"""
-from app.models import Course, CourseEnrollment, Student
+from app.utils.principal import get_principal
 
 
 def can_access_harkness_board(user, board):
@@ -29,27 +29,17 @@ def can_access_harkness_board(user, board):
 
     # 학생 권한 체크
     if user.role == 'student':
-        student = Student.query.filter_by(user_id=user.user_id).first()
-        if not student:
+        principal = get_principal(user)
+        if not principal.student_id:
             return False
 
         # 하크니스 전체 게시판: 하크니스 수업을 하나라도 듣고 있으면 접근 가능
         if board.board_type == 'harkness_all':
-            harkness_enrollments = CourseEnrollment.query.join(Course).filter(
-                CourseEnrollment.student_id == student.student_id,
-                CourseEnrollment.status == 'active',
-                Course.course_type == '하크니스'
-            ).count()
-            return harkness_enrollments > 0
+            return bool(principal.harkness_course_ids())
 
         # 특정 수업 게시판: 해당 수업을 듣고 있어야 함
         if board.course_id:
-            enrollment = CourseEnrollment.query.filter_by(
-                student_id=student.student_id,
-                course_id=board.course_id,
-                status='active'
-            ).first()
-            return enrollment is not None
+            return board.course_id in principal.course_ids()
 
     return False
 
@@ -75,11 +65,7 @@ def get_accessible_harkness_boards(user):
     # 강사는 자신의 게시판 + 하크니스 전체 + 담당 수업 게시판
     if user.role == 'teacher':
         # 담당 하크니스 수업 ID 목록
-        teacher_course_ids = [
-            c.course_id for c in Course.query.filter_by(
-                teacher_id=user.user_id, course_type='하크니스'
-            ).all()
-        ]
+        teacher_course_ids = list(get_principal(user).taught_harkness_course_ids)
         conditions = [
             HarknessBoard.board_type == 'harkness_all',
             HarknessBoard.created_by == user.user_id
@@ -98,18 +84,12 @@ def get_accessible_harkness_boards(user):
 
     # 학생은 자신이 수강하는 하크니스 수업 게시판만
     if user.role == 'student':
-        student = Student.query.filter_by(user_id=user.user_id).first()
-        if not student:
+        principal = get_principal(user)
+        if not principal.student_id:
             return []
 
         # 학생이 수강 중인 하크니스 수업 ID 목록
-        harkness_enrollments = CourseEnrollment.query.join(Course).filter(
-            CourseEnrollment.student_id == student.student_id,
-            CourseEnrollment.status == 'active',
-            Course.course_type == '하크니스'
-        ).all()
-
-        course_ids = [e.course_id for e in harkness_enrollments]
+        course_ids = list(principal.harkness_course_ids())
 
         # 하크니스 전체 게시판 + 수강 중인 수업 게시판
         if course_ids:
@@ -1,11 +1,27 @@
 # -*- coding: utf-8 -*-
-"""강사 월별 시수 계산 유틸리티"""
-from datetime import date
-from sqlalchemy import extract, func, or_
+"""강사 월별 시수 계산 유틸리티
+
+시수 화면이 강사마다 세션 쿼리를 따로 돌리지 않도록 여러 강사의 한 달치 세션과 출석 인원을
+날짜 범위 쿼리 1번으로 모아 강사별로 나눠 계산한다 (build_monthly_data).
+결과는 teacher_hours_snapshots에 저장해 마감된 달은 고정 스냅샷으로, 이번 달은 바뀐 강사만
+다시 계산하고, 수동 보정은 조회 때 위에 더한다 (get_monthly_data).
+"""
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, or_, select
 from app.models import db, Course, CourseSession, Attendance
 
+logger = logging.getLogger(__name__)
+
 # 보강 관련 course_type 집합 (신규 타입 + 기존 호환)
 MAKEUP_TYPES = frozenset({'보강수업', '보강(프리미엄)', '보강(정규반)', '보강(하크니스)'})
+# 시수 외 별도 수당 수업
+SPECIAL_TYPES = frozenset({'시그니처', '특강', '모의고사'})
+
+DEFAULT_SNAPSHOT_TTL = 300    # 이번 달 스냅샷 유지 시간 (초)
+IN_CHUNK = 500
 
 
 def is_makeup_type(course_type: str) -> bool:
@@ -97,139 +113,106 @@ def _week_of_month(d):
     return (adjusted - 1) // 7 + 1
 
 
-def build_teacher_monthly_data(teacher_id, year, month):
-    """
-    강사의 월별 시수 데이터를 계산해 반환.
+def _month_range(year, month):
+    """(1일, 말일) — session_date 인덱스를 쓰도록 extract 대신 날짜 범위로 비교"""
+    first = date(year, month, 1)
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return first, last
 
-    Returns dict:
-    {
-      'sessions': [
-          {'session': CourseSession, 'course': Course,
-           'attended': int, 'hours': float, 'week': 1-5}, ...
-      ],
-      'by_type': {
-          course_type: {'w1': h, 'w2': h, 'w3': h, 'w4': h, 'w5': h, 'total': h}, ...
-      },
-      'weekly_totals': {1: h, 2: h, 3: h, 4: h, 5: h},
-      'auto_total': float,
-      'special': [
-          {'session': CourseSession, 'course': Course, 'attended': int}, ...
-      ]
+
+def _empty_data():
+    return {
+        'sessions': [],
+        'by_type': {},
+        'weekly_totals': {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0, 5: 0.0},
+        'auto_total': 0.0,
+        'special': [],
     }
-    """
-    SPECIAL_TYPES = {'시그니처', '특강', '모의고사'}
-
-    # 시수 집계 대상 세션:
-    #   1) session.status == 'completed' (정상 마킹된 세션)
-    #   2) 또는 출결이 입력된 세션 (attendance.checked_at IS NOT NULL).
-    #      강사가 학생 출결만 입력하고 '✓ 완료' 버튼을 누르지 않은 경우에도
-    #      시수에 정상 반영되도록 한다 (status가 scheduled로 남아있어도 포함).
-    attended_subq = (
-        db.session.query(Attendance.session_id)
-        .filter(Attendance.checked_at.isnot(None))
-        .distinct()
-        .subquery()
-    )
-    sessions = (
-        CourseSession.query
-        .join(Course)
-        .filter(
-            Course.teacher_id == teacher_id,
-            CourseSession.status != 'cancelled',
-            or_(
-                CourseSession.status == 'completed',
-                CourseSession.session_id.in_(db.session.query(attended_subq.c.session_id))
-            ),
-            extract('year', CourseSession.session_date) == year,
-            extract('month', CourseSession.session_date) == month
-        )
-        .order_by(CourseSession.session_date)
-        .all()
-    )
 
-    if not sessions:
-        return {
-            'sessions': [],
-            'by_type': {},
-            'weekly_totals': {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0, 5: 0.0},
-            'auto_total': 0.0,
-            'special': [],
-        }
 
-    session_ids = [s.session_id for s in sessions]
+def _load_sessions(teacher_ids, first, last):
+    """
+    강사들의 기간 내 시수 집계 대상 세션 + 출석 학생 수 (1쿼리)
 
-    # 세션별 출석 학생 수 일괄 조회
-    count_rows = (
+    시수 집계 대상 세션:
+      1) session.status == 'completed' (정상 마킹된 세션)
+      2) 또는 출결이 입력된 세션 (attendance.checked_at IS NOT NULL).
+         강사가 학생 출결만 입력하고 '✓ 완료' 버튼을 누르지 않은 경우에도
+         시수에 정상 반영되도록 한다 (status가 scheduled로 남아있어도 포함).
+    """
+    attended = func.sum(case((Attendance.status.in_(['present', 'late']), 1), else_=0))
+    checked = func.count(Attendance.checked_at)
+    return (
         db.session.query(
-            Attendance.session_id,
-            func.count(Attendance.attendance_id)
+            CourseSession.session_id, CourseSession.session_date, CourseSession.start_time,
+            Course.teacher_id, Course.course_id, Course.course_name, Course.course_type, Course.grade,
+            attended.label('attended')
         )
+        .join(Course, CourseSession.course_id == Course.course_id)
+        .outerjoin(Attendance, Attendance.session_id == CourseSession.session_id)
         .filter(
-            Attendance.session_id.in_(session_ids),
-            Attendance.status.in_(['present', 'late'])
+            Course.teacher_id.in_(list(teacher_ids)),
+            CourseSession.session_date.between(first, last),
+            CourseSession.status != 'cancelled',
         )
-        .group_by(Attendance.session_id)
+        .group_by(CourseSession.session_id, Course.course_id)
+        .having(or_(CourseSession.status == 'completed', checked > 0))
+        .order_by(CourseSession.session_date, CourseSession.start_time, CourseSession.session_id)
         .all()
     )
-    count_map = {row[0]: row[1] for row in count_rows}
 
-    # 각 세션별 과목 캐시
-    course_map = {s.session_id: s.course for s in sessions}
 
-    result_sessions = []
-    special = []
-    by_type = {}
-    weekly_totals = {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0, 5: 0.0}
+def _assemble(rows):
+    """한 강사의 세션 행 → 월별 시수 데이터 (보강 병합 + 유형/주차별 집계)"""
+    data = _empty_data()
+    by_type = data['by_type']
+    weekly_totals = data['weekly_totals']
 
     # 같은 날짜+시간에 겹치는 보강수업은 원 수업 출석에 합산
     # (별도 1.0시수가 아닌, 원 수업 인원으로 합산 계산)
-    from collections import defaultdict
     time_groups = defaultdict(list)
-    for s in sessions:
-        time_groups[(s.session_date, s.start_time)].append(s)
+    for r in rows:
+        time_groups[(r.session_date, r.start_time)].append(r)
 
     merged_skip = set()  # 병합된 보강 세션 ID (개별 집계 제외)
     merged_attended = {}  # session_id → 합산 출석수 (primary session용)
 
-    for key, group in time_groups.items():
+    for group in time_groups.values():
         if len(group) < 2:
             continue
-        primary = next(
-            (s for s in group if not is_makeup_type(course_map[s.session_id].course_type)),
-            None
-        )
+        primary = next((r for r in group if not is_makeup_type(r.course_type)), None)
         if primary is None:
             continue
         # 보강 세션 출석을 primary에 합산
-        total = sum(count_map.get(s.session_id, 0) for s in group)
-        merged_attended[primary.session_id] = total
-        for s in group:
-            if s.session_id != primary.session_id:
-                merged_skip.add(s.session_id)
-
-    for s in sessions:
-        if s.session_id in merged_skip:
+        merged_attended[primary.session_id] = sum(int(r.attended or 0) for r in group)
+        for r in group:
+            if r.session_id != primary.session_id:
+                merged_skip.add(r.session_id)
+
+    for r in rows:
+        if r.session_id in merged_skip:
             continue
 
-        course = course_map[s.session_id]
-        attended = merged_attended.get(s.session_id, count_map.get(s.session_id, 0))
-        grade_level = get_grade_level(course.grade)
-        course_type = course.course_type or '기타'
-        hours = calculate_session_hours(course_type, grade_level, attended)
-        week = _week_of_month(s.session_date)
+        attended = merged_attended.get(r.session_id, int(r.attended or 0))
+        course_type = r.course_type or '기타'
+        hours = calculate_session_hours(course_type, get_grade_level(r.grade), attended)
+        week = _week_of_month(r.session_date)
 
         row = {
-            'session': s,
-            'course': course,
+            'session': {'session_id': r.session_id, 'session_date': r.session_date, 'start_time': r.start_time},
+            'course': {'course_id': r.course_id, 'course_name': r.course_name,
+                       'course_type': r.course_type, 'grade': r.grade},
             'attended': attended,
             'hours': hours,
             'week': week,
         }
 
         if course_type in SPECIAL_TYPES:
-            special.append(row)
+            data['special'].append(row)
         else:
-            result_sessions.append(row)
+            data['sessions'].append(row)
+            # weekly_totals (special 포함하지 않음)
+            weekly_totals[week] = weekly_totals.get(week, 0.0) + hours
 
         # by_type 집계
         if course_type not in by_type:
@@ -237,16 +220,252 @@ def build_teacher_monthly_data(teacher_id, year, month):
         by_type[course_type][week] = by_type[course_type].get(week, 0.0) + hours
         by_type[course_type]['total'] += hours
 
-        # weekly_totals (special 포함하지 않음)
-        if course_type not in SPECIAL_TYPES:
-            weekly_totals[week] = weekly_totals.get(week, 0.0) + hours
+    data['auto_total'] = sum(weekly_totals.values())
+    return data
 
-    auto_total = sum(weekly_totals.values())
 
-    return {
-        'sessions': result_sessions,
-        'by_type': by_type,
-        'weekly_totals': weekly_totals,
-        'auto_total': auto_total,
-        'special': special,
+def build_monthly_data(teacher_ids, year, month):
+    """
+    여러 강사의 월별 시수 데이터를 한 번에 계산 (세션+출석 집계 1쿼리).
+
+    Returns:
+        {teacher_id: dict} — dict 형식은 build_teacher_monthly_data()와 같다
+    """
+    teacher_ids = list(teacher_ids)
+    by_teacher = defaultdict(list)
+    if teacher_ids:
+        for row in _load_sessions(teacher_ids, *_month_range(year, month)):
+            by_teacher[row.teacher_id].append(row)
+    return {tid: _assemble(by_teacher.get(tid, [])) for tid in teacher_ids}
+
+
+def build_teacher_monthly_data(teacher_id, year, month):
+    """
+    강사의 월별 시수 데이터를 계산해 반환.
+
+    Returns dict:
+    {
+      'sessions': [
+          {'session': {'session_id', 'session_date', 'start_time'},
+           'course': {'course_id', 'course_name', 'course_type', 'grade'},
+           'attended': int, 'hours': float, 'week': 1-5}, ...
+      ],
+      'by_type': {
+          course_type: {1: h, 2: h, 3: h, 4: h, 5: h, 'total': h}, ...
+      },
+      'weekly_totals': {1: h, 2: h, 3: h, 4: h, 5: h},
+      'auto_total': float,
+      'special': [ sessions와 같은 형식 (시그니처/특강/모의고사) ]
+    }
+    """
+    return build_monthly_data([teacher_id], year, month)[teacher_id]
+
+
+# ════════════════════════════════════════════════════════
+# 월별 스냅샷 (마감된 달은 고정, 이번 달은 바뀐 강사만 다시 계산)
+# ════════════════════════════════════════════════════════
+
+def _encode(data):
+    def _default(value):
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+        raise TypeError(f'JSON 변환 불가: {type(value)}')
+    return json.dumps(data, ensure_ascii=False, default=_default)
+
+
+def _decode(text):
+    data = json.loads(text)
+    for row in data['sessions'] + data['special']:
+        session = row['session']
+        session['session_date'] = date.fromisoformat(session['session_date'])
+        if session['start_time']:
+            session['start_time'] = time.fromisoformat(session['start_time'])
+    data['by_type'] = {
+        ctype: {('total' if k == 'total' else int(k)): v for k, v in row.items()}
+        for ctype, row in data['by_type'].items()
     }
+    data['weekly_totals'] = {int(k): v for k, v in data['weekly_totals'].items()}
+    return data
+
+
+def _ttl():
+    from flask import current_app
+    return current_app.config.get('HOURS_SNAPSHOT_TTL', DEFAULT_SNAPSHOT_TTL)
+
+
+def refresh_snapshots(teacher_ids, year, month, now=None):
+    """강사들의 월별 시수를 일괄 계산해 스냅샷 교체. 커밋은 호출 측에서.
+
+    Returns:
+        {teacher_id: 시수 데이터 dict}
+    """
+    from app.models.teacher_hours import TeacherHoursSnapshot
+
+    now = now or datetime.now()
+    values = build_monthly_data(teacher_ids, year, month)
+    is_closed = _month_range(year, month)[1] < now.date()
+
+    table = TeacherHoursSnapshot.__table__
+    connection = db.session.connection()
+    ids = list(values)
+    for i in range(0, len(ids), IN_CHUNK):
+        connection.execute(delete(table).where(
+            table.c.teacher_id.in_(ids[i:i + IN_CHUNK]), table.c.year == year, table.c.month == month))
+    rows = [dict(teacher_id=tid, year=year, month=month, data_json=_encode(data),
+                 is_closed=is_closed, computed_at=now) for tid, data in values.items()]
+    for i in range(0, len(rows), IN_CHUNK):
+        connection.execute(insert(table), rows[i:i + IN_CHUNK])
+    return values
+
+
+def get_monthly_data(teacher_ids, year, month, now=None):
+    """
+    강사들의 월별 시수 (스냅샷 + 보정)
+
+    마감된 달(말일이 지난 달)은 고정 스냅샷을 그대로 쓰고, 이번 달은 스냅샷이
+    HOURS_SNAPSHOT_TTL보다 오래됐거나 세션 훅이 지운 강사만 한 번에 다시 계산한다.
+    보정(TeacherHoursCorrection)은 스냅샷과 별도로 읽어 위에 더한다.
+
+    Returns:
+        {teacher_id: 시수 데이터 dict + 'corrections'(목록), 'correction_total', 'final_total'}
+    """
+    from app.models.teacher_hours import TeacherHoursCorrection, TeacherHoursSnapshot
+
+    teacher_ids = list(teacher_ids)
+    if not teacher_ids:
+        return {}
+    now = now or datetime.now()
+    fresh_after = now - timedelta(seconds=_ttl())
+
+    data = {}
+    for snap in TeacherHoursSnapshot.query.filter(
+        TeacherHoursSnapshot.teacher_id.in_(teacher_ids),
+        TeacherHoursSnapshot.year == year,
+        TeacherHoursSnapshot.month == month,
+    ):
+        if snap.is_closed or snap.computed_at >= fresh_after:
+            data[snap.teacher_id] = _decode(snap.data_json)
+
+    outdated = [tid for tid in teacher_ids if tid not in data]
+    if outdated:
+        try:
+            data.update(refresh_snapshots(outdated, year, month, now))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[TeacherHours] 스냅샷 저장 오류: {e}')
+            data.update(build_monthly_data(outdated, year, month))
+
+    corrections = defaultdict(list)
+    for c in TeacherHoursCorrection.query.filter(
+        TeacherHoursCorrection.teacher_id.in_(teacher_ids),
+        TeacherHoursCorrection.year == year,
+        TeacherHoursCorrection.month == month,
+    ).order_by(TeacherHoursCorrection.created_at):
+        corrections[c.teacher_id].append(c)
+
+    result = {}
+    for tid in teacher_ids:
+        correction_total = sum(c.hours_delta for c in corrections[tid])
+        result[tid] = dict(data[tid], corrections=corrections[tid], correction_total=correction_total,
+                           final_total=data[tid]['auto_total'] + correction_total)
+    return result
+
+
+# ════════════════════════════════════════════════════════
+# 스냅샷 무효화 (세션 훅)
+# ════════════════════════════════════════════════════════
+
+_PENDING_KEY = 'teacher_hours_stale'
+
+
+def _changed_ids(objs, session):
+    """시수에 영향을 주는 변경이 있는 (출결 ID, 세션 ID, 수업 ID)"""
+    attendance_ids, session_ids, course_ids = set(), set(), set()
+    for obj in objs:
+        if isinstance(obj, Attendance):
+            target, attrs = attendance_ids, ('status', 'checked_at', 'session_id')
+        elif isinstance(obj, CourseSession):
+            target, attrs = session_ids, ('status', 'session_date', 'start_time', 'course_id')
+        elif isinstance(obj, Course):
+            if obj in session.new:
+                continue            # 새 수업은 세션 변경으로 잡힌다
+            target, attrs = course_ids, ('teacher_id', 'course_type', 'grade')
+        else:
+            continue
+        state = inspect(obj)
+        if obj in session.dirty and not any(state.attrs[a].history.has_changes() for a in attrs):
+            continue
+        if state.identity:          # flush 전 새 객체는 after_flush에서 다시 본다
+            target.add(state.identity[0])
+    return attendance_ids, session_ids, course_ids
+
+
+def _stale_keys(connection, attendance_ids, session_ids, course_ids):
+    """DB 현재 상태 기준 영향받는 (강사, 연, 월)과 모든 달을 지울 강사"""
+    months, teachers = set(), set()
+
+    def _add(stmt, ids):
+        ids = [i for i in ids if i]
+        for i in range(0, len(ids), IN_CHUNK):
+            for teacher_id, session_date in connection.execute(stmt(ids[i:i + IN_CHUNK])):
+                if teacher_id and session_date:
+                    months.add((teacher_id, session_date.year, session_date.month))
+
+    base = select(Course.teacher_id, CourseSession.session_date).join(
+        Course, CourseSession.course_id == Course.course_id)
+    _add(lambda chunk: base.join(Attendance, Attendance.session_id == CourseSession.session_id)
+         .where(Attendance.attendance_id.in_(chunk)), attendance_ids)
+    _add(lambda chunk: base.where(CourseSession.session_id.in_(chunk)), session_ids)
+    ids = list(course_ids)
+    for i in range(0, len(ids), IN_CHUNK):
+        teachers.update(t for (t,) in connection.execute(
+            select(Course.teacher_id).where(Course.course_id.in_(ids[i:i + IN_CHUNK]))) if t)
+    return months, teachers
+
+
+def _before_flush(session, flush_context, instances):
+    """변경·삭제 전 값(이전 날짜/이전 담당 강사)을 DB에서 읽어 둔다 — 만료된 객체는 이력에 옛 값이 없다"""
+    ids = _changed_ids(list(session.dirty) + list(session.deleted), session)
+    if any(ids):
+        months, teachers = _stale_keys(session.connection(), *ids)
+        pending = session.info.setdefault(_PENDING_KEY, (set(), set()))
+        pending[0].update(months)
+        pending[1].update(teachers)
+
+
+def _after_flush(session, flush_context):
+    """시수에 영향을 주는 출결/세션/수업 변경 → 이전·이후 (강사, 월) 스냅샷 삭제"""
+    from app.models.teacher_hours import TeacherHoursSnapshot
+
+    months, teachers = session.info.pop(_PENDING_KEY, (set(), set()))
+    ids = _changed_ids(list(session.new) + list(session.dirty), session)
+    if any(ids):
+        new_months, new_teachers = _stale_keys(session.connection(), *ids)
+        months |= new_months
+        teachers |= new_teachers
+    if not (months or teachers):
+        return
+
+    connection = session.connection()
+    table = TeacherHoursSnapshot.__table__
+    if teachers:
+        connection.execute(delete(table).where(table.c.teacher_id.in_(list(teachers))))
+    months = [m for m in months if m[0] not in teachers]
+    for i in range(0, len(months), IN_CHUNK):
+        connection.execute(delete(table).where(or_(*[
+            and_(table.c.teacher_id == tid, table.c.year == y, table.c.month == m)
+            for tid, y, m in months[i:i + IN_CHUNK]
+        ])))
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_teacher_hours(app):
+    """시수 스냅샷 무효화용 세션 훅 등록"""
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'before_flush', _before_flush)
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'after_rollback', _after_rollback)
@@ -1,14 +1,43 @@
 # -*- coding: utf-8 -*-
-"""게시판 이미지 업로드/삭제 유틸리티"""
+"""게시판 이미지 업로드/삭제 유틸리티
+
+업로드 원본은 그대로 보관하고, 커밋 후 백그라운드 스레드 풀이 EXIF 회전을 반영한
+파생 이미지(thumb/medium × JPEG/WebP)를 만들어 PostImage.variants에 기록한다.
+화면은 srcset으로 크기에 맞는 파생 이미지를 받고, 파일명이 UUID라 내용이 바뀌지 않으므로
+serve_post_image는 장기 캐시 헤더를 붙인다.
+OCR 입력도 prepare_ocr_image()로 같은 방식(회전 보정 + 축소 + JPEG 재압축)을 거쳐 전송량을 줄인다.
+"""
+import io
+import logging
 import os
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from werkzeug.utils import secure_filename
 from flask import current_app
 
+logger = logging.getLogger(__name__)
+
 ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
 MAX_IMAGES_PER_POST = 10
 
+# 파생 이미지: 이름 → 긴 변 최대 픽셀 (원본보다 크게 늘리지 않음)
+VARIANT_SIZES = {'thumb': 400, 'medium': 1280}
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+# UUID 파일명은 내용이 바뀌지 않으므로 1년 캐시
+IMAGE_CACHE_MAX_AGE = 365 * 24 * 3600
+# OCR 입력 긴 변 최대 픽셀 (손글씨 판독에 충분한 크기)
+OCR_MAX_SIDE = 2048
+DEFAULT_CONCURRENCY = 2
+
+_PENDING_KEY = 'pending_image_derivatives'
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
 
 def is_allowed_image(filename: str) -> bool:
     """허용된 이미지 확장자 여부 확인"""
@@ -68,15 +97,21 @@ def save_post_images(files, board_type: str, post_id: str, uploader_id: str,
         )
         saved.append(img)
 
+    if saved:
+        # 커밋되면 파생 이미지 생성 (롤백 시 취소)
+        from app.models import db
+        db.session.info.setdefault(_PENDING_KEY, []).extend(img.image_id for img in saved)
+
     return saved
 
 
 def delete_post_image(image_obj):
     """PostImage 객체를 DB + 파일시스템에서 삭제"""
     folder = get_images_folder()
-    file_path = folder / image_obj.stored_filename
-    if file_path.exists():
-        file_path.unlink()
+    for filename in [image_obj.stored_filename] + _variant_filenames(image_obj.variants):
+        file_path = folder / filename
+        if file_path.exists():
+            file_path.unlink()
 
     from app.models import db
     db.session.delete(image_obj)
@@ -98,3 +133,176 @@ def get_post_images(board_type: str, post_id: str):
     return PostImage.query.filter_by(
         board_type=board_type, post_id=post_id
     ).order_by(PostImage.order.asc()).all()
+
+
+# ------------------------------------------------------------------ #
+#  파생 이미지 (썸네일 / 중간 크기 / WebP)                             #
+# ------------------------------------------------------------------ #
+
+def _variant_filenames(variants):
+    """variants에 기록된 파생 이미지 파일명 목록 (중복 제거)"""
+    names = []
+    for variant in (variants or {}).values():
+        for fmt in ('jpeg', 'webp'):
+            if variant.get(fmt) and variant[fmt] not in names:
+                names.append(variant[fmt])
+    return names
+
+
+def _open_upright(source):
+    """이미지를 열고 EXIF Orientation을 픽셀에 반영 (폰 사진 세로/가로 보정)"""
+    from PIL import Image, ImageOps
+    img = Image.open(source)
+    img.load()
+    return ImageOps.exif_transpose(img)
+
+
+def _flatten_rgb(img):
+    """JPEG 저장용 RGB 변환 (투명 배경은 흰색으로)"""
+    from PIL import Image
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    return img.convert('RGB') if img.mode != 'RGB' else img
+
+
+def render_variants(image_path):
+    """
+    원본 이미지로 파생 이미지 파일을 만들어 같은 폴더에 저장한다.
+
+    :param image_path: 원본 파일 경로 ({uuid}.{ext})
+    :return: (width, height, variants) — 애니메이션 이미지는 variants가 {} (원본 사용)
+    """
+    from PIL import Image
+
+    path = Path(image_path)
+    img = _open_upright(path)
+    width, height = img.size
+    if getattr(img, 'is_animated', False):
+        return width, height, {}
+
+    jpeg_base = _flatten_rgb(img)
+    webp_base = img if img.mode in ('RGB', 'RGBA') else img.convert('RGBA' if img.has_transparency_data else 'RGB')
+
+    variants = {}
+    rendered = {}
+    for name, max_side in sorted(VARIANT_SIZES.items(), key=lambda kv: kv[1]):
+        scale = min(1.0, max_side / max(width, height))
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if size in rendered:
+            # 원본이 작아 이전 크기와 같으면 파일을 공유
+            variants[name] = dict(rendered[size])
+            continue
+        jpeg_name = f'{path.stem}_{name}.jpg'
+        webp_name = f'{path.stem}_{name}.webp'
+        jpeg_base.resize(size, Image.Resampling.LANCZOS).save(
+            path.with_name(jpeg_name), 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        webp_base.resize(size, Image.Resampling.LANCZOS).save(
+            path.with_name(webp_name), 'WEBP', quality=WEBP_QUALITY, method=4)
+        variants[name] = rendered[size] = {'width': size[0], 'height': size[1],
+                                           'jpeg': jpeg_name, 'webp': webp_name}
+    return width, height, variants
+
+
+def build_derivatives(image_ids):
+    """
+    PostImage 파생 이미지 생성 후 width/height/variants 기록 (앱 컨텍스트 안에서 호출)
+
+    이미 생성된 이미지는 건너뛴다. 원본을 읽을 수 없으면 variants를 {}로 두어 원본을 그대로 쓴다.
+
+    :return: 처리한 이미지 수
+    """
+    from app.models import db
+    from app.models.post_image import PostImage
+
+    folder = get_images_folder()
+    done = 0
+    for image in PostImage.query.filter(PostImage.image_id.in_(list(image_ids)),
+                                        PostImage.variants.is_(None)).all():
+        try:
+            image.width, image.height, image.variants = render_variants(folder / image.stored_filename)
+        except Exception as e:
+            logger.warning(f'[Image] 파생 이미지 생성 실패 {image.stored_filename}: {e}')
+            image.variants = {}
+        db.session.commit()
+        done += 1
+    return done
+
+
+def _run_derivatives(app, image_ids):
+    with app.app_context():
+        try:
+            build_derivatives(image_ids)
+        except Exception as e:
+            logger.error(f'[Image] 파생 이미지 작업 오류: {e}')
+
+
+def _get_executor(app):
+    """파생 이미지 생성용 스레드 풀 (fork 이후 프로세스마다 1개)"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            workers = app.config.get('IMAGE_DERIVATIVE_CONCURRENCY') or DEFAULT_CONCURRENCY
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-derivatives')
+            _executor_pid = os.getpid()
+    return _executor
+
+
+def schedule_derivatives(image_ids):
+    """파생 이미지 생성을 백그라운드 스레드 풀에 등록 (Future 반환)"""
+    app = current_app._get_current_object()
+    return _get_executor(app).submit(_run_derivatives, app, list(image_ids))
+
+
+def _submit_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    try:
+        schedule_derivatives(pending)
+    except Exception as e:
+        logger.warning(f'[Image] 커밋 후 파생 이미지 등록 실패: {e}')
+
+
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_image_derivatives(app):
+    """save_post_images()로 저장한 이미지를 커밋 후 처리하는 세션 훅 등록"""
+    from sqlalchemy import event
+    from app.models import db
+    if not event.contains(db.session, 'after_commit', _submit_pending):
+        event.listen(db.session, 'after_commit', _submit_pending)
+        event.listen(db.session, 'after_rollback', _discard_pending)
+
+
+# ------------------------------------------------------------------ #
+#  OCR 입력 축소                                                       #
+# ------------------------------------------------------------------ #
+
+def prepare_ocr_image(image_path, max_side=OCR_MAX_SIDE, quality=85):
+    """
+    OCR 모델에 보낼 이미지 바이트 생성 (EXIF 회전 보정 + 긴 변 max_side로 축소 + JPEG)
+
+    재압축 결과가 원본보다 크면(이미 작은 JPEG) 원본 바이트를 그대로 쓴다.
+
+    :return: (bytes, mime_type)
+    """
+    from PIL import Image, ImageOps
+
+    raw = Path(image_path).read_bytes()
+    source = Image.open(io.BytesIO(raw))
+    rotated = source.getexif().get(0x0112, 1) != 1    # EXIF Orientation
+    img = _flatten_rgb(ImageOps.exif_transpose(source))
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', quality=quality, optimize=True)
+    data = buf.getvalue()
+    if source.format == 'JPEG' and not rotated and len(raw) <= len(data):
+        return raw, 'image/jpeg'
+    return data, 'image/jpeg'
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""PDF 렌더 서비스 (프로세스 풀 + 내용 해시 캐시)
+
+xhtml2pdf / ReportLab 렌더링은 CPU를 오래 쓰므로 요청 스레드에서 직접 돌리지 않고
+프로세스 풀(PDF_RENDER_WORKERS)에 맡긴다. 결과는 PDF_FOLDER/cache/{해시}.pdf에 저장하며,
+해시는 (렌더러 종류, 템플릿 버전, 입력 내용)으로 만들어 내용이 같으면 다시 렌더링하지 않는다.
+
+- 첨삭 결과 PDF: HTML 본문 + 렌더러 버전(xhtml2pdf 버전 포함)
+- 사용 설명서: pdf_utils.py 소스 해시 + 한글 폰트 — 워커 프로세스마다 첫 요청 때 미리 생성
+- 첨삭이 완료(is_finalized) 처리되어 커밋되면 최신 버전 PDF를 백그라운드에서 미리 렌더링
+
+같은 키를 동시에 요청하면 프로세스 안에서는 렌더링을 한 번만 한다.
+PDF_RENDER_WORKERS=0 이면 프로세스 풀 없이 호출한 스레드에서 렌더링한다.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from sqlalchemy import event, inspect as sa_inspect
+
+logger = logging.getLogger(__name__)
+
+# 렌더링 방식/스타일을 바꾸면 올려서 기존 캐시를 무효화
+HTML_RENDERER_VERSION = 1
+MANUAL_RENDERER_VERSION = 1
+
+DEFAULT_WORKERS = 2
+RENDER_TIMEOUT = 120      # 초
+
+_PENDING_KEY = 'pending_pdf_prerender'
+
+_pool = None
+_pool_pid = None
+_prerender = None
+_prerender_pid = None
+_lock = threading.Lock()
+_inflight = {}            # 캐시 키 → Future (이 프로세스에서 렌더링 중인 작업)
+_started_pid = None       # 사용 설명서 미리 생성을 시작한 프로세스
+
+
+# ------------------------------------------------------------------ #
+#  렌더 워커 (프로세스 풀에서 실행 — 최상위 함수여야 함)              #
+# ------------------------------------------------------------------ #
+
+def _write_atomic(out_path, data):
+    """임시 파일에 쓴 뒤 교체 (동시에 읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    tmp_path = f'{out_path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _render_html(html_content, out_path):
+    from io import BytesIO
+    from xhtml2pdf import pisa
+
+    buffer = BytesIO()
+    status = pisa.CreatePDF(html_content, dest=buffer, encoding='utf-8')
+    if status.err:
+        raise RuntimeError('PDF 생성 중 오류가 발생했습니다.')
+    return _write_atomic(out_path, buffer.getvalue())
+
+
+def _render_manual(role, out_path):
+    from app.utils.pdf_utils import build_manual_pdf
+    return _write_atomic(out_path, build_manual_pdf(role))
+
+
+# ------------------------------------------------------------------ #
+#  캐시 키                                                             #
+# ------------------------------------------------------------------ #
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def html_key(html_content):
+    """첨삭 HTML → 캐시 키"""
+    try:
+        from xhtml2pdf import __version__ as engine_version
+    except ImportError:
+        engine_version = ''
+    return _digest('html', HTML_RENDERER_VERSION, engine_version, html_content)
+
+
+def manual_key(role):
+    """사용 설명서 → 캐시 키 (설명서 내용이 있는 pdf_utils.py 소스가 바뀌면 달라짐)"""
+    from app.utils import pdf_utils
+    source = Path(pdf_utils.__file__).read_bytes()
+    font_name, _ = pdf_utils.get_korean_font_path()
+    return _digest('manual', MANUAL_RENDERER_VERSION, role, font_name, source)
+
+
+def cache_dir():
+    from flask import current_app
+    folder = Path(current_app.config['PDF_FOLDER']) / 'cache'
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def cache_path(key):
+    return cache_dir() / f'{key}.pdf'
+
+
+# ------------------------------------------------------------------ #
+#  실행                                                                #
+# ------------------------------------------------------------------ #
+
+def _workers():
+    from flask import current_app
+    workers = current_app.config.get('PDF_RENDER_WORKERS')
+    return DEFAULT_WORKERS if workers is None else workers
+
+
+def _get_pool(workers):
+    """렌더 프로세스 풀 (fork 이후 프로세스마다 1개, 스레드가 있는 부모를 fork하지 않도록 spawn)"""
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _lock:
+        _pool = None
+
+
+def _submit(key, fn, *args):
+    """
+    캐시에 없으면 렌더링 작업 등록 (같은 키가 진행 중이면 그 작업을 공유)
+
+    Returns:
+        (캐시 파일 경로, Future 또는 None — 이미 캐시에 있으면 None)
+    """
+    from concurrent.futures import Future
+
+    path = cache_path(key)
+    if path.exists():
+        return path, None
+
+    with _lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return path, future
+        future = Future()
+        _inflight[key] = future
+
+    def _done(result_future):
+        with _lock:
+            _inflight.pop(key, None)
+        if result_future.exception() is not None:
+            future.set_exception(result_future.exception())
+        else:
+            future.set_result(result_future.result())
+
+    workers = _workers()
+    try:
+        if workers <= 0:
+            raise BrokenProcessPool('PDF_RENDER_WORKERS=0')
+        _get_pool(workers).submit(fn, *args, str(path)).add_done_callback(_done)
+    except (BrokenProcessPool, RuntimeError, OSError) as e:
+        # 프로세스 풀을 쓸 수 없으면 (비활성/손상) 현재 스레드에서 렌더링
+        if workers > 0:
+            logger.warning(f'[PDF] 렌더 프로세스 풀 사용 불가, 직접 렌더링: {e}')
+            _reset_pool()
+        inline = Future()
+        try:
+            inline.set_result(fn(*args, str(path)))
+        except Exception as render_error:
+            inline.set_exception(render_error)
+        _done(inline)
+    return path, future
+
+
+def _ensure(key, fn, *args):
+    """캐시 파일 경로 반환 (없으면 렌더링이 끝날 때까지 대기)"""
+    path, future = _submit(key, fn, *args)
+    if future is not None:
+        try:
+            future.result(timeout=RENDER_TIMEOUT)
+        except BrokenProcessPool:
+            _reset_pool()
+            raise
+    return path
+
+
+def render_html(html_content):
+    """첨삭 HTML → PDF 캐시 파일 경로 (캐시에 없으면 렌더링 후 반환)"""
+    return _ensure(html_key(html_content), _render_html, html_content)
+
+
+def manual_pdf(role):
+    """역할별 사용 설명서 PDF 캐시 파일 경로"""
+    return _ensure(manual_key(role), _render_manual, role)
+
+
+def prerender_html(html_content):
+    """첨삭 HTML PDF를 미리 렌더링 (기다리지 않음)"""
+    return _submit(html_key(html_content), _render_html, html_content)[1]
+
+
+def prebuild_manuals():
+    """
+    사용 설명서 4종을 미리 렌더링 (기다리지 않음)
+
+    앱 시작(create_app) 때가 아니라 워커 프로세스가 첫 요청을 받을 때 init_pdf_render의
+    before_request 훅에서 한 번 호출된다. PDF_PREBUILD_MANUALS=false면 호출되지 않는다.
+    """
+    from app.utils.pdf_utils import MANUALS
+    return [f for f in (_submit(manual_key(role), _render_manual, role)[1] for role in MANUALS) if f]
+
+
+# ------------------------------------------------------------------ #
+#  첨삭 완료 커밋 시 미리 렌더링                                       #
+# ------------------------------------------------------------------ #
+
+def prerender_essays(essay_ids):
+    """첨삭 최신 버전 HTML을 읽어 PDF 렌더링 등록 (앱 컨텍스트 안에서 호출)"""
+    from app.models import db
+    from app.models.essay import EssayVersion
+    from app.utils.essay_store import load_html
+
+    latest = db.session.query(EssayVersion.essay_id, db.func.max(EssayVersion.version_number).label('n'))\
+        .filter(EssayVersion.essay_id.in_(list(essay_ids)))\
+        .group_by(EssayVersion.essay_id).subquery()
+    versions = db.session.query(EssayVersion).join(
+        latest, (EssayVersion.essay_id == latest.c.essay_id) & (EssayVersion.version_number == latest.c.n)
+    ).all()
+
+    futures = []
+    for version in versions:
+        html_content = load_html(version)
+        if not html_content:
+            continue
+        future = prerender_html(html_content)
+        if future is not None:
+            futures.append(future)
+    return futures
+
+
+def _run_prerender(app, essay_ids):
+    with app.app_context():
+        try:
+            for future in prerender_essays(essay_ids):
+                future.result(timeout=RENDER_TIMEOUT)
+        except Exception as e:
+            logger.warning(f'[PDF] 첨삭 PDF 미리 렌더링 실패: {e}')
+
+
+def _get_prerender_executor():
+    """미리 렌더링 대기용 스레드 (요청/커밋 스레드를 막지 않도록)"""
+    global _prerender, _prerender_pid
+    with _lock:
+        if _prerender is None or _prerender_pid != os.getpid():
+            _prerender = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdf-prerender')
+            _prerender_pid = os.getpid()
+    return _prerender
+
+
+def _after_flush(session, flush_context):
+    from app.models.essay import Essay
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Essay) and obj.is_finalized:
+            history = sa_inspect(obj).attrs.is_finalized.history
+            if obj in session.new or history.added:
+                session.info.setdefault(_PENDING_KEY, set()).add(obj.essay_id)
+
+
+def _after_commit(session):
+    essay_ids = session.info.pop(_PENDING_KEY, None)
+    if not essay_ids:
+        return
+    try:
+        from flask import current_app
+        app = current_app._get_current_object()
+        if app.config.get('PDF_PRERENDER_ESSAYS', True):
+            _get_prerender_executor().submit(_run_prerender, app, essay_ids)
+    except Exception as e:
+        logger.warning(f'[PDF] 미리 렌더링 등록 실패: {e}')
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_pdf_render(app):
+    """
+    첨삭 완료 시 미리 렌더링하는 세션 훅 등록 + 첫 요청 시 사용 설명서 미리 생성
+
+    사용 설명서는 앱 시작 시점이 아니라 각 워커 프로세스의 첫 요청 때 생성한다.
+    gunicorn preload_app 환경에서 렌더 풀이 마스터가 아닌 워커에서 뜨게 하기 위해서이며,
+    요청을 받지 않는 관리 스크립트에서는 생성되지 않는다.
+    PDF_PREBUILD_MANUALS / PDF_PRERENDER_ESSAYS가 false면 각각 건너뛴다.
+    """
+    from app.models import db
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+
+    if not app.config.get('PDF_PREBUILD_MANUALS', True):
+        return
+
+    @app.before_request
+    def _prebuild_manuals():
+        global _started_pid
+        if _started_pid == os.getpid():
+            return
+        _started_pid = os.getpid()
+        try:
+            prebuild_manuals()
+        except Exception as e:
+            logger.warning(f'[PDF] 사용 설명서 미리 생성 실패: {e}')
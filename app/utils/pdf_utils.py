@@ -466,9 +466,9 @@ def generate_monthly_report_pdf(month_str, statistics):
 
 # ==================== 강사 사용 설명서 PDF ====================
 
-def generate_teacher_manual_pdf():
+def build_teacher_manual_pdf():
     """
-    강사 사용 설명서 PDF 생성
+    강사 사용 설명서 PDF 생성 (bytes)
     """
     buffer = BytesIO()
     doc = SimpleDocTemplate(
@@ -819,13 +819,13 @@ def generate_teacher_manual_pdf():
     story.append(ft)
 
     doc.build(story)
-    return create_pdf_response(buffer, "MOMOAI_강사사용설명서")
+    return buffer.getvalue()
 
 
 # ==================== 학생 사용 설명서 PDF ====================
 
-def generate_student_manual_pdf():
-    """학생 사용 설명서 PDF 생성"""
+def build_student_manual_pdf():
+    """학생 사용 설명서 PDF 생성 (bytes)"""
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4,
                             topMargin=20*mm, bottomMargin=20*mm,
@@ -1019,13 +1019,13 @@ def generate_student_manual_pdf():
     ]))
     story.append(ft)
     doc.build(story)
-    return create_pdf_response(buffer, "MOMOAI_학생사용설명서")
+    return buffer.getvalue()
 
 
 # ==================== 학부모 사용 설명서 PDF ====================
 
-def generate_parent_manual_pdf():
-    """학부모 사용 설명서 PDF 생성"""
+def build_parent_manual_pdf():
+    """학부모 사용 설명서 PDF 생성 (bytes)"""
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4,
                             topMargin=20*mm, bottomMargin=20*mm,
@@ -1227,11 +1227,11 @@ def generate_parent_manual_pdf():
     ]))
     story.append(ft)
     doc.build(story)
-    return create_pdf_response(buffer, "MOMOAI_학부모사용설명서")
+    return buffer.getvalue()
 
 
-def generate_admin_manual_pdf():
-    """관리자 사이트 사용 설명서 PDF 생성"""
+def build_admin_manual_pdf():
+    """관리자 사이트 사용 설명서 PDF 생성 (bytes)"""
     from io import BytesIO
     from reportlab.lib.pagesizes import A4
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -1411,4 +1411,47 @@ def generate_admin_manual_pdf():
     ]))
     story.append(ft)
     doc.build(story)
-    return create_pdf_response(buffer, "MOMOAI_관리자사용설명서")
+    return buffer.getvalue()
+
+
+# ==================== 사용 설명서 다운로드 (렌더 캐시) ====================
+
+# 역할 → (생성 함수명, 다운로드 파일명)
+MANUALS = {
+    'teacher': ('build_teacher_manual_pdf', 'MOMOAI_강사사용설명서'),
+    'student': ('build_student_manual_pdf', 'MOMOAI_학생사용설명서'),
+    'parent': ('build_parent_manual_pdf', 'MOMOAI_학부모사용설명서'),
+    'admin': ('build_admin_manual_pdf', 'MOMOAI_관리자사용설명서'),
+}
+
+
+def build_manual_pdf(role):
+    """역할별 사용 설명서 PDF bytes 생성 (렌더 워커 프로세스에서 호출)"""
+    return globals()[MANUALS[role][0]]()
+
+
+def _manual_response(role):
+    """사용 설명서 다운로드 응답 — 앱 시작 시 미리 만들어 둔 캐시 파일 사용"""
+    from app.utils.pdf_render import manual_pdf
+    with open(manual_pdf(role), 'rb') as f:
+        return create_pdf_response(BytesIO(f.read()), MANUALS[role][1])
+
+
+def generate_teacher_manual_pdf():
+    """강사 사용 설명서 PDF 다운로드"""
+    return _manual_response('teacher')
+
+
+def generate_student_manual_pdf():
+    """학생 사용 설명서 PDF 다운로드"""
+    return _manual_response('student')
+
+
+def generate_parent_manual_pdf():
+    """학부모 사용 설명서 PDF 다운로드"""
+    return _manual_response('parent')
+
+
+def generate_admin_manual_pdf():
+    """관리자 사용 설명서 PDF 다운로드"""
+    return _manual_response('admin')
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""현재 사용자 범위 (학생 레코드 / 자녀 / 수강 수업 / 담당 학생)
+
+포털·권한 헬퍼가 요청마다 여러 번
+Student.query.filter_by(user_id=...) / filter_by(email=current_user.email), ParentStudent 자녀 목록,
+get_active_student_ids_for_teacher()를 다시 조회하지 않도록 한 곳에서 푼다.
+
+- 범위: 사용자별 ID 묶음만 보관 (학생 레코드 ID, 자녀 ID, 본인·자녀의 active 수강 수업,
+  강사의 active 수강 학생 / 하크니스 담당 수업)
+- 캐시: 요청 동안은 flask.g, 요청 사이에는 PRINCIPAL_CACHE_TTL(초) 동안 프로세스 캐시
+- 객체: principal.student / principal.children은 요청 세션에서 기본키로 읽는다 (상태 등은 항상 최신)
+
+수강 / 자녀 연결 / 수업 담당·종료 / 학생 계정 연결이 커밋되면 캐시를 비운다 (세션 훅).
+캐시는 프로세스별이므로 다른 워커에는 TTL 이내로 반영된다.
+
+principal.student(current_student)는 email 일치로도 학생 레코드를 찾으므로 포털 화면 표시용이다.
+결제·줌 입장·티어 같은 권한 판단은 linked_student()를 쓴다 — user_id로 연결된 레코드만,
+프로세스 캐시 없이 요청(flask.g) 안에서만 기억한다.
+"""
+import threading
+import time
+
+from sqlalchemy import event, inspect
+
+DEFAULT_TTL = 60          # 초
+MAX_ENTRIES = 5000        # 초과 시 만료된 항목 정리
+
+_G_KEY = '_principals'
+_LINKED_KEY = '_linked_students'
+_DIRTY_KEY = 'principal_dirty'
+
+_cache = {}        # user_id → (만료 시각, scope)
+_lock = threading.Lock()
+
+
+def _ttl():
+    from flask import current_app
+    return current_app.config.get('PRINCIPAL_CACHE_TTL', DEFAULT_TTL)
+
+
+def invalidate(user_ids=None):
+    """사용자 범위 캐시 삭제 (user_ids가 None이면 전체). 현재 요청의 범위도 함께 버린다."""
+    from flask import g, has_app_context
+    with _lock:
+        if user_ids is None:
+            _cache.clear()
+        else:
+            for uid in user_ids:
+                _cache.pop(uid, None)
+    if has_app_context():
+        if user_ids is None:
+            g.pop(_G_KEY, None)
+            g.pop(_LINKED_KEY, None)
+        else:
+            for key in (_G_KEY, _LINKED_KEY):
+                memo = g.get(key) or {}
+                for uid in user_ids:
+                    memo.pop(uid, None)
+
+
+# ------------------------------------------------------------------ #
+#  범위 계산                                                           #
+# ------------------------------------------------------------------ #
+
+def _student_id_for(user):
+    """학생 계정의 학생 레코드 ID — user_id 연결 우선, 없으면 email 일치 (포털의 기존 조회 순서)"""
+    from app.models import db, Student
+    conditions = [Student.user_id == user.user_id]
+    if user.email:
+        conditions.append(Student.email == user.email)
+    return db.session.query(Student.student_id).filter(db.or_(*conditions)).order_by(
+        db.case((Student.user_id == user.user_id, 0), else_=1)
+    ).limit(1).scalar()
+
+
+def compute_scope(user):
+    """캐시 없이 사용자 범위 계산 → dict (ID만)"""
+    from app.models import db, Course, CourseEnrollment, ParentStudent, Student
+    from app.utils.enrollment_utils import get_active_student_ids_for_teacher
+
+    student_id = _student_id_for(user)
+
+    child_ids = tuple(row[0] for row in db.session.query(ParentStudent.student_id).join(
+        Student, Student.student_id == ParentStudent.student_id
+    ).filter(
+        ParentStudent.parent_id == user.user_id,
+        ParentStudent.is_active == True  # noqa: E712
+    ).order_by(ParentStudent.created_at, ParentStudent.relation_id))
+
+    # 본인·자녀의 active 수강 수업 (수업 종료 여부와 무관 — 기존 권한 판단과 동일)
+    courses = {}
+    student_ids = [sid for sid in (student_id,) + child_ids if sid]
+    if student_ids:
+        rows = db.session.query(
+            CourseEnrollment.student_id, Course.course_id, Course.grade, Course.course_type
+        ).join(Course, CourseEnrollment.course_id == Course.course_id).filter(
+            CourseEnrollment.student_id.in_(student_ids),
+            CourseEnrollment.status == 'active'
+        ).all()
+        for sid, course_id, grade, course_type in rows:
+            courses.setdefault(sid, []).append((course_id, grade, course_type))
+
+    taught_student_ids = frozenset()
+    taught_harkness_course_ids = frozenset()
+    if user.role not in ('student', 'parent'):
+        taught_student_ids = frozenset(get_active_student_ids_for_teacher(user.user_id))
+        taught_harkness_course_ids = frozenset(row[0] for row in db.session.query(Course.course_id).filter(
+            Course.teacher_id == user.user_id,
+            Course.course_type == '하크니스'
+        ))
+
+    return {
+        'student_id': student_id,
+        'child_ids': child_ids,
+        'courses': {sid: tuple(items) for sid, items in courses.items()},
+        'taught_student_ids': taught_student_ids,
+        'taught_harkness_course_ids': taught_harkness_course_ids,
+    }
+
+
+def _cached_scope(user):
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(user.user_id)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    scope = compute_scope(user)
+    with _lock:
+        if len(_cache) >= MAX_ENTRIES:
+            for uid in [uid for uid, (exp, _) in _cache.items() if exp <= now]:
+                del _cache[uid]
+        _cache[user.user_id] = (now + _ttl(), scope)
+    return scope
+
+
+class Principal:
+    """
+    요청 동안 쓰는 사용자 범위
+
+        principal = get_principal()
+        student = principal.student                 # 학생 계정의 학생 레코드 (없으면 None)
+        principal.is_parent_of(student_id)
+        principal.course_ids(student_id)            # active 수강 수업 ID
+    """
+
+    def __init__(self, user, scope):
+        self.user_id = user.user_id
+        self.role = user.role
+        self.student_id = scope['student_id']
+        self.child_ids = scope['child_ids']
+        self.taught_student_ids = scope['taught_student_ids']
+        self.taught_harkness_course_ids = scope['taught_harkness_course_ids']
+        self._courses = scope['courses']
+        self._children = None
+
+    @property
+    def student(self):
+        """학생 레코드 (요청 세션의 identity map을 거쳐 기본키 조회)"""
+        if not self.student_id:
+            return None
+        from app.models import db, Student
+        return db.session.get(Student, self.student_id)
+
+    @property
+    def children(self):
+        """연결된 자녀 Student 목록 (연결 순서, 한 번의 IN 조회)"""
+        if self._children is None:
+            from app.models import Student
+            found = {s.student_id: s for s in Student.query.filter(
+                Student.student_id.in_(self.child_ids)
+            )} if self.child_ids else {}
+            self._children = [found[sid] for sid in self.child_ids if sid in found]
+        return list(self._children)
+
+    def is_parent_of(self, student_id):
+        return student_id in self.child_ids
+
+    def covers(self, student_id):
+        """수강 범위를 들고 있는 학생인지 (본인 또는 자녀)"""
+        return bool(student_id) and (student_id == self.student_id or student_id in self.child_ids)
+
+    def courses(self, student_id=None):
+        """active 수강 수업 [(course_id, grade, course_type), ...] (기본: 본인)"""
+        return self._courses.get(student_id or self.student_id, ())
+
+    def course_ids(self, student_id=None):
+        return {c[0] for c in self.courses(student_id)}
+
+    def harkness_course_ids(self, student_id=None):
+        return {c[0] for c in self.courses(student_id) if c[2] == '하크니스'}
+
+
+def get_principal(user=None):
+    """사용자 범위 (기본: current_user). 요청 안에서는 한 번만 만든다. 비로그인이면 None."""
+    from flask import g, has_app_context
+    if user is None:
+        from flask_login import current_user
+        user = current_user
+    if not getattr(user, 'is_authenticated', False):
+        return None
+
+    memo = g.setdefault(_G_KEY, {}) if has_app_context() else {}
+    principal = memo.get(user.user_id)
+    if principal is None or principal.role != user.role:
+        principal = Principal(user, _cached_scope(user))
+        memo[user.user_id] = principal
+    return principal
+
+
+def current_student():
+    """현재 로그인한 학생 계정의 학생 레코드 (없으면 None)"""
+    principal = get_principal()
+    return principal.student if principal else None
+
+
+def linked_student_id(user=None):
+    """user_id로 연결된 학생 레코드 ID (권한 판단용 — email 일치는 보지 않음). 비로그인이면 None.
+
+    프로세스 캐시를 거치지 않고 요청(flask.g) 안에서만 기억한다.
+    """
+    from flask import g, has_app_context
+    if user is None:
+        from flask_login import current_user
+        user = current_user
+    if not getattr(user, 'is_authenticated', False):
+        return None
+
+    memo = g.setdefault(_LINKED_KEY, {}) if has_app_context() else {}
+    if user.user_id not in memo:
+        from app.models import db, Student
+        memo[user.user_id] = db.session.query(Student.student_id).filter(
+            Student.user_id == user.user_id
+        ).order_by(Student.student_id).limit(1).scalar()
+    return memo[user.user_id]
+
+
+def linked_student(user=None):
+    """user_id로 연결된 학생 레코드 (권한 판단용, 없으면 None)"""
+    student_id = linked_student_id(user)
+    if not student_id:
+        return None
+    from app.models import db, Student
+    return db.session.get(Student, student_id)
+
+
+def enrolled_courses(student_id, user=None):
+    """학생의 active 수강 수업 [(course_id, grade, course_type), ...]
+
+    사용자 범위에 있는 학생(본인/자녀)이면 캐시에서, 아니면 한 번 조회한다.
+    """
+    principal = get_principal(user)
+    if principal and principal.covers(student_id):
+        return principal.courses(student_id)
+
+    from app.models import db, Course, CourseEnrollment
+    return tuple(db.session.query(Course.course_id, Course.grade, Course.course_type).join(
+        CourseEnrollment, CourseEnrollment.course_id == Course.course_id
+    ).filter(
+        CourseEnrollment.student_id == student_id,
+        CourseEnrollment.status == 'active'
+    ).all())
+
+
+# ------------------------------------------------------------------ #
+#  커밋 시 캐시 무효화                                                 #
+# ------------------------------------------------------------------ #
+
+def _mark_dirty(session, user_ids=None):
+    dirty = session.info.setdefault(_DIRTY_KEY, {'users': set(), 'all': False})
+    if user_ids is None:
+        dirty['all'] = True
+    else:
+        dirty['users'].update(uid for uid in user_ids if uid)
+
+
+def _changed(obj, session, attrs):
+    if obj not in session.dirty:
+        return True
+    state = inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in attrs)
+
+
+def _watched():
+    """바뀌면 여러 사용자의 범위가 달라지는 모델 → 감시 컬럼 (새 행 / 삭제는 항상)"""
+    from app.models import Course, CourseEnrollment, Student
+    return {
+        CourseEnrollment: ('status', 'course_id', 'student_id'),
+        Course: ('teacher_id', 'is_terminated', 'course_type', 'grade'),
+        Student: ('email', 'user_id'),
+    }
+
+
+def _after_flush(session, flush_context):
+    from app.models import User, ParentStudent
+    from app.utils.attendance_rollup import _old_and_new
+
+    watched = _watched()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if type(obj) in watched:
+            if _changed(obj, session, watched[type(obj)]):
+                # 수강·수업 변경은 학생/학부모/강사 여러 사용자에 걸치므로 전체
+                _mark_dirty(session)
+        elif isinstance(obj, ParentStudent):
+            _mark_dirty(session, _old_and_new(inspect(obj), 'parent_id'))
+        elif isinstance(obj, User):
+            if _changed(obj, session, ('email', 'role')):
+                _mark_dirty(session, [obj.user_id])
+
+
+def _on_bulk_statement(orm_execute_state):
+    """Query.update()/delete() 등 대상 사용자를 알 수 없는 일괄 변경 → 전체 무효화"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    from app.models import User, ParentStudent
+    if mapper.class_ in _watched() or mapper.class_ in (ParentStudent, User):
+        _mark_dirty(orm_execute_state.session)
+
+
+def _after_commit(session):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+    invalidate(None if dirty['all'] else dirty['users'])
+
+
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def init_principal(app):
+    """캐시 무효화용 세션 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'do_orm_execute', _on_bulk_statement)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
@@ -1,44 +1,103 @@
 # -*- coding: utf-8 -*-
-"""Web Push 알림 발송 유틸리티"""
+"""Web Push 알림 발송 유틸리티
+
+발송 요청마다 스레드를 띄우지 않고, 프로세스당 1개의 PushDispatcher가
+고정된 수의 워커 스레드로 큐를 처리한다.
+
+- 대량 발송은 사용자 묶음(CHUNK_SIZE) 단위로 나눠 워커에 분배
+- 묶음마다 구독 정보를 한 번에 조회, 만료 구독은 한 번에 삭제
+- 워커 스레드별로 Push 서비스(origin)마다 requests.Session을 재사용 (keep-alive)
+- queue_push(): 현재 DB 트랜잭션이 커밋된 뒤에 발송 (롤백되면 취소)
+"""
 import json
+import logging
+import os
+import queue
 import threading
+from urllib.parse import urlsplit
 
+from sqlalchemy import event
 
-def send_push_to_user(user_id, title, body, url='/notifications'):
-    """특정 사용자의 모든 Push 구독에 알림 발송 (백그라운드 스레드)"""
-    from flask import current_app
-    app = current_app._get_current_object()
-    t = threading.Thread(target=_do_send_push, args=(app, user_id, title, body, url), daemon=True)
-    t.start()
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 50
+DEFAULT_WORKERS = 4
+MAX_QUEUE = 10000
+EXPIRED_CODES = (400, 403, 404, 410)
+
+
+class PushDispatcher:
+    """Push 발송기 (프로세스당 1개, 워커 스레드 N개)"""
+
+    def __init__(self, app, workers=DEFAULT_WORKERS, max_queue=MAX_QUEUE):
+        self.app = app
+        self.pid = os.getpid()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._local = threading.local()
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._run, name=f'push-dispatcher-{i}', daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, user_ids, title, body, url):
+        """발송 요청 등록 (사용자 묶음 단위로 분할). Returns: 등록된 묶음 수"""
+        user_ids = list(dict.fromkeys(uid for uid in user_ids if uid))
+        submitted = 0
+        for i in range(0, len(user_ids), CHUNK_SIZE):
+            try:
+                self._queue.put_nowait((user_ids[i:i + CHUNK_SIZE], title, body, url))
+                submitted += 1
+            except queue.Full:
+                logger.warning(f'[Push] 발송 큐 가득 참 — {len(user_ids) - i}명 발송 생략')
+                break
+        return submitted
 
+    def join(self):
+        """등록된 발송이 모두 끝날 때까지 대기 (스크립트/테스트용)"""
+        self._queue.join()
 
-def _do_send_push(app, user_id, title, body, url):
-    """실제 Push 발송 (백그라운드에서 실행)"""
-    with app.app_context():
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                with self.app.app_context():
+                    self._deliver(*item)
+            except Exception as e:
+                logger.warning(f'[Push] 발송 오류: {e}')
+            finally:
+                self._queue.task_done()
+
+    def _session_for(self, endpoint):
+        """워커 스레드별 · Push 서비스 origin별 HTTP 세션 (연결 재사용)"""
+        import requests
+        sessions = getattr(self._local, 'sessions', None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        parts = urlsplit(endpoint)
+        origin = f'{parts.scheme}://{parts.netloc}'
+        session = sessions.get(origin)
+        if session is None:
+            session = sessions[origin] = requests.Session()
+        return session
+
+    def _deliver(self, user_ids, title, body, url):
+        """사용자 묶음의 모든 Push 구독에 발송"""
         from app.models.push_subscription import PushSubscription
         from app.models import db
+        from pywebpush import webpush, WebPushException
 
+        app = self.app
         vapid_private_key = app.config.get('VAPID_PRIVATE_KEY')
         vapid_claims_sub = app.config.get('VAPID_CLAIMS_SUB', 'mailto:contact@momoai.kr')
 
-        if not vapid_private_key:
-            app.logger.warning('[Push] VAPID_PRIVATE_KEY not set — skipping push')
-            return
-
-        try:
-            from pywebpush import webpush, WebPushException
-        except ImportError:
-            app.logger.warning('[Push] pywebpush not installed — skipping push')
-            return
-
-        subscriptions = PushSubscription.query.filter_by(user_id=user_id).all()
+        subscriptions = PushSubscription.query.filter(PushSubscription.user_id.in_(user_ids)).all()
         if not subscriptions:
-            app.logger.info(f'[Push] No subscriptions for user {user_id}')
             return
 
-        app.logger.info(f'[Push] Sending to user {user_id}: {len(subscriptions)} subscription(s)')
+        data = json.dumps({'title': title, 'body': body, 'url': url})
         expired_ids = []
-
+        sent = 0
         for sub in subscriptions:
             try:
                 webpush(
@@ -46,26 +105,104 @@ def _do_send_push(app, user_id, title, body, url):
                         'endpoint': sub.endpoint,
                         'keys': {'p256dh': sub.p256dh, 'auth': sub.auth}
                     },
-                    data=json.dumps({'title': title, 'body': body, 'url': url}),
+                    data=data,
                     vapid_private_key=vapid_private_key,
-                    vapid_claims={'sub': vapid_claims_sub}
+                    vapid_claims={'sub': vapid_claims_sub},
+                    requests_session=self._session_for(sub.endpoint),
                 )
-                app.logger.info(f'[Push] Sent OK to sub #{sub.id}')
+                sent += 1
             except WebPushException as e:
-                status = e.response.status_code if e.response else 'no-response'
+                status = e.response.status_code if e.response is not None else 'no-response'
                 app.logger.warning(f'[Push] WebPushException sub#{sub.id} status={status}: {e}')
                 # e.response가 None이어도 메시지에서 만료 상태코드 감지
-                expired_codes = (400, 403, 404, 410)
                 is_expired = (
-                    (e.response and e.response.status_code in expired_codes) or
-                    any(str(code) in str(e) for code in expired_codes)
+                    (e.response is not None and e.response.status_code in EXPIRED_CODES) or
+                    any(str(code) in str(e) for code in EXPIRED_CODES)
                 )
                 if is_expired:
                     expired_ids.append(sub.id)
             except Exception as e:
                 app.logger.warning(f'[Push] Unexpected error sub#{sub.id}: {e}')
 
+        app.logger.info(f'[Push] {len(user_ids)}명 / 구독 {len(subscriptions)}건 중 {sent}건 발송')
         if expired_ids:
             app.logger.info(f'[Push] Removing {len(expired_ids)} expired subscription(s)')
-            PushSubscription.query.filter(PushSubscription.id.in_(expired_ids)).delete()
+            PushSubscription.query.filter(PushSubscription.id.in_(expired_ids)).delete(
+                synchronize_session=False)
             db.session.commit()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher(app):
+    """현재 프로세스의 Push 발송기 (fork 이후 프로세스마다 1개)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None or _dispatcher.pid != os.getpid():
+            _dispatcher = PushDispatcher(
+                app, workers=app.config.get('PUSH_DISPATCH_WORKERS') or DEFAULT_WORKERS)
+    return _dispatcher
+
+
+def _push_enabled(app):
+    if not app.config.get('VAPID_PRIVATE_KEY'):
+        app.logger.warning('[Push] VAPID_PRIVATE_KEY not set — skipping push')
+        return False
+    try:
+        import pywebpush  # noqa: F401
+    except ImportError:
+        app.logger.warning('[Push] pywebpush not installed — skipping push')
+        return False
+    return True
+
+
+def send_push_to_users(user_ids, title, body, url='/notifications'):
+    """여러 사용자의 모든 Push 구독에 알림 발송 (발송기 큐에 등록 후 즉시 반환)"""
+    from flask import current_app
+    app = current_app._get_current_object()
+    if not user_ids or not _push_enabled(app):
+        return
+    get_dispatcher(app).submit(user_ids, title, body, url)
+
+
+def send_push_to_user(user_id, title, body, url='/notifications'):
+    """특정 사용자의 모든 Push 구독에 알림 발송 (발송기 큐에 등록 후 즉시 반환)"""
+    send_push_to_users([user_id], title, body, url)
+
+
+# ------------------------------------------------------------------ #
+#  트랜잭션 커밋 후 발송                                               #
+# ------------------------------------------------------------------ #
+
+_PENDING_KEY = 'pending_pushes'
+
+
+def queue_push(user_ids, title, body, url='/notifications'):
+    """현재 세션이 커밋되면 발송 (롤백 시 취소). 커밋 밖에서 호출해도 다음 커밋 때 발송된다."""
+    from app.models import db
+    db.session.info.setdefault(_PENDING_KEY, []).append((list(user_ids), title, body, url))
+
+
+def _flush_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    try:
+        for user_ids, title, body, url in pending:
+            send_push_to_users(user_ids, title, body, url)
+    except Exception as e:
+        logger.warning(f'[Push] 커밋 후 발송 등록 실패: {e}')
+
+
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_push(app):
+    """queue_push()용 세션 커밋/롤백 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'after_commit', _flush_pending):
+        event.listen(db.session, 'after_commit', _flush_pending)
+        event.listen(db.session, 'after_rollback', _discard_pending)
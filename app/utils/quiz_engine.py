@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""어휘퀴즈 / 스키마퀴즈 출제·채점 엔진
+
+문제 화면을 열 때마다 레벨(주제) 전체 문제를 읽고 random.sample을 다시 돌리지 않도록
+
+- 세션 시작 시 문제 세트를 한 번 뽑아 세션(question_ids)에 순서대로 고정
+- 문제 본문은 종류·레벨(주제)별 문제은행을 프로세스 메모리에 QUIZ_BANK_TTL(초) 동안 캐싱
+- 답안은 여러 문제를 한 번에 받아 채점하고 결과 행을 한꺼번에 추가 (호출한 쪽에서 1회 커밋)
+
+채점은 고정된 순서의 다음 미응답 문제부터 진행하므로 같은 답안을 두 번 보내도
+중복 집계되지 않는다. 채점은 서버(grade)에서만 하고, 풀이 화면에는 정답을 뺀
+public_questions()만 내려준다 (정답·정오는 제출 응답으로 받는다). 문제가 추가/수정/삭제되어 커밋되면 세션 훅이 캐시를 비운다
+(캐시는 프로세스별이므로 다른 워커에는 TTL 이내로 반영된다).
+"""
+import json
+import random
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+QUESTION_COUNT = 10
+DEFAULT_TTL = 300         # 초
+
+VOCABULARY = 'vocabulary'
+SCHEMA = 'schema'
+
+_DIRTY_KEY = 'quiz_bank_dirty'
+
+_banks = {}        # (종류, 레벨/주제) → (만료 시각, {quiz_id: 문제 dict})
+_lock = threading.Lock()
+
+
+def _models(kind):
+    """종류별 (문제, 세션, 결과) 모델과 문제은행 구분 컬럼명"""
+    if kind == VOCABULARY:
+        from app.models.vocabulary_quiz import VocabularyQuiz, VocabularyQuizSession, VocabularyQuizResult
+        return VocabularyQuiz, VocabularyQuizSession, VocabularyQuizResult, 'level'
+    if kind == SCHEMA:
+        from app.models.schema_quiz import SchemaQuiz, SchemaQuizSession, SchemaQuizResult
+        return SchemaQuiz, SchemaQuizSession, SchemaQuizResult, 'subject'
+    raise ValueError(f'알 수 없는 퀴즈 종류: {kind}')
+
+
+def _ttl():
+    from flask import current_app
+    return current_app.config.get('QUIZ_BANK_TTL', DEFAULT_TTL)
+
+
+def _vocabulary_item(quiz):
+    try:
+        options = json.loads(quiz.options)
+    except (TypeError, ValueError):
+        options = [quiz.correct_answer, "오답1", "오답2", "오답3"]
+    return {
+        'quiz_id': quiz.quiz_id,
+        'word': quiz.word,
+        'meaning': quiz.meaning,
+        'example': quiz.example,
+        'options': options,
+        'correct_answer': quiz.correct_answer,
+    }
+
+
+def _schema_item(quiz):
+    from app.utils.korean_utils import get_chosung
+    return {
+        'quiz_id': quiz.quiz_id,
+        'term': quiz.term,
+        'definition': quiz.definition,
+        'example': quiz.example,
+        'category': quiz.category,
+        'correct_answer': quiz.correct_answer,
+        'chosung_hint': get_chosung(quiz.term),    # 초성 힌트 (정답 용어의 초성)
+    }
+
+
+def get_bank(kind, key):
+    """
+    레벨(어휘) / 주제(스키마)별 문제은행
+
+    Returns:
+        {quiz_id: 문제 dict} — 캐시 공유 객체이므로 수정하지 말 것
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _banks.get((kind, key))
+        if cached and cached[0] > now:
+            return cached[1]
+
+    quiz_model, _, _, key_column = _models(kind)
+    to_item = _vocabulary_item if kind == VOCABULARY else _schema_item
+    quizzes = quiz_model.query.filter(getattr(quiz_model, key_column) == key)\
+        .order_by(quiz_model.created_at, quiz_model.quiz_id).all()
+    bank = {quiz.quiz_id: to_item(quiz) for quiz in quizzes}
+
+    with _lock:
+        _banks[(kind, key)] = (now + _ttl(), bank)
+    return bank
+
+
+def invalidate(kind=None):
+    """문제은행 캐시 삭제 (kind가 None이면 전체)"""
+    with _lock:
+        if kind is None:
+            _banks.clear()
+            return
+        for cache_key in [k for k in _banks if k[0] == kind]:
+            _banks.pop(cache_key, None)
+
+
+def _bank_key(kind, quiz_session):
+    return quiz_session.level if kind == VOCABULARY else quiz_session.subject
+
+
+def freeze_questions(kind, quiz_session, count=QUESTION_COUNT):
+    """
+    문제 세트를 뽑아 세션에 고정 (커밋은 호출한 쪽에서)
+
+    Returns:
+        고정된 quiz_id 목록 (문제은행이 비어 있으면 빈 목록)
+    """
+    bank = get_bank(kind, _bank_key(kind, quiz_session))
+    question_ids = random.sample(list(bank), min(count, len(bank)))
+    quiz_session.question_ids = question_ids
+    return question_ids
+
+
+def session_questions(kind, quiz_session):
+    """
+    세션에 고정된 문제 목록 (순서 유지)
+
+    문제 세트가 없는 세션(도입 이전 세션)은 이때 고정한다 — 호출한 쪽에서 커밋.
+    어휘 선택지는 세션·문제별로 고정된 순서로 섞어 새로고침해도 바뀌지 않는다.
+    """
+    if quiz_session.question_ids is None:
+        freeze_questions(kind, quiz_session)
+
+    bank = get_bank(kind, _bank_key(kind, quiz_session))
+    questions = []
+    for quiz_id in quiz_session.question_ids:
+        item = bank.get(quiz_id)
+        if item is None:
+            continue    # 출제 후 삭제된 문제
+        if kind == VOCABULARY:
+            options = list(item['options'])
+            random.Random(f'{quiz_session.session_id}:{quiz_id}').shuffle(options)
+            item = dict(item, options=options)
+        questions.append(item)
+    return questions
+
+
+def public_questions(kind, questions):
+    """풀이 화면에 내려줄 문제 목록 — 정답(어휘 correct_answer / 스키마 term)과 뜻풀이는 뺀다"""
+    if kind == VOCABULARY:
+        return [{'quiz_id': q['quiz_id'], 'word': q['word'], 'options': q['options']} for q in questions]
+    # 스키마 문제 본문은 correct_answer 컬럼(용어 설명)에 있고 정답은 term
+    return [{'quiz_id': q['quiz_id'], 'question': q['correct_answer'], 'category': q['category'],
+             'chosung_hint': q['chosung_hint']} for q in questions]
+
+
+def grade(kind, item, answer):
+    """문제 1개 채점 (어휘: 선택지 일치, 스키마: 용어 유사도)"""
+    if kind == VOCABULARY:
+        return answer == item['correct_answer']
+    from app.utils.korean_utils import check_answer_similarity
+    return check_answer_similarity(answer, item['term'])
+
+
+def submit_answers(kind, quiz_session, student_id, answers):
+    """
+    답안 일괄 채점 + 결과 행 추가 + 세션 통계 갱신 (커밋은 호출한 쪽에서 1회)
+
+    고정된 순서에서 아직 채점하지 않은 문제부터 answers에 있는 만큼 연속으로 채점한다.
+    이미 채점한 문제의 답안은 무시되고, 마지막 문제까지 채점되면 점수와 완료 시각을 기록한다.
+
+    Args:
+        answers: {quiz_id: 답안}
+
+    Returns:
+        채점 결과 목록 [{'quiz_id', 'answer', 'is_correct', 'correct_answer'}]
+    """
+    from app.models import db
+
+    _, _, result_model, _ = _models(kind)
+    questions = session_questions(kind, quiz_session)
+    answered = quiz_session.total_questions or 0
+
+    graded, rows = [], []
+    for item in questions[answered:]:
+        if item['quiz_id'] not in answers:
+            break
+        answer = (answers[item['quiz_id']] or '').strip()
+        is_correct = grade(kind, item, answer)
+        fields = dict(student_id=student_id, quiz_id=item['quiz_id'],
+                      student_answer=answer, is_correct=is_correct)
+        if kind == SCHEMA:
+            fields['session_id'] = quiz_session.session_id
+        rows.append(result_model(**fields))
+        graded.append({
+            'quiz_id': item['quiz_id'],
+            'answer': answer,
+            'is_correct': is_correct,
+            'correct_answer': item['term'] if kind == SCHEMA else item['correct_answer'],
+        })
+
+    if not graded:
+        return graded
+
+    db.session.add_all(rows)
+    quiz_session.total_questions = answered + len(graded)
+    quiz_session.correct_count = (quiz_session.correct_count or 0) + sum(g['is_correct'] for g in graded)
+    if quiz_session.total_questions >= len(questions):
+        finish_session(quiz_session)
+    return graded
+
+
+def finish_session(quiz_session):
+    """점수(%)와 완료 시각 기록 (푼 문제가 없으면 그대로 둔다)"""
+    if quiz_session.total_questions and not quiz_session.completed_at:
+        quiz_session.score = (quiz_session.correct_count / quiz_session.total_questions) * 100
+        quiz_session.completed_at = datetime.utcnow()
+
+
+# ------------------------------------------------------------------ #
+#  문제 변경 커밋 시 캐시 무효화                                       #
+# ------------------------------------------------------------------ #
+
+def _after_flush(session, flush_context):
+    from app.models.vocabulary_quiz import VocabularyQuiz
+    from app.models.schema_quiz import SchemaQuiz
+
+    dirty = session.info.setdefault(_DIRTY_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, VocabularyQuiz):
+            dirty.add(VOCABULARY)
+        elif isinstance(obj, SchemaQuiz):
+            dirty.add(SCHEMA)
+
+
+def _on_bulk_statement(orm_execute_state):
+    """Query.update()/delete()로 문제를 일괄 변경한 경우"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    from app.models.vocabulary_quiz import VocabularyQuiz
+    from app.models.schema_quiz import SchemaQuiz
+    kinds = {VocabularyQuiz: VOCABULARY, SchemaQuiz: SCHEMA}
+    if mapper.class_ in kinds:
+        orm_execute_state.session.info.setdefault(_DIRTY_KEY, set()).add(kinds[mapper.class_])
+
+
+def _after_commit(session):
+    for kind in session.info.pop(_DIRTY_KEY, None) or ():
+        invalidate(kind)
+
+
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def init_quiz_bank(app):
+    """문제은행 캐시 무효화용 세션 훅 등록"""
+    from app.models import db
+    # 퀴즈 모델은 app.models에서 내보내지 않으므로 여기서 매퍼를 등록해 둔다
+    # (첫 flush 중에 처음 import되면 Student 백레퍼런스가 그때서야 생김)
+    import app.models.vocabulary_quiz  # noqa: F401
+    import app.models.schema_quiz  # noqa: F401
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'do_orm_execute', _on_bulk_statement)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
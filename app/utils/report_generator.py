@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 """학생 리포트 생성 유틸리티"""
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_
-from app.models import db, Student, CourseEnrollment, Attendance
-from app.models.essay import Essay, EssayVersion
+from app.models import Student
+from app.models.essay import Essay
+from app.utils import attendance_rollup
+from app.utils.score_cohorts import TOTAL_METRIC, cohort_distributions, latest_scores, percentile
 
 
 class ReportGenerator:
@@ -19,6 +20,9 @@ class ReportGenerator:
         self.student = Student.query.get_or_404(student_id)
         self.end_date = end_date or datetime.utcnow()
         self.start_date = start_date or (self.end_date - timedelta(days=30))
+        self._essays = None
+        self._scores = None
+        self._attendance = None
 
     def generate_report(self):
         """전체 리포트 데이터 생성"""
@@ -37,30 +41,36 @@ class ReportGenerator:
             'summary': self._generate_summary()
         }
 
+    def _get_essays(self):
+        """기간 내 첨삭 전체 (생성일 순)"""
+        if self._essays is None:
+            self._essays = Essay.query.filter(
+                Essay.student_id == self.student.student_id,
+                Essay.created_at >= self.start_date,
+                Essay.created_at <= self.end_date
+            ).order_by(Essay.created_at.asc()).all()
+        return self._essays
+
+    def _get_scores(self):
+        """기간 내 완료 첨삭의 최신 버전 점수 {essay_id: {'total', 'indicators'}} (첨삭 수와 무관하게 2쿼리)"""
+        if self._scores is None:
+            self._scores = latest_scores(
+                Essay.student_id == self.student.student_id,
+                Essay.created_at >= self.start_date,
+                Essay.created_at <= self.end_date
+            )
+        return self._scores
+
     def _get_essay_statistics(self):
         """첨삭 통계"""
-        essays = Essay.query.filter(
-            Essay.student_id == self.student.student_id,
-            Essay.created_at >= self.start_date,
-            Essay.created_at <= self.end_date
-        ).all()
-
+        essays = self._get_essays()
         completed_essays = [e for e in essays if e.status == 'completed']
+        scores = self._get_scores()
 
         # 평균 점수 계산
-        total_score = 0
-        score_count = 0
-
-        for essay in completed_essays:
-            latest_version = EssayVersion.query.filter_by(
-                essay_id=essay.essay_id
-            ).order_by(EssayVersion.version_number.desc()).first()
-
-            if latest_version and latest_version.total_score:
-                total_score += latest_version.total_score
-                score_count += 1
-
-        avg_score = (total_score / score_count) if score_count > 0 else 0
+        totals = [scores[e.essay_id]['total'] for e in completed_essays
+                  if e.essay_id in scores and scores[e.essay_id]['total']]
+        avg_score = (sum(totals) / len(totals)) if totals else 0
 
         return {
             'total': len(essays),
@@ -71,76 +81,38 @@ class ReportGenerator:
         }
 
     def _get_attendance_statistics(self):
-        """출석 통계"""
-        # 학생의 모든 수강 신청
-        enrollments = CourseEnrollment.query.filter_by(
-            student_id=self.student.student_id
-        ).all()
-
-        total_sessions = 0
-        attended = 0
-        absent = 0
-        late = 0
-
-        for enrollment in enrollments:
-            attendances = Attendance.query.filter(
-                Attendance.enrollment_id == enrollment.enrollment_id,
-                Attendance.session_date >= self.start_date,
-                Attendance.session_date <= self.end_date
-            ).all()
-
-            for att in attendances:
-                total_sessions += 1
-                if att.status == 'present':
-                    attended += 1
-                elif att.status == 'absent':
-                    absent += 1
-                elif att.status == 'late':
-                    late += 1
-
-        attendance_rate = (attended / total_sessions * 100) if total_sessions > 0 else 0
-
-        return {
-            'total_sessions': total_sessions,
-            'attended': attended,
-            'absent': absent,
-            'late': late,
-            'attendance_rate': round(attendance_rate, 1)
+        """출석 통계 (출결 집계 테이블 1쿼리)"""
+        if self._attendance is not None:
+            return self._attendance
+        stats = attendance_rollup.totals(
+            self.start_date.date(), self.end_date.date(), student_id=self.student.student_id
+        )
+        self._attendance = {
+            'total_sessions': stats['total'],
+            'attended': stats['present'],
+            'absent': stats['absent'],
+            'late': stats['late'],
+            'attendance_rate': stats['rate']
         }
+        return self._attendance
 
     def _get_score_analysis(self):
         """지표별 점수 분석"""
-        essays = Essay.query.filter(
-            Essay.student_id == self.student.student_id,
-            Essay.created_at >= self.start_date,
-            Essay.created_at <= self.end_date,
-            Essay.status == 'completed'
-        ).all()
-
-        if not essays:
+        scores = self._get_scores()
+        if not scores:
             return None
 
         # 18개 지표 점수 집계
         indicator_scores = {}
         indicator_counts = {}
 
-        for essay in essays:
-            latest_version = EssayVersion.query.filter_by(
-                essay_id=essay.essay_id
-            ).order_by(EssayVersion.version_number.desc()).first()
-
-            if latest_version and latest_version.scores_json:
-                import json
-                try:
-                    scores = json.loads(latest_version.scores_json)
-                    for indicator, score in scores.items():
-                        if indicator not in indicator_scores:
-                            indicator_scores[indicator] = 0
-                            indicator_counts[indicator] = 0
-                        indicator_scores[indicator] += score
-                        indicator_counts[indicator] += 1
-                except:
-                    pass
+        for entry in scores.values():
+            for indicator, score in entry['indicators'].items():
+                if indicator not in indicator_scores:
+                    indicator_scores[indicator] = 0
+                    indicator_counts[indicator] = 0
+                indicator_scores[indicator] += score
+                indicator_counts[indicator] += 1
 
         # 평균 계산
         avg_scores = {}
@@ -160,23 +132,15 @@ class ReportGenerator:
 
     def _get_progress_analysis(self):
         """진도 분석 (점수 추이)"""
-        essays = Essay.query.filter(
-            Essay.student_id == self.student.student_id,
-            Essay.created_at >= self.start_date,
-            Essay.created_at <= self.end_date,
-            Essay.status == 'completed'
-        ).order_by(Essay.created_at.asc()).all()
+        scores = self._get_scores()
 
         scores_timeline = []
-        for essay in essays:
-            latest_version = EssayVersion.query.filter_by(
-                essay_id=essay.essay_id
-            ).order_by(EssayVersion.version_number.desc()).first()
-
-            if latest_version and latest_version.total_score:
+        for essay in self._get_essays():
+            entry = scores.get(essay.essay_id)
+            if essay.status == 'completed' and entry and entry['total']:
                 scores_timeline.append({
                     'date': essay.created_at.strftime('%Y-%m-%d'),
-                    'score': latest_version.total_score,
+                    'score': entry['total'],
                     'title': essay.title
                 })
 
@@ -193,43 +157,36 @@ class ReportGenerator:
         }
 
     def _get_peer_comparison(self):
-        """동급생 평균과 비교"""
-        # 같은 학년 학생들의 평균 점수
-        same_grade_students = Student.query.filter_by(grade=self.student.grade).all()
-        same_grade_ids = [s.student_id for s in same_grade_students]
-
-        if not same_grade_ids:
-            return None
-
-        # 같은 학년 학생들의 평균 점수 계산
-        peer_essays = Essay.query.filter(
-            Essay.student_id.in_(same_grade_ids),
-            Essay.created_at >= self.start_date,
-            Essay.created_at <= self.end_date,
-            Essay.status == 'completed'
-        ).all()
-
-        peer_total_score = 0
-        peer_count = 0
-
-        for essay in peer_essays:
-            latest_version = EssayVersion.query.filter_by(
-                essay_id=essay.essay_id
-            ).order_by(EssayVersion.version_number.desc()).first()
-
-            if latest_version and latest_version.total_score:
-                peer_total_score += latest_version.total_score
-                peer_count += 1
-
-        peer_avg = (peer_total_score / peer_count) if peer_count > 0 else 0
+        """동급생 평균과 비교 (학년별 점수 분포 집계 1쿼리, 작성일 단위 기간)"""
+        cohort = cohort_distributions(self.student.grade, self.start_date, self.end_date)
+        peer = cohort.get(TOTAL_METRIC)
+        peer_avg = peer['mean'] if peer else 0
 
         # 내 평균
         my_avg = self._get_essay_statistics()['avg_score']
 
+        # 지표별 비교
+        score_analysis = self._get_score_analysis()
+        my_indicators = score_analysis['avg_scores'] if score_analysis else {}
+        indicators = {}
+        for indicator, my_score in my_indicators.items():
+            dist = cohort.get(indicator)
+            if not dist:
+                continue
+            indicators[indicator] = {
+                'my_avg': my_score,
+                'peer_avg': round(dist['mean'], 1),
+                'difference': round(my_score - dist['mean'], 1),
+                'percentile': percentile(dist, my_score)
+            }
+
         return {
             'peer_avg': round(peer_avg, 1),
             'my_avg': my_avg,
-            'difference': round(my_avg - peer_avg, 1)
+            'difference': round(my_avg - peer_avg, 1),
+            'peer_count': peer['count'] if peer else 0,
+            'percentile': percentile(peer, my_avg) if peer and my_avg else None,
+            'indicators': indicators
         }
 
     def _generate_summary(self):
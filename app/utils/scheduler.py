@@ -1,119 +1,253 @@
 # -*- coding: utf-8 -*-
-"""APScheduler 설정 및 예약 작업"""
+"""APScheduler 설정 및 예약 작업
+
+스케줄러는 create_app을 실행한 프로세스에서 시작한다. gunicorn은 preload_app=True라
+마스터 프로세스에서 한 번 시작되고, fork된 워커에는 스케줄러 스레드가 없다 (노드당 1개).
+예약 작업은 DB 리스(scheduler_leases)를 가진 프로세스에서만 실행되며, 리더가 죽거나
+노드가 내려가면 LEASE_SECONDS 안에 다른 노드가 리스를 넘겨받으므로
+여러 앱 노드를 띄워도 작업이 중복·누락되지 않는다.
+"""
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
+from datetime import datetime, time, timedelta
+import atexit
 import logging
+import os
+import socket
 
 logger = logging.getLogger(__name__)
 scheduler = BackgroundScheduler(timezone='Asia/Seoul')
 
+LEASE_NAME = 'scheduler'
+DEFAULT_LEASE_SECONDS = 90
 
-def send_class_reminders(app):
-    """수업 1시간 전 학생·학부모에게 푸시 알림 발송 (30분마다 실행)"""
-    from datetime import datetime, timedelta
+REMINDER_LEAD = timedelta(minutes=60)     # 수업 시작 몇 분 전에 알릴지
+REMINDER_INTERVAL_MINUTES = 5
+
+
+# ------------------------------------------------------------------ #
+#  리더 리스                                                           #
+# ------------------------------------------------------------------ #
+
+def holder_id():
+    """리스 보유자 식별자 (호스트:PID)"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _lease_seconds():
+    from flask import current_app
+    return current_app.config.get('SCHEDULER_LEASE_SECONDS', DEFAULT_LEASE_SECONDS)
+
+
+def acquire_lease(name=LEASE_NAME, holder=None, now=None):
+    """
+    리스 획득 또는 갱신 (앱 컨텍스트 안에서 호출, 결과를 바로 커밋)
+
+    내가 가진 리스이거나 만료된 리스일 때만 조건부 UPDATE로 가져오므로
+    동시에 여러 노드가 시도해도 한 곳만 성공한다.
+
+    Returns:
+        True면 리더
+    """
+    from sqlalchemy import case, or_, update
+    from sqlalchemy.exc import IntegrityError
+    from app.models import db
+    from app.models.scheduler_lease import SchedulerLease
+
+    holder = holder or holder_id()
+    now = now or datetime.utcnow()
+    expires_at = now + timedelta(seconds=_lease_seconds())
+
+    mine = SchedulerLease.holder == holder
+    result = db.session.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(mine, SchedulerLease.expires_at.is_(None), SchedulerLease.expires_at < now),
+        )
+        .values(holder=holder, expires_at=expires_at, renewed_at=now,
+                acquired_at=case((mine, SchedulerLease.acquired_at), else_=now))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        db.session.commit()
+        return True
+
+    if db.session.get(SchedulerLease, name) is not None:
+        db.session.rollback()
+        return False
+
+    try:
+        db.session.add(SchedulerLease(name=name, holder=holder, expires_at=expires_at,
+                                      acquired_at=now, renewed_at=now))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()       # 다른 노드가 먼저 만듦
+        return False
+    logger.info(f'[Scheduler] 리더 리스 획득: {holder}')
+    return True
+
+
+def release_lease(name=LEASE_NAME, holder=None):
+    """내 리스를 즉시 만료 (정상 종료 시 다른 노드가 바로 넘겨받도록)"""
+    from sqlalchemy import update
+    from app.models import db
+    from app.models.scheduler_lease import SchedulerLease
+
+    db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == (holder or holder_id()))
+        .values(expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def run_as_leader(job, app):
+    """리스를 가진(또는 새로 잡은) 프로세스에서만 예약 작업 실행"""
     with app.app_context():
         try:
-            from app.models import db, ParentStudent
-            from app.models.course import CourseSession, CourseEnrollment
-            from app.models.reminder_log import ReminderLog
-            from app.utils.push_utils import send_push_to_user
-
-            now = datetime.now()
-            # 1시간 후 ± 5분 윈도우
-            window_start = (now + timedelta(minutes=55)).time()
-            window_end   = (now + timedelta(minutes=65)).time()
-            today = now.date()
-
-            sessions = CourseSession.query.filter(
-                CourseSession.session_date == today,
-                CourseSession.start_time != None,
-                CourseSession.start_time >= window_start,
-                CourseSession.start_time < window_end,
-                CourseSession.status == 'scheduled'
-            ).all()
+            leader = acquire_lease()
+        except Exception as e:
+            logger.warning(f'[Scheduler] 리스 확인 실패 — {job.__name__} 건너뜀: {e}')
+            return
+    if leader:
+        job(app)
 
-            for session in sessions:
-                # 이미 발송한 세션은 건너뜀
-                if ReminderLog.query.filter_by(session_id=session.session_id).first():
-                    continue
 
-                course = session.course
-                time_str = session.start_time.strftime('%H:%M')
-                title = f'수업 1시간 전 알림'
-                body = f'{course.course_name} 수업이 {time_str}에 시작됩니다.'
+def keep_lease(app):
+    """리더 리스 갱신 (작업이 없는 동안에도 리더를 유지해 노드 간 교대가 잦지 않도록)"""
+    with app.app_context():
+        try:
+            acquire_lease()
+        except Exception as e:
+            logger.warning(f'[Scheduler] 리스 갱신 실패: {e}')
 
-                enrollments = CourseEnrollment.query.filter_by(
-                    course_id=course.course_id, status='active'
-                ).all()
 
-                for enroll in enrollments:
-                    student = enroll.student
-                    if not student:
-                        continue
+def _release_on_exit(app):
+    with app.app_context():
+        try:
+            release_lease()
+        except Exception:
+            pass
 
-                    # 학생 본인
-                    if student.user_id:
-                        send_push_to_user(
-                            user_id=student.user_id,
-                            title=title,
-                            body=body,
-                            url='/student/courses'
-                        )
 
-                    # 학부모
-                    parents = ParentStudent.query.filter_by(
-                        student_id=student.student_id, is_active=True
-                    ).all()
-                    for ps in parents:
-                        send_push_to_user(
-                            user_id=ps.parent_id,
-                            title=f'{student.name} 수업 1시간 전 알림',
-                            body=body,
-                            url='/parent/attendance'
-                        )
+# ------------------------------------------------------------------ #
+#  수업 리마인더                                                       #
+# ------------------------------------------------------------------ #
+
+def _reminder_windows(now):
+    """(날짜, 시작 시각 하한(미포함), 상한(포함)) — 자정을 넘기면 두 구간"""
+    end = now + REMINDER_LEAD
+    if end.date() == now.date():
+        return [(now.date(), now.time(), end.time())]
+    return [(now.date(), now.time(), time.max), (end.date(), time.min, end.time())]
+
+
+def send_class_reminders(app, now=None):
+    """
+    수업 1시간 전 학생·학부모에게 푸시 알림 발송 (5분마다 실행)
 
-                # 발송 이력 기록
+    앞으로 REMINDER_LEAD 안에 시작하는, 아직 알림을 보내지 않은 세션 전체를 대상으로 하므로
+    실행이 한두 번 빠지거나 리더가 바뀌어도 누락되지 않는다. 세션·수강생·학부모를
+    조인 쿼리 3번으로 모은 뒤, 발송 이력(ReminderLog)과 함께 커밋하고 Push 발송기로 넘긴다.
+    (이력은 session_id 유니크 — 중복 실행되면 커밋이 실패하고 Push도 취소된다)
+    """
+    with app.app_context():
+        try:
+            from sqlalchemy import and_, or_
+            from app.models import db, ParentStudent, Student
+            from app.models.course import Course, CourseSession, CourseEnrollment
+            from app.models.reminder_log import ReminderLog
+            from app.utils.push_utils import queue_push
+
+            now = now or datetime.now()
+            window = or_(*[
+                and_(CourseSession.session_date == day,
+                     CourseSession.start_time > after,
+                     CourseSession.start_time <= until)
+                for day, after, until in _reminder_windows(now)
+            ])
+
+            sessions = db.session.query(
+                CourseSession.session_id, CourseSession.course_id,
+                CourseSession.start_time, Course.course_name
+            ).join(Course, CourseSession.course_id == Course.course_id)\
+                .outerjoin(ReminderLog, ReminderLog.session_id == CourseSession.session_id)\
+                .filter(
+                    window,
+                    CourseSession.status == 'scheduled',
+                    ReminderLog.id.is_(None)
+                ).all()
+            if not sessions:
+                return 0
+
+            # 수업별 수강생 (학생 본인 계정 포함)
+            course_ids = {s.course_id for s in sessions}
+            students_by_course = {}
+            for course_id, student_id, name, user_id in db.session.query(
+                CourseEnrollment.course_id, Student.student_id, Student.name, Student.user_id
+            ).join(Student, CourseEnrollment.student_id == Student.student_id).filter(
+                CourseEnrollment.course_id.in_(course_ids),
+                CourseEnrollment.status == 'active'
+            ):
+                students_by_course.setdefault(course_id, []).append((student_id, name, user_id))
+
+            # 학생별 학부모
+            student_ids = {sid for rows in students_by_course.values() for sid, _, _ in rows}
+            parents_by_student = {}
+            for student_id, parent_id in db.session.query(
+                ParentStudent.student_id, ParentStudent.parent_id
+            ).filter(ParentStudent.student_id.in_(student_ids), ParentStudent.is_active == True):
+                parents_by_student.setdefault(student_id, []).append(parent_id)
+
+            for session in sessions:
+                time_str = session.start_time.strftime('%H:%M')
+                body = f'{session.course_name} 수업이 {time_str}에 시작됩니다.'
+                students = students_by_course.get(session.course_id, [])
+
+                for student_id, name, _ in students:
+                    if parents_by_student.get(student_id):
+                        queue_push(parents_by_student[student_id], title=f'{name} 수업 1시간 전 알림',
+                                   body=body, url='/parent/attendance')
+                queue_push([user_id for _, _, user_id in students if user_id],
+                           title='수업 1시간 전 알림', body=body, url='/student/courses')
+
+                # 발송 이력 기록 (커밋 후 Push 일괄 발송)
                 db.session.add(ReminderLog(session_id=session.session_id))
 
             db.session.commit()
-            if sessions:
-                logger.info(f'[Reminder] {len(sessions)}개 세션 알림 발송 완료')
+            logger.info(f'[Reminder] {len(sessions)}개 세션 알림 발송 완료')
+            return len(sessions)
 
         except Exception as e:
+            from app.models import db
+            db.session.rollback()
             logger.error(f'[Reminder] 오류: {e}')
+            return 0
 
 
 def generate_weekly_sessions(app):
-    """매주 일요일 자정: 다음 7일치 세션 생성"""
+    """매주 일요일 자정: 다음 7일치 세션 일괄 생성 (누락분만 — 다시 실행해도 중복 없음)"""
     from datetime import date, timedelta
     with app.app_context():
         try:
             from app.models import db
-            from app.models.course import Course
-            from app.utils.course_utils import extend_sessions_for_course
+            from app.utils.course_utils import generate_sessions_bulk
 
             today = date.today()          # 일요일
             from_date = today + timedelta(days=1)   # 월요일
             to_date = today + timedelta(days=7)     # 다음 일요일
 
-            active_courses = Course.query.filter(
-                Course.schedule_type == 'weekly',
-                Course.status == 'active',
-                Course.is_terminated == False,
-                Course.end_date >= from_date,
-                Course.start_date <= to_date
-            ).all()
-
-            total_created = 0
-            for course in active_courses:
-                created = extend_sessions_for_course(course, from_date, to_date)
-                total_created += len(created)
+            result = generate_sessions_bulk(from_date, to_date)
             db.session.commit()
-            if total_created:
-                logger.info(f'[WeeklySession] {total_created}개 세션 생성 완료')
+            if result['sessions']:
+                logger.info(f"[WeeklySession] {result['courses']}개 수업 {len(result['sessions'])}개 세션 생성 완료")
 
         except Exception as e:
+            from app.models import db
+            db.session.rollback()
             logger.error(f'[WeeklySession] 오류: {e}')
 
 
@@ -214,41 +348,129 @@ def apply_enrollment_schedules(app):
             logger.error(f'[EnrollSchedule] 전체 오류: {e}')
 
 
-def init_scheduler(app):
-    """스케줄러 초기화 및 시작 (단일 워커에서만 실행)"""
-    if scheduler.running:
-        return
+def process_correction_batches(app):
+    """일괄 첨삭 Message Batch 결과 반영 + 대기 작업 제출 (3분마다 실행)"""
+    with app.app_context():
+        try:
+            from app.essays.message_batch import poll_batches, submit_pending_batch
+            done = poll_batches()
+            batch_id, submitted = submit_pending_batch()
+            if done or submitted:
+                logger.info(f'[MessageBatch] 반영 {done}건, 제출 {submitted}건 ({batch_id or "-"})')
+        except Exception as e:
+            logger.error(f'[MessageBatch] 오류: {e}')
+
+
+def refresh_student_risk_snapshots(app):
+    """매일 새벽: 전체 학생 위험도 스냅샷 일괄 재계산"""
+    with app.app_context():
+        try:
+            from app.models import db
+            from app.utils.student_insights import refresh_risk_snapshots
+            refreshed = refresh_risk_snapshots()
+            db.session.commit()
+            logger.info(f'[RiskSnapshot] {len(refreshed)}명 위험도 갱신 완료')
+        except Exception as e:
+            logger.error(f'[RiskSnapshot] 오류: {e}')
+
+
+def refresh_enrollment_attendance(app):
+    """매일 자정: 오늘 세션이 생긴 수강의 출석 통계 재계산 (오늘 이전 세션 기준 집계의 날짜 경계)"""
+    with app.app_context():
+        try:
+            from app.models import db
+            from app.utils.course_counters import refresh_due_enrollments
+            refreshed = refresh_due_enrollments()
+            db.session.commit()
+            if refreshed:
+                logger.info(f'[CourseCounters] {refreshed}개 수강 출석 통계 갱신')
+        except Exception as e:
+            from app.models import db
+            db.session.rollback()
+            logger.error(f'[CourseCounters] 오류: {e}')
+
 
-    # 파일 락으로 첫 번째 워커에서만 스케줄러 실행
-    import fcntl
-    lock_path = '/tmp/momoai_scheduler.lock'
+def recover_stale_sms(app):
+    """5분마다: 발송 스레드가 중단돼 대기/발송 중에 멈춘 일괄 문자 재발송"""
     try:
-        lock_fp = open(lock_path, 'w')
-        fcntl.flock(lock_fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
-    except (IOError, OSError):
-        logger.info('[Scheduler] 다른 워커가 이미 실행 중 — 스킵')
+        from app.utils.sms_dispatch import recover_stale_batches
+        batch_ids = recover_stale_batches(app)
+        if batch_ids:
+            logger.info(f'[SMS] 멈춘 배치 {len(batch_ids)}개 재발송')
+    except Exception as e:
+        logger.error(f'[SMS] 멈춘 배치 복구 오류: {e}')
+
+
+def init_scheduler(app):
+    """
+    스케줄러 초기화 및 시작
+
+    create_app에서 호출되므로 gunicorn(preload_app=True)에서는 워커가 아닌 마스터 프로세스에서
+    시작된다 — 노드마다 스케줄러 1개. 각 작업은 run_as_leader()로 감싸 여러 노드 중
+    DB 리스를 가진 프로세스에서만 실행한다.
+    """
+    if scheduler.running:
         return
 
+    lease_seconds = app.config.get('SCHEDULER_LEASE_SECONDS', DEFAULT_LEASE_SECONDS)
     scheduler.add_job(
-        func=send_class_reminders,
+        func=keep_lease,
         args=[app],
-        trigger=IntervalTrigger(minutes=30),
+        trigger=IntervalTrigger(seconds=max(5, lease_seconds // 3)),
+        id='scheduler_lease',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        func=run_as_leader,
+        args=[send_class_reminders, app],
+        trigger=IntervalTrigger(minutes=REMINDER_INTERVAL_MINUTES),
         id='class_reminder',
         replace_existing=True
     )
     scheduler.add_job(
-        func=apply_enrollment_schedules,
-        args=[app],
+        func=run_as_leader,
+        args=[apply_enrollment_schedules, app],
         trigger=CronTrigger(hour=0, minute=5),  # 매일 자정 00:05
         id='enrollment_schedule',
         replace_existing=True
     )
     scheduler.add_job(
-        func=generate_weekly_sessions,
-        args=[app],
+        func=run_as_leader,
+        args=[generate_weekly_sessions, app],
         trigger=CronTrigger(day_of_week='sun', hour=0, minute=1, timezone='Asia/Seoul'),
         id='weekly_session_gen',
         replace_existing=True
     )
+    scheduler.add_job(
+        func=run_as_leader,
+        args=[process_correction_batches, app],
+        trigger=IntervalTrigger(minutes=3),
+        id='correction_batches',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        func=run_as_leader,
+        args=[refresh_enrollment_attendance, app],
+        trigger=CronTrigger(hour=0, minute=10),  # 매일 00:10
+        id='enrollment_attendance_counters',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        func=run_as_leader,
+        args=[recover_stale_sms, app],
+        trigger=IntervalTrigger(minutes=5),
+        id='sms_stale_recovery',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        func=run_as_leader,
+        args=[refresh_student_risk_snapshots, app],
+        trigger=CronTrigger(hour=0, minute=30),  # 입반/전반 처리 후 매일 00:30
+        id='student_risk_snapshots',
+        replace_existing=True
+    )
     scheduler.start()
-    logger.info('[Scheduler] APScheduler 시작됨 (수업 알림 30분 간격 + 입반/전반 자정 자동처리 + 주간 세션 생성)')
+    atexit.register(_release_on_exit, app)
+    logger.info(f'[Scheduler] APScheduler 시작됨 ({holder_id()}, DB 리스를 가진 프로세스에서만 실행 — '
+                f'수업 알림 {REMINDER_INTERVAL_MINUTES}분 간격 + 입반/전반 자정 자동처리 + 주간 세션 생성 + '
+                f'일괄 첨삭 3분 간격 + 멈춘 문자 복구 5분 간격 + 수강 출석 통계 00:10 + 위험도 스냅샷 매일 00:30)')
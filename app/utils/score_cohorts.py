@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""학년별 첨삭 점수 분포 집계(score_cohort_stats) 유지/조회
+
+리포트의 동급생 비교가 같은 학년 학생 전체 → 기간 내 완료 첨삭 전체 →
+첨삭마다 최신 버전 조회를 반복하지 않도록 (작성일, 학년, 지표, 점수 구간) 단위 분포를 유지한다.
+
+- 점수 원본: 완료(completed) 첨삭의 최신 버전(version_number 최대)에 달린
+  EssayResult.total_score(총점, 0/NULL 제외)와 EssayScore(18개 지표)
+- 갱신: 세션 flush 훅이 Essay / EssayVersion / EssayResult / EssayScore / Student.grade 변경을 보고
+  영향받은 (작성일, 학년) 구간만 원본에서 다시 집계해 같은 트랜잭션 안에서 교체한다.
+  parse_and_save_scores()가 점수를 저장하는 커밋에서 함께 갱신된다.
+- 조회: cohort_distributions() 1쿼리 → 지표별 건수/평균/표준편차/구간 분포, percentile()
+- 점검/복구: find_mismatches() / rebuild() (backfill_score_cohorts.py)
+
+기간 필터는 작성일(UTC) 단위다. Query.update() / Query.delete() 같은 일괄 변경은
+같은 flush에 다른 변경이 없으면 감지하지 않으므로 rebuild()로 맞춘다.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import and_, delete, event, func, inspect, insert, or_, select
+from sqlalchemy.orm import aliased
+
+TOTAL_METRIC = 'total'
+BUCKET_WIDTH = {TOTAL_METRIC: 1.0}    # 총점 0~100: 1점 구간
+DEFAULT_BUCKET_WIDTH = 0.5            # 지표 0~10: 0.5점 구간
+KEY_CHUNK = 200
+
+
+def bucket_width(metric):
+    return BUCKET_WIDTH.get(metric, DEFAULT_BUCKET_WIDTH)
+
+
+def _bucket(metric, score):
+    return int(score // bucket_width(metric))
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+# ════════════════════════════════════════════════════════
+# 원본 점수
+# ════════════════════════════════════════════════════════
+
+def _scored_select(*columns):
+    """완료 첨삭 ⋈ 학생 ⋈ 최신 버전 SELECT (columns에 EssayResult/EssayScore 컬럼을 붙여 사용)"""
+    from app.models import Student
+    from app.models.essay import Essay, EssayVersion
+
+    latest = select(
+        EssayVersion.essay_id, func.max(EssayVersion.version_number).label('version_number')
+    ).group_by(EssayVersion.essay_id).subquery()
+    version = aliased(EssayVersion)
+    return select(Essay.essay_id, Essay.created_at, Student.grade, *columns).join(
+        Student, Essay.student_id == Student.student_id
+    ).join(
+        latest, latest.c.essay_id == Essay.essay_id
+    ).join(
+        version, and_(version.essay_id == Essay.essay_id,
+                      version.version_number == latest.c.version_number)
+    ).where(Essay.status == 'completed'), version
+
+
+def latest_scores(*conditions, connection=None):
+    """완료 첨삭별 최신 버전 점수 (2쿼리)
+
+    Args:
+        conditions: Essay / Student 컬럼 조건
+    Returns:
+        {essay_id: {'created_at', 'grade', 'total'(없으면 None), 'indicators': {지표명: 점수}}}
+    """
+    from app.models import db
+    from app.models.essay import EssayResult
+    from app.models.essay_score import EssayScore
+
+    execute = (connection or db.session).execute
+    scores = {}
+
+    stmt, version = _scored_select(EssayResult.total_score)
+    stmt = stmt.outerjoin(EssayResult, EssayResult.version_id == version.version_id).where(*conditions)
+    for essay_id, created_at, grade, total in execute(stmt):
+        entry = scores.setdefault(essay_id, {'created_at': created_at, 'grade': grade,
+                                             'total': None, 'indicators': {}})
+        if total:
+            entry['total'] = float(total)
+
+    stmt, version = _scored_select(EssayScore.indicator_name, EssayScore.score)
+    stmt = stmt.join(EssayScore, EssayScore.version_id == version.version_id).where(*conditions)
+    for essay_id, _, _, name, score in execute(stmt):
+        if essay_id in scores:
+            scores[essay_id]['indicators'][name] = float(score)
+    return scores
+
+
+def _aggregate(scores):
+    """latest_scores() 결과 → {(날짜, 학년, 지표, 구간): [count, 합, 제곱합]}"""
+    stats = defaultdict(lambda: [0, 0.0, 0.0])
+    for entry in scores.values():
+        values = dict(entry['indicators'])
+        if entry['total'] is not None:
+            values[TOTAL_METRIC] = entry['total']
+        day = entry['created_at'].date()
+        for metric, score in values.items():
+            row = stats[(day, entry['grade'], metric, _bucket(metric, score))]
+            row[0] += 1
+            row[1] += score
+            row[2] += score * score
+    return stats
+
+
+def _rows(stats):
+    return [
+        {'stat_date': d, 'grade': g, 'metric': m, 'bucket': b,
+         'count': c, 'score_sum': s, 'score_sq_sum': sq}
+        for (d, g, m, b), (c, s, sq) in stats.items()
+    ]
+
+
+def _day_conditions(day, grade):
+    from app.models import Student
+    from app.models.essay import Essay
+    start = datetime.combine(day, time.min)
+    return and_(Essay.created_at >= start, Essay.created_at < start + timedelta(days=1),
+                Student.grade == grade)
+
+
+def _refresh_keys(connection, keys):
+    """(작성일, 학년) 구간 집계를 원본 기준으로 교체"""
+    from app.models.score_cohort import ScoreCohortStat
+    table = ScoreCohortStat.__table__
+    keys = list(keys)
+    for i in range(0, len(keys), KEY_CHUNK):
+        chunk = keys[i:i + KEY_CHUNK]
+        connection.execute(delete(table).where(or_(*[
+            and_(table.c.stat_date == d, table.c.grade == g) for d, g in chunk
+        ])))
+        rows = _rows(_aggregate(latest_scores(
+            or_(*[_day_conditions(d, g) for d, g in chunk]), connection=connection)))
+        if rows:
+            connection.execute(insert(table), rows)
+
+
+def _range_conditions(date_from, date_to):
+    from app.models.essay import Essay
+    conditions = []
+    if date_from:
+        conditions.append(Essay.created_at >= datetime.combine(_as_date(date_from), time.min))
+    if date_to:
+        conditions.append(Essay.created_at < datetime.combine(_as_date(date_to) + timedelta(days=1), time.min))
+    return conditions
+
+
+def _stat_range(table, date_from, date_to):
+    conditions = []
+    if date_from:
+        conditions.append(table.c.stat_date >= _as_date(date_from))
+    if date_to:
+        conditions.append(table.c.stat_date <= _as_date(date_to))
+    return conditions
+
+
+def rebuild(date_from=None, date_to=None):
+    """작성일 기간(미지정 시 전체) 집계를 원본에서 다시 생성. 커밋은 호출 측에서.
+
+    Returns:
+        생성된 집계 행 수
+    """
+    from app.models import db
+    from app.models.score_cohort import ScoreCohortStat
+    table = ScoreCohortStat.__table__
+    connection = db.session.connection()
+    connection.execute(delete(table).where(*_stat_range(table, date_from, date_to)))
+    rows = _rows(_aggregate(latest_scores(*_range_conditions(date_from, date_to), connection=connection)))
+    for i in range(0, len(rows), 1000):
+        connection.execute(insert(table), rows[i:i + 1000])
+    return len(rows)
+
+
+def find_mismatches(date_from=None, date_to=None):
+    """원본 점수와 집계가 다른 (날짜, 학년, 지표, 구간) 목록
+
+    Returns:
+        [(key, 원본 (count, 합, 제곱합) 또는 None, 집계 값 또는 None), ...]
+    """
+    from app.models import db
+    from app.models.score_cohort import ScoreCohortStat
+    table = ScoreCohortStat.__table__
+
+    def _rounded(values):
+        return (values[0], round(values[1], 4), round(values[2], 4))
+
+    expected = {key: _rounded(v) for key, v in
+                _aggregate(latest_scores(*_range_conditions(date_from, date_to))).items()}
+    actual = {tuple(row[:4]): _rounded(row[4:]) for row in db.session.execute(
+        select(table.c.stat_date, table.c.grade, table.c.metric, table.c.bucket,
+               table.c.count, table.c.score_sum, table.c.score_sq_sum)
+        .where(*_stat_range(table, date_from, date_to)))}
+    return [
+        (key, expected.get(key), actual.get(key))
+        for key in sorted(set(expected) | set(actual), key=str)
+        if expected.get(key) != actual.get(key)
+    ]
+
+
+# ════════════════════════════════════════════════════════
+# 증분 갱신 (세션 훅)
+# ════════════════════════════════════════════════════════
+
+def _values(state, attr):
+    history = state.attrs[attr].history
+    values = list(history.added or ()) + list(history.deleted or ())
+    if not history.has_changes():
+        values.append(getattr(state.obj(), attr))
+    return [v for v in values if v is not None]
+
+
+def _after_flush(session, flush_context):
+    from app.models import Student
+    from app.models.essay import Essay, EssayVersion, EssayResult
+    from app.models.essay_score import EssayScore
+
+    keys = set()
+    essay_ids = set()
+    essay_days = set()          # (작성일, student_id) — 삭제·이동된 첨삭의 이전 위치
+    regraded = {}               # student_id → 이전/새 학년
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Essay):
+            state = inspect(obj)
+            if obj in session.dirty and not any(
+                state.attrs[a].history.has_changes() for a in ('status', 'student_id', 'created_at')
+            ):
+                continue
+            for created_at in _values(state, 'created_at'):
+                for student_id in _values(state, 'student_id'):
+                    essay_days.add((created_at.date(), student_id))
+        elif isinstance(obj, (EssayVersion, EssayResult, EssayScore)):
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            essay_ids.add(obj.essay_id)
+        elif isinstance(obj, Student) and obj in session.dirty:
+            # 만료된 객체에 대입하면 이전 학년이 history에 남지 않으므로
+            # 아래에서 해당 날짜에 집계된 학년을 모두 다시 계산한다
+            state = inspect(obj)
+            if state.attrs['grade'].history.has_changes():
+                regraded[obj.student_id] = _values(state, 'grade')
+
+    if not (essay_ids or essay_days or regraded):
+        return
+    connection = session.connection()
+
+    if essay_ids:
+        ids = list(essay_ids)
+        for i in range(0, len(ids), KEY_CHUNK):
+            keys.update((created_at.date(), grade) for created_at, grade in connection.execute(
+                select(Essay.created_at, Student.grade)
+                .join(Student, Essay.student_id == Student.student_id)
+                .where(Essay.essay_id.in_(ids[i:i + KEY_CHUNK]))
+            ))
+    if essay_days:
+        student_ids = list({sid for _, sid in essay_days})
+        grades = {sid: grade for sid, grade in connection.execute(
+            select(Student.student_id, Student.grade).where(Student.student_id.in_(student_ids)))}
+        for obj in session.deleted:
+            if isinstance(obj, Student):
+                grades.setdefault(obj.student_id, obj.grade)
+        for day, student_id in essay_days:
+            for grade in regraded.get(student_id, [grades.get(student_id)]):
+                if grade:
+                    keys.add((day, grade))
+    if regraded:
+        from app.models.score_cohort import ScoreCohortStat
+        table = ScoreCohortStat.__table__
+        for student_id, grades in regraded.items():
+            days = {created_at.date() for created_at in connection.execute(
+                select(Essay.created_at).where(Essay.student_id == student_id)
+            ).scalars()}
+            if not days:
+                continue
+            keys.update((day, grade) for day in days for grade in grades)
+            keys.update(tuple(row) for row in connection.execute(
+                select(table.c.stat_date, table.c.grade).where(table.c.stat_date.in_(days)).distinct()
+            ))
+
+    if keys:
+        _refresh_keys(connection, keys)
+
+
+def init_score_cohorts(app):
+    """첨삭 점수 분포 갱신용 세션 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+
+
+# ════════════════════════════════════════════════════════
+# 조회
+# ════════════════════════════════════════════════════════
+
+def cohort_distributions(grade, date_from=None, date_to=None, metrics=None):
+    """학년·작성일 기간의 지표별 점수 분포 (1쿼리)
+
+    Returns:
+        {지표: {'count', 'mean', 'std', 'buckets': {구간: count}}}  ('total' = 총점)
+    """
+    from app.models import db
+    from app.models.score_cohort import ScoreCohortStat as S
+    query = db.session.query(
+        S.metric, S.bucket, func.sum(S.count), func.sum(S.score_sum), func.sum(S.score_sq_sum)
+    ).filter(S.grade == grade, *_stat_range(S.__table__, date_from, date_to))
+    if metrics:
+        query = query.filter(S.metric.in_(metrics))
+
+    sums = defaultdict(lambda: {'count': 0, 'sum': 0.0, 'sq_sum': 0.0, 'buckets': {}})
+    for metric, bucket, count, total, sq_total in query.group_by(S.metric, S.bucket):
+        entry = sums[metric]
+        entry['count'] += int(count)
+        entry['sum'] += float(total)
+        entry['sq_sum'] += float(sq_total)
+        entry['buckets'][bucket] = int(count)
+
+    distributions = {}
+    for metric, entry in sums.items():
+        n = entry['count']
+        mean = entry['sum'] / n
+        variance = max(entry['sq_sum'] / n - mean * mean, 0.0)
+        distributions[metric] = {'count': n, 'mean': mean, 'std': math.sqrt(variance),
+                                 'buckets': entry['buckets'], 'metric': metric}
+    return distributions
+
+
+def percentile(distribution, score):
+    """분포 안에서 score의 백분위 (0~100, 같은 구간은 절반으로 계산)"""
+    if not distribution or not distribution['count']:
+        return None
+    target = _bucket(distribution['metric'], score)
+    below = sum(c for b, c in distribution['buckets'].items() if b < target)
+    same = distribution['buckets'].get(target, 0)
+    return round((below + same / 2) / distribution['count'] * 100, 1)
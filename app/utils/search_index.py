@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""통합 검색 역색인
+
+LIKE '%q%' 전체 스캔 대신 search_tokens 역색인으로 검색한다.
+
+- 토큰화: 단어별 2-gram (한글/영문/숫자 공통), 제목은 1글자 토큰과
+  초성 2-gram(korean_utils.get_chosung)도 함께 색인 → 'ㄱㅁㅅ', '김ㅁ' 같은 초성 검색 지원
+- 색인 갱신: 세션 flush 훅에서 검색 대상 모델의 생성/수정/삭제를 감지해
+  같은 트랜잭션 안에서 해당 문서 토큰만 다시 쓴다 (롤백 시 함께 롤백)
+- 검색: 질의 토큰을 모두 포함하는 문서를 GROUP BY/HAVING으로 찾고 weight 합계로 순위,
+  권한 조건은 원본 테이블과 JOIN한 같은 쿼리 안에서 적용
+- 일반 테이블 + B-tree 인덱스만 사용하므로 SQLite / PostgreSQL 모두 동작
+
+Query.update() 같은 일괄 변경은 감지하지 않는다. 기존 데이터 색인 생성이나
+일괄 변경 후 재색인은 backfill_search_index.py (rebuild_index) 로 한다.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from sqlalchemy import delete, distinct, event, func, inspect, literal, or_, select
+from sqlalchemy.orm import joinedload
+
+from app.utils.korean_utils import get_chosung
+
+TITLE_WEIGHT = 3
+BODY_WEIGHT = 1
+MAX_TF = 5                 # 같은 토큰 반복 가중 상한
+MAX_BODY_CHARS = 20000     # 본문 색인 길이 상한
+INSERT_CHUNK = 1000
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def _is_jamo(ch):
+    return 'ㄱ' <= ch <= 'ㅎ'
+
+
+def _has_hangul(word):
+    return any('가' <= ch <= '힣' for ch in word)
+
+
+def _words(text):
+    if not text:
+        return []
+    return _WORD_RE.findall(unicodedata.normalize('NFC', str(text)).lower())
+
+
+def _bigrams(word):
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def tokenize_document(title, body):
+    """문서 토큰화 → Counter {(token, field): weight}"""
+    tokens = Counter()
+    for word in _words(title):
+        for ch in word:
+            tokens[(ch, 'title')] += 1
+        for gram in _bigrams(word):
+            tokens[(gram, 'title')] += 1
+        if _has_hangul(word):
+            for gram in _bigrams(get_chosung(word)):
+                tokens[(gram, 'title')] += 1
+    for word in _words((body or '')[:MAX_BODY_CHARS]):
+        for gram in _bigrams(word):
+            tokens[(gram, 'body')] += 1
+
+    weights = Counter()
+    for (token, field), count in tokens.items():
+        weight = TITLE_WEIGHT if field == 'title' else BODY_WEIGHT
+        weights[(token, field)] = min(count, MAX_TF) * weight
+    return weights
+
+
+def query_tokens(query):
+    """검색어 토큰 집합 (문서 토큰화와 같은 규칙)
+
+    초성이 섞인 단어('김ㅁ', 'ㄱㅁㅅ')는 초성 2-gram으로 바꿔 찾는다.
+    """
+    tokens = set()
+    for word in _words(query):
+        if any(_is_jamo(ch) for ch in word):
+            word = get_chosung(word)
+        if len(word) == 1:
+            tokens.add(word)
+        else:
+            tokens.update(_bigrams(word))
+    return tokens
+
+
+# ════════════════════════════════════════════════════════
+# 검색 대상 정의
+# ════════════════════════════════════════════════════════
+
+_entities = None
+
+
+def get_entities():
+    """entity_type → (모델, PK 속성, 제목 필드, 본문 필드)"""
+    global _entities
+    if _entities is None:
+        from app.models import Student, Course, User
+        from app.models.material import Material
+        from app.models.community import Post
+        from app.models.assignment import Assignment
+        _entities = {
+            'student': (Student, 'student_id', ('name',), ('email', 'grade')),
+            'course': (Course, 'course_id', ('course_name',), ('description',)),
+            'material': (Material, 'material_id', ('title',), ('description', 'tags')),
+            'assignment': (Assignment, 'assignment_id', ('title',), ('description',)),
+            'post': (Post, 'post_id', ('title',), ('content',)),
+            'user': (User, 'user_id', ('name',), ('email',)),
+        }
+    return _entities
+
+
+def _entity_type_of(obj):
+    for entity_type, (model, *_rest) in get_entities().items():
+        if isinstance(obj, model):
+            return entity_type
+    return None
+
+
+def _document_rows(entity_type, obj):
+    _, id_attr, title_fields, body_fields = get_entities()[entity_type]
+    entity_id = getattr(obj, id_attr)
+    title = ' '.join(str(getattr(obj, f) or '') for f in title_fields)
+    body = ' '.join(str(getattr(obj, f) or '') for f in body_fields)
+    return [
+        {'token': token, 'entity_type': entity_type, 'entity_id': entity_id,
+         'field': field, 'weight': weight}
+        for (token, field), weight in tokenize_document(title, body).items()
+    ]
+
+
+def _write(connection, remove, add):
+    """remove: {(entity_type, entity_id)} 토큰 삭제, add: [(entity_type, obj)] 재색인"""
+    from app.models.search_index import SearchToken
+    table = SearchToken.__table__
+
+    by_type = {}
+    for entity_type, entity_id in remove:
+        by_type.setdefault(entity_type, set()).add(entity_id)
+    for entity_type, ids in by_type.items():
+        ids = list(ids)
+        for i in range(0, len(ids), INSERT_CHUNK):
+            connection.execute(delete(table).where(
+                table.c.entity_type == entity_type,
+                table.c.entity_id.in_(ids[i:i + INSERT_CHUNK])
+            ))
+
+    rows = [row for entity_type, obj in add for row in _document_rows(entity_type, obj)]
+    for i in range(0, len(rows), INSERT_CHUNK):
+        connection.execute(table.insert(), rows[i:i + INSERT_CHUNK])
+
+
+def rebuild_index(entity_types=None, batch_size=500):
+    """검색 대상 전체 재색인 (기존 데이터 백필용). 커밋은 호출 측에서.
+
+    Returns:
+        {entity_type: 문서 수}
+    """
+    from app.models import db
+    from app.models.search_index import SearchToken
+
+    counts = {}
+    connection = db.session.connection()
+    for entity_type, (model, id_attr, _, _) in get_entities().items():
+        if entity_types and entity_type not in entity_types:
+            continue
+        connection.execute(delete(SearchToken.__table__).where(
+            SearchToken.entity_type == entity_type))
+        count = 0
+        batch = []
+        for obj in model.query.order_by(getattr(model, id_attr)).yield_per(batch_size):
+            batch.append((entity_type, obj))
+            if len(batch) >= batch_size:
+                _write(connection, (), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            _write(connection, (), batch)
+            count += len(batch)
+        counts[entity_type] = count
+    return counts
+
+
+# ════════════════════════════════════════════════════════
+# 증분 색인 (세션 훅)
+# ════════════════════════════════════════════════════════
+
+def _text_fields_changed(entity_type, obj):
+    _, _, title_fields, body_fields = get_entities()[entity_type]
+    state = inspect(obj)
+    return any(state.attrs[f].history.has_changes() for f in title_fields + body_fields)
+
+
+def _after_flush(session, flush_context):
+    remove = set()
+    add = []
+    for obj in session.new:
+        entity_type = _entity_type_of(obj)
+        if entity_type:
+            add.append((entity_type, obj))
+    for obj in session.dirty:
+        entity_type = _entity_type_of(obj)
+        if entity_type and _text_fields_changed(entity_type, obj):
+            id_attr = get_entities()[entity_type][1]
+            remove.add((entity_type, getattr(obj, id_attr)))
+            add.append((entity_type, obj))
+    for obj in session.deleted:
+        entity_type = _entity_type_of(obj)
+        if entity_type:
+            id_attr = get_entities()[entity_type][1]
+            remove.add((entity_type, getattr(obj, id_attr)))
+    if remove or add:
+        _write(session.connection(), remove, add)
+
+
+def init_search_index(app):
+    """증분 색인용 세션 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+
+
+# ════════════════════════════════════════════════════════
+# 검색
+# ════════════════════════════════════════════════════════
+
+def _student_of(user):
+    from app.models import Student
+    return Student.query.filter_by(email=user.email).first()
+
+
+def _enrolled_course_ids(student):
+    from app.models import CourseEnrollment
+    return select(CourseEnrollment.course_id).where(
+        CourseEnrollment.student_id == student.student_id,
+        CourseEnrollment.status == 'active'
+    )
+
+
+def _filter_student(q, user):
+    if user.role not in ('admin', 'teacher'):
+        return None
+    return q
+
+
+def _filter_course(q, user):
+    from app.models import Course
+    q = q.options(joinedload(Course.teacher))
+    if user.role == 'teacher':
+        return q.filter(Course.teacher_id == user.user_id)
+    if user.role == 'student':
+        student = _student_of(user)
+        if not student:
+            return None
+        return q.filter(Course.course_id.in_(_enrolled_course_ids(student)))
+    return q
+
+
+def _filter_material(q, user):
+    """Material.can_access()와 같은 조건을 SQL로"""
+    from app.models.material import Material
+    q = q.filter(Material.is_published == True)
+    if user.role != 'student':
+        return q
+    student = _student_of(user)
+    if not student:
+        return None
+    conditions = [
+        Material.access_level == 'all',
+        (Material.access_level == 'course') & Material.course_id.in_(_enrolled_course_ids(student)),
+    ]
+    if student.tier:
+        tiers = literal(',') + func.replace(Material.tier_restriction, ' ', '') + literal(',')
+        conditions.append((Material.access_level == 'tier') & tiers.contains(f',{student.tier},'))
+    return q.filter(or_(*conditions))
+
+
+def _filter_assignment(q, user):
+    from app.models.assignment import Assignment
+    q = q.filter(Assignment.is_published == True)
+    if user.role == 'teacher':
+        return q.filter(Assignment.teacher_id == user.user_id)
+    if user.role == 'student':
+        student = _student_of(user)
+        if not student:
+            return q.filter(Assignment.course_id == None)
+        return q.filter(or_(Assignment.course_id.in_(_enrolled_course_ids(student)),
+                            Assignment.course_id == None))
+    return q
+
+
+def _filter_post(q, user):
+    from app.models.community import Post
+    return q.options(joinedload(Post.user))
+
+
+def _filter_user(q, user):
+    if user.role != 'admin':
+        return None
+    return q
+
+
+_FILTERS = {
+    'student': _filter_student,
+    'course': _filter_course,
+    'material': _filter_material,
+    'assignment': _filter_assignment,
+    'post': _filter_post,
+    'user': _filter_user,
+}
+
+
+def search(entity_type, query, user, limit=10, title_only=False):
+    """권한 범위 안에서 검색어를 포함하는 문서를 관련도순으로 반환
+
+    Args:
+        entity_type: get_entities()의 키
+        query: 검색어
+        user: 검색하는 사용자 (권한 필터 기준)
+        title_only: 제목(이름) 토큰만 사용 (자동완성)
+    Returns:
+        모델 객체 목록
+    """
+    from app.models import db
+    from app.models.search_index import SearchToken
+
+    tokens = query_tokens(query)
+    if not tokens:
+        return []
+    model, id_attr, _, _ = get_entities()[entity_type]
+
+    matched = db.session.query(
+        SearchToken.entity_id.label('entity_id'),
+        func.sum(SearchToken.weight).label('score'),
+    ).filter(
+        SearchToken.entity_type == entity_type,
+        SearchToken.token.in_(tokens),
+    )
+    if title_only:
+        matched = matched.filter(SearchToken.field == 'title')
+    matched = matched.group_by(SearchToken.entity_id).having(
+        func.count(distinct(SearchToken.token)) == len(tokens)
+    ).subquery()
+
+    q = model.query.join(matched, matched.c.entity_id == getattr(model, id_attr))
+    q = _FILTERS[entity_type](q, user)
+    if q is None:
+        return []
+
+    order = [matched.c.score.desc()]
+    if hasattr(model, 'created_at'):
+        order.append(model.created_at.desc())
+    order.append(getattr(model, id_attr))
+    return q.order_by(*order).limit(limit).all()
@@ -1,8 +1,106 @@
 # -*- coding: utf-8 -*-
-"""SMS 발송 유틸리티 (Aligo API)"""
+"""SMS 발송 유틸리티 (Aligo API)
+
+- 프로세스 공용 requests.Session (연결 풀 재사용)
+- send_sms_message(): 1건 발송
+- send_mass(): 알리고 대량 발송(/send_mass/, 수신자별 다른 내용 최대 500건)
+- 일시적 오류(연결 실패, 5xx, 429)는 지수 백오프로 재시도.
+  응답 대기 중 타임아웃은 이미 발송됐을 수 있으므로 재시도하지 않는다.
+
+SMS_API_URL 설정으로 API 주소를 바꿀 수 있다 (테스트용 로컬 서버 등).
+"""
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 from flask import current_app
 
+DEFAULT_API_URL = 'https://apis.aligo.in'
+MASS_MAX_RECEIVERS = 500      # 알리고 send_mass 1회 최대 건수
+REQUEST_TIMEOUT = 10
+TRANSIENT_STATUS = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class SmsTransientError(Exception):
+    """재시도 가능한 오류 (연결 실패, 5xx 등)"""
+
+
+def _get_session():
+    """프로세스 공용 HTTP 세션 (알리고 호스트 연결 풀)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+    return _session
+
+
+def get_msg_type(message):
+    """90바이트(EUC-KR) 초과 시 LMS"""
+    return 'LMS' if len(message.encode('euc-kr', errors='replace')) > 90 else 'SMS'
+
+
+def _credentials():
+    """(key, user_id, sender) 또는 미설정 사유 반환"""
+    api_key = current_app.config.get('SMS_API_KEY')
+    user_id = current_app.config.get('SMS_USER_ID')
+    sender = current_app.config.get('SMS_SENDER')
+
+    if not api_key:
+        return None, 'SMS_API_KEY 미설정'
+    if not user_id:
+        return None, 'SMS_USER_ID 미설정'
+    if not sender:
+        return None, 'SMS_SENDER 미설정'
+    return (api_key, user_id, sender), None
+
+
+def _post_once(path, data):
+    """알리고 API 1회 호출. 일시적 오류는 SmsTransientError"""
+    url = (current_app.config.get('SMS_API_URL') or DEFAULT_API_URL).rstrip('/') + path
+    try:
+        response = _get_session().post(url, data=data, timeout=(3, REQUEST_TIMEOUT))
+    except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout) as e:
+        raise SmsTransientError(f'연결 실패: {e}')
+    if response.status_code in TRANSIENT_STATUS:
+        raise SmsTransientError(f'HTTP {response.status_code}')
+    return response.json()
+
+
+def post_with_retry(path, data, max_retries=None, backoff=None):
+    """
+    알리고 API 호출 (일시적 오류 시 지수 백오프 재시도)
+
+    Returns:
+        (result dict 또는 None, 시도 횟수, 실패 사유)
+    """
+    if max_retries is None:
+        max_retries = current_app.config.get('SMS_MAX_RETRIES', 3)
+    if backoff is None:
+        backoff = current_app.config.get('SMS_RETRY_BACKOFF', 1.0)
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return _post_once(path, data), attempt, None
+        except SmsTransientError as e:
+            if attempt > max_retries:
+                return None, attempt, str(e)
+            current_app.logger.warning(f'SMS API 재시도 {attempt}/{max_retries}: {e}')
+            time.sleep(backoff * (2 ** (attempt - 1)))
+        except requests.exceptions.Timeout:
+            return None, attempt, f'요청 타임아웃 ({REQUEST_TIMEOUT}초 초과)'
+        except Exception as e:
+            return None, attempt, str(e)
+
 
 def send_sms_message(phone, message, title=None):
     """알리고 SMS API를 통한 문자 발송.
@@ -15,20 +113,14 @@ def send_sms_message(phone, message, title=None):
     Returns:
         (success: bool, reason: str)
     """
-    api_key = current_app.config.get('SMS_API_KEY')
-    user_id = current_app.config.get('SMS_USER_ID')
-    sender = current_app.config.get('SMS_SENDER')
-
-    if not api_key:
-        return False, 'SMS_API_KEY 미설정'
-    if not user_id:
-        return False, 'SMS_USER_ID 미설정'
-    if not sender:
-        return False, 'SMS_SENDER 미설정'
+    creds, reason = _credentials()
+    if not creds:
+        return False, reason
     if not phone:
         return False, '수신자 번호 없음'
+    api_key, user_id, sender = creds
 
-    msg_type = 'LMS' if len(message.encode('euc-kr', errors='replace')) > 90 else 'SMS'
+    msg_type = get_msg_type(message)
     data = {
         'key': api_key,
         'user_id': user_id,
@@ -39,18 +131,60 @@ def send_sms_message(phone, message, title=None):
         'title': title or ('MOMOAI' if msg_type == 'LMS' else ''),
     }
 
+    result, _, error = post_with_retry('/send/', data)
+    if result is None:
+        current_app.logger.error(f'SMS 발송 오류 ({phone}): {error}')
+        return False, error
+    if result.get('result_code') == '1':
+        current_app.logger.info(f'SMS 발송 성공: {phone}')
+        return True, '발송 완료'
+    reason = result.get('message', '알 수 없는 오류')
+    current_app.logger.warning(f'SMS 발송 실패 ({phone}): {reason}')
+    return False, reason
+
+
+def send_mass(items, msg_type, title=None):
+    """
+    알리고 대량 발송 (수신자별 다른 내용, 1회 최대 500건)
+
+    Args:
+        items: [(receiver, message), ...] — 같은 msg_type끼리 묶어서 호출
+        msg_type: 'SMS' / 'LMS'
+
+    Returns:
+        dict: success(bool), reason, attempts, msg_id, success_cnt, error_cnt
+    """
+    if len(items) > MASS_MAX_RECEIVERS:
+        raise ValueError(f'send_mass는 1회 최대 {MASS_MAX_RECEIVERS}건입니다.')
+    creds, reason = _credentials()
+    if not creds:
+        return {'success': False, 'reason': reason, 'attempts': 0}
+    api_key, user_id, sender = creds
+
+    data = {
+        'key': api_key,
+        'user_id': user_id,
+        'sender': sender,
+        'msg_type': msg_type,
+        'cnt': str(len(items)),
+        'title': title or ('MOMOAI' if msg_type == 'LMS' else ''),
+    }
+    for i, (receiver, message) in enumerate(items, start=1):
+        data[f'rec_{i}'] = receiver
+        data[f'msg_{i}'] = message
+
+    result, attempts, error = post_with_retry('/send_mass/', data)
+    if result is None:
+        return {'success': False, 'reason': error, 'attempts': attempts}
     try:
-        response = requests.post('https://apis.aligo.in/send/', data=data, timeout=10)
-        result = response.json()
-        if result.get('result_code') == '1':
-            current_app.logger.info(f'SMS 발송 성공: {phone}')
-            return True, '발송 완료'
-        else:
-            reason = result.get('message', '알 수 없는 오류')
-            current_app.logger.warning(f'SMS 발송 실패 ({phone}): {reason}')
-            return False, reason
-    except requests.exceptions.Timeout:
-        return False, '요청 타임아웃 (10초 초과)'
-    except Exception as e:
-        current_app.logger.error(f'SMS 발송 오류 ({phone}): {e}')
-        return False, str(e)
+        ok = int(result.get('result_code', 0)) > 0
+    except (TypeError, ValueError):
+        ok = False
+    return {
+        'success': ok,
+        'reason': result.get('message', '') if not ok else '발송 완료',
+        'attempts': attempts,
+        'msg_id': str(result.get('msg_id') or '') or None,
+        'success_cnt': int(result.get('success_cnt') or 0),
+        'error_cnt': int(result.get('error_cnt') or 0),
+    }
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""문자 일괄 발송 (비동기 + 발송 이력)
+
+요청 처리 중에 수백 건을 순차 발송하지 않도록
+1. create_batch(): 발송할 문자를 SmsDeliveryLog(queued)로 기록 (한 번의 커밋)
+2. dispatch_batch(): 백그라운드 스레드가 같은 msg_type끼리 최대 500건씩 묶어
+   알리고 대량 발송(send_mass)으로 전송 — 묶음 전송은 프로세스 공용 스레드 풀
+   (SMS_DISPATCH_CONCURRENCY)에서 동시 처리
+3. get_batch_status(): 화면에서 배치 진행 상황을 폴링
+4. recover_stale_batches(): 프로세스 재시작 등으로 멈춘 건 정리 (스케줄러)
+   — queued 건은 다시 발송, sending 건은 실제 발송 여부를 알 수 없으므로 unknown으로 남김
+
+청구서 문자(payment_id 지정)는 발송 성공 시 Payment.sms_sent_at을 함께 기록한다.
+같은 청구서가 다른 배치에서 대기/발송 중이거나 이미 발송됐으면 다시 보내지 않는다
+(일괄 발송 버튼 중복 클릭, 진행 중 재요청).
+"""
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, update
+
+from app.models import db, Payment
+from app.models.sms_delivery_log import SmsDeliveryLog
+from app.utils.sms import MASS_MAX_RECEIVERS, get_msg_type, send_mass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_STALE_SECONDS = 900      # 이 시간보다 오래 queued / sending인 건은 발송 스레드가 죽은 것으로 본다
+FINAL_STATUSES = ('sent', 'failed', 'skipped', 'unknown')
+ALL_STATUSES = ('queued', 'sending') + FINAL_STATUSES
+IN_FLIGHT_STATUSES = ('queued', 'sending')
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(app):
+    """묶음 전송용 스레드 풀 (fork 이후 프로세스마다 1개)"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            workers = app.config.get('SMS_DISPATCH_CONCURRENCY') or DEFAULT_CONCURRENCY
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms-dispatch')
+            _executor_pid = os.getpid()
+    return _executor
+
+
+def _in_flight_payment_ids(payment_ids):
+    """다른 배치에서 대기 / 발송 중인 청구서 ID"""
+    payment_ids = list({pid for pid in payment_ids if pid})
+    if not payment_ids:
+        return set()
+    return {row[0] for row in db.session.query(SmsDeliveryLog.payment_id).filter(
+        SmsDeliveryLog.payment_id.in_(payment_ids),
+        SmsDeliveryLog.status.in_(IN_FLIGHT_STATUSES),
+    ).distinct()}
+
+
+def create_batch(entries, created_by=None):
+    """
+    발송 배치 생성
+
+    Args:
+        entries: dict 목록 — receiver, message, receiver_name, payment_id, title(선택)
+                 skip_reason이 있으면 skipped, 수신자 번호가 없으면 failed로 기록
+                 같은 청구서가 다른 배치에서 대기/발송 중이면 skipped
+        created_by: 요청자 user_id
+
+    Returns:
+        batch_id
+    """
+    batch_id = str(uuid.uuid4())
+    in_flight = _in_flight_payment_ids(e.get('payment_id') for e in entries)
+    logs = []
+    for e in entries:
+        skip_reason = e.get('skip_reason')
+        if not skip_reason and e.get('payment_id') in in_flight:
+            skip_reason = '발송 대기/진행 중'
+        if skip_reason:
+            status, reason = 'skipped', skip_reason
+        elif not e.get('receiver'):
+            status, reason = 'failed', '수신자 번호 없음'
+        else:
+            status, reason = 'queued', None
+        logs.append(SmsDeliveryLog(
+            batch_id=batch_id,
+            payment_id=e.get('payment_id'),
+            receiver=e.get('receiver'),
+            receiver_name=e.get('receiver_name'),
+            message=e.get('message') or '',
+            msg_type=get_msg_type(e.get('message') or ''),
+            title=e.get('title'),
+            status=status,
+            reason=reason,
+            attempts=0,
+            created_by=created_by,
+        ))
+    db.session.add_all(logs)
+    db.session.commit()
+    return batch_id
+
+
+def _send_chunk(app, log_ids, msg_type, title):
+    """묶음 1개 전송 (스레드 풀에서 실행)"""
+    with app.app_context():
+        try:
+            # 다른 워커가 이미 가져간 건은 제외 (compare-and-set)
+            db.session.execute(
+                update(SmsDeliveryLog)
+                .where(SmsDeliveryLog.log_id.in_(log_ids), SmsDeliveryLog.status == 'queued')
+                .values(status='sending', claimed_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            logs = SmsDeliveryLog.query.filter(
+                SmsDeliveryLog.log_id.in_(log_ids), SmsDeliveryLog.status == 'sending'
+            ).all()
+
+            # 대기 중에 다른 배치가 먼저 보낸 청구서는 제외
+            sent_ids = {row[0] for row in db.session.query(Payment.payment_id).filter(
+                Payment.payment_id.in_([log.payment_id for log in logs if log.payment_id]),
+                Payment.sms_sent_at.isnot(None),
+            )}
+            for log in [log for log in logs if log.payment_id in sent_ids]:
+                log.status, log.reason = 'skipped', '이미 발송됨'
+                logs.remove(log)
+            if sent_ids:
+                db.session.commit()
+            if not logs:
+                return
+
+            result = send_mass([(log.receiver, log.message) for log in logs], msg_type, title=title)
+
+            now = datetime.utcnow()
+            reason = result.get('reason')
+            if result['success'] and result.get('error_cnt'):
+                # 알리고는 수신자별 실패 여부를 응답하지 않음 → 접수 성공으로 기록
+                reason = f"접수 완료 (알리고 실패 {result['error_cnt']}건 포함, 전송결과 조회 필요)"
+            for log in logs:
+                log.attempts = (log.attempts or 0) + result.get('attempts', 0)
+                log.status = 'sent' if result['success'] else 'failed'
+                log.reason = reason
+                log.provider_msg_id = result.get('msg_id')
+                if result['success']:
+                    log.sent_at = now
+
+            payment_ids = [log.payment_id for log in logs if log.payment_id]
+            if result['success'] and payment_ids:
+                db.session.execute(
+                    update(Payment)
+                    .where(Payment.payment_id.in_(payment_ids))
+                    .values(sms_sent_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+            logger.info(f'[SMS] {msg_type} {len(logs)}건 → {"성공" if result["success"] else "실패"}: {reason}')
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[SMS] 묶음 발송 오류: {e}')
+            db.session.execute(
+                update(SmsDeliveryLog)
+                .where(SmsDeliveryLog.log_id.in_(log_ids), SmsDeliveryLog.status == 'sending')
+                .values(status='failed', reason=str(e)[:500])
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+
+
+def run_batch(app, batch_id):
+    """배치의 대기 문자를 msg_type별 500건 묶음으로 전송 (완료까지 대기)"""
+    with app.app_context():
+        rows = db.session.query(
+            SmsDeliveryLog.log_id, SmsDeliveryLog.msg_type, SmsDeliveryLog.title
+        ).filter(
+            SmsDeliveryLog.batch_id == batch_id,
+            SmsDeliveryLog.status == 'queued',
+        ).order_by(SmsDeliveryLog.created_at, SmsDeliveryLog.log_id).all()
+
+    groups = {}
+    for log_id, msg_type, title in rows:
+        groups.setdefault((msg_type, title), []).append(log_id)
+
+    executor = _get_executor(app)
+    futures = [
+        executor.submit(_send_chunk, app, ids[i:i + MASS_MAX_RECEIVERS], msg_type, title)
+        for (msg_type, title), ids in groups.items()
+        for i in range(0, len(ids), MASS_MAX_RECEIVERS)
+    ]
+    wait(futures)
+
+
+def dispatch_batch(app, batch_id):
+    """백그라운드에서 배치 발송 시작 (즉시 반환)"""
+    t = threading.Thread(target=run_batch, args=(app, batch_id),
+                         name=f'sms-batch-{batch_id[:8]}', daemon=True)
+    t.start()
+    return t
+
+
+def batch_counts(batch_id):
+    """배치의 상태별 건수 (GROUP BY 1회)"""
+    counts = dict.fromkeys(ALL_STATUSES, 0)
+    counts.update(dict(db.session.query(SmsDeliveryLog.status, func.count()).filter(
+        SmsDeliveryLog.batch_id == batch_id
+    ).group_by(SmsDeliveryLog.status).all()))
+    return counts
+
+
+def recover_stale_batches(app, now=None):
+    """
+    발송 스레드가 사라져(프로세스 재시작 등) 멈춘 건 정리
+
+    - queued: 생성(created_at) 후 SMS_STALE_SECONDS가 지난 건은 배치를 다시 발송한다.
+      _send_chunk가 queued → sending 전환을 compare-and-set으로 하므로 중복 발송되지 않는다.
+    - sending: 발송을 가져간 시각(claimed_at, 옛 데이터는 created_at)이 SMS_STALE_SECONDS보다
+      오래된 건만 대상. 알리고에 이미 요청했을 수 있으므로 다시 보내지 않는다 —
+      청구서 발송이 기록됐으면 sent, 아니면 unknown(수동 확인)으로 마무리한다.
+
+    Returns:
+        다시 발송한 배치 ID 목록
+    """
+    with app.app_context():
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(seconds=app.config.get('SMS_STALE_SECONDS', DEFAULT_STALE_SECONDS))
+        stale_queued = SmsDeliveryLog.query.filter(
+            SmsDeliveryLog.status == 'queued',
+            SmsDeliveryLog.created_at < cutoff,
+        ).all()
+        stale_sending = SmsDeliveryLog.query.filter(
+            SmsDeliveryLog.status == 'sending',
+            db.or_(
+                SmsDeliveryLog.claimed_at < cutoff,
+                db.and_(SmsDeliveryLog.claimed_at.is_(None), SmsDeliveryLog.created_at < cutoff),
+            ),
+        ).all()
+
+        if stale_sending:
+            sent_at = dict(db.session.query(Payment.payment_id, Payment.sms_sent_at).filter(
+                Payment.payment_id.in_({log.payment_id for log in stale_sending if log.payment_id}),
+                Payment.sms_sent_at.isnot(None),
+            ).all())
+            for log in stale_sending:
+                if log.payment_id in sent_at:
+                    log.status, log.sent_at = 'sent', sent_at[log.payment_id]
+                    log.reason = log.reason or '발송 기록 확인 (중단 후 복구)'
+                else:
+                    log.status = 'unknown'
+                    log.reason = '발송 중 중단 — 발송 여부 확인 필요'
+                    logger.warning(f'[SMS] 발송 결과 불명 (수동 확인 필요): {log.log_id}')
+            db.session.commit()
+
+        batch_ids = {log.batch_id for log in stale_queued}
+
+    for batch_id in batch_ids:
+        logger.warning(f'[SMS] 멈춘 배치 재발송: {batch_id}')
+        run_batch(app, batch_id)
+    return sorted(batch_ids)
+
+
+def get_batch_status(batch_id):
+    """배치 진행 상황 (화면 폴링용)"""
+    logs = SmsDeliveryLog.query.filter_by(batch_id=batch_id).order_by(
+        SmsDeliveryLog.created_at, SmsDeliveryLog.log_id).all()
+    counts = dict.fromkeys(ALL_STATUSES, 0)
+    for log in logs:
+        counts[log.status] = counts.get(log.status, 0) + 1
+    return {
+        'batch_id': batch_id,
+        'total': len(logs),
+        'counts': counts,
+        'done': bool(logs) and all(log.status in FINAL_STATUSES for log in logs),
+        'items': [log.to_dict() for log in logs],
+    }
@@ -190,8 +190,13 @@ def get_mbti_learning_insights(mbti_result, mbti_type):
     return insights
 
 
-def generate_student_insights(student, enrollments, profile, mbti_result, mbti_type, consultations, feedbacks=None):
-    """학생 종합 인사이트 생성"""
+def generate_student_insights(student, enrollments, profile, mbti_result, mbti_type, consultations, feedbacks=None,
+                              attendance_trend=None, parent_count=None):
+    """학생 종합 인사이트 생성
+
+    attendance_trend((최근 2주 출석률, 전체 출석률))와 parent_count(활성 학부모 연결 수)를
+    넘기면 학생별 조회 없이 그 값을 쓴다 (일괄 분석용).
+    """
     insights = {
         'risk_factors': [],      # 위험 요소
         'warning_factors': [],   # 주의 요소
@@ -200,7 +205,9 @@ def generate_student_insights(student, enrollments, profile, mbti_result, mbti_t
     }
 
     # 1. 출석률 분석
-    recent_rate, overall_rate = get_recent_attendance_trend(student.student_id)
+    if attendance_trend is None:
+        attendance_trend = get_recent_attendance_trend(student.student_id)
+    recent_rate, overall_rate = attendance_trend
 
     if recent_rate is not None and overall_rate is not None:
         if recent_rate < 70:
@@ -320,13 +327,14 @@ def generate_student_insights(student, enrollments, profile, mbti_result, mbti_t
             })
 
     # 5. 학부모 연락 가능 여부
-    from app.models.parent_student import ParentStudent
-    parent_relations = ParentStudent.query.filter_by(student_id=student.student_id, is_active=True).all()
+    if parent_count is None:
+        from app.models.parent_student import ParentStudent
+        parent_count = ParentStudent.query.filter_by(student_id=student.student_id, is_active=True).count()
 
-    if parent_relations:
+    if parent_count:
         insights['strengths'].append({
             'category': '학부모',
-            'description': f'학부모 {len(parent_relations)}명 연결됨 (협조 가능)',
+            'description': f'학부모 {parent_count}명 연결됨 (협조 가능)',
             'icon': '🟢'
         })
     else:
@@ -362,16 +370,232 @@ def generate_student_insights(student, enrollments, profile, mbti_result, mbti_t
     return insights
 
 
-def get_all_students_risk_analysis():
-    """전체 학생 위험도 분석"""
+
+
+# ════════════════════════════════════════════════════════
+# 전체 학생 일괄 분석 + 스냅샷
+# ════════════════════════════════════════════════════════
+#
+# 학생마다 수강/프로필/상담/MBTI/출석 추이/학부모를 따로 조회하던 것을
+# 입력 종류별 GROUP BY / 윈도 함수 쿼리 몇 번으로 모아 한 번에 점수를 매긴다.
+# 결과는 student_risk_snapshots에 저장해 대시보드는 스냅샷만 읽고,
+# 관련 데이터가 바뀐 학생(세션 훅이 행 삭제)과 오늘 계산되지 않은 학생만 다시 계산한다.
+
+IN_CHUNK = 500
+
+
+def _chunks(ids):
+    if ids is None:
+        yield None
+        return
+    ids = list(ids)
+    for i in range(0, len(ids), IN_CHUNK):
+        yield ids[i:i + IN_CHUNK]
+
+
+def _load_attendance_trends(student_ids, now):
+    """{student_id: (최근 2주 출석률, 전체 출석률)} — 출결 집계 테이블 1쿼리
+
+    get_recent_attendance_trend()와 같은 규칙: 최근 2주 출결이 없으면 (None, None).
+    (날짜 컬럼을 now-14일 시각과 비교하므로 경계일은 제외된다)
+    """
+    from app import db
+    from sqlalchemy import case
+    from app.models.attendance_rollup import AttendanceDailyStat as S
+
+    recent = S.stat_date > (now - timedelta(days=14)).date()
+    trends = {}
+    for chunk in _chunks(student_ids):
+        query = db.session.query(
+            S.student_id,
+            func.sum(case((recent, S.total), else_=0)),
+            func.sum(case((recent, S.present), else_=0)),
+            func.sum(S.total),
+            func.sum(S.present),
+        )
+        if chunk is not None:
+            query = query.filter(S.student_id.in_(chunk))
+        for student_id, recent_total, recent_present, total, present in query.group_by(S.student_id):
+            if not recent_total:
+                continue
+            trends[student_id] = (
+                round((recent_present / recent_total) * 100, 1),
+                round((present / total) * 100, 1) if total else 0,
+            )
+    return trends
+
+
+def _load_grouped(model, student_ids, *filters):
+    """{student_id: [객체, ...]}"""
+    grouped = {}
+    for chunk in _chunks(student_ids):
+        query = model.query.filter(*filters)
+        if chunk is not None:
+            query = query.filter(model.student_id.in_(chunk))
+        for obj in query:
+            grouped.setdefault(obj.student_id, []).append(obj)
+    return grouped
+
+
+def _load_ranked(model, student_ids, order_by, limit):
+    """학생별 order_by 상위 limit건 {student_id: [객체, ...]} (ROW_NUMBER 1쿼리)"""
+    from app import db
+    from sqlalchemy.orm import aliased
+
+    grouped = {}
+    for chunk in _chunks(student_ids):
+        ranked = db.session.query(
+            model,
+            func.row_number().over(partition_by=model.student_id, order_by=order_by).label('rn'),
+        )
+        if chunk is not None:
+            ranked = ranked.filter(model.student_id.in_(chunk))
+        ranked = ranked.subquery()
+        alias = aliased(model, ranked)
+        for obj in db.session.query(alias).filter(ranked.c.rn <= limit).order_by(ranked.c.rn):
+            grouped.setdefault(obj.student_id, []).append(obj)
+    return grouped
+
+
+def _load_parent_counts(student_ids):
+    from app import db
+    from app.models.parent_student import ParentStudent
+
+    counts = {}
+    for chunk in _chunks(student_ids):
+        query = db.session.query(ParentStudent.student_id, func.count(ParentStudent.relation_id))\
+            .filter(ParentStudent.is_active == True)
+        if chunk is not None:
+            query = query.filter(ParentStudent.student_id.in_(chunk))
+        counts.update(query.group_by(ParentStudent.student_id))
+    return counts
+
+
+def analyze_students(students=None, now=None):
+    """학생 위험도 일괄 분석 (학생 수와 무관하게 입력 종류별 쿼리 몇 번)
+
+    Args:
+        students: 분석할 Student 목록 (None이면 전체 학생, IN 조건 없이 읽는다)
+        now: 기준 시각 (기본: 현재)
+    Returns:
+        {student_id: (insights, 최근 2주 출석률)}
+    """
     from app.models import Student
     from app.models.course import CourseEnrollment
     from app.models.student_profile import StudentProfile
     from app.models.consultation import ConsultationRecord
     from app.models.reading_mbti import ReadingMBTIResult, ReadingMBTIType
+
+    if students is None:
+        students = Student.query.all()
+        student_ids = None
+    else:
+        student_ids = [s.student_id for s in students]
+    if not students:
+        return {}
+    now = now or datetime.now()
+
+    trends = _load_attendance_trends(student_ids, now)
+    enrollments = _load_grouped(CourseEnrollment, student_ids)
+    profiles = {sid: rows[0] for sid, rows in _load_grouped(StudentProfile, student_ids).items()}
+    consultations = _load_ranked(
+        ConsultationRecord, student_ids,
+        (ConsultationRecord.consultation_date.desc(), ConsultationRecord.consultation_id.desc()), 10)
+    mbti_results = {sid: rows[0] for sid, rows in _load_ranked(
+        ReadingMBTIResult, student_ids,
+        (ReadingMBTIResult.created_at.desc(), ReadingMBTIResult.result_id.desc()), 1).items()}
+    type_ids = {r.type_id for r in mbti_results.values()}
+    mbti_types = {t.type_id: t for t in ReadingMBTIType.query.filter(
+        ReadingMBTIType.type_id.in_(type_ids))} if type_ids else {}
+    parent_counts = _load_parent_counts(student_ids)
+
+    analyzed = {}
+    for student in students:
+        sid = student.student_id
+        mbti_result = mbti_results.get(sid)
+        trend = trends.get(sid, (None, None))
+        insights = generate_student_insights(
+            student, enrollments.get(sid, []), profiles.get(sid), mbti_result,
+            mbti_types.get(mbti_result.type_id) if mbti_result else None,
+            consultations.get(sid, []),
+            attendance_trend=trend, parent_count=parent_counts.get(sid, 0),
+        )
+        analyzed[sid] = (insights, trend[0])
+    return analyzed
+
+
+def _snapshot_values(insights, recent_rate):
+    return {
+        'risk_score': insights['risk_score'],
+        'status': insights['overall_status'],
+        'label': insights['overall_label'],
+        'risk_count': len(insights['risk_factors']),
+        'warning_count': len(insights['warning_factors']),
+        'recent_attendance': recent_rate,
+    }
+
+
+def refresh_risk_snapshots(students=None, now=None):
+    """학생 위험도를 일괄 계산해 스냅샷 교체. 커밋은 호출 측에서.
+
+    Args:
+        students: 갱신할 Student 목록 (None이면 전체)
+    Returns:
+        {student_id: 스냅샷 값 dict}
+    """
+    from sqlalchemy import delete, insert
+    from app import db
+    from app.models.student_risk import StudentRiskSnapshot
+
+    now = now or datetime.now()
+    values = {sid: _snapshot_values(insights, recent_rate)
+              for sid, (insights, recent_rate) in analyze_students(students, now).items()}
+
+    table = StudentRiskSnapshot.__table__
+    connection = db.session.connection()
+    if students is None:
+        connection.execute(delete(table))
+    else:
+        for chunk in _chunks(values):
+            connection.execute(delete(table).where(table.c.student_id.in_(chunk)))
+    rows = [dict(v, student_id=sid, computed_at=now) for sid, v in values.items()]
+    for i in range(0, len(rows), IN_CHUNK):
+        connection.execute(insert(table), rows[i:i + IN_CHUNK])
+    return values
+
+
+def get_all_students_risk_analysis():
+    """전체 학생 위험도 분석
+
+    스냅샷을 읽고, 스냅샷이 없거나(관련 데이터 변경으로 삭제됨) 오늘 계산되지 않은 학생만
+    일괄 분석으로 다시 계산해 저장한다.
+    """
+    import logging
     from app import db
+    from app.models import Student
+    from app.models.student_risk import StudentRiskSnapshot
 
     students = Student.query.order_by(Student.name).all()
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    snapshots = {}
+    for snap in StudentRiskSnapshot.query:
+        if snap.computed_at >= today:
+            snapshots[snap.student_id] = {
+                c: getattr(snap, c) for c in ('risk_score', 'status', 'label', 'risk_count',
+                                              'warning_count', 'recent_attendance')
+            }
+
+    outdated = [s for s in students if s.student_id not in snapshots]
+    if outdated:
+        try:
+            snapshots.update(refresh_risk_snapshots(outdated))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.getLogger(__name__).error(f'[RiskSnapshot] 스냅샷 저장 오류: {e}')
+            snapshots.update({sid: _snapshot_values(insights, recent_rate)
+                              for sid, (insights, recent_rate) in analyze_students(outdated).items()})
+
     risk_analysis = {
         'high_risk': [],
         'medium_risk': [],
@@ -380,34 +604,12 @@ def get_all_students_risk_analysis():
     }
 
     for student in students:
-        # 데이터 수집
-        enrollments = CourseEnrollment.query.filter_by(student_id=student.student_id).all()
-        profile = StudentProfile.query.filter_by(student_id=student.student_id).first()
-        consultations = ConsultationRecord.query.filter_by(student_id=student.student_id)\
-            .order_by(ConsultationRecord.consultation_date.desc())\
-            .limit(10).all()
-        mbti_result = ReadingMBTIResult.query.filter_by(student_id=student.student_id)\
-            .order_by(ReadingMBTIResult.created_at.desc()).first()
-        mbti_type = ReadingMBTIType.query.get(mbti_result.type_id) if mbti_result else None
-
-        # 인사이트 생성
-        insights = generate_student_insights(
-            student, enrollments, profile, mbti_result, mbti_type, consultations
-        )
+        snap = snapshots[student.student_id]
+        student_data = dict(snap, student=student)
 
-        student_data = {
-            'student': student,
-            'risk_score': insights['risk_score'],
-            'status': insights['overall_status'],
-            'label': insights['overall_label'],
-            'risk_count': len(insights['risk_factors']),
-            'warning_count': len(insights['warning_factors']),
-            'recent_attendance': get_recent_attendance_trend(student.student_id)[0]
-        }
-
-        if insights['overall_status'] == 'high_risk':
+        if snap['status'] == 'high_risk':
             risk_analysis['high_risk'].append(student_data)
-        elif insights['overall_status'] == 'medium_risk':
+        elif snap['status'] == 'medium_risk':
             risk_analysis['medium_risk'].append(student_data)
         else:
             risk_analysis['low_risk'].append(student_data)
@@ -417,3 +619,67 @@ def get_all_students_risk_analysis():
     risk_analysis['medium_risk'].sort(key=lambda x: x['risk_score'], reverse=True)
 
     return risk_analysis
+
+
+# ════════════════════════════════════════════════════════
+# 스냅샷 무효화 (세션 훅)
+# ════════════════════════════════════════════════════════
+
+def _watched_models():
+    from app.models import Attendance, CourseEnrollment, ParentStudent
+    from app.models.student_profile import StudentProfile
+    from app.models.consultation import ConsultationRecord
+    from app.models.reading_mbti import ReadingMBTIResult
+    return (Attendance, CourseEnrollment, ParentStudent, StudentProfile, ConsultationRecord, ReadingMBTIResult)
+
+
+def _after_flush(session, flush_context):
+    """위험도 입력이 바뀐 학생의 스냅샷 행을 같은 트랜잭션에서 삭제 (다음 조회 시 재계산)"""
+    from sqlalchemy import delete, inspect, select
+    from app.models import Attendance, CourseSession
+    from app.models.student_risk import StudentRiskSnapshot
+
+    watched = _watched_models()
+    student_ids = set()
+    session_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, watched):
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            history = inspect(obj).attrs['student_id'].history
+            student_ids.update(str(v) for v in list(history.added or ()) + list(history.deleted or ()) if v)
+            if obj.student_id:
+                student_ids.add(str(obj.student_id))
+        elif isinstance(obj, CourseSession) and obj in session.dirty:
+            # 수업일이 바뀌면 최근 2주 출석률이 달라진다
+            if inspect(obj).attrs['session_date'].history.has_changes():
+                session_ids.add(obj.session_id)
+
+    connection = session.connection() if student_ids or session_ids else None
+    if session_ids:
+        student_ids.update(connection.execute(
+            select(Attendance.student_id).where(Attendance.session_id.in_(session_ids)).distinct()
+        ).scalars())
+    if student_ids:
+        table = StudentRiskSnapshot.__table__
+        for chunk in _chunks(student_ids):
+            connection.execute(delete(table).where(table.c.student_id.in_(chunk)))
+
+
+def invalidate_snapshots(student_ids):
+    """세션 훅을 거치지 않은 변경(일괄 INSERT 등)의 학생 스냅샷 삭제 — 다음 조회 때 다시 계산"""
+    from sqlalchemy import delete
+    from app.models import db
+    from app.models.student_risk import StudentRiskSnapshot
+    table = StudentRiskSnapshot.__table__
+    for chunk in _chunks(set(student_ids)):
+        if chunk:
+            db.session.execute(delete(table).where(table.c.student_id.in_(chunk)))
+
+
+def init_risk_snapshots(app):
+    """위험도 스냅샷 무효화용 세션 훅 등록"""
+    from sqlalchemy import event
+    from app.models import db
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
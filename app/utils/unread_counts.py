@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""네비게이션 배지용 미읽음 카운트 (사용자별 단기 캐시)
+
+모든 템플릿 렌더링마다 실행되는 inject_unread_counts가 유형별 COUNT 쿼리를
+여러 번 날리지 않도록
+
+- 알림 카운트는 notifications를 notification_type별 GROUP BY 한 번으로 집계
+- 사용자별 결과를 UNREAD_COUNTS_TTL(초) 동안 캐싱
+- 승인 대기 회원 수는 관리자 공용 값으로 한 번만 계산해 캐싱 (NOT EXISTS 서브쿼리)
+
+알림 생성/읽음 처리, DM, 회원 상태 변경이 커밋되면 해당 사용자 캐시를 비운다
+(세션 flush/commit 훅). 캐시는 프로세스별이므로 다른 워커에는 TTL 이내로 반영된다.
+"""
+import threading
+import time
+
+from sqlalchemy import event, func, select
+
+DEFAULT_TTL = 15          # 초
+MAX_ENTRIES = 5000        # 초과 시 만료된 항목 정리
+
+# 배지 키 → notification_type 목록
+NOTIFICATION_BADGES = {
+    'homework': ('homework_assignment',),
+    'announcement': ('class_announcement',),
+    'essay': ('essay_complete',),
+    'feedback': ('teacher_feedback', 'consultation'),
+    'new_submission': ('essay_submitted',),   # 강사용: 새 제출 건수
+}
+
+# 승인 대기 회원 계산에서 제외할 알림 유형 (거절됐거나 이미 한 번 승인된 사용자)
+PENDING_EXCLUDE_TYPES = ('account_rejected', 'account_approved')
+
+_ALL = '__all__'
+_DIRTY_KEY = 'unread_counts_dirty'
+
+_cache = {}        # user_id → (만료 시각, counts)
+_pending = {'expires': 0.0, 'value': 0}
+_lock = threading.Lock()
+
+
+def default_counts():
+    return {'homework': 0, 'announcement': 0, 'essay': 0,
+            'feedback': 0, 'total': 0, 'assignments': 0, 'pending_users': 0,
+            'hall_of_fame': 0}
+
+
+def _ttl():
+    from flask import current_app
+    return current_app.config.get('UNREAD_COUNTS_TTL', DEFAULT_TTL)
+
+
+def invalidate(user_ids=None):
+    """사용자 캐시 삭제 (user_ids가 None이면 전체 + 승인 대기 수)"""
+    with _lock:
+        if user_ids is None:
+            _cache.clear()
+            _pending['expires'] = 0.0
+            return
+        for uid in user_ids:
+            _cache.pop(uid, None)
+
+
+def invalidate_pending_users():
+    with _lock:
+        _pending['expires'] = 0.0
+
+
+def _notification_counts(user_id):
+    """미읽음 알림 유형별 개수 (GROUP BY 1회)"""
+    from app.models import db
+    from app.models.notification import Notification
+
+    rows = db.session.query(
+        Notification.notification_type, func.count()
+    ).filter(
+        Notification.user_id == user_id,
+        Notification.is_read == False  # noqa: E712
+    ).group_by(Notification.notification_type).all()
+    return dict(rows)
+
+
+def _pending_users_count():
+    """승인 대기 회원 수 (관리자 공용, TTL 동안 재사용)"""
+    now = time.monotonic()
+    with _lock:
+        if _pending['expires'] > now:
+            return _pending['value']
+
+    from app.models import db, User
+    from app.models.notification import Notification
+
+    excluded = select(Notification.notification_id).where(
+        Notification.user_id == User.user_id,
+        Notification.notification_type.in_(PENDING_EXCLUDE_TYPES)
+    ).exists()
+    value = db.session.query(func.count(User.user_id)).filter(
+        User.is_active == False,  # noqa: E712
+        User.role.in_(['teacher', 'parent', 'student']),
+        ~excluded
+    ).scalar() or 0
+
+    with _lock:
+        _pending['value'] = value
+        _pending['expires'] = now + _ttl()
+    return value
+
+
+def _dm_unread(user_id):
+    from app.models import db
+    from app.models.conversation import Conversation, ConversationMessage
+    return ConversationMessage.query.join(
+        Conversation,
+        ConversationMessage.conversation_id == Conversation.conversation_id
+    ).filter(
+        db.or_(
+            Conversation.user1_id == user_id,
+            Conversation.user2_id == user_id
+        ),
+        ConversationMessage.sender_id != user_id,
+        ConversationMessage.is_read == False  # noqa: E712
+    ).count()
+
+
+def _hall_of_fame_new(user):
+    """명예의 전당 새 글 수 (마지막 열람 이후 게시된 글)"""
+    from datetime import datetime
+    from app.models.library import HallOfFame
+    last_viewed = user.hall_of_fame_last_viewed_at or datetime(2000, 1, 1)
+    return HallOfFame.query.filter(
+        HallOfFame.is_published == True,  # noqa: E712
+        HallOfFame.created_at > last_viewed
+    ).count()
+
+
+def compute_unread_counts(user):
+    """캐시 없이 미읽음 카운트 계산"""
+    by_type = _notification_counts(user.user_id)
+
+    counts = {key: sum(by_type.get(t, 0) for t in types)
+              for key, types in NOTIFICATION_BADGES.items()}
+    counts['assignments'] = counts['homework'] + counts['announcement']
+    counts['total'] = sum(by_type.values())
+
+    # 관리자용: 승인 대기 회원 수
+    counts['pending_users'] = (
+        _pending_users_count()
+        if user.is_active and user.has_permission_level(2) else 0
+    )
+    # DM 미읽은 수 (강사/관리자만)
+    counts['dm'] = _dm_unread(user.user_id) if user.role in ('admin', 'teacher') else 0
+    counts['hall_of_fame'] = _hall_of_fame_new(user)
+    return counts
+
+
+def get_unread_counts(user):
+    """미읽음 카운트 (사용자별 TTL 캐시)"""
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(user.user_id)
+        if hit and hit[0] > now:
+            return dict(hit[1])
+
+    counts = compute_unread_counts(user)
+    with _lock:
+        if len(_cache) >= MAX_ENTRIES:
+            for uid in [uid for uid, (exp, _) in _cache.items() if exp <= now]:
+                del _cache[uid]
+        _cache[user.user_id] = (now + _ttl(), counts)
+    return dict(counts)
+
+
+# ------------------------------------------------------------------ #
+#  커밋 시 캐시 무효화                                                 #
+# ------------------------------------------------------------------ #
+
+def _mark_dirty(session, user_ids=None, pending=False):
+    dirty = session.info.setdefault(_DIRTY_KEY, {'users': set(), 'all': False, 'pending': False})
+    if user_ids is None:
+        dirty['all'] = True
+    else:
+        dirty['users'].update(uid for uid in user_ids if uid)
+    dirty['pending'] = dirty['pending'] or pending
+
+
+def _after_flush(session, flush_context):
+    from app.models import User
+    from app.models.notification import Notification
+    from app.models.conversation import Conversation, ConversationMessage
+    from app.models.library import HallOfFame
+
+    conversation_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Notification):
+            _mark_dirty(session, [obj.user_id],
+                        pending=obj.notification_type in PENDING_EXCLUDE_TYPES)
+        elif isinstance(obj, ConversationMessage):
+            conversation_ids.add(obj.conversation_id)
+        elif isinstance(obj, User):
+            _mark_dirty(session, [obj.user_id], pending=True)
+        elif isinstance(obj, HallOfFame):
+            _mark_dirty(session)
+
+    if conversation_ids:
+        rows = session.execute(
+            select(Conversation.user1_id, Conversation.user2_id)
+            .where(Conversation.conversation_id.in_(conversation_ids))
+        ).all()
+        _mark_dirty(session, [uid for row in rows for uid in row])
+
+
+def _on_bulk_statement(orm_execute_state):
+    """Query.update()/delete() 등 대상 사용자를 알 수 없는 일괄 변경 → 전체 무효화"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    from app.models import User
+    from app.models.notification import Notification
+    from app.models.conversation import ConversationMessage
+    from app.models.library import HallOfFame
+    if mapper.class_ in (Notification, ConversationMessage, User, HallOfFame):
+        _mark_dirty(orm_execute_state.session)
+
+
+def _after_commit(session):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+    if dirty['all']:
+        invalidate()
+        return
+    invalidate(dirty['users'])
+    if dirty['pending']:
+        invalidate_pending_users()
+
+
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def init_unread_counts(app):
+    """캐시 무효화용 세션 훅 등록"""
+    from app.models import db
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'do_orm_execute', _on_bulk_statement)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
@@ -5,13 +5,14 @@ from flask_login import login_required, current_user
 from datetime import datetime, time as dtime, timedelta
 
 from app.zoom import zoom_bp
-from app.models import db, User, Student, Course, CourseSession, CourseEnrollment
+from app.models import db, User, Course, CourseSession, CourseEnrollment
 from app.utils.zoom_utils import (
     decrypt_zoom_link,
     can_access_zoom,
     get_current_or_upcoming_session,
     log_zoom_access
 )
+from app.utils.principal import linked_student
 
 
 @zoom_bp.route('/join/<string:token>')
@@ -27,7 +28,7 @@ def join(token):
         return redirect(url_for('student.index'))
 
     # 학생 정보 조회
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = linked_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'danger')
         return redirect(url_for('student.index'))
@@ -109,7 +110,7 @@ def preview(token):
         return redirect(url_for('student.index'))
 
     # 학생 정보 조회
-    student = Student.query.filter_by(user_id=current_user.user_id).first()
+    student = linked_student()
     if not student:
         flash('학생 정보를 찾을 수 없습니다.', 'danger')
         return redirect(url_for('student.index'))
@@ -2,7 +2,7 @@
 """
 초등(elementary) 모델 첨삭의 점수를 기존 HTML에서 역산하여 DB에 저장.
 - EssayResult.total_score == NULL 인 elementary 첨삭 대상
-- EssayVersion.html_content 에서 polygon 좌표 역산
+- 첨삭 버전 HTML(essay_store)에서 polygon 좌표 역산
 - AI 재호출 없음
 """
 import sys, os, logging
@@ -23,6 +23,7 @@ from app.models import db
 from app.models.essay import Essay, EssayResult, EssayVersion
 from app.models.essay_score import EssayScore
 from app.essays.score_parser import get_parser
+from app.utils import essay_store
 
 app = create_app()
 with app.app_context():
@@ -45,7 +46,7 @@ with app.app_context():
     for essay, result, version in targets:
         student_name = essay.student.name if essay.student else '알수없음'
         try:
-            parsed = parser.parse_elementary_html(version.html_content)
+            parsed = parser.parse_elementary_html(essay_store.load_html(version) or '')
             if not parsed.get('success') or parsed.get('total_score') is None:
                 print(f"  ❌ SKIP {essay.essay_id} [{student_name}] - 파싱 실패")
                 failed += 1
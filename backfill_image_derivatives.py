@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+게시판 이미지 파생본(썸네일/중간 크기 × JPEG/WebP) 생성.
+
+새 업로드는 커밋 후 백그라운드에서 자동 생성되지만, 파생본 도입 이전 이미지는
+variants가 비어 있어 원본이 그대로 서빙되므로 배포 직후 한 번 실행한다.
+
+    python backfill_image_derivatives.py
+"""
+import sys, os
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.models.post_image import PostImage
+from app.utils.image_utils import build_derivatives
+
+BATCH = 100
+
+app = create_app()
+with app.app_context():
+    total = 0
+    while True:
+        ids = [row.image_id for row in PostImage.query.with_entities(PostImage.image_id)
+               .filter(PostImage.variants.is_(None)).limit(BATCH)]
+        if not ids:
+            break
+        total += build_derivatives(ids)
+        print(f"  {total}건 처리")
+    print("=" * 60)
+    print(f"파생 이미지 생성 완료: {total}건")
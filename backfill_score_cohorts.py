@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+학년별 첨삭 점수 분포 집계(score_cohort_stats) 재생성 / 점검.
+
+점수 저장·첨삭 완료·학년 변경은 세션 훅으로 자동 반영되지만, 집계 도입 이전 데이터와
+Query.update() 같은 일괄 변경은 반영되지 않으므로 배포 직후 또는 일괄 변경 후 실행한다.
+
+    python backfill_score_cohorts.py            # 전체 재생성
+    python backfill_score_cohorts.py --check    # 원본과 비교만 (변경 없음)
+"""
+import sys, os
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.models import db
+from app.utils.score_cohorts import find_mismatches, rebuild
+
+app = create_app()
+with app.app_context():
+    if '--check' in sys.argv:
+        mismatches = find_mismatches()
+        for key, expected, actual in mismatches[:50]:
+            print(f"  {key}: 원본 {expected} / 집계 {actual}")
+        print("=" * 60)
+        print(f"불일치 {len(mismatches)}건" + (" (--check 없이 실행하면 재생성)" if mismatches else ""))
+        sys.exit(1 if mismatches else 0)
+
+    count = rebuild()
+    db.session.commit()
+    print("=" * 60)
+    print(f"집계 완료: {count}행")
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+통합 검색 역색인(search_tokens) 전체 재생성.
+
+검색 대상(학생/수업/자료/과제/게시글/사용자)의 생성·수정·삭제는 세션 훅으로
+자동 색인되지만, 색인 도입 이전 데이터와 Query.update() 같은 일괄 변경은
+반영되지 않으므로 배포 직후 또는 일괄 변경 후 한 번 실행한다.
+
+    python backfill_search_index.py                 # 전체
+    python backfill_search_index.py post student    # 일부 대상만
+"""
+import sys, os
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.models import db
+from app.utils.search_index import get_entities, rebuild_index
+
+targets = [a for a in sys.argv[1:] if not a.startswith('-')]
+
+app = create_app()
+with app.app_context():
+    unknown = [t for t in targets if t not in get_entities()]
+    if unknown:
+        print(f"알 수 없는 대상: {', '.join(unknown)} (가능: {', '.join(get_entities())})")
+        sys.exit(1)
+
+    counts = rebuild_index(targets or None)
+    db.session.commit()
+
+    for entity_type, count in counts.items():
+        print(f"  {entity_type:<12} {count}건")
+    print("=" * 60)
+    print(f"색인 완료: 총 {sum(counts.values())}건")
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+일괄 첨삭 PDF 생성 처리량 벤치마크 (호출마다 브라우저 실행 vs 상주 브라우저 풀).
+
+첨삭 결과와 비슷한 HTML(Noto Sans KR 웹폰트, 표/배경색, 2~3쪽 분량)을 N개 만들어
+같은 묶음을 두 방식으로 PDF로 만들고 분당 처리량(PDFs/min)을 비교한다.
+    - 이전 방식: 1건마다 Chromium 실행 → 탭 → PDF → 종료 (순차)
+    - 브라우저 풀: Chromium 1개 + 예열된 탭 N개, PDFGenerator.generate_batch()로 병렬
+
+풀은 시작(브라우저 실행 + 폰트 예열) 시간을 따로 출력하고 처리량에서는 뺀다 (서버에서는 한 번만 든다).
+
+    python bench_pdf_generator.py                    # 40건, 탭 4개
+    python bench_pdf_generator.py --count 100 --pages 8
+"""
+import sys, os
+import shutil
+import tempfile
+import time
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pathlib import Path
+
+from pdf_generator import BrowserPool, PDFGenerator, FONT_CSS_URL, render_once
+
+
+def _arg(name, default):
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return int(sys.argv[idx + 1])
+    return default
+
+
+N_DOCS = _arg('--count', 40)
+N_PAGES = _arg('--pages', 4)
+
+
+def _sample_html(i):
+    rows = ''.join(
+        f'<tr><td>{k + 1}</td><td>문단 {k + 1}의 논지 전개와 근거 제시</td><td>{(i + k) % 5 + 6}/10</td></tr>'
+        for k in range(12)
+    )
+    paragraph = '학생의 논술문은 주장과 근거가 분명하며, 반론에 대한 재반박을 통해 설득력을 높였다. ' * 12
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="UTF-8">
+<style>
+@import url('{FONT_CSS_URL}');
+body {{ font-family: 'Noto Sans KR', sans-serif; color: #1f2937; }}
+h1 {{ background: #4f46e5; color: #fff; padding: 16px; font-weight: 700; }}
+table {{ width: 100%; border-collapse: collapse; }}
+td {{ border: 1px solid #e5e7eb; padding: 6px; }}
+.box {{ background: #f3f4f6; padding: 12px; margin: 12px 0; font-weight: 300; }}
+</style></head><body>
+<h1>벤치학생{i} 논술 첨삭 리포트</h1>
+<div class="box">{paragraph}</div>
+<table>{rows}</table>
+<div class="box" style="font-weight:500">{paragraph}</div>
+<div class="box" style="font-weight:600">{paragraph}</div>
+</body></html>"""
+
+
+def main():
+    tmpdir = Path(tempfile.mkdtemp(prefix='momoai_bench_pdf_'))
+    try:
+        batch = []
+        for i in range(N_DOCS):
+            html_path = tmpdir / f'bench_{i:04d}.html'
+            html_path.write_text(_sample_html(i), encoding='utf-8')
+            batch.append({'index_num': i, 'html_path': str(html_path), 'pdf_path': None})
+
+        print(f"PDF {N_DOCS}건 / 브라우저 풀 탭 {N_PAGES}개")
+        print("=" * 60)
+
+        legacy_dir = tmpdir / 'legacy'
+        legacy_dir.mkdir()
+        started = time.perf_counter()
+        for r in batch:
+            render_once(r['html_path'], legacy_dir / (Path(r['html_path']).stem + '.pdf'))
+        legacy = time.perf_counter() - started
+        print(f"  {'이전 (호출마다 실행)':<18} {legacy:8.2f}s  {N_DOCS / legacy * 60:8.1f} PDFs/min")
+
+        pool_dir = tmpdir / 'pool'
+        pool_dir.mkdir()
+        pool = BrowserPool(pages=N_PAGES, queue_size=N_PAGES * 4)
+        started = time.perf_counter()
+        pool.start()
+        warmup = time.perf_counter() - started
+        try:
+            generator = PDFGenerator(pool=pool, output_dir=pool_dir)
+            started = time.perf_counter()
+            results = generator.generate_batch(batch)
+            pooled = time.perf_counter() - started
+        finally:
+            pool.close()
+
+        failed = [r for r in results if r['error']]
+        print(f"  {'브라우저 풀':<18} {pooled:8.2f}s  {N_DOCS / pooled * 60:8.1f} PDFs/min"
+              f"  (시작/예열 {warmup:.2f}s 별도, 실패 {len(failed)}건)")
+        print(f"\n  처리량 {legacy / pooled:.1f}배")
+        for r in failed[:5]:
+            print(f"  ❌ #{r['index_num']}: {r['error']}")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
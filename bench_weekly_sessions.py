@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+주간 세션 생성 작업 벤치마크 (이전 수업별 루프 vs generate_sessions_bulk).
+
+임시 SQLite DB에 주간 수업 N개(수업당 수강생 M명)를 만들고, 같은 기간을 두 방식으로
+생성했을 때의 소요 시간과 실행 SQL 수를 비교한다. 각 실행은 롤백하므로 서로 영향이 없다.
+    - 다음 주 (일요일 자정 작업과 같은 범위 — 미래 세션이라 출석 레코드 없음)
+    - 지난 2주 보완 (과거 세션 — 출석 레코드 포함)
+
+    python bench_weekly_sessions.py                       # 수업 300개 × 수강생 8명
+    python bench_weekly_sessions.py --courses 800 --students 12
+"""
+import sys, os
+import shutil
+import tempfile
+import time as _time
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from datetime import date, datetime, time, timedelta
+
+
+def _arg(name, default):
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return int(sys.argv[idx + 1])
+    return default
+
+
+N_COURSES = _arg('--courses', 300)
+N_STUDENTS = _arg('--students', 8)
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_bench_sessions_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "bench.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+
+from sqlalchemy import event, func
+
+from app import create_app
+from app.models import db, User, Student, Course, CourseSession, CourseEnrollment
+from app.utils.course_utils import create_attendance_records_for_session, generate_sessions_bulk
+
+
+def legacy_extend(course, from_date, to_date):
+    """이전 extend_sessions_for_course() — 세션마다 flush 후 수강생을 다시 조회"""
+    actual_from = max(from_date, course.start_date)
+    actual_to = min(to_date, course.end_date)
+    existing_dates = {s.session_date for s in course.sessions if actual_from <= s.session_date <= actual_to}
+    max_num = db.session.query(func.max(CourseSession.session_number)).filter(
+        CourseSession.course_id == course.course_id
+    ).scalar() or 0
+    current = actual_from
+    while current.weekday() != course.weekday:
+        current += timedelta(days=1)
+    created = []
+    while current <= actual_to:
+        if current not in existing_dates:
+            max_num += 1
+            session = CourseSession(course_id=course.course_id, session_number=max_num, session_date=current,
+                                    start_time=course.start_time, end_time=course.end_time, status='scheduled')
+            db.session.add(session)
+            db.session.flush()
+            create_attendance_records_for_session(session)
+            created.append(session)
+        current += timedelta(days=7)
+    course.total_sessions = (course.total_sessions or 0) + len(created)
+    return created
+
+
+def legacy_job(from_date, to_date):
+    courses = Course.query.filter(
+        Course.schedule_type == 'weekly', Course.status == 'active', Course.is_terminated == False,
+        Course.end_date >= from_date, Course.start_date <= to_date
+    ).all()
+    return sum(len(legacy_extend(c, from_date, to_date)) for c in courses)
+
+
+def bulk_job(from_date, to_date):
+    return len(generate_sessions_bulk(from_date, to_date)['sessions'])
+
+
+def main():
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        teacher = User(email='bench_teacher@test.com', name='벤치강사', role='teacher', role_level=1)
+        teacher.set_password('test1234')
+        db.session.add(teacher)
+        db.session.flush()
+
+        today = date.today()
+        courses, students = [], []
+        for i in range(N_COURSES):
+            courses.append(Course(course_name=f'벤치반{i}', course_code=f'BENCH-{i}', teacher_id=teacher.user_id,
+                                  schedule_type='weekly', weekday=i % 7, start_time=time(16, 0),
+                                  end_time=time(18, 0), start_date=today - timedelta(days=90),
+                                  end_date=today + timedelta(days=180), status='active'))
+        for i in range(N_COURSES * N_STUDENTS):
+            students.append(Student(teacher_id=teacher.user_id, name=f'벤치학생{i}', grade='중1'))
+        db.session.add_all(courses + students)
+        db.session.flush()
+        enrolled_at = datetime.combine(today - timedelta(days=60), time(9, 0))
+        db.session.add_all([
+            CourseEnrollment(course_id=c.course_id, student_id=students[i * N_STUDENTS + k].student_id,
+                             status='active', enrolled_at=enrolled_at)
+            for i, c in enumerate(courses) for k in range(N_STUDENTS)
+        ])
+        db.session.commit()
+        db.session.expunge_all()
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(1))
+
+        next_sunday = today + timedelta(days=(6 - today.weekday()) or 7)
+        ranges = [
+            ('다음 주', next_sunday + timedelta(days=1), next_sunday + timedelta(days=7)),
+            ('지난 2주 보완', today - timedelta(days=14), today - timedelta(days=1)),
+        ]
+        print(f"수업 {N_COURSES}개 × 수강생 {N_STUDENTS}명 (SQLite)")
+        print("=" * 60)
+        for label, from_date, to_date in ranges:
+            print(f"\n[{label}] {from_date} ~ {to_date}")
+            for name, job in (('이전 (수업별 루프)', legacy_job), ('일괄 생성', bulk_job)):
+                statements.clear()
+                started = _time.perf_counter()
+                created = job(from_date, to_date)
+                db.session.flush()
+                elapsed = _time.perf_counter() - started
+                attendance = db.session.execute(db.text(
+                    'SELECT count(*) FROM attendance a JOIN course_sessions s ON a.session_id = s.session_id '
+                    'WHERE s.session_date BETWEEN :f AND :t'), {'f': from_date, 't': to_date}).scalar()
+                print(f"  {name:<16} 세션 {created:>5}개  출석 {attendance:>6}건  "
+                      f"SQL {len(statements):>6}회  {elapsed:8.3f}s")
+                db.session.rollback()
+                db.session.expunge_all()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
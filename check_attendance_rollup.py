@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+출결 집계 테이블(attendance_daily_stats)과 원본 Attendance 비교/복구.
+
+집계는 출결·세션 변경 시 세션 훅으로 갱신되지만, Query.update() 같은 일괄 변경이나
+훅 도입 전 데이터는 어긋날 수 있으므로 이 스크립트로 점검한다.
+
+기본은 점검만(출력). 어긋난 기간을 다시 집계하려면 --apply, 전체 재생성은 --rebuild.
+    python check_attendance_rollup.py                              # 전체 점검
+    python check_attendance_rollup.py --from 2026-09-01 --to 2026-09-30
+    python check_attendance_rollup.py --apply                      # 어긋난 날짜만 재집계
+    python check_attendance_rollup.py --rebuild                    # 전체(또는 기간) 재생성
+"""
+import sys, os
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from datetime import datetime
+
+from app import create_app
+from app.models import db
+from app.utils.attendance_rollup import find_mismatches, rebuild
+
+
+def _arg(name):
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return datetime.strptime(sys.argv[idx + 1], '%Y-%m-%d').date()
+    return None
+
+
+APPLY = '--apply' in sys.argv
+REBUILD = '--rebuild' in sys.argv
+date_from = _arg('--from')
+date_to = _arg('--to')
+
+app = create_app()
+with app.app_context():
+    if REBUILD:
+        count = rebuild(date_from, date_to)
+        db.session.commit()
+        print(f"집계 재생성 완료: {count}행 ({date_from or '처음'} ~ {date_to or '끝'})")
+        sys.exit(0)
+
+    mismatches = find_mismatches(date_from, date_to)
+    print(f"불일치: {len(mismatches)}건 ({date_from or '처음'} ~ {date_to or '끝'})")
+    print("=" * 60)
+    for (stat_date, course_id, student_id), expected, actual in mismatches[:50]:
+        print(f"  {stat_date} course={course_id[:8]} student={student_id[:8]}")
+        print(f"    원본: {expected}")
+        print(f"    집계: {actual}")
+    if len(mismatches) > 50:
+        print(f"  ... 외 {len(mismatches) - 50}건")
+
+    if mismatches and APPLY:
+        dates = sorted({key[0] for key, _, _ in mismatches})
+        for d in dates:
+            rebuild(d, d)
+        db.session.commit()
+        remaining = find_mismatches(date_from, date_to)
+        print(f"\n{len(dates)}일 재집계 → 남은 불일치 {len(remaining)}건")
+    elif mismatches:
+        print("\n(dry-run) 반영하려면 --apply 옵션을 주세요.")
+
+    sys.exit(1 if mismatches and not APPLY else 0)
@@ -44,6 +44,10 @@ MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB (수동첨삭 이미지 10개 
 ALLOWED_EXTENSIONS = {'xlsx', 'csv'}
 ALLOWED_MATERIAL_EXTENSIONS = {'pdf', 'doc', 'docx', 'ppt', 'pptx', 'xls', 'xlsx', 'hwp', 'txt', 'zip', 'png', 'jpg', 'jpeg'}
 
+# 일괄 첨삭 PDF 브라우저 풀 (탭 수 0이면 호출마다 브라우저 실행)
+PDF_BROWSER_PAGES = int(os.environ.get('PDF_BROWSER_PAGES', 4))
+PDF_BROWSER_QUEUE = int(os.environ.get('PDF_BROWSER_QUEUE', 32))
+
 # 폴더 생성
 for folder in [UPLOAD_FOLDER, HTML_FOLDER, PDF_FOLDER, POST_FILES_FOLDER, POST_IMAGES_FOLDER,
                MATERIALS_FOLDER, CORRECTION_ATTACHMENTS_FOLDER]:
@@ -79,6 +83,18 @@ class Config:
     POST_IMAGES_FOLDER = str(POST_IMAGES_FOLDER)
     MATERIALS_FOLDER = str(MATERIALS_FOLDER)
     CORRECTION_ATTACHMENTS_FOLDER = str(CORRECTION_ATTACHMENTS_FOLDER)
+    # 게시판 이미지 파생본(썸네일/중간/WebP) 생성 동시 처리 수 / OCR 입력 긴 변 최대 픽셀
+    IMAGE_DERIVATIVE_CONCURRENCY = int(os.environ.get('IMAGE_DERIVATIVE_CONCURRENCY', 2))
+    OCR_IMAGE_MAX_SIDE = int(os.environ.get('OCR_IMAGE_MAX_SIDE', 2048))
+
+    # PDF 렌더 프로세스 수 (0이면 요청 스레드에서 직접 렌더링)
+    PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', 2))
+    # 워커 프로세스의 첫 요청 때 사용 설명서 PDF 미리 생성 / 첨삭 완료 커밋 후 결과 PDF 미리 렌더링
+    # (테스트 스크립트는 false로 두어 PDF_FOLDER/cache에 파일을 만들지 않는다)
+    PDF_PREBUILD_MANUALS = os.environ.get('PDF_PREBUILD_MANUALS', 'true').lower() == 'true'
+    PDF_PRERENDER_ESSAYS = os.environ.get('PDF_PRERENDER_ESSAYS', 'true').lower() == 'true'
+    # 첨삭 HTML 버전 저장소 압축 방식 (gzip / zstd — zstd는 zstandard 패키지 필요)
+    ESSAY_STORE_CODEC = os.environ.get('ESSAY_STORE_CODEC', 'gzip')
 
     # MOMOAI 설정
     ANTHROPIC_API_KEY = ANTHROPIC_API_KEY
@@ -87,10 +103,35 @@ class Config:
     MOMOAI_STANDARD_DOC_PATH = str(MOMOAI_STANDARD_DOC_PATH)
     MOMOAI_ELEM_DOC_PATH = str(MOMOAI_ELEM_DOC_PATH)
 
+    # 첨삭 작업 큐 (DB 기반 — 모든 gunicorn 워커/노드 공통 동시 처리 한도)
+    # embedded: 웹 워커 프로세스 안에서 큐 워커 스레드 실행
+    # external: correction_worker.py 전용 프로세스만 작업 처리
+    CORRECTION_WORKER_MODE = os.environ.get('CORRECTION_WORKER_MODE', 'embedded')
+    CORRECTION_CONCURRENCY = {
+        'claude': int(os.environ.get('CORRECTION_CLAUDE_CONCURRENCY', 2)),
+        'gemini': int(os.environ.get('CORRECTION_GEMINI_CONCURRENCY', 2)),
+    }
+    CORRECTION_LEASE_SECONDS = int(os.environ.get('CORRECTION_LEASE_SECONDS', 120))
+    CORRECTION_MAX_ATTEMPTS = 3
+    # Claude 응답 스트리밍 (진행 상황 표시 + 취소 시 업스트림 즉시 중단)
+    CORRECTION_STREAMING = os.environ.get('CORRECTION_STREAMING', 'true').lower() == 'true'
+    # 일괄 첨삭 (Message Batches) — 배치 1건당 최대 요청 수
+    CORRECTION_BATCH_MAX_REQUESTS = int(os.environ.get('CORRECTION_BATCH_MAX_REQUESTS', 500))
+
+    # 예약 작업 리더 리스 유지 시간 (초) — 리더 노드가 죽으면 이 시간 안에 다른 노드가 넘겨받음
+    SCHEDULER_LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS', 90))
+
     # SMS/카카오톡 API 설정
     SMS_API_KEY = SMS_API_KEY
     SMS_USER_ID = SMS_USER_ID
     SMS_SENDER = SMS_SENDER
+    SMS_API_URL = os.environ.get('SMS_API_URL') or 'https://apis.aligo.in'
+    # 일괄 문자 발송: 동시 전송 묶음 수 / 일시적 오류 재시도 횟수·백오프(초)
+    SMS_DISPATCH_CONCURRENCY = int(os.environ.get('SMS_DISPATCH_CONCURRENCY', 4))
+    SMS_MAX_RETRIES = int(os.environ.get('SMS_MAX_RETRIES', 3))
+    SMS_RETRY_BACKOFF = float(os.environ.get('SMS_RETRY_BACKOFF', 1.0))
+    # 이 시간(초)보다 오래 대기/발송 중인 문자는 발송 스레드가 중단된 것으로 보고 다시 발송
+    SMS_STALE_SECONDS = int(os.environ.get('SMS_STALE_SECONDS', 900))
     KAKAO_API_KEY = KAKAO_API_KEY
     KAKAO_USER_ID = KAKAO_USER_ID
     KAKAO_SENDER_KEY = KAKAO_SENDER_KEY
@@ -103,6 +144,16 @@ class Config:
     VAPID_PRIVATE_KEY = (os.environ.get('VAPID_PRIVATE_KEY') or '').replace('\\n', '\n') or None
     VAPID_PUBLIC_KEY = os.environ.get('VAPID_PUBLIC_KEY')
     VAPID_CLAIMS_SUB = os.environ.get('VAPID_CLAIMS_SUB') or 'mailto:contact@momoai.kr'
+    # 프로세스당 Push 발송 워커 스레드 수
+    PUSH_DISPATCH_WORKERS = int(os.environ.get('PUSH_DISPATCH_WORKERS', 4))
+    # 네비게이션 미읽음 배지 사용자별 캐시 유지 시간 (초)
+    UNREAD_COUNTS_TTL = int(os.environ.get('UNREAD_COUNTS_TTL', 15))
+    # 어휘/스키마 퀴즈 문제은행 프로세스 캐시 유지 시간 (초)
+    QUIZ_BANK_TTL = int(os.environ.get('QUIZ_BANK_TTL', 300))
+    # 강사 시수 이번 달 스냅샷 유지 시간 (초) — 지난달 이전은 고정 스냅샷
+    HOURS_SNAPSHOT_TTL = int(os.environ.get('HOURS_SNAPSHOT_TTL', 300))
+    # 현재 사용자 범위(학생 레코드/자녀/수강 수업/담당 학생) 프로세스 캐시 유지 시간 (초)
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
 
     # 이메일 설정 (Gmail SMTP 예시)
     # .env에 아래 항목 추가 시 이메일 인증 활성화됨
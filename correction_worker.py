@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""첨삭 작업 큐 전용 워커
+
+웹 서버(gunicorn)와 별도 프로세스로 correction_jobs 큐를 처리한다.
+동시 처리 한도는 DB slot으로 관리되므로 여러 대를 띄워도 전체 한도를 넘지 않는다.
+
+사용법:
+    # 웹 워커 내장 처리를 끄고 전용 워커만 사용할 때
+    export CORRECTION_WORKER_MODE=external
+    python correction_worker.py [--concurrency N]
+"""
+import argparse
+import logging
+import os
+import signal
+import sys
+import io
+import time
+
+from app import create_app
+from app.essays.job_queue import CorrectionWorker
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MOMOAI 첨삭 작업 큐 워커')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='처리 스레드 수 (기본: provider별 한도 합계)')
+    parser.add_argument('--poll-interval', type=float, default=3.0,
+                        help='빈 큐 폴링 간격 (초)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    app = create_app(os.environ.get('FLASK_ENV', 'production'))
+    worker = CorrectionWorker(app, concurrency=args.concurrency,
+                              poll_interval=args.poll_interval)
+
+    stopping = {'flag': False}
+
+    def _shutdown(signum, frame):
+        if stopping['flag']:
+            return
+        stopping['flag'] = True
+        print(f'[CorrectionWorker] 종료 신호 수신 — 처리 중 작업 완료 후 종료합니다...')
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    print('=' * 50)
+    print(f'MOMOAI Correction Worker: {worker.worker_id}')
+    print(f'Threads: {worker.concurrency}')
+    print('=' * 50)
+    worker.start()
+
+    while not stopping['flag']:
+        time.sleep(1)
+
+    # 처리 중 작업은 끝까지 진행 (강제 종료되더라도 리스 만료 후 다른 워커가 재처리)
+    worker.stop()
+    print('[CorrectionWorker] 종료')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+주간 수업 세션/출석 레코드 일괄 보완.
+
+지정 기간 안에 빠진 (수업, 날짜) 세션을 한 번에 계산해 생성한다. 이미 있는 날짜는
+건너뛰므로 여러 번 실행해도 중복되지 않는다. 오늘 이전 세션은 활성 수강생 출석 레코드도 함께 만든다.
+
+기본은 dry-run(출력만). 실제로 DB에 반영하려면 --apply 옵션을 준다.
+    python generate_sessions.py --from 2026-10-19 --to 2026-10-25           # dry-run
+    python generate_sessions.py --from 2026-10-19 --to 2026-10-25 --apply   # 실제 반영
+    python generate_sessions.py --from 2026-10-01 --to 2026-10-31 --course <course_id> --apply
+"""
+import sys, os
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from datetime import date, datetime, timedelta
+
+from app import create_app
+from app.models import db, Course
+from app.utils.course_utils import generate_sessions_bulk
+
+
+def _arg(name):
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return None
+
+
+APPLY = '--apply' in sys.argv
+date_from = datetime.strptime(_arg('--from'), '%Y-%m-%d').date() if _arg('--from') else date.today()
+date_to = datetime.strptime(_arg('--to'), '%Y-%m-%d').date() if _arg('--to') else date_from + timedelta(days=6)
+course_ids = [_arg('--course')] if _arg('--course') else None
+
+app = create_app()
+with app.app_context():
+    result = generate_sessions_bulk(date_from, date_to, course_ids=course_ids, dry_run=not APPLY)
+    sessions = result['sessions']
+
+    print(f"기간: {date_from} ~ {date_to}")
+    print(f"누락 세션: {len(sessions)}개 ({result['courses']}개 수업) / 출석 레코드: {result['attendance']}건")
+    print("=" * 60)
+    names = dict(db.session.query(Course.course_id, Course.course_name).filter(
+        Course.course_id.in_({s['course_id'] for s in sessions})
+    ).all()) if sessions else {}
+    for s in sessions[:50]:
+        print(f"  {s['session_date']} {names.get(s['course_id'], s['course_id'][:8])} {s['session_number']}회차")
+    if len(sessions) > 50:
+        print(f"  ... 외 {len(sessions) - 50}개")
+
+    if APPLY:
+        db.session.commit()
+        print("\n반영 완료")
+    else:
+        print("\n(dry-run — 반영하려면 --apply)")
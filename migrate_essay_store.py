@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+첨삭 HTML 버전 저장소 이관 / 정리.
+
+저장소 도입 이전 essay_versions 행은 HTML 전문이 html_content(또는 html_path 파일)에만 있다.
+이 스크립트는 그 행들을 압축·중복 제거된 조각(essay_blobs)으로 옮기고 html_content를 비운다.
+옮기기 전에도 화면은 이전 행을 그대로 읽으므로 배포 후 아무 때나 실행하면 된다.
+
+기본은 dry-run(현황만 출력). 실제로 반영하려면 --apply 옵션을 준다.
+    python migrate_essay_store.py                 # 현황
+    python migrate_essay_store.py --apply         # 이전 행 이관
+    python migrate_essay_store.py --prune         # 참조가 없어진 조각 삭제 (첨삭 초기화 등)
+"""
+import sys, os
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.models import db
+from app.models.essay import EssayVersion
+from app.utils.essay_store import migrate_versions, prune_blobs, store_stats
+
+APPLY = '--apply' in sys.argv
+PRUNE = '--prune' in sys.argv
+
+
+def _mb(n):
+    return f"{n / 1024 / 1024:,.2f}MB"
+
+
+def _print_stats():
+    stats = store_stats()
+    ratio = stats['raw_bytes'] / stats['stored_bytes'] if stats['stored_bytes'] else 0
+    print(f"  저장소 버전: {stats['versions']}개 (원본 {_mb(stats['raw_bytes'])})")
+    print(f"  조각: {stats['blobs']}개 (저장 {_mb(stats['stored_bytes'])}, {ratio:.1f}배 절감)")
+
+
+app = create_app()
+with app.app_context():
+    pending = EssayVersion.query.filter(EssayVersion.content_digest.is_(None)).count()
+    print(f"이관 대상 (이전 행): {pending}개")
+    _print_stats()
+    print("=" * 60)
+
+    if APPLY:
+        migrated, empty = migrate_versions()
+        print(f"이관 완료: {migrated}개" + (f" (HTML 없음 {empty}개 건너뜀)" if empty else ""))
+
+    if PRUNE:
+        removed = prune_blobs()
+        db.session.commit()
+        print(f"참조 없는 조각 삭제: {removed}개")
+
+    if APPLY or PRUNE:
+        _print_stats()
+    else:
+        print("(dry-run — 이관하려면 --apply, 조각 정리는 --prune)")
@@ -0,0 +1,25 @@
+"""add_correction_job_partial_output
+
+Revision ID: a3d8f61c2b94
+Revises: e4a7c2d9f815
+Create Date: 2026-10-23 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a3d8f61c2b94'
+down_revision = 'e4a7c2d9f815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('correction_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('partial_output', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('correction_jobs', schema=None) as batch_op:
+        batch_op.drop_column('partial_output')
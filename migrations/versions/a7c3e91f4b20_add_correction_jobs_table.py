@@ -0,0 +1,56 @@
+"""add_correction_jobs_table
+
+Revision ID: a7c3e91f4b20
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a7c3e91f4b20'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'correction_jobs',
+        sa.Column('job_id', sa.String(length=36), nullable=False),
+        sa.Column('essay_id', sa.String(length=36), nullable=False),
+        sa.Column('job_type', sa.String(length=20), nullable=False),
+        sa.Column('provider', sa.String(length=20), nullable=False),
+        sa.Column('correction_model', sa.String(length=20), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('slot', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('worker_id', sa.String(length=100), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['essay_id'], ['essays.essay_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id'),
+        sa.UniqueConstraint('provider', 'slot', name='uq_correction_job_slot'),
+    )
+    with op.batch_alter_table('correction_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_correction_jobs_essay_id'), ['essay_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_correction_jobs_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_correction_jobs_lease_expires_at'), ['lease_expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_correction_jobs_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('correction_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_correction_jobs_created_at'))
+        batch_op.drop_index(batch_op.f('ix_correction_jobs_lease_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_correction_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_correction_jobs_essay_id'))
+
+    op.drop_table('correction_jobs')
@@ -0,0 +1,43 @@
+"""add_score_cohort_stats_table
+
+Revision ID: a7e3c9f1b604
+Revises: f4b9d2c7e815
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a7e3c9f1b604'
+down_revision = 'f4b9d2c7e815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 앱 시작 시 db.create_all()로 먼저 생성됐을 수 있음
+    # 기존 점수 집계는 배포 후 python backfill_score_cohorts.py 로 생성
+    if 'score_cohort_stats' not in inspector.get_table_names():
+        op.create_table(
+            'score_cohort_stats',
+            sa.Column('stat_date', sa.Date(), nullable=False),
+            sa.Column('grade', sa.String(length=20), nullable=False),
+            sa.Column('metric', sa.String(length=50), nullable=False),
+            sa.Column('bucket', sa.Integer(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.Column('score_sum', sa.Float(), nullable=False),
+            sa.Column('score_sq_sum', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('stat_date', 'grade', 'metric', 'bucket'),
+        )
+        with op.batch_alter_table('score_cohort_stats', schema=None) as batch_op:
+            batch_op.create_index('ix_score_cohort_stats_grade_date', ['grade', 'stat_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('score_cohort_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_score_cohort_stats_grade_date')
+
+    op.drop_table('score_cohort_stats')
@@ -0,0 +1,30 @@
+"""add_post_image_variants
+
+Revision ID: b3d8f1a6c920
+Revises: a7e3c9f1b604
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b3d8f1a6c920'
+down_revision = 'a7e3c9f1b604'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 기존 이미지 파생본은 배포 후 python backfill_image_derivatives.py 로 생성
+    with op.batch_alter_table('post_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('width', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('height', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('post_images', schema=None) as batch_op:
+        batch_op.drop_column('variants')
+        batch_op.drop_column('height')
+        batch_op.drop_column('width')
@@ -0,0 +1,85 @@
+"""add_essay_version_store
+
+Revision ID: b6d3f8a2c517
+Revises: e2b7c5a9d184
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b6d3f8a2c517'
+down_revision = 'e2b7c5a9d184'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 앱 시작 시 db.create_all()로 먼저 생성됐을 수 있음
+    # 기존 essay_versions 행의 HTML 이관은 migrate_essay_store.py --apply 로 한다
+    if 'essay_blobs' not in inspector.get_table_names():
+        op.create_table(
+            'essay_blobs',
+            sa.Column('digest', sa.String(length=64), nullable=False),
+            sa.Column('codec', sa.String(length=10), nullable=False),
+            sa.Column('data', sa.LargeBinary(), nullable=False),
+            sa.Column('raw_size', sa.Integer(), nullable=False),
+            sa.Column('stored_size', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('digest'),
+        )
+
+    if 'essay_version_chunks' not in inspector.get_table_names():
+        op.create_table(
+            'essay_version_chunks',
+            sa.Column('version_id', sa.String(length=36), nullable=False),
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.Column('digest', sa.String(length=64), nullable=False),
+            sa.ForeignKeyConstraint(['version_id'], ['essay_versions.version_id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['digest'], ['essay_blobs.digest']),
+            sa.PrimaryKeyConstraint('version_id', 'seq'),
+        )
+        with op.batch_alter_table('essay_version_chunks', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_essay_version_chunks_digest'), ['digest'], unique=False)
+
+    columns = {c['name'] for c in inspector.get_columns('essay_versions')}
+    with op.batch_alter_table('essay_versions', schema=None) as batch_op:
+        if 'content_digest' not in columns:
+            batch_op.add_column(sa.Column('content_digest', sa.String(length=64), nullable=True))
+        if 'content_size' not in columns:
+            batch_op.add_column(sa.Column('content_size', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    # 저장소로 옮긴 HTML을 html_content로 되돌린 뒤 삭제
+    import gzip
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("""
+        SELECT c.version_id, b.codec, b.data
+        FROM essay_version_chunks c JOIN essay_blobs b ON b.digest = c.digest
+        ORDER BY c.version_id, c.seq
+    """)).fetchall()
+    restored = {}
+    for version_id, codec, data in rows:
+        if codec == 'zstd':
+            import zstandard
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = gzip.decompress(data)
+        restored.setdefault(version_id, []).append(raw)
+    for version_id, parts in restored.items():
+        conn.execute(sa.text("UPDATE essay_versions SET html_content = :html WHERE version_id = :id"),
+                     {'html': b''.join(parts).decode('utf-8'), 'id': version_id})
+
+    with op.batch_alter_table('essay_versions', schema=None) as batch_op:
+        batch_op.drop_column('content_size')
+        batch_op.drop_column('content_digest')
+
+    with op.batch_alter_table('essay_version_chunks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_essay_version_chunks_digest'))
+
+    op.drop_table('essay_version_chunks')
+    op.drop_table('essay_blobs')
@@ -0,0 +1,25 @@
+"""add_sms_delivery_log_claimed_at
+
+Revision ID: b6e2c9f4a713
+Revises: a3d8f61c2b94
+Create Date: 2026-10-24 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b6e2c9f4a713'
+down_revision = 'a3d8f61c2b94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('sms_delivery_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('sms_delivery_logs', schema=None) as batch_op:
+        batch_op.drop_column('claimed_at')
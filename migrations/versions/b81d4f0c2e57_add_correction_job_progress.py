@@ -0,0 +1,28 @@
+"""add_correction_job_progress
+
+Revision ID: b81d4f0c2e57
+Revises: a7c3e91f4b20
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b81d4f0c2e57'
+down_revision = 'a7c3e91f4b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('correction_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('cancel_requested', sa.Boolean(), nullable=False,
+                                      server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table('correction_jobs', schema=None) as batch_op:
+        batch_op.drop_column('cancel_requested')
+        batch_op.drop_column('progress')
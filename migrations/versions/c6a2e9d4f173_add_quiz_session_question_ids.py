@@ -0,0 +1,32 @@
+"""add_quiz_session_question_ids
+
+Revision ID: c6a2e9d4f173
+Revises: b3d8f1a6c920
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c6a2e9d4f173'
+down_revision = 'b3d8f1a6c920'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 기존 진행 중 세션은 다음 풀이 화면 진입 시 문제 세트가 고정됨
+    with op.batch_alter_table('vocabulary_quiz_sessions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_ids', sa.JSON(), nullable=True))
+
+    with op.batch_alter_table('schema_quiz_sessions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_ids', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('schema_quiz_sessions', schema=None) as batch_op:
+        batch_op.drop_column('question_ids')
+
+    with op.batch_alter_table('vocabulary_quiz_sessions', schema=None) as batch_op:
+        batch_op.drop_column('question_ids')
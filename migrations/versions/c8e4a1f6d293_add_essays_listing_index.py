@@ -0,0 +1,28 @@
+"""add_essays_listing_index
+
+Revision ID: c8e4a1f6d293
+Revises: b6d3f8a2c517
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c8e4a1f6d293'
+down_revision = 'b6d3f8a2c517'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 첨삭 목록 키셋 페이지네이션 (created_at, essay_id)
+    indexes = {ix['name'] for ix in inspector.get_indexes('essays')}
+    if 'ix_essays_created_at_essay_id' not in indexes:
+        op.create_index('ix_essays_created_at_essay_id', 'essays', ['created_at', 'essay_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_essays_created_at_essay_id', table_name='essays')
@@ -0,0 +1,53 @@
+"""add_sms_delivery_logs_table
+
+Revision ID: c92e5a7d1f38
+Revises: b81d4f0c2e57
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c92e5a7d1f38'
+down_revision = 'b81d4f0c2e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sms_delivery_logs',
+        sa.Column('log_id', sa.String(length=36), nullable=False),
+        sa.Column('batch_id', sa.String(length=36), nullable=False),
+        sa.Column('payment_id', sa.String(length=36), nullable=True),
+        sa.Column('receiver', sa.String(length=20), nullable=True),
+        sa.Column('receiver_name', sa.String(length=100), nullable=True),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('msg_type', sa.String(length=10), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=500), nullable=True),
+        sa.Column('provider_msg_id', sa.String(length=50), nullable=True),
+        sa.Column('created_by', sa.String(length=36), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['payment_id'], ['payments.payment_id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('log_id'),
+    )
+    with op.batch_alter_table('sms_delivery_logs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sms_delivery_logs_batch_id'), ['batch_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_sms_delivery_logs_payment_id'), ['payment_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_sms_delivery_logs_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_sms_delivery_logs_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('sms_delivery_logs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sms_delivery_logs_created_at'))
+        batch_op.drop_index(batch_op.f('ix_sms_delivery_logs_status'))
+        batch_op.drop_index(batch_op.f('ix_sms_delivery_logs_payment_id'))
+        batch_op.drop_index(batch_op.f('ix_sms_delivery_logs_batch_id'))
+
+    op.drop_table('sms_delivery_logs')
@@ -0,0 +1,37 @@
+"""add_search_tokens_table
+
+Revision ID: d4a7b2e9c613
+Revises: c92e5a7d1f38
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd4a7b2e9c613'
+down_revision = 'c92e5a7d1f38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 기존 데이터 색인은 배포 후 python backfill_search_index.py 로 생성
+    op.create_table(
+        'search_tokens',
+        sa.Column('token', sa.String(length=16), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.String(length=36), nullable=False),
+        sa.Column('field', sa.String(length=10), nullable=False),
+        sa.Column('weight', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('token', 'entity_type', 'entity_id', 'field'),
+    )
+    with op.batch_alter_table('search_tokens', schema=None) as batch_op:
+        batch_op.create_index('ix_search_tokens_entity', ['entity_type', 'entity_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('search_tokens', schema=None) as batch_op:
+        batch_op.drop_index('ix_search_tokens_entity')
+
+    op.drop_table('search_tokens')
@@ -0,0 +1,36 @@
+"""add_scheduler_leases_table
+
+Revision ID: d8f4b2a7c391
+Revises: c6a2e9d4f173
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd8f4b2a7c391'
+down_revision = 'c6a2e9d4f173'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 앱 시작 시 db.create_all()로 먼저 생성됐을 수 있음
+    # 행은 스케줄러가 처음 리스를 잡을 때 만든다
+    if 'scheduler_leases' not in inspector.get_table_names():
+        op.create_table(
+            'scheduler_leases',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('holder', sa.String(length=100), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=True),
+            sa.Column('acquired_at', sa.DateTime(), nullable=True),
+            sa.Column('renewed_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('name'),
+        )
+
+
+def downgrade():
+    op.drop_table('scheduler_leases')
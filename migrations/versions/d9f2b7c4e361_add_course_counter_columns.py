@@ -0,0 +1,78 @@
+"""add_course_counter_columns
+
+Revision ID: d9f2b7c4e361
+Revises: c8e4a1f6d293
+Create Date: 2026-10-20 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd9f2b7c4e361'
+down_revision = 'c8e4a1f6d293'
+branch_labels = None
+depends_on = None
+
+
+COURSE_COLUMNS = ('enrolled_count', 'completed_sessions', 'attendance_total', 'attendance_present')
+SESSION_COLUMNS = ('attendance_count', 'total_students')
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 앱 시작 시 db.create_all()로 먼저 생성됐을 수 있음
+    course_columns = {c['name'] for c in inspector.get_columns('courses')}
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        for name in COURSE_COLUMNS:
+            if name not in course_columns:
+                batch_op.add_column(sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+
+    session_columns = {c['name'] for c in inspector.get_columns('course_sessions')}
+    with op.batch_alter_table('course_sessions', schema=None) as batch_op:
+        for name in SESSION_COLUMNS:
+            if name not in session_columns:
+                batch_op.add_column(sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+
+    # 기존 데이터 백필 (이후에는 앱의 세션 훅이 갱신, 점검은 reconcile_course_counters.py)
+    op.execute("""
+        UPDATE courses SET
+            enrolled_count = (SELECT COUNT(*) FROM course_enrollments e
+                              WHERE e.course_id = courses.course_id AND e.status = 'active'),
+            completed_sessions = (SELECT COUNT(*) FROM course_sessions s
+                                  WHERE s.course_id = courses.course_id AND s.status = 'completed'),
+            attendance_total = (SELECT COUNT(*) FROM attendance a
+                                JOIN course_sessions s ON a.session_id = s.session_id
+                                WHERE s.course_id = courses.course_id),
+            attendance_present = (SELECT COUNT(*) FROM attendance a
+                                  JOIN course_sessions s ON a.session_id = s.session_id
+                                  WHERE s.course_id = courses.course_id AND a.status = 'present')
+    """)
+    op.execute("""
+        UPDATE course_sessions SET
+            attendance_count = (SELECT COUNT(*) FROM attendance a
+                                WHERE a.session_id = course_sessions.session_id AND a.status = 'present'),
+            total_students = (SELECT COUNT(*) FROM attendance a
+                              WHERE a.session_id = course_sessions.session_id)
+    """)
+    # 수강 출석 통계는 출결 수정 시에만 갱신되던 값 — 오늘 이전 세션 기준으로 다시 센다
+    for column, status in (('attended_sessions', 'present'), ('late_sessions', 'late'),
+                           ('absent_sessions', 'absent')):
+        op.execute(f"""
+            UPDATE course_enrollments SET {column} = (
+                SELECT COUNT(*) FROM attendance a
+                JOIN course_sessions s ON a.session_id = s.session_id
+                WHERE a.enrollment_id = course_enrollments.enrollment_id
+                  AND s.session_date <= CURRENT_DATE AND a.status = '{status}')
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table('course_sessions', schema=None) as batch_op:
+        for name in reversed(SESSION_COLUMNS):
+            batch_op.drop_column(name)
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        for name in reversed(COURSE_COLUMNS):
+            batch_op.drop_column(name)
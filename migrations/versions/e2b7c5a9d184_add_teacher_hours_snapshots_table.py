@@ -0,0 +1,38 @@
+"""add_teacher_hours_snapshots_table
+
+Revision ID: e2b7c5a9d184
+Revises: d8f4b2a7c391
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e2b7c5a9d184'
+down_revision = 'd8f4b2a7c391'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 앱 시작 시 db.create_all()로 먼저 생성됐을 수 있음
+    # 행은 시수 화면을 처음 열 때 계산해 채운다
+    if 'teacher_hours_snapshots' not in inspector.get_table_names():
+        op.create_table(
+            'teacher_hours_snapshots',
+            sa.Column('teacher_id', sa.String(length=36), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=False),
+            sa.Column('month', sa.Integer(), nullable=False),
+            sa.Column('data_json', sa.Text(), nullable=False),
+            sa.Column('is_closed', sa.Boolean(), nullable=False),
+            sa.Column('computed_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['teacher_id'], ['users.user_id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('teacher_id', 'year', 'month'),
+        )
+
+
+def downgrade():
+    op.drop_table('teacher_hours_snapshots')
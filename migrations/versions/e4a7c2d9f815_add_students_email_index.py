@@ -0,0 +1,31 @@
+"""add_students_email_index
+
+Revision ID: e4a7c2d9f815
+Revises: d9f2b7c4e361
+Create Date: 2026-10-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e4a7c2d9f815'
+down_revision = 'd9f2b7c4e361'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 학생 계정 → 학생 레코드 조회 (email, user_id)
+    indexes = {ix['name'] for ix in inspector.get_indexes('students')}
+    if 'ix_students_email' not in indexes:
+        op.create_index('ix_students_email', 'students', ['email'], unique=False)
+    if 'ix_students_user_id' not in indexes:
+        op.create_index('ix_students_user_id', 'students', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_students_user_id', table_name='students')
+    op.drop_index('ix_students_email', table_name='students')
@@ -0,0 +1,68 @@
+"""add_attendance_daily_stats_table
+
+Revision ID: e5c8a1f4b237
+Revises: d4a7b2e9c613
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e5c8a1f4b237'
+down_revision = 'd4a7b2e9c613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 앱 시작 시 db.create_all()로 먼저 생성됐을 수 있음
+    if 'attendance_daily_stats' not in inspector.get_table_names():
+        op.create_table(
+            'attendance_daily_stats',
+            sa.Column('stat_date', sa.Date(), nullable=False),
+            sa.Column('course_id', sa.String(length=36), nullable=False),
+            sa.Column('student_id', sa.String(length=36), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=False),
+            sa.Column('present', sa.Integer(), nullable=False),
+            sa.Column('late', sa.Integer(), nullable=False),
+            sa.Column('absent', sa.Integer(), nullable=False),
+            sa.Column('excused', sa.Integer(), nullable=False),
+            sa.Column('checked_total', sa.Integer(), nullable=False),
+            sa.Column('checked_present', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['course_id'], ['courses.course_id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['student_id'], ['students.student_id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('stat_date', 'course_id', 'student_id'),
+        )
+        with op.batch_alter_table('attendance_daily_stats', schema=None) as batch_op:
+            batch_op.create_index('ix_attendance_daily_stats_course_date', ['course_id', 'stat_date'], unique=False)
+            batch_op.create_index('ix_attendance_daily_stats_student_date', ['student_id', 'stat_date'], unique=False)
+
+    # 기존 출결 집계 백필 (이후에는 앱의 세션 훅이 갱신)
+    op.execute("DELETE FROM attendance_daily_stats")
+    op.execute("""
+        INSERT INTO attendance_daily_stats
+            (stat_date, course_id, student_id, total, present, late, absent, excused,
+             checked_total, checked_present)
+        SELECT cs.session_date, cs.course_id, a.student_id,
+               COUNT(a.attendance_id),
+               SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN a.status = 'late' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN a.status = 'absent' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN a.status = 'excused' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN cs.attendance_checked THEN 1 ELSE 0 END),
+               SUM(CASE WHEN cs.attendance_checked AND a.status = 'present' THEN 1 ELSE 0 END)
+        FROM attendance a
+        JOIN course_sessions cs ON a.session_id = cs.session_id
+        GROUP BY cs.session_date, cs.course_id, a.student_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_daily_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_daily_stats_student_date')
+        batch_op.drop_index('ix_attendance_daily_stats_course_date')
+
+    op.drop_table('attendance_daily_stats')
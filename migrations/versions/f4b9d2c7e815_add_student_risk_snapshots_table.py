@@ -0,0 +1,40 @@
+"""add_student_risk_snapshots_table
+
+Revision ID: f4b9d2c7e815
+Revises: e5c8a1f4b237
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'f4b9d2c7e815'
+down_revision = 'e5c8a1f4b237'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 앱 시작 시 db.create_all()로 먼저 생성됐을 수 있음
+    # 데이터는 첫 대시보드 조회 또는 새벽 스케줄러가 채운다
+    if 'student_risk_snapshots' not in inspector.get_table_names():
+        op.create_table(
+            'student_risk_snapshots',
+            sa.Column('student_id', sa.String(length=36), nullable=False),
+            sa.Column('risk_score', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('label', sa.String(length=50), nullable=False),
+            sa.Column('risk_count', sa.Integer(), nullable=False),
+            sa.Column('warning_count', sa.Integer(), nullable=False),
+            sa.Column('recent_attendance', sa.Float(), nullable=True),
+            sa.Column('computed_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['student_id'], ['students.student_id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('student_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('student_risk_snapshots')
@@ -1,11 +1,249 @@
-from playwright.sync_api import sync_playwright
+import asyncio
+import atexit
+import threading
 from pathlib import Path
 import config
 
 
+# 첨삭 HTML과 같은 웹폰트/스타일 — 풀 시작 시 한 번 불러와 브라우저 캐시에 올려 둔다
+FONT_CSS_URL = 'https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@300;400;500;600;700&display=swap'
+WARMUP_HTML = f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="UTF-8">
+<style>@import url('{FONT_CSS_URL}'); body {{ font-family: 'Noto Sans KR', sans-serif; }}</style>
+</head><body>
+<p style="font-weight:300">가나다 ABC 123</p><p style="font-weight:400">가나다 ABC 123</p>
+<p style="font-weight:500">가나다 ABC 123</p><p style="font-weight:600">가나다 ABC 123</p>
+<p style="font-weight:700">가나다 ABC 123</p>
+</body></html>"""
+
+PDF_OPTIONS = {
+    'format': 'A4',
+    'print_background': True,
+    'margin': {
+        'top': '12mm',
+        'bottom': '12mm',
+        'left': '12mm',
+        'right': '12mm'
+    }
+}
+
+STARTUP_TIMEOUT = 60          # 브라우저 실행 + 예열 대기 (초)
+RENDER_TIMEOUT = 120          # PDF 1건 대기 (초, 대기열 대기 포함)
+QUEUE_TIMEOUT = 60            # 대기열 자리가 날 때까지 기다리는 시간 (초)
+MAX_RENDERS_PER_PAGE = 200    # 탭 하나를 이만큼 쓰면 새 탭으로 교체 (메모리 누적 방지)
+
+
+def _pdf_path_for(html_path, output_dir=None) -> Path:
+    return Path(output_dir or config.PDF_FOLDER) / (Path(html_path).stem + '.pdf')
+
+
+def render_once(html_path: str, pdf_path) -> str:
+    """브라우저를 새로 띄워 PDF 1건 생성 (풀을 쓰지 않는 경우 / 벤치마크 기준)"""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+
+        # HTML 파일 로드 후 페이지가 완전히 로드될 때까지 대기
+        page.goto(Path(html_path).resolve().as_uri())
+        page.wait_for_load_state('networkidle')
+
+        page.pdf(path=str(pdf_path), **PDF_OPTIONS)
+        browser.close()
+
+    return str(pdf_path)
+
+
+class BrowserPool:
+    """
+    상주 Chromium 1개 + 재사용 탭 N개로 PDF를 렌더링하는 풀
+
+    Playwright 객체는 만든 스레드에서만 쓸 수 있으므로 전용 스레드가 이벤트 루프를 돌리며
+    브라우저를 소유한다. 요청 스레드는 submit()으로 작업을 넘기고 Future를 받는다.
+    - 탭은 한 브라우저 컨텍스트를 공유하므로 예열 때 받은 폰트/CSS를 캐시에서 바로 쓴다.
+    - 대기열은 queue_size건(렌더 중 포함)으로 제한되며, 가득 차면 submit()이 기다린다.
+    - 렌더가 실패한 탭은 버리고 다음 작업 때 새로 만든다. 브라우저가 죽었으면 다시 띄운다.
+    """
+
+    def __init__(self, pages: int = None, queue_size: int = None):
+        self.size = max(1, pages or config.PDF_BROWSER_PAGES)
+        self._slots = threading.BoundedSemaphore(max(self.size, queue_size or config.PDF_BROWSER_QUEUE))
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._error = None
+        self._running = False
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle = None
+        self._relaunching = None
+        self._renders = {}
+
+    # ── 요청 스레드 쪽 ─────────────────────────────────────────
+    def start(self):
+        """전용 스레드에서 브라우저를 띄우고 탭을 예열 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._running:
+                return
+            if self._thread and self._thread.is_alive():
+                self._thread.join(timeout=10)      # 이전 시작 실패 정리 중
+            self._ready.clear()
+            self._error = None
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name='pdf-browser-pool', daemon=True)
+            self._thread.start()
+
+            if not self._ready.wait(STARTUP_TIMEOUT):
+                raise Exception('브라우저 풀 시작 시간이 초과되었습니다.')
+            if self._error:
+                raise self._error
+
+    def submit(self, html_path: str, pdf_path):
+        """렌더 작업을 대기열에 넣고 concurrent.futures.Future 반환 (결과는 PDF 경로)"""
+        self.start()
+        if not self._slots.acquire(timeout=QUEUE_TIMEOUT):
+            raise Exception('PDF 생성 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.')
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._render(str(html_path), str(pdf_path)), self._loop)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self):
+        """브라우저 종료 후 전용 스레드 정리"""
+        with self._lock:
+            if self._running:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=10)
+
+    # ── 전용 스레드 쪽 ─────────────────────────────────────────
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._launch())
+        except Exception as e:
+            self._error = e
+            self._loop.run_until_complete(self._shutdown())
+            self._loop.close()
+            self._ready.set()
+            return
+
+        self._running = True
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._running = False
+            self._loop.run_until_complete(self._shutdown())
+            self._loop.close()
+
+    async def _start_playwright(self):
+        from playwright.async_api import async_playwright
+        return await async_playwright().start()
+
+    async def _launch(self):
+        self._playwright = await self._start_playwright()
+        self._relaunching = asyncio.Lock()
+        self._idle = asyncio.Queue()
+        await self._open_browser()
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_page())
+
+    async def _open_browser(self):
+        self._browser = await self._playwright.chromium.launch()
+        self._context = await self._browser.new_context()
+        self._renders = {}
+
+    async def _new_page(self):
+        async with self._relaunching:
+            if not self._browser.is_connected():
+                await self._open_browser()
+
+        page = await self._context.new_page()
+        try:
+            # 폰트/CSS 예열 — 오프라인 등으로 실패해도 렌더에는 지장 없음
+            await page.set_content(WARMUP_HTML, wait_until='networkidle', timeout=15000)
+            await page.evaluate('document.fonts.ready.then(() => true)')
+        except Exception:
+            pass
+        self._renders[page] = 0
+        return page
+
+    async def _discard(self, page):
+        if page is None:
+            return
+        self._renders.pop(page, None)
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    async def _render(self, html_path: str, pdf_path: str) -> str:
+        page = await self._idle.get()
+        try:
+            if page is None or page.is_closed():
+                page = await self._new_page()
+
+            await page.goto(Path(html_path).resolve().as_uri(), wait_until='networkidle')
+            await page.evaluate('document.fonts.ready.then(() => true)')
+            await page.pdf(path=pdf_path, **PDF_OPTIONS)
+
+            self._renders[page] = self._renders.get(page, 0) + 1
+            if self._renders[page] >= MAX_RENDERS_PER_PAGE:
+                await self._discard(page)
+                page = None
+            return pdf_path
+        except Exception:
+            await self._discard(page)
+            page = None
+            raise
+        finally:
+            self._idle.put_nowait(page)
+
+    async def _shutdown(self):
+        for closer in (self._context, self._browser):
+            if closer is not None:
+                try:
+                    await closer.close()
+                except Exception:
+                    pass
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._playwright = self._browser = self._context = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """프로세스 공용 브라우저 풀 (PDF_BROWSER_PAGES=0이면 None — 호출마다 브라우저 실행)"""
+    global _pool
+    if config.PDF_BROWSER_PAGES <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
 class PDFGenerator:
     """PDF 생성 클래스"""
 
+    def __init__(self, pool=None, output_dir=None):
+        self.pool = pool if pool is not None else get_pool()
+        self.output_dir = output_dir
+
     def generate_pdf(self, html_path: str) -> str:
         """
         HTML을 PDF로 변환
@@ -17,38 +255,43 @@ class PDFGenerator:
             생성된 PDF 파일 경로
         """
         try:
-            # PDF 파일 경로 생성
-            html_file = Path(html_path)
-            pdf_filename = html_file.stem + '.pdf'
-            pdf_path = config.PDF_FOLDER / pdf_filename
-
-            # Playwright로 PDF 생성
-            with sync_playwright() as p:
-                browser = p.chromium.launch()
-                page = browser.new_page()
-
-                # HTML 파일 로드
-                page.goto(f'file:///{html_path.replace(chr(92), "/")}')
-
-                # 페이지가 완전히 로드될 때까지 대기
-                page.wait_for_load_state('networkidle')
-
-                # PDF 생성
-                page.pdf(
-                    path=str(pdf_path),
-                    format='A4',
-                    print_background=True,
-                    margin={
-                        'top': '12mm',
-                        'bottom': '12mm',
-                        'left': '12mm',
-                        'right': '12mm'
-                    }
-                )
-
-                browser.close()
-
-            return str(pdf_path)
+            pdf_path = _pdf_path_for(html_path, self.output_dir)
+            if self.pool is None:
+                return render_once(html_path, pdf_path)
+            return self.pool.submit(html_path, pdf_path).result(RENDER_TIMEOUT)
 
         except Exception as e:
             raise Exception(f"PDF 생성 중 오류가 발생했습니다: {e}")
+
+    def generate_batch(self, batch_results: list) -> list:
+        """
+        일괄 작업 결과 전체를 PDF로 변환 (풀의 탭 수만큼 병렬)
+
+        Args:
+            batch_results: database.get_batch_results() 결과 (index_num, html_path 포함)
+
+        Returns:
+            [{'index_num', 'pdf_path', 'error'}] — 입력 순서, HTML이 없는 항목은 제외
+        """
+        targets = [r for r in batch_results if r.get('html_path')]
+
+        # 대기열이 가득 차면 submit()이 자리가 날 때까지 기다리므로 배치 크기와 관계없이 넣어도 된다
+        pending = []
+        for r in targets:
+            pdf_path = _pdf_path_for(r['html_path'], self.output_dir)
+            try:
+                pending.append((r, pdf_path, self.pool.submit(r['html_path'], pdf_path) if self.pool else None, None))
+            except Exception as e:
+                pending.append((r, pdf_path, None, e))
+
+        results = []
+        for r, pdf_path, future, error in pending:
+            try:
+                if error:
+                    raise error
+                path = future.result(RENDER_TIMEOUT) if future else render_once(r['html_path'], pdf_path)
+                results.append({'index_num': r['index_num'], 'pdf_path': path, 'error': None})
+            except Exception as e:
+                results.append({'index_num': r['index_num'], 'pdf_path': None,
+                                'error': f"PDF 생성 중 오류가 발생했습니다: {e}"})
+        return results
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+수업 집계 컬럼(수강생 수 / 완료 세션 / 출석 수)과 원본 비교/복구.
+
+집계는 수강·세션·출결 변경 시 세션 훅으로 갱신되지만, Query.update() 같은 일괄 변경이나
+훅 도입 전 데이터는 어긋날 수 있으므로 이 스크립트로 점검한다.
+
+기본은 점검만(출력). 어긋난 행만 다시 계산하려면 --apply, 전체 재계산은 --rebuild.
+    python reconcile_course_counters.py              # 점검
+    python reconcile_course_counters.py --apply      # 어긋난 행 재계산
+    python reconcile_course_counters.py --rebuild    # 전체 재계산
+"""
+import sys, os
+sys.stdout.reconfigure(encoding='utf-8')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.models import db
+from app.utils.course_counters import find_mismatches, reconcile
+
+APPLY = '--apply' in sys.argv
+REBUILD = '--rebuild' in sys.argv
+
+app = create_app()
+with app.app_context():
+    if REBUILD:
+        count = reconcile()
+        db.session.commit()
+        print(f"집계 전체 재계산 완료: {count}행")
+        sys.exit(0)
+
+    mismatches = find_mismatches()
+    print(f"불일치: {len(mismatches)}건")
+    print("=" * 60)
+    for model, key, diff in mismatches[:50]:
+        detail = ', '.join(f"{name} 원본 {expected} / 저장 {actual}" for name, (expected, actual) in diff.items())
+        print(f"  {model} {key[:8]}: {detail}")
+    if len(mismatches) > 50:
+        print(f"  ... 외 {len(mismatches) - 50}건")
+
+    if mismatches and APPLY:
+        count = reconcile(mismatches)
+        db.session.commit()
+        remaining = find_mismatches()
+        print(f"\n{count}행 재계산 → 남은 불일치 {len(remaining)}건")
+    elif mismatches:
+        print("\n(dry-run) 반영하려면 --apply 옵션을 주세요.")
+
+    sys.exit(1 if mismatches and not APPLY else 0)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""출결 집계 테이블 테스트 스크립트
+
+임시 SQLite DB로 출결 생성/상태 변경(강사 API)/삭제, 세션 일정 변경·출석체크·삭제 시
+attendance_daily_stats가 원본 Attendance 집계와 일치하는지(find_mismatches),
+출석 현황 화면 통계가 원본 count 결과와 같은지, 점검기가 어긋남을 찾고 복구하는지 검증한다.
+
+사용법:
+    python test_attendance_rollup.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_rollup_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "rollup_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event, update
+    from app import create_app
+    from app.models import (db, User, Student, Course, CourseEnrollment, CourseSession,
+                            Attendance, AttendanceDailyStat)
+    from app.utils import attendance_rollup
+    from app.utils.attendance_rollup import find_mismatches, rebuild
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    admin = User(email='rollup_admin@test.com', name='집계관리자', role='admin', role_level=1)
+    teacher = User(email='rollup_teacher@test.com', name='집계강사', role='teacher')
+    for u in (admin, teacher):
+        u.set_password('test1234')
+    db.session.add_all([admin, teacher])
+    db.session.flush()
+
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
+    courses = [Course(course_name=f'집계반{i}', course_code=f'ROLL-{i}', teacher_id=teacher.user_id if i else admin.user_id,
+                      start_date=today - timedelta(days=60), end_date=today + timedelta(days=60))
+               for i in range(3)]
+    db.session.add_all(courses)
+    students = [Student(teacher_id=teacher.user_id, name=f'집계학생{i}', grade='중1') for i in range(6)]
+    db.session.add_all(students)
+    db.session.flush()
+
+    statuses = ['present', 'present', 'late', 'absent', 'excused', 'present', 'absent_makeup']
+    sessions = []
+    for ci, course in enumerate(courses):
+        enrollments = []
+        for student in students[ci:ci + 4]:
+            e = CourseEnrollment(course_id=course.course_id, student_id=student.student_id)
+            db.session.add(e)
+            enrollments.append(e)
+        db.session.flush()
+        for n in range(8):
+            s = CourseSession(course_id=course.course_id, session_number=n + 1,
+                              session_date=week_start - timedelta(days=7 * 4) + timedelta(days=5 * n + ci),
+                              attendance_checked=n % 3 != 0)
+            db.session.add(s)
+            db.session.flush()
+            sessions.append(s)
+            for k, e in enumerate(enrollments):
+                db.session.add(Attendance(session_id=s.session_id, student_id=e.student_id,
+                                          enrollment_id=e.enrollment_id,
+                                          status=statuses[(n + k + ci) % len(statuses)]))
+    db.session.commit()
+    check(not find_mismatches(), f'출결 {Attendance.query.count()}건 생성 → 집계 {AttendanceDailyStat.query.count()}행 일치')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 변경 시 증분 갱신')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = admin.user_id
+        sess['_fresh'] = True
+
+    att = Attendance.query.filter_by(status='present').first()
+    res = client.patch(f'/teacher/api/attendance/{att.attendance_id}', json={'status': 'late'})
+    check(res.status_code == 200 and not find_mismatches(), '강사 API 상태 변경 → 집계 반영', res.get_data(as_text=True)[:200])
+
+    moved = sessions[4]
+    moved.session_date = moved.session_date + timedelta(days=1)
+    db.session.commit()
+    check(not find_mismatches(), '세션 날짜 변경 → 이전/새 날짜 모두 반영')
+
+    flipped = sessions[3]
+    flipped.attendance_checked = not flipped.attendance_checked
+    db.session.commit()
+    check(not find_mismatches(), '출석체크 완료 여부 변경 → checked 집계 반영')
+
+    db.session.delete(sessions[5])
+    db.session.commit()
+    check(not find_mismatches(), '세션 삭제(출결 cascade) → 집계 제거')
+
+    db.session.delete(Attendance.query.filter_by(status='excused').first())
+    db.session.commit()
+    check(not find_mismatches(), '출결 1건 삭제 → 반영')
+
+    s = sessions[6]
+    a = Attendance(session_id=s.session_id, student_id=students[5].student_id,
+                   enrollment_id=CourseEnrollment.query.first().enrollment_id, status='absent')
+    db.session.add(a)
+    db.session.flush()
+    db.session.rollback()
+    check(not find_mismatches(), '롤백 → 집계도 롤백')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 화면 통계 = 원본 count')
+    date_from = week_start - timedelta(days=40)
+
+    def _raw(d_from, d_to, **filters):
+        q = Attendance.query.join(CourseSession, Attendance.session_id == CourseSession.session_id)\
+            .join(Course, CourseSession.course_id == Course.course_id)\
+            .filter(CourseSession.session_date >= d_from, CourseSession.session_date <= d_to)
+        if filters.get('course_id'):
+            q = q.filter(Course.course_id == filters['course_id'])
+        if filters.get('teacher_id'):
+            q = q.filter(Course.teacher_id == filters['teacher_id'])
+        return {st: q.filter(Attendance.status == st).count() for st in ('present', 'late', 'absent', 'excused')} | {'total': q.count()}
+
+    for label, filters in (('전체', {}), ('수업', {'course_id': courses[1].course_id}),
+                           ('강사', {'teacher_id': teacher.user_id})):
+        got = attendance_rollup.totals(date_from, today, **filters)
+        check({k: got[k] for k in ('total', 'present', 'late', 'absent', 'excused')} == _raw(date_from, today, **filters),
+              f'{label} 필터 합계', str(got))
+
+    periods = attendance_rollup.period_totals({'a': (date_from, week_start), 'b': (week_start - timedelta(days=10), today)})
+    check(periods['a']['total'] == _raw(date_from, week_start)['total'] and
+          periods['b']['total'] == _raw(week_start - timedelta(days=10), today)['total'], '여러 기간 합계 1쿼리')
+
+    queries = [0]
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count(*args):
+        queries[0] += 1
+
+    res = client.get(f'/admin/attendance-status?date_from={date_from}&date_to={today}')
+    check(res.status_code == 200, '출석 현황 화면 200')
+    queries[0] = 0
+    client.get(f'/admin/attendance-status?date_from={date_from}&date_to={today}')
+    page_queries = queries[0]
+    check(page_queries <= 14, f'출석 현황 쿼리 {page_queries}회 (기존 통계만 17회)')
+    check(client.get('/admin/').status_code == 200, '관리자 대시보드 200')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 점검 / 복구')
+    db.session.execute(update(AttendanceDailyStat).values(present=AttendanceDailyStat.present + 1)
+                       .where(AttendanceDailyStat.course_id == courses[0].course_id))
+    db.session.commit()
+    broken = find_mismatches()
+    check(len(broken) > 0, f'어긋난 집계 감지 ({len(broken)}건)')
+    rebuild()
+    db.session.commit()
+    check(not find_mismatches(), 'rebuild() 후 일치')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""청구 금액 일괄 계산 테스트 스크립트
+
+임시 SQLite DB로 PaymentCalculator.calculate_batch()가
+단건 계산(calculate)과 같은 결과를 내는지 요일·휴무 주·중간 합류·결제 주기·할인·
+이월/무료수업 조합별로 비교하고, 청구 화면 쿼리 수가 수강생 수와 무관한지 검증한다.
+
+사용법:
+    python test_billing_batch.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime
+from itertools import product
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_billing_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "billing_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def _snapshot(result):
+    data = result.to_dict()
+    data['pending_adjustments'] = sorted(a.adjustment_id for a in result.pending_adjustments)
+    return data
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User, Student, Course, CourseEnrollment, Payment, ParentStudent
+    from app.models.payment_period import PaymentPeriod, HolidayWeek
+    from app.models.session_adjustment import SessionAdjustment
+    from app.services.payment_calculator import PaymentCalculator
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    admin = User(email='billing_admin@test.com', name='청구관리자', role='admin', role_level=1)
+    parent = User(email='billing_parent@test.com', name='청구학부모', role='parent')
+    for u in (admin, parent):
+        u.set_password('test1234')
+    db.session.add_all([admin, parent])
+    db.session.flush()
+
+    monthly = PaymentPeriod(period_type='monthly', year=2026, period_number=11,
+                            label='2026년 11월', start_date=date(2026, 11, 1),
+                            end_date=date(2026, 11, 30), weeks_count=4)
+    quarterly = PaymentPeriod(period_type='quarterly', year=2026, period_number=4,
+                              label='2026년 4분기', start_date=date(2026, 10, 1),
+                              end_date=date(2026, 12, 31), weeks_count=13)
+    db.session.add_all([monthly, quarterly])
+    # 월요일 휴무 2주 + 월요일이 아닌 week_start 1건 (단건 계산에서도 무시됨)
+    db.session.add_all([HolidayWeek(week_start=date(2026, 11, 9), reason='휴무1'),
+                        HolidayWeek(week_start=date(2026, 11, 30), reason='휴무2'),
+                        HolidayWeek(week_start=date(2026, 10, 7), reason='수요일 시작')])
+
+    courses = []
+    for weekday in list(range(7)) + [None]:
+        c = Course(course_name=f'청구반{weekday}', course_code=f'BILL-{weekday}',
+                   course_type='정규반', teacher_id=admin.user_id, weekday=weekday,
+                   start_date=date(2026, 1, 1), end_date=date(2026, 12, 31))
+        courses.append(c)
+    db.session.add_all(courses)
+    db.session.flush()
+
+    enrolled_dates = [None, datetime(2026, 9, 1), datetime(2026, 11, 1, 15),
+                      datetime(2026, 11, 12), datetime(2026, 11, 29), datetime(2026, 12, 20)]
+    discounts = [None, 'sibling', 'scholarship']
+    enrollments = []
+    for i, (course, enrolled_at, cycle, discount) in enumerate(
+            product(courses, enrolled_dates, ('monthly', 'quarterly', 'quarterly_no_discount'), discounts)):
+        student = Student(teacher_id=admin.user_id, name=f'학생{i:03d}', grade='중1')
+        db.session.add(student)
+        db.session.flush()
+        enr = CourseEnrollment(course_id=course.course_id, student_id=student.student_id,
+                               payment_cycle=cycle, weekly_fee=35000 + (i % 3) * 5000,
+                               discount_type=discount)
+        enr.enrolled_at = enrolled_at
+        enrollments.append(enr)
+    db.session.add_all(enrollments)
+    db.session.flush()
+
+    # 조정: pending(기간 전/후 발생), applied, 여러 건 합산
+    adj_specs = [('rollover', 1, 'pending', datetime(2026, 9, 20)),
+                 ('free_session', 2, 'pending', datetime(2026, 10, 15)),
+                 ('rollover', 1, 'applied', datetime(2026, 9, 1)),
+                 ('free_session', 1, 'pending', datetime(2026, 11, 1))]
+    for i, enr in enumerate(enrollments):
+        for j, (atype, cnt, status, created_at) in enumerate(adj_specs):
+            if (i + j) % 3 == 0:
+                db.session.add(SessionAdjustment(
+                    student_id=enr.student_id, enrollment_id=enr.enrollment_id,
+                    adjustment_type=atype, sessions_count=cnt, source='admin_manual',
+                    status=status, created_at=created_at))
+    for student_id in {e.student_id for e in enrollments[:4]}:
+        db.session.add(ParentStudent(parent_id=parent.user_id, student_id=student_id))
+    db.session.commit()
+    ok(f'수강 {len(enrollments)}건 (요일 8종 × 합류일 6종 × 주기 3종 × 할인 3종)')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 단건 계산과 일괄 계산 비교')
+    for period in (monthly, quarterly):
+        db.session.expire_all()
+        scalar = {e.enrollment_id: _snapshot(PaymentCalculator.calculate(e, period))
+                  for e in CourseEnrollment.query.all()}
+        db.session.expire_all()
+        batch = PaymentCalculator.calculate_batch(CourseEnrollment.query.all(), period)
+        batch_map = {e.enrollment_id: _snapshot(r) for e, r in batch}
+        diffs = [eid for eid in scalar if scalar[eid] != batch_map.get(eid)]
+        check(not diffs and len(batch_map) == len(scalar),
+              f'{period.label}: {len(scalar)}건 동일',
+              str([(scalar[d], batch_map.get(d)) for d in diffs[:2]]))
+        check(any(s['is_prorated'] for s in scalar.values())
+              and any(s['adjustment_deduction'] for s in scalar.values()),
+              f'{period.label}: 중간 합류 / 조정 차감 케이스 포함')
+    check(any(r.weeks_charged == 0 for _, r in PaymentCalculator.calculate_batch(
+        CourseEnrollment.query.all(), monthly)), '기간 이후 합류 → 0주')
+
+    check(PaymentCalculator.calculate_batch([], monthly) == [], '빈 목록 → 빈 결과')
+
+    queries = [0]
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count(*args):
+        queries[0] += 1
+
+    db.session.expire_all()
+    loaded = CourseEnrollment.query.all()
+    for e in loaded:
+        e.course
+    monthly.start_date
+    queries[0] = 0
+    PaymentCalculator.calculate_batch(loaded, monthly)
+    check(queries[0] == 2, '일괄 계산 쿼리 2회 (휴무 + 조정)', f'{queries[0]}회')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 청구 화면 쿼리 수')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = admin.user_id
+        sess['_fresh'] = True
+
+    def _page_queries(period):
+        db.session.expire_all()
+        queries[0] = 0
+        res = client.get(f'/admin/billing?period_id={period.period_id}')
+        return res, queries[0]
+
+    _page_queries(monthly)   # 로그인 사용자 로드/미읽음 카운트 캐시 등 첫 요청분 제외
+    res, small = _page_queries(monthly)
+    check(res.status_code == 200 and '학생000' in res.get_data(as_text=True), '청구 화면 200')
+
+    # 수강생을 늘려도 쿼리 수가 같아야 함
+    for i in range(60):
+        student = Student(teacher_id=admin.user_id, name=f'추가{i:03d}', grade='중2')
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(CourseEnrollment(course_id=courses[i % 8].course_id, student_id=student.student_id,
+                                        payment_cycle='monthly', weekly_fee=40000))
+    db.session.commit()
+    res, large = _page_queries(monthly)
+    check(res.status_code == 200 and small == large, f'수강생 증가 후에도 쿼리 수 동일 ({small} → {large}회)')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 청구서 일괄 생성')
+    ids = [e.enrollment_id for e in CourseEnrollment.query.filter_by(payment_cycle='monthly').all()]
+    db.session.expire_all()
+    expected = {e.enrollment_id: PaymentCalculator.calculate(e, monthly).final_amount
+                for e in CourseEnrollment.query.filter(CourseEnrollment.enrollment_id.in_(ids)).all()}
+    res = client.post('/admin/billing/create-invoices',
+                      data={'period_id': monthly.period_id, 'enrollment_ids': ids + ids[:1]})
+    check(res.status_code == 302, '청구서 생성 → 리다이렉트')
+    payments = Payment.query.filter_by(period_id=monthly.period_id).all()
+    check(len(payments) == len(ids), f'청구서 {len(ids)}건 (중복 선택 1건 제외)', str(len(payments)))
+    check(all(p.amount == expected[p.enrollment_id] for p in payments), '청구 금액 = 단건 계산 금액')
+    applied = SessionAdjustment.query.filter(SessionAdjustment.applied_payment_id.isnot(None)).count()
+    check(applied > 0 and SessionAdjustment.query.filter(
+        SessionAdjustment.enrollment_id.in_(ids), SessionAdjustment.status == 'pending',
+        SessionAdjustment.created_at < datetime(2026, 11, 1)).count() == 0,
+        f'반영된 조정 applied 처리 ({applied}건)')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
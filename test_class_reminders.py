@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""수업 리마인더 / 예약 작업 리더 리스 테스트 스크립트
+
+임시 SQLite DB로 리더 리스가 한 보유자에게만 주어지고 만료·반납 후 넘어가는지,
+수업 리마인더가 앞으로 1시간 안에 시작하는 미발송 세션(자정을 넘기는 경우 포함)을
+수강생 수와 관계없이 고정된 쿼리 수로 모아 학생·학부모에게 보내는지,
+다시 실행하거나 두 노드가 같이 실행해도 중복 발송되지 않는지 검증한다.
+Push 발송 함수는 기록용 함수로 바꿔 끼워 실제 발송 없이 수신자만 확인한다.
+
+사용법:
+    python test_class_reminders.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_reminder_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "reminder_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+NOW = datetime(2026, 3, 2, 23, 30)      # 자정을 넘기는 1시간 구간
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from app import create_app
+    from app.models import db, User, Student, ParentStudent, SchedulerLease
+    from app.models.course import Course, CourseSession, CourseEnrollment
+    from app.models.reminder_log import ReminderLog
+    from app.utils import push_utils, scheduler
+
+    app = create_app('production')
+    app.config['SCHEDULER_LEASE_SECONDS'] = 60
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    sent = []
+    push_utils.send_push_to_users = lambda user_ids, title, body, url='/notifications': \
+        sent.append((list(user_ids), title, body, url))
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    teacher = User(email='reminder_teacher@test.com', name='알림강사', role='teacher', role_level=1)
+    teacher.set_password('test1234')
+    db.session.add(teacher)
+    db.session.flush()
+
+    def _course(code, n_students):
+        course = Course(course_name=f'{code}반', course_code=code, teacher_id=teacher.user_id,
+                        start_date=date(2026, 1, 1), end_date=date(2026, 12, 31))
+        db.session.add(course)
+        db.session.flush()
+        students = []
+        for i in range(n_students):
+            account = User(email=f'{code}_s{i}@test.com', name=f'{code}학생{i}', role='student')
+            parent = User(email=f'{code}_p{i}@test.com', name=f'{code}학부모{i}', role='parent')
+            account.set_password('test1234')
+            parent.set_password('test1234')
+            db.session.add_all([account, parent])
+            db.session.flush()
+            student = Student(teacher_id=teacher.user_id, name=f'{code}학생{i}', grade='중1',
+                              user_id=account.user_id if i % 2 == 0 else None)
+            db.session.add(student)
+            db.session.flush()
+            db.session.add(CourseEnrollment(course_id=course.course_id, student_id=student.student_id,
+                                            status='active' if i < n_students - 1 else 'dropped'))
+            db.session.add(ParentStudent(parent_id=parent.user_id, student_id=student.student_id))
+            students.append(student)
+        return course, students
+
+    def _session(course, n, day, start, status='scheduled'):
+        s = CourseSession(course_id=course.course_id, session_number=n, session_date=day,
+                          start_time=start, end_time=(datetime.combine(day, start) + timedelta(hours=1)).time(),
+                          status=status)
+        db.session.add(s)
+        return s
+
+    small, _ = _course('RMD-A', 3)         # 수강 2명 (1명 중도 하차)
+    large, _ = _course('RMD-B', 30)        # 수강 29명
+    today, tomorrow = NOW.date(), NOW.date() + timedelta(days=1)
+    due = [
+        _session(small, 1, today, time(23, 50)),
+        _session(large, 1, tomorrow, time(0, 20)),
+    ]
+    not_due = [
+        _session(small, 2, today, time(23, 20)),                  # 이미 시작
+        _session(small, 3, tomorrow, time(0, 40)),                # 1시간 밖
+        _session(large, 2, today, time(23, 45), 'cancelled'),     # 휴강
+    ]
+    db.session.commit()
+    ok('수업 2개 / 알림 대상 세션 2개 + 제외 세션 3개')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 리더 리스')
+    check(scheduler.acquire_lease(holder='node-a:1', now=NOW), '첫 노드가 리스 획득')
+    check(not scheduler.acquire_lease(holder='node-b:1', now=NOW + timedelta(seconds=10)),
+          '유효한 리스는 다른 노드가 가져가지 못함')
+    check(scheduler.acquire_lease(holder='node-a:1', now=NOW + timedelta(seconds=30)), '보유 노드는 갱신')
+    lease = db.session.get(SchedulerLease, scheduler.LEASE_NAME)
+    check(lease.expires_at == NOW + timedelta(seconds=90) and lease.acquired_at == NOW,
+          '갱신 시 만료만 연장 (획득 시각 유지)')
+    check(scheduler.acquire_lease(holder='node-b:1', now=NOW + timedelta(seconds=91)),
+          '만료 후 다른 노드가 넘겨받음')
+    check(not scheduler.acquire_lease(holder='node-a:1', now=NOW + timedelta(seconds=92)),
+          '이전 리더는 다시 가져가지 못함')
+    scheduler.release_lease(holder='node-b:1')
+    check(scheduler.acquire_lease(holder='node-a:1', now=NOW + timedelta(seconds=93)),
+          '반납하면 만료 전이라도 바로 넘겨받음')
+    db.session.expire_all()
+    lease = db.session.get(SchedulerLease, scheduler.LEASE_NAME)
+    check(lease.holder == 'node-a:1' and lease.acquired_at == NOW + timedelta(seconds=93),
+          '보유자/획득 시각 기록')
+    check(SchedulerLease.query.count() == 1, '리스 행 1개')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 수업 리마인더 일괄 발송')
+    statements.clear()
+    count = scheduler.send_class_reminders(app, now=NOW)
+    selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+    check(count == 2, f'대상 세션 2개 발송 ({count})')
+    check(len(selects) == 3, f'조회 쿼리 3회 (수강생 31명) — {len(selects)}회')
+
+    student_pushes = [p for p in sent if p[3] == '/student/courses']
+    parent_pushes = [p for p in sent if p[3] == '/parent/attendance']
+    check(len(student_pushes) == 2, '세션별 학생 Push 1회')
+    check(sorted(len(p[0]) for p in student_pushes) == [1, 15],
+          '계정이 있는 활성 수강생에게만 발송', str([len(p[0]) for p in student_pushes]))
+    check(len(parent_pushes) == 2 + 29 and all(len(p[0]) == 1 for p in parent_pushes),
+          f'활성 수강생 학부모에게 학생별 발송 ({len(parent_pushes)}건)')
+    check(any('23:50' in p[2] and 'RMD-A반' in p[2] for p in student_pushes)
+          and any('00:20' in p[2] for p in student_pushes), '자정 전후 세션 모두 포함')
+    logged = {r.session_id for r in ReminderLog.query.all()}
+    check(logged == {s.session_id for s in due}, '발송 이력 기록 (대상 세션만)')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 중복 / 누락 방지')
+    sent.clear()
+    check(scheduler.send_class_reminders(app, now=NOW + timedelta(minutes=5)) == 0 and not sent,
+          '다시 실행해도 중복 발송 없음')
+
+    _session(small, 4, tomorrow, time(0, 25))
+    db.session.commit()
+    check(scheduler.send_class_reminders(app, now=NOW + timedelta(minutes=5)) == 1 and sent,
+          '뒤늦게 생긴 세션도 다음 실행에서 발송')
+
+    sent.clear()
+    other = _session(large, 3, tomorrow, time(0, 30))
+    db.session.commit()
+    with Session(db.engine) as other_node:       # 다른 노드가 먼저 기록
+        other_node.add(ReminderLog(session_id=other.session_id))
+        other_node.commit()
+    check(scheduler.send_class_reminders(app, now=NOW + timedelta(minutes=5)) == 0 and not sent,
+          '다른 노드가 이미 보낸 세션은 건너뜀')
+    logged = {r.session_id for r in ReminderLog.query.all()}
+    check(len(logged) == 4 and not logged & {s.session_id for s in not_due}, '제외 세션은 이력 없음')
+
+    # ════════════════════════════════════════════════════════
+    section('4. 리더만 작업 실행')
+    ran = []
+    scheduler.release_lease(holder='node-a:1')
+    scheduler.run_as_leader(lambda a: ran.append('me'), app)
+    check(ran == ['me'], '리스가 비어 있으면 현재 프로세스가 리더로 실행')
+    db.session.query(SchedulerLease).update({'holder': 'node-z:9',
+                                            'expires_at': datetime.utcnow() + timedelta(minutes=5)})
+    db.session.commit()
+    scheduler.run_as_leader(lambda a: ran.append('again'), app)
+    check(ran == ['me'], '다른 노드가 리더면 실행하지 않음')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""수업 집계 컬럼 테스트 스크립트
+
+임시 SQLite DB로 수강 등록/퇴원, 세션 완료·일정 변경·삭제, 출결 생성/상태 변경(강사 API)/삭제,
+주간 세션 일괄 생성 시 Course / CourseSession / CourseEnrollment 집계 컬럼이 원본과 일치하는지(find_mismatches),
+이미 로드된 객체도 커밋 전에 새 값을 읽는지, 월간 리포트·수업 목록이 수업별 컬렉션을 읽지 않는지,
+점검기가 어긋남을 찾고 복구하는지 검증한다.
+
+사용법:
+    python test_course_counters.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_course_counters_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "course_counters_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event, update
+    from app import create_app
+    from app.models import db, User, Student, Course, CourseEnrollment, CourseSession, Attendance
+    from app.utils import course_counters
+    from app.utils.course_counters import find_mismatches, reconcile
+    from app.utils.course_utils import enroll_student_to_course, generate_sessions_bulk
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    admin = User(email='counter_admin@test.com', name='집계관리자', role='admin', role_level=1)
+    teacher = User(email='counter_teacher@test.com', name='집계강사', role='teacher')
+    for u in (admin, teacher):
+        u.set_password('test1234')
+    db.session.add_all([admin, teacher])
+    db.session.flush()
+
+    today = date.today()
+    courses = [Course(course_name=f'집계반{i}', course_code=f'CNT-{i}', teacher_id=teacher.user_id,
+                      weekday=today.weekday(), max_students=10,
+                      start_date=today - timedelta(days=60), end_date=today + timedelta(days=60))
+               for i in range(3)]
+    db.session.add_all(courses)
+    students = [Student(teacher_id=teacher.user_id, name=f'집계학생{i}', grade='중1') for i in range(6)]
+    db.session.add_all(students)
+    db.session.flush()
+
+    statuses = ['present', 'present', 'late', 'absent', 'excused', 'present']
+    sessions = {}
+    for ci, course in enumerate(courses):
+        enrollments = [CourseEnrollment(course_id=course.course_id, student_id=s.student_id,
+                                        enrolled_at=datetime.utcnow() - timedelta(days=60))
+                       for s in students[ci:ci + 3]]
+        db.session.add_all(enrollments)
+        db.session.flush()
+        for n in range(6):
+            # 5회차는 미래 세션 (보강/custom처럼 레코드가 미리 있는 경우)
+            s = CourseSession(course_id=course.course_id, session_number=n + 1,
+                              session_date=today - timedelta(days=7 * (4 - n)),
+                              status='completed' if n < 3 else 'scheduled')
+            db.session.add(s)
+            db.session.flush()
+            sessions.setdefault(ci, []).append(s)
+            for k, e in enumerate(enrollments):
+                db.session.add(Attendance(session_id=s.session_id, student_id=e.student_id,
+                                          enrollment_id=e.enrollment_id, status=statuses[(n + k + ci) % 6]))
+    db.session.commit()
+
+    c0 = courses[0]
+    check(not find_mismatches(), f'출결 {Attendance.query.count()}건 생성 → 집계 컬럼 일치')
+    check((c0.enrolled_count, c0.completed_sessions) == (3, 3), f'수강생 {c0.enrolled_count}명 / 완료 세션 {c0.completed_sessions}회')
+    s0 = sessions[0][0]
+    check(s0.total_students == 3 and s0.attendance_count == sum(1 for a in s0.attendance_records if a.status == 'present'),
+          f'세션 출석 {s0.attendance_count}/{s0.total_students}')
+    e0 = CourseEnrollment.query.filter_by(course_id=c0.course_id).first()
+    future = Attendance.query.join(CourseSession).filter(
+        Attendance.enrollment_id == e0.enrollment_id, CourseSession.session_date > today).count()
+    total = e0.attended_sessions + e0.late_sessions + e0.absent_sessions
+    check(future == 1 and total + future + Attendance.query.filter_by(enrollment_id=e0.enrollment_id, status='excused')
+          .join(CourseSession).filter(CourseSession.session_date <= today).count() == 6,
+          '수강 출석 통계 — 미래 세션 제외')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 변경 시 증분 갱신')
+    updated_at = c0.updated_at
+    enrollment = enroll_student_to_course(c0.course_id, students[5].student_id)
+    check(enrollment is not None and c0.enrolled_count == 4, '수강 등록 → 로드된 수업 객체도 커밋 전 4명')
+    db.session.commit()
+    check(c0.updated_at == updated_at, '집계 갱신은 수업 수정 시각을 바꾸지 않음')
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = admin.user_id
+        sess['_fresh'] = True
+    res = client.post(f'/admin/enrollments/{enrollment.enrollment_id}/remove')
+    check(res.status_code in (200, 302) and db.session.get(Course, c0.course_id).enrolled_count == 3,
+          '퇴원(dropped) → 3명', str(res.status_code))
+    check(not find_mismatches(), '퇴원 후 일치 (미래 출결 삭제 포함)')
+
+    att = Attendance.query.filter_by(enrollment_id=e0.enrollment_id, status='present').join(CourseSession)\
+        .filter(CourseSession.session_date <= today).first()
+    before = (e0.attended_sessions, e0.late_sessions)
+    res = client.patch(f'/teacher/api/attendance/{att.attendance_id}', json={'status': 'late'})
+    db.session.expire_all()
+    e0 = db.session.get(CourseEnrollment, e0.enrollment_id)
+    check(res.status_code == 200 and (e0.attended_sessions, e0.late_sessions) == (before[0] - 1, before[1] + 1),
+          '강사 API 출결 변경 → 수강 출석/지각 반영', res.get_data(as_text=True)[:200])
+    check(not find_mismatches(), '출결 변경 후 세션/수업 집계 일치')
+
+    target = sessions[0][3]
+    target.status = 'completed'
+    db.session.flush()
+    check(c0.completed_sessions == 4, '세션 완료 → 완료 세션 4회 (flush 직후)')
+    db.session.commit()
+
+    moved = sessions[0][5]
+    moved.session_date = today - timedelta(days=1)
+    db.session.commit()
+    check(not find_mismatches(), '미래 세션을 과거로 이동 → 수강 출석 통계에 포함')
+
+    db.session.delete(sessions[1][0])
+    db.session.commit()
+    check(not find_mismatches() and courses[1].completed_sessions == 2, '세션 삭제(출결 cascade) → 반영')
+
+    db.session.delete(Attendance.query.filter_by(status='present').first())
+    db.session.commit()
+    check(not find_mismatches(), '출결 1건 삭제 → 반영')
+
+    db.session.add(Attendance(session_id=sessions[2][0].session_id, student_id=students[0].student_id,
+                              enrollment_id=e0.enrollment_id, status='present'))
+    db.session.flush()
+    db.session.rollback()
+    check(not find_mismatches(), '롤백 → 집계도 롤백')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 일괄 생성 / 날짜 경계')
+    for c in courses:
+        c.start_date = today - timedelta(days=3)
+        c.weekday = (today - timedelta(days=2)).weekday()
+    db.session.commit()
+    result = generate_sessions_bulk(today - timedelta(days=6), today + timedelta(days=13))
+    db.session.commit()
+    check(result['attendance'] > 0 and not find_mismatches(),
+          f'세션 {len(result["sessions"])}개 / 출결 {result["attendance"]}건 일괄 생성 → 일치')
+
+    future_session = CourseSession(course_id=c0.course_id, session_number=99, session_date=today + timedelta(days=1))
+    db.session.add(future_session)
+    db.session.flush()
+    db.session.add(Attendance(session_id=future_session.session_id, student_id=e0.student_id,
+                              enrollment_id=e0.enrollment_id, status='present'))
+    db.session.commit()
+    attended = e0.attended_sessions
+    refreshed = course_counters.refresh_due_enrollments(today + timedelta(days=1))
+    check(refreshed >= 1 and e0.attended_sessions == attended, '날짜가 오기 전에는 미포함')
+    db.session.execute(update(CourseSession).where(CourseSession.session_id == future_session.session_id)
+                       .values(session_date=today))
+    course_counters.refresh_due_enrollments(today)
+    db.session.commit()
+    check(e0.attended_sessions == attended + 1, '해당 날짜 재계산 → 출석 +1')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 목록 / 내보내기 — 컬렉션 미조회')
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', _record)
+    db.session.expire_all()
+    res = client.get('/admin/export/monthly-report')
+    body = res.get_data()
+    check(res.status_code == 200 and len(body) > 0, '월간 리포트 엑셀 200')
+    check(not any('FROM course_enrollments' in s or 'FROM attendance' in s for s in statements),
+          f'월간 리포트 — 수강/출결 원본 미조회 (쿼리 {len(statements)}회)')
+    top = Course.query.order_by(Course.enrolled_count.desc()).first()
+    check(top.enrolled_count == max(c.enrolled_count for c in Course.query.all()), 'enrolled_count로 DB 정렬')
+
+    statements.clear()
+    res = client.get('/admin/courses')
+    check(res.status_code == 200 and not any('FROM course_enrollments' in s and 'course_enrollments.course_id = ?' in s
+                                             for s in statements),
+          f'수업 목록 — 수업별 수강 컬렉션 미조회 (쿼리 {len(statements)}회)')
+    event.remove(db.engine, 'before_cursor_execute', _record)
+
+    # ════════════════════════════════════════════════════════
+    section('4. 점검 / 복구')
+    db.session.execute(update(Course).values(enrolled_count=Course.enrolled_count + 2)
+                       .where(Course.course_id == c0.course_id))
+    db.session.execute(update(CourseSession).values(total_students=0))
+    db.session.commit()
+    broken = find_mismatches()
+    check(len(broken) > 1 and any(m[0] == 'Course' for m in broken), f'어긋난 집계 감지 ({len(broken)}건)')
+    fixed = reconcile(broken)
+    db.session.commit()
+    check(fixed == len({(m[0], m[1]) for m in broken}) and not find_mismatches(), f'어긋난 {fixed}행만 재계산 후 일치')
+    reconcile()
+    db.session.commit()
+    check(not find_mismatches(), '전체 재계산 후 일치')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -18,6 +18,7 @@ from app.models import db, Student
 from app.models.essay import Essay, EssayResult, EssayVersion
 from app.models.essay_score import EssayScore
 from app.essays.score_parser import get_parser
+from app.utils import essay_store
 
 app = create_app()
 with app.app_context():
@@ -44,7 +45,7 @@ with app.app_context():
 
     ok = 0
     for essay, result, version in targets:
-        parsed = parser.parse_elementary_html(version.html_content)
+        parsed = parser.parse_elementary_html(essay_store.load_html(version) or '')
         title = (essay.title or '')[:20]
 
         if not parsed.get('success') or parsed.get('total_score') is None:
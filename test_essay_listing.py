@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""첨삭 목록 키셋 페이지네이션 테스트 스크립트
+
+임시 SQLite DB에 첨삭 여러 건을 만들고, 목록 API가 커서로 빠짐·중복 없이 끝까지 이어지는지
+(최신순 / 오래된순 / 점수순 / 학생 이름순, 같은 created_at 포함), 강사 가시 범위와 필터가 지켜지는지,
+목록 조회 SQL이 original_text / teacher_guide / 버전 HTML을 읽지 않고 페이지당 쿼리 수가 고정인지,
+상태별 건수와 대시보드 통계가 GROUP BY 집계와 일치하는지 검증한다.
+
+사용법:
+    python test_essay_listing.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_essay_listing_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "essay_listing_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from datetime import datetime, timedelta
+    from flask import g
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User, Student, Essay, EssayVersion, EssayResult
+    from app.essays.listing import EssayListing, status_summary
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    admin = User(email='list_admin@test.com', name='관리자', role='admin', role_level=1)
+    teacher = User(email='list_teacher@test.com', name='목록강사', role='teacher', role_level=4)
+    other = User(email='list_other@test.com', name='다른강사', role='teacher', role_level=4)
+    for u in (admin, teacher, other):
+        u.set_password('test1234')
+    db.session.add_all([admin, teacher, other])
+    db.session.flush()
+
+    students = [Student(teacher_id=teacher.user_id, name=f'학생{c}', grade='중1') for c in 'ABC']
+    other_student = Student(teacher_id=other.user_id, name='외부학생', grade='고1')
+    db.session.add_all(students + [other_student])
+    db.session.flush()
+
+    base = datetime.utcnow() - timedelta(days=3)
+    statuses = ['draft', 'reviewing', 'completed', 'failed']
+    essays = []
+    for i in range(23):
+        # 3건씩 같은 created_at → 동률은 essay_id로 이어져야 함
+        essays.append(Essay(
+            essay_id=f'essay-{i:03d}', student_id=students[i % 3].student_id, user_id=teacher.user_id,
+            title=f'논술 {i}', original_text='긴 원문 ' * 200 + str(i), teacher_guide='가이드 ' * 100,
+            grade='중1', status=statuses[i % 4], created_at=base + timedelta(minutes=i // 3),
+            current_version=2 if i % 4 else 1,
+        ))
+    for i in range(5):
+        essays.append(Essay(
+            essay_id=f'other-{i}', student_id=other_student.student_id, user_id=other.user_id,
+            title=f'외부 {i}', original_text='외부 원문', grade='고1', status='completed',
+            created_at=base + timedelta(minutes=i),
+        ))
+    db.session.add_all(essays)
+    db.session.flush()
+
+    for i, essay in enumerate(essays[:23]):
+        if essay.status == 'draft':
+            continue
+        v1 = EssayVersion(essay_id=essay.essay_id, version_number=1, html_content=f'<p>{i}-1</p>')
+        v2 = EssayVersion(essay_id=essay.essay_id, version_number=2, html_content=f'<p>{i}-2</p>')
+        db.session.add_all([v1, v2])
+        db.session.flush()
+        # 재생성으로 결과가 두 건 — 목록은 최신 결과 1건만
+        db.session.add(EssayResult(essay_id=essay.essay_id, version_id=v1.version_id, total_score=10,
+                                   final_grade='C', created_at=base))
+        db.session.add(EssayResult(essay_id=essay.essay_id, version_id=v2.version_id,
+                                   total_score=(i * 7) % 50 + 50 if i % 5 else None,
+                                   final_grade='A' if i % 2 else 'B', created_at=base + timedelta(hours=1)))
+    db.session.commit()
+    ok(f'강사 3명 / 학생 4명 / 첨삭 {len(essays)}건 (재생성 결과 포함)')
+
+    client = app.test_client()
+
+    def login(user):
+        g.pop('_login_user', None)
+        with client.session_transaction() as sess:
+            sess['_user_id'] = user.user_id
+            sess['_fresh'] = True
+
+    def walk(params, limit=4):
+        """커서를 따라 끝까지 → (essay_id 목록, 페이지 수, 첫 응답)"""
+        ids, pages, first, cursor = [], 0, None, None
+        while True:
+            query = dict(params, limit=limit)
+            if cursor:
+                query['cursor'] = cursor
+            res = client.get('/essays/api/list', query_string=query)
+            data = res.get_json()
+            first = first or data
+            pages += 1
+            ids += [item['essay_id'] for item in data['items']]
+            cursor = data['next_cursor']
+            if not cursor or pages > 50:
+                return ids, pages, first
+
+    # ════════════════════════════════════════════════════════
+    section('1. 커서 페이지 — 정렬별 전체 순회')
+    login(admin)
+    ids, pages, first = walk({})
+    expected = [e.essay_id for e in sorted(essays, key=lambda e: (e.created_at, e.essay_id), reverse=True)]
+    check(ids == expected, f'최신순 {len(ids)}건 / {pages}페이지 — 빠짐·중복 없음', f'{ids[:6]}')
+    check(first['total'] == 28 and first['status_counts'].get('completed') == 11,
+          f'첫 페이지 상태별 건수 {first["status_counts"]}')
+
+    ids, _, _ = walk({'sort': 'date_asc'}, limit=5)
+    check(ids == list(reversed(expected)), '오래된순 — 역순과 동일')
+
+    scored = {}
+    for r in EssayResult.query.order_by(EssayResult.created_at).all():
+        scored[r.essay_id] = float(r.total_score) if r.total_score is not None else -1
+    ids, _, _ = walk({'sort': 'score_desc'}, limit=3)
+    check(sorted(ids) == sorted(scored) and len(set(ids)) == len(ids),
+          f'점수 높은순 {len(ids)}건 — 결과 있는 첨삭만, 중복 없음')
+    values = [scored[i] for i in ids]
+    check(values == sorted(values, reverse=True), '점수 내림차순 유지 (점수 없는 결과는 맨 뒤)')
+
+    ids, _, _ = walk({'sort': 'student'}, limit=4)
+    names = [db.session.get(Essay, i).student.name for i in ids]
+    check(len(ids) == 28 and len(set(ids)) == 28 and names == sorted(names), '학생 이름순 — 전체 순회, 이름 정렬')
+
+    res = client.get('/essays/api/list', query_string={'cursor': 'not-a-cursor'})
+    check(res.status_code == 400, '잘못된 커서 → 400')
+    _, _, page1 = walk({}, limit=2)
+    res = client.get('/essays/api/list', query_string={'sort': 'date_asc', 'cursor': page1['next_cursor']})
+    check(res.status_code == 400, '다른 정렬의 커서 → 400')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 가시 범위 / 필터')
+    login(teacher)
+    ids, _, first = walk({}, limit=10)
+    check(len(ids) == 23 and not any(i.startswith('other-') for i in ids), f'강사 — 본인 첨삭만 ({len(ids)}건)')
+    ids, _, first = walk({'status': 'completed'}, limit=10)
+    check(len(ids) == 6 and first['status_counts'] == {'completed': 6}, '상태 필터 + 건수')
+    ids, _, _ = walk({'grade': 'A'})
+    check(ids and all(db.session.get(Essay, i).result is not None for i in ids)
+          and len(ids) == sum(1 for i in range(23) if i % 4 and i % 2),
+          f'등급 필터 — 최신 결과 기준 ({len(ids)}건, 이전 결과 C는 무시)')
+    ids, _, _ = walk({'search': '학생B'})
+    check(len(ids) == sum(1 for i in range(23) if i % 3 == 1), '검색 (학생명)')
+    login(other)
+    ids, _, _ = walk({})
+    check(sorted(ids) == [f'other-{i}' for i in range(5)], '다른 강사 — 본인 첨삭 5건만')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 목록 SQL — 큰 컬럼 미조회 / 쿼리 수 고정')
+    login(admin)
+    db.session.expire_all()
+    statements.clear()
+    res = client.get('/essays/api/list', query_string={'limit': 20, 'cursor': page1['next_cursor']})
+    item = res.get_json()['items'][0]
+    list_sql = [s for s in statements if 'FROM essays' in s]
+    check(len(statements) <= 4, f'페이지 1회 쿼리 {len(statements)}회 (행 수와 무관)')
+    check(not any('teacher_guide' in s or 'html_content' in s or 'essay_blobs' in s for s in statements),
+          'teacher_guide / 버전 HTML 미조회')
+    check(any('substr(essays.original_text' in s for s in list_sql)
+          and not any('essays.original_text AS' in s for s in list_sql), 'original_text는 미리보기(substr)만')
+    essay = db.session.get(Essay, item['essay_id'])
+    check(item['latest_version'] == (2 if essay.status != 'draft' else None), '최신 버전 번호 (서브쿼리)')
+    check(item['preview'].endswith('...') and len(item['preview']) == 203, '미리보기 200자 + ...')
+
+    statements.clear()
+    res = client.get('/essays/', query_string={'status': 'reviewing'})
+    html = res.get_data(as_text=True)
+    check(res.status_code == 200 and '총 <strong class="text-gray-800">6</strong>건' in html, '목록 화면 — 전체 건수')
+    check(not any('essays.original_text AS' in s or 'teacher_guide' in s for s in statements),
+          f'목록 화면 — 큰 컬럼 미조회 (쿼리 {len(statements)}회)')
+    check('긴 원문' in html, '목록 화면 — 원문 미리보기')
+    res = client.get('/essays/', query_string={'cursor': '깨진커서'})
+    check(res.status_code == 200, '목록 화면 — 잘못된 커서는 첫 페이지')
+
+    # ════════════════════════════════════════════════════════
+    section('4. 통계 / 최신 버전')
+    listing = EssayListing(admin, {})
+    counts = listing.status_counts()
+    check(counts == {s: sum(1 for e in essays if e.status == s) for s in {e.status for e in essays}},
+          f'상태별 건수 GROUP BY = Python 집계')
+    summary = status_summary(Essay.query.filter(Essay.created_at >= base))
+    check(summary == {'total': 28, 'completed': counts['completed'], 'pending': counts['draft']},
+          f'대시보드 요약 {summary}')
+    check(any('GROUP BY essays.status' in s for s in statements), '목록 화면 대시보드도 GROUP BY 사용')
+
+    db.session.expire_all()
+    statements.clear()
+    essay = db.session.get(Essay, 'essay-001')
+    latest = essay.latest_version
+    check(latest.version_number == 2 and 'versions' not in essay.__dict__, 'latest_version — 전체 버전 미조회')
+    check(any('LIMIT' in s.upper() for s in statements if 'essay_versions' in s), 'latest_version — 1건만 조회')
+    _ = essay.versions
+    check(essay.latest_version is essay.versions[-1], '버전을 이미 읽었으면 그대로 사용')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
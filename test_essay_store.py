@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""첨삭 HTML 버전 저장소 테스트 스크립트
+
+임시 SQLite DB로 EssayVersion 저장 시 HTML이 압축 조각으로 옮겨지고 html_content는 비는지,
+초등 리포트 공통 CSS처럼 같은 조각은 한 번만 저장되는지, 목록 조회가 html_content를 읽지 않는지,
+이전 행(html_content / html_path 파일)이 그대로 읽히고 이관되는지,
+HTML 응답이 압축 바이트를 그대로 보내고 ETag 조건부 요청에 304로 답하는지 검증한다.
+
+사용법:
+    python test_essay_store.py
+"""
+import gzip
+import io
+import os
+import shutil
+import sys
+import tempfile
+import zlib
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_essay_store_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "essay_store_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+ELEM_CSS = '\n'.join(f'.section-{i} {{ margin: {i}px 0; padding: 12px; color: #333; border-radius: 8px; }}'
+                     for i in range(80))
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event, text
+    from app import create_app
+    from app.models import db, User, Student, Essay, EssayVersion, EssayBlob, EssayVersionChunk
+    from app.essays.momoai_service import MOMOAIService
+    from app.utils import essay_store
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    teacher = User(email='store_teacher@test.com', name='저장강사', role='teacher', role_level=1)
+    outsider = User(email='store_other@test.com', name='다른강사', role='teacher', role_level=1)
+    teacher.set_password('test1234')
+    outsider.set_password('test1234')
+    db.session.add_all([teacher, outsider])
+    db.session.flush()
+    student = Student(teacher_id=teacher.user_id, name='저장학생', grade='초5')
+    db.session.add(student)
+    db.session.flush()
+    essay = Essay(essay_id='essay-store-1', student_id=student.student_id, user_id=teacher.user_id,
+                  original_text='원문', grade='초5', status='reviewing', correction_model='elementary')
+    db.session.add(essay)
+    db.session.commit()
+
+    def _elem_html(body):
+        return MOMOAIService._wrap_elem_html(None, f'<h1>{body}</h1>' + '<p>첨삭 본문</p>' * 40, ELEM_CSS, '저장강사')
+
+    ok('강사 / 학생 / 초등 첨삭 1건')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 저장 (세션 훅)')
+    html_v1 = _elem_html('1차 리포트')
+    v1 = EssayVersion(essay_id=essay.essay_id, version_number=1, html_content=html_v1)
+    db.session.add(v1)
+    db.session.commit()
+
+    raw_column = db.session.execute(text('SELECT html_content FROM essay_versions WHERE version_id = :id'),
+                                    {'id': v1.version_id}).scalar()
+    check(raw_column == '', 'html_content 컬럼은 비움 (전문은 저장소에만)')
+    check(v1.content_size == len(html_v1.encode('utf-8')) and len(v1.content_digest) == 64,
+          '버전에 원본 크기 / sha256 기록')
+    check(len(v1.chunks) == 3, f'<style> 경계로 조각 3개 ({len(v1.chunks)})')
+    check(essay_store.load_html(v1) == html_v1, '저장소에서 읽은 HTML = 원문')
+    blob = db.session.get(EssayBlob, v1.chunks[1].digest)
+    check(blob.codec == 'gzip' and gzip.decompress(blob.data).decode('utf-8').startswith('<style>'),
+          '공통 CSS 조각 gzip 저장')
+
+    html_v2 = _elem_html('2차 리포트 (수정 요청 반영)')
+    v2 = EssayVersion(essay_id=essay.essay_id, version_number=2, html_content=html_v2, revision_note='수정')
+    db.session.add(v2)
+    db.session.commit()
+    check(EssayBlob.query.count() == 4, f'2차 버전은 본문 조각만 추가 (조각 {EssayBlob.query.count()}개)')
+    check([c.digest for c in v2.chunks][:2] == [c.digest for c in v1.chunks][:2], 'head / CSS 조각 공유')
+    check(essay_store.load_html(v2) == html_v2, '2차 버전 HTML = 원문')
+
+    stats = essay_store.store_stats()
+    check(stats['stored_bytes'] * 4 < stats['raw_bytes'],
+          f'원본 {stats["raw_bytes"]}B → 저장 {stats["stored_bytes"]}B')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 목록 조회는 html_content를 읽지 않음')
+    db.session.expire_all()
+    statements.clear()
+    listed = EssayVersion.query.filter_by(essay_id=essay.essay_id).order_by(EssayVersion.version_number).all()
+    _ = [v.revision_note for v in listed] + [essay.latest_version.version_number]
+    check(not any('html_content' in s for s in statements), f'조회 SQL {len(statements)}회 — html_content 없음')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 이전 행 읽기 / 이관')
+    legacy_file = os.path.join(tmpdir, 'legacy_v4.html')
+    with open(legacy_file, 'w', encoding='utf-8') as f:
+        f.write('<html><body>파일에만 있는 4차</body></html>')
+    db.session.execute(text(
+        "INSERT INTO essay_versions (version_id, essay_id, version_number, html_content, html_path) "
+        "VALUES ('legacy-3', :e, 3, :html, NULL), ('legacy-4', :e, 4, '', :path), ('legacy-5', :e, 5, '', NULL)"
+    ), {'e': essay.essay_id, 'html': _elem_html('이전 3차'), 'path': legacy_file})
+    db.session.commit()
+    legacy = {v.version_id: v for v in EssayVersion.query.filter(EssayVersion.version_id.like('legacy-%'))}
+    check(essay_store.load_html(legacy['legacy-3']) == _elem_html('이전 3차'), '이전 행 — DB html_content')
+    check('파일에만 있는 4차' in essay_store.load_html(legacy['legacy-4']), '이전 행 — html_path 파일')
+    check(essay_store.load_html(legacy['legacy-5']) is None, 'HTML 없는 행은 None')
+
+    migrated, empty = essay_store.migrate_versions(batch_size=1)
+    check((migrated, empty) == (2, 1), f'이관 {migrated}개 / 건너뜀 {empty}개')
+    db.session.expire_all()
+    v3 = db.session.get(EssayVersion, 'legacy-3')
+    check(v3.content_digest and v3.html_content == '' and essay_store.load_html(v3) == _elem_html('이전 3차'),
+          '이관 후 저장소에서 같은 HTML')
+    os.remove(legacy_file)
+    check('파일에만 있는 4차' in essay_store.load_html(db.session.get(EssayVersion, 'legacy-4')),
+          '이관 후에는 파일이 없어도 읽힘')
+    check(EssayBlob.query.count() == 6, f'이관분도 공통 조각 공유 (조각 {EssayBlob.query.count()}개)')
+
+    # ════════════════════════════════════════════════════════
+    section('4. HTML 응답 (압축 그대로 전송 / ETag)')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = teacher.user_id
+        sess['_fresh'] = True
+    url = f'/essays/{essay.essay_id}/version/2/html'
+
+    res = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    check(res.status_code == 200 and res.headers.get('Content-Encoding') == 'gzip',
+          'gzip 클라이언트 → Content-Encoding: gzip', f'{res.status_code} {res.headers.get("Content-Encoding")}')
+    check(gzip.decompress(res.data).decode('utf-8') == html_v2, '여러 조각 버전 응답 = 원문')
+    # 첫 gzip 멤버만 푸는 클라이언트/프록시 (unused_data 무시)
+    first_member = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    check(first_member.decompress(res.data).decode('utf-8') == html_v2 and not first_member.unused_data,
+          '첫 멤버만 푸는 클라이언트도 전체 HTML (gzip 멤버를 이어 붙이지 않음)')
+    etag = res.headers.get('ETag')
+    check(etag == f'W/"{v2.content_digest}"', 'ETag = 약한 ETag(sha256)')
+
+    html_single = '<html><body>' + '<p>조각 하나짜리 리포트</p>' * 40 + '</body></html>'
+    v6 = EssayVersion(essay_id=essay.essay_id, version_number=6, html_content=html_single)
+    db.session.add(v6)
+    db.session.commit()
+    res = client.get(f'/essays/{essay.essay_id}/version/6/html', headers={'Accept-Encoding': 'gzip'})
+    stored = db.session.get(EssayBlob, v6.chunks[0].digest).data
+    check(len(v6.chunks) == 1 and res.headers.get('Content-Encoding') == 'gzip' and res.data == stored,
+          '조각 1개 버전 → 저장된 압축 바이트 그대로 전송')
+
+    statements.clear()
+    res = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    check(res.status_code == 304 and not res.data, '같은 ETag → 304 (본문 없음)')
+
+    res = client.get(url, headers={'Accept-Encoding': 'identity'})
+    check(res.status_code == 200 and 'Content-Encoding' not in res.headers and res.get_data(as_text=True) == html_v2,
+          '압축 미지원 클라이언트 → 풀어서 전송')
+    res = client.get(url + '?download=1', headers={'Accept-Encoding': 'gzip'})
+    check('attachment' in res.headers.get('Content-Disposition', ''), 'download=1 → 첨부 파일')
+    res = client.get(f'/essays/{essay.essay_id}/version/4/html', headers={'Accept-Encoding': 'gzip'})
+    check(res.status_code == 200 and b'4' in gzip.decompress(res.data), '이관된 버전 응답')
+
+    res = client.get(f'/essays/{essay.essay_id}/version/2', headers={'Accept-Encoding': 'identity'})
+    check(res.status_code == 200 and '2차 리포트' in res.get_data(as_text=True), '버전 보기 화면 — 저장소에서 렌더링')
+
+    from flask import g
+    g.pop('_login_user', None)
+    with client.session_transaction() as sess:
+        sess['_user_id'] = outsider.user_id
+    res = client.get(url)
+    check(res.status_code == 403, '권한 없는 강사 → 403', str(res.status_code))
+
+    # ════════════════════════════════════════════════════════
+    section('5. 조각 정리')
+    check(essay_store.prune_blobs() == 0, '참조 중인 조각은 삭제하지 않음')
+    db.session.delete(db.session.get(EssayVersion, v2.version_id))
+    db.session.commit()
+    check(not EssayVersionChunk.query.filter_by(version_id=v2.version_id).count(), '버전 삭제 시 조각 순서 삭제')
+    removed = essay_store.prune_blobs()
+    db.session.commit()
+    check(removed == 1 and essay_store.load_html(db.session.get(EssayVersion, v1.version_id)) == html_v1,
+          f'2차 전용 조각만 정리 ({removed}개), 공유 조각 유지')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""스트리밍 Excel 내보내기 테스트 스크립트
+
+임시 SQLite DB로 내보내기 응답이 행을 읽기 전에 헤더부터 나가는 청크 스트림인지,
+생성된 파일의 제목 병합 / 헤더·짝수 행 스타일 / 컬럼 너비 / 합계 행이 기존 형식과 같은지,
+행 수가 늘어도 메모리 사용량과 쿼리 수가 늘지 않는지, 월간 리포트 상위 수업이
+DB 정렬로 기존 Python 정렬과 같은 결과를 내는지 검증한다.
+
+사용법:
+    python test_excel_stream.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_excel_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "excel_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from openpyxl import load_workbook
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import (db, User, Student, Course, CourseEnrollment, CourseSession,
+                            Attendance, Payment)
+    from app.utils.export_utils import ExcelStream, export_attendance_to_excel
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    admin = User(email='excel_admin@test.com', name='엑셀관리자', role='admin', role_level=1)
+    admin.set_password('test1234')
+    db.session.add(admin)
+    db.session.flush()
+
+    today = date.today()
+    courses = [Course(course_name=f'엑셀반{i}', course_code=f'XLS-{i}', teacher_id=admin.user_id,
+                      start_date=today - timedelta(days=60), end_date=today + timedelta(days=60),
+                      max_students=20, total_sessions=8)
+               for i in range(7)]
+    students = [Student(teacher_id=admin.user_id, name=f'엑셀학생{i:02d}', grade='중1') for i in range(24)]
+    db.session.add_all(courses + students)
+    db.session.flush()
+
+    statuses = ['present', 'late', 'absent', 'excused', 'present']
+    for ci, course in enumerate(courses):
+        enrollments = [CourseEnrollment(course_id=course.course_id, student_id=s.student_id,
+                                        status='active' if k % 4 else 'completed')
+                       for k, s in enumerate(students[:ci * 3 + 2])]
+        db.session.add_all(enrollments)
+        db.session.flush()
+        for n in range(6):
+            session = CourseSession(course_id=course.course_id, session_number=n + 1,
+                                    session_date=today - timedelta(days=25 - n * 4),
+                                    status='completed' if n < 4 else 'scheduled')
+            db.session.add(session)
+            db.session.flush()
+            for k, e in enumerate(enrollments):
+                db.session.add(Attendance(session_id=session.session_id, student_id=e.student_id,
+                                          enrollment_id=e.enrollment_id,
+                                          status=statuses[(n + k + ci) % len(statuses)]))
+        for k, e in enumerate(enrollments):
+            db.session.add(Payment(enrollment_id=e.enrollment_id, course_id=course.course_id,
+                                   student_id=e.student_id, amount=10000 * (k + 1),
+                                   status='completed' if k % 3 else 'pending'))
+    db.session.commit()
+    attendance_total = Attendance.query.count()
+    ok(f'수업 {len(courses)}개 / 출석 {attendance_total}건 / 결제 {Payment.query.count()}건')
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = admin.user_id
+        sess['_fresh'] = True
+
+    def _workbook(res):
+        return load_workbook(io.BytesIO(res.data)).active
+
+    # ════════════════════════════════════════════════════════
+    section('1. 스트리밍 응답')
+    consumed = []
+
+    def _rows():
+        for i in range(3):
+            consumed.append(i)
+            yield {'date': '2026-01-0%d' % (i + 1), 'course_name': '반', 'student_name': '학생', 'status': 'present'}
+
+    with app.test_request_context():
+        res = export_attendance_to_excel(_rows())
+        check(res.is_streamed and res.content_length is None and not consumed,
+              '응답 생성 시점에는 행을 읽지 않음 (청크 전송)')
+        chunks = iter(res.response)
+        first = next(chunks)
+        check(first == b'' and not consumed, '첫 청크는 빈 값 → 헤더가 먼저 전송됨')
+        body = b''.join(chunks)
+    check(len(consumed) == 3 and body[:2] == b'PK', f'이후 행을 읽으며 xlsx 생성 ({len(body)} bytes)')
+    disposition = res.headers['Content-Disposition']
+    check("filename*=UTF-8''%EC%B6%9C%EC%84%9D%EB%B6%80_" in disposition and disposition.endswith('.xlsx'),
+          f'한글 파일명 헤더: {disposition[:60]}...')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 파일 형식 (관리자 출석 / 결제)')
+    res = client.get('/admin/export/attendance')
+    ws = _workbook(res)
+    rows = list(ws.iter_rows(values_only=True))
+    check(res.status_code == 200 and len(rows) == 4 + attendance_total,
+          f'출석 {attendance_total}건 + 제목/정보/빈 줄/헤더 4행')
+    check(rows[0][0] == '전체 출석부' and 'A1:G1' in {str(r) for r in ws.merged_cells.ranges}
+          and ws.row_dimensions[1].height == 30, '제목 행 병합 / 높이')
+    check(rows[3] == ('날짜', '수업명', '학생명', '출석상태', '지각시간', '비고', '체크시간')
+          and ws['A4'].font.bold and ws['A4'].fill.start_color.rgb.endswith('4472C4'), '헤더 행 스타일')
+    check(ws['A6'].fill.start_color.rgb.endswith('F2F2F2') and ws['A5'].fill.fill_type is None
+          and ws['A5'].border.left.style == 'thin', '짝수 행 배경 / 테두리')
+    check(ws.column_dimensions['B'].width == 30 and ws.column_dimensions['F'].width == 30, '컬럼 너비 미리 지정')
+    dates = [r[0] for r in rows[4:]]
+    check(dates == sorted(dates, reverse=True) and {r[3] for r in rows[4:]} <= {'출석', '지각', '결석', '결석(사유)'},
+          '최근 날짜순 / 상태 표기')
+
+    ws = _workbook(client.get('/admin/export/payments'))
+    rows = list(ws.iter_rows(values_only=True))
+    expected = sum(p.amount for p in Payment.query.filter_by(status='completed'))
+    total_row = rows[-1]
+    check(total_row[2] == '합계' and total_row[3] == expected and ws.cell(ws.max_row, 4).font.color.rgb.endswith('FF0000'),
+          f'결제 합계 행 {expected:,}원 (완료 건만)')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 쿼리 수 / 메모리')
+    queries = [0]
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count(*args):
+        queries[0] += 1
+
+    def _queries(url):
+        db.session.commit()
+        queries[0] = 0
+        res = client.get(url)
+        res.get_data()      # 스트리밍 본문을 읽는 동안의 쿼리까지 포함
+        return res, queries[0]
+
+    student = students[0]
+    res, before = _queries(f'/parent/export/child-attendance/{student.student_id}')
+    rows_before = _workbook(res).max_row
+    for ci, course in enumerate(courses[1:3]):
+        extra = CourseSession(course_id=course.course_id, session_number=20 + ci, session_date=today)
+        db.session.add(extra)
+        db.session.flush()
+        e = CourseEnrollment.query.filter_by(course_id=course.course_id, student_id=student.student_id).first()
+        db.session.add(Attendance(session_id=extra.session_id, student_id=student.student_id,
+                                  enrollment_id=e.enrollment_id, status='present'))
+    res, after = _queries(f'/parent/export/child-attendance/{student.student_id}')
+    check(_workbook(res).max_row == rows_before + 2 and after == before,
+          f'학부모 자녀 출석 내보내기 쿼리 {before}회 → 출석 추가 후 {after}회')
+
+    _, payment_queries = _queries('/admin/export/payments')
+    db.session.add_all([Payment(enrollment_id=e.enrollment_id, course_id=e.course_id, student_id=e.student_id,
+                                amount=5000, status='completed')
+                        for e in CourseEnrollment.query.limit(10)])
+    _, payment_queries_after = _queries('/admin/export/payments')
+    check(payment_queries_after == payment_queries, f'결제 내보내기 쿼리 {payment_queries}회 (행 수와 무관)')
+
+    course = courses[-1]
+    res, course_queries = _queries(f'/teacher/export/course-attendance/{course.course_id}')
+    ws = _workbook(res)
+    enrollment = CourseEnrollment.query.filter_by(course_id=course.course_id, status='active')\
+        .join(Student).order_by(Student.name).first()
+    first_session = CourseSession.query.filter_by(course_id=course.course_id).order_by(CourseSession.session_date).first()
+    status = Attendance.query.filter_by(enrollment_id=enrollment.enrollment_id,
+                                        session_id=first_session.session_id).first().status
+    symbol = {'present': 'O', 'late': '△', 'absent': 'X', 'excused': '결'}[status]
+    check(ws['B5'].value == enrollment.student.name and ws['D5'].value == symbol and course_queries < 15,
+          f'수업 출석부 (학생 x 세션 매트릭스) 쿼리 {course_queries}회')
+
+    def _peak(n):
+        sheet = ExcelStream('메모리', widths=[12, 30, 12, 10, 10, 30, 18])
+        tracemalloc.start()
+        sheet.header(['날짜', '수업명', '학생명', '출석상태', '지각시간', '비고', '체크시간'])
+        for i in range(n):
+            sheet.row(['2026-01-01', f'수업{i % 50}', f'학생{i}', '출석', '-', '비고 ' * 3, '2026-01-01 10:00'])
+        size = sum(len(chunk) for chunk in sheet._chunks())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak, size
+
+    small_peak, _ = _peak(2000)
+    large_peak, large_size = _peak(40000)
+    check(large_peak < small_peak * 2,
+          f'행 2천 → 4만: 최대 메모리 {small_peak // 1024}KB → {large_peak // 1024}KB (파일 {large_size // 1024}KB)')
+
+    # ════════════════════════════════════════════════════════
+    section('4. 월간 리포트 상위 수업')
+    res, monthly_queries = _queries('/admin/export/monthly-report')
+    ws = _workbook(res)
+    rows = list(ws.iter_rows(values_only=True))
+    start = next(i for i, r in enumerate(rows) if r[0] == '상위 5개 수업') + 1
+    top = [r[0] for r in rows[start:start + 5]]
+    expected_top = [c.course_name for c in sorted(Course.query.all(), key=lambda c: c.enrolled_count, reverse=True)[:5]]
+    check(top == expected_top, f'수강생 수 상위 5개: {", ".join(top)}')
+    best = next(c for c in courses if c.course_name == top[0])
+    present = Attendance.query.join(CourseEnrollment).filter(CourseEnrollment.course_id == best.course_id,
+                                                              Attendance.status == 'present').count()
+    total = Attendance.query.join(CourseEnrollment).filter(CourseEnrollment.course_id == best.course_id).count()
+    check(rows[start][2] == f'{best.enrolled_count}/{best.max_students}' and
+          rows[start][3] == f'{best.completed_sessions}/{best.total_sessions}' and
+          rows[start][4] == f'{present / total * 100:.1f}%',
+          f'수강생 {rows[start][2]} / 세션 {rows[start][3]} / 출석률 {rows[start][4]}')
+
+    for i in range(8):
+        db.session.add(Course(course_name=f'추가반{i}', course_code=f'XLS-ADD-{i}', teacher_id=admin.user_id,
+                              start_date=today, end_date=today + timedelta(days=30)))
+    _, monthly_after = _queries('/admin/export/monthly-report')
+    check(monthly_after == monthly_queries, f'수업 8개 추가 전후 쿼리 {monthly_queries}회 → {monthly_after}회')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""게시판 이미지 파생본 / OCR 입력 축소 테스트 스크립트
+
+임시 SQLite DB와 임시 이미지 폴더로 save_post_images() 커밋 후 백그라운드에서
+EXIF 회전이 반영된 썸네일/중간/WebP 파생본이 생성·기록되는지, 롤백 시 생성되지 않는지,
+이미지 삭제 시 파생본도 지워지는지, 서빙 응답에 장기 캐시 헤더가 붙는지,
+상세 화면 매크로가 srcset을 출력하는지, OCR 입력이 축소되는지 검증한다.
+
+사용법:
+    python test_image_derivatives.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_images_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "images_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def _photo(size=(4000, 3000), orientation=6, fmt='JPEG', mode='RGB'):
+    """폰 사진처럼 가로로 저장되고 EXIF Orientation으로 세로 표시되는 이미지"""
+    from PIL import Image
+    img = Image.new(mode, size, (200, 120, 40) if mode == 'RGB' else (200, 120, 40, 128))
+    for x in range(0, size[0], 50):     # 압축이 너무 잘 되지 않도록 무늬
+        img.paste((x % 255, 90, 160) if mode == 'RGB' else (x % 255, 90, 160, 255), (x, 0, x + 25, size[1]))
+    buf = io.BytesIO()
+    exif = Image.Exif()
+    if orientation != 1:
+        exif[0x0112] = orientation
+    img.save(buf, fmt, exif=exif, **({'quality': 95} if fmt == 'JPEG' else {}))
+    buf.seek(0)
+    return buf
+
+
+def _wait(predicate, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB / 이미지 폴더)')
+    from flask import render_template_string
+    from werkzeug.datastructures import FileStorage
+    from PIL import Image
+    from app import create_app
+    from app.models import db, User
+    from app.models.post_image import PostImage
+    from app.utils.image_utils import delete_post_image, prepare_ocr_image, save_post_images
+
+    app = create_app('production')
+    images_folder = os.path.join(tmpdir, 'post_images')
+    app.config['POST_IMAGES_FOLDER'] = images_folder
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    user = User(email='image_teacher@test.com', name='이미지강사', role='teacher', role_level=1)
+    user.set_password('test1234')
+    db.session.add(user)
+    db.session.commit()
+    ok('앱/DB 준비')
+
+    def _stored(image_id):
+        db.session.expire_all()
+        return db.session.get(PostImage, image_id)
+
+    # ════════════════════════════════════════════════════════
+    section('1. 업로드 → 커밋 후 파생본 생성')
+    files = [FileStorage(stream=_photo(), filename='phone.jpg', content_type='image/jpeg'),
+             FileStorage(stream=_photo((300, 200), orientation=1, fmt='PNG', mode='RGBA'),
+                         filename='small.png', content_type='image/png')]
+    with app.test_request_context():
+        saved = save_post_images(files, 'community', 'post-1', user.user_id)
+        db.session.add_all(saved)
+        check(saved[0].variants is None, '요청 처리 중에는 원본만 저장 (variants 없음)')
+        db.session.commit()
+    photo_id, small_id = saved[0].image_id, saved[1].image_id
+
+    ready = _wait(lambda: _stored(photo_id).variants is not None and _stored(small_id).variants is not None)
+    check(ready, '커밋 후 백그라운드에서 파생본 생성')
+    photo = _stored(photo_id)
+    check((photo.width, photo.height) == (3000, 4000), f'EXIF 회전 반영 원본 크기 {photo.width}x{photo.height}')
+    thumb, medium = photo.variants.get('thumb', {}), photo.variants.get('medium', {})
+    check((thumb.get('width'), thumb.get('height')) == (300, 400) and
+          (medium.get('width'), medium.get('height')) == (960, 1280),
+          f"thumb {thumb.get('width')}x{thumb.get('height')} / medium {medium.get('width')}x{medium.get('height')}")
+    paths = {fmt: os.path.join(images_folder, medium.get(fmt, '-')) for fmt in ('jpeg', 'webp')}
+    check(all(os.path.exists(p) for p in paths.values()), '중간 크기 JPEG + WebP 파일 생성')
+    with Image.open(paths['webp']) as webp:
+        check(webp.format == 'WEBP' and webp.size == (960, 1280), 'WebP 파생본 형식/크기')
+    original_size = os.path.getsize(os.path.join(images_folder, photo.stored_filename))
+    check(os.path.getsize(paths['jpeg']) * 5 < original_size,
+          f'중간 크기 {os.path.getsize(paths["jpeg"]) // 1024}KB < 원본 {original_size // 1024}KB / 5')
+
+    small = _stored(small_id)
+    with app.test_request_context():
+        srcset = small.srcset('jpeg')
+    check(small.variants['thumb']['jpeg'] == small.variants['medium']['jpeg'] and
+          srcset.endswith(' 300w') and ', ' not in srcset, '원본보다 크게 만들지 않음 (작은 이미지는 파일 공유)')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 롤백 / 삭제')
+    with app.test_request_context():
+        rolled = save_post_images([FileStorage(stream=_photo(), filename='rolled.jpg')],
+                                  'community', 'post-2', user.user_id)
+        db.session.add_all(rolled)
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+    stem = rolled[0].stored_filename.rsplit('.', 1)[0]
+    time.sleep(0.5)
+    check(not any(name.startswith(f'{stem}_') for name in os.listdir(images_folder)),
+          '롤백된 업로드는 파생본을 만들지 않음')
+
+    variant_files = [os.path.join(images_folder, v[fmt]) for v in photo.variants.values() for fmt in ('jpeg', 'webp')]
+    with app.test_request_context():
+        delete_post_image(photo)
+        db.session.commit()
+    check(not any(os.path.exists(p) for p in variant_files), '이미지 삭제 시 파생본 파일도 삭제')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 서빙 / srcset')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = user.user_id
+        sess['_fresh'] = True
+    small = _stored(small_id)
+    with app.test_request_context():
+        webp_url = small.variant_url('thumb', 'webp')
+    res = client.get(webp_url)
+    cache = res.headers.get('Cache-Control', '')
+    check(res.status_code == 200 and res.mimetype == 'image/webp', f'파생본 서빙 {res.status_code} {res.mimetype}')
+    check('immutable' in cache and 'max-age=31536000' in cache and 'private' in cache and 'public' not in cache,
+          f'장기 캐시 헤더: {cache}')
+
+    with app.test_request_context():
+        html = render_template_string(
+            "{% from 'macros/image_upload.html' import image_display_section %}{{ image_display_section(images) }}",
+            images=[small])
+        pending = PostImage(board_type='community', post_id='post-3', original_filename='p.jpg',
+                            stored_filename='pending.jpg', file_size=1)
+        pending_html = render_template_string(
+            "{% from 'macros/image_upload.html' import image_display_section %}{{ image_display_section(images) }}",
+            images=[pending])
+    check('type="image/webp"' in html and small.variants['thumb']['webp'] in html and 'sizes=' in html,
+          '상세 화면 <picture> + WebP srcset')
+    check('srcset' not in pending_html and 'pending.jpg' in pending_html, '파생본 생성 전에는 원본으로 표시')
+
+    # ════════════════════════════════════════════════════════
+    section('4. OCR 입력 축소')
+    photo_path = os.path.join(tmpdir, 'ocr_photo.jpg')
+    with open(photo_path, 'wb') as f:
+        f.write(_photo().getvalue())
+    data, mime = prepare_ocr_image(photo_path, max_side=2048)
+    with Image.open(io.BytesIO(data)) as sent:
+        check(mime == 'image/jpeg' and sent.size == (1536, 2048), f'회전 보정 + 긴 변 2048 축소 {sent.size}')
+    check(len(data) * 3 < os.path.getsize(photo_path),
+          f'전송량 {os.path.getsize(photo_path) // 1024}KB → {len(data) // 1024}KB')
+
+    small_path = os.path.join(tmpdir, 'ocr_small.jpg')
+    Image.effect_noise((800, 600), 60).convert('RGB').save(small_path, 'JPEG', quality=60)
+    data, _ = prepare_ocr_image(small_path)
+    with open(small_path, 'rb') as f:
+        check(data == f.read(), '이미 작은 JPEG는 원본 그대로 전송')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""첨삭 작업 큐 테스트 스크립트
+
+임시 SQLite DB로 두 워커가 경쟁할 때의 작업 점유, provider별 slot 한도,
+리스 만료 후 재대기, cancel_jobs_for_essay, 알려진 소요 시간 이력으로
+여러 slot에서의 대기 순번·예상 완료 시간(get_queue_state) 시뮬레이션을 검증하고,
+로컬 스텁 서버(Anthropic Messages 스트리밍 API 흉내)로
+스트리밍 중간 결과 저장 → 처리 중 취소 → 작업 cancelled + 변경 롤백을 검증한다.
+실제 API 키나 운영 DB가 필요 없다.
+
+사용법:
+    python test_job_queue.py
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+# 스트리밍으로 보낼 응답 조각 (섹션 제목 포함)
+CHUNKS = [
+    '<!DOCTYPE html><html lang="ko"><body>',
+    '<div class="sh">총평</div><p>논지가 분명합니다.</p>',
+    '<div class="sh">윤문 완성본</div><p>첫 문단',
+    '을 다듬었습니다.</p>',
+    '<div class="sh">교사 종합 제언</div><p>마무리</p>',
+    '</body></html>',
+]
+
+
+# ════════════════════════════════════════════════════════
+# 스텁 서버 (POST /v1/messages, stream=true → SSE)
+# ════════════════════════════════════════════════════════
+
+class StubState:
+    def __init__(self):
+        self.cancel_after = None  # 이 개수만큼 보낸 뒤 on_cancel 호출
+        self.on_cancel = None
+        self.sent = 0
+        self.requests = 0
+
+
+STUB = StubState()
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'.encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        STUB.requests += 1
+        STUB.sent = 0
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        try:
+            self.wfile.write(_sse('message_start', {'type': 'message_start', 'message': {
+                'id': 'msg_stub', 'type': 'message', 'role': 'assistant', 'model': body.get('model'),
+                'content': [], 'stop_reason': None, 'stop_sequence': None,
+                'usage': {'input_tokens': 100, 'output_tokens': 1,
+                          'cache_read_input_tokens': 0, 'cache_creation_input_tokens': 0},
+            }}))
+            self.wfile.write(_sse('content_block_start', {
+                'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}}))
+            for chunk in CHUNKS:
+                self.wfile.write(_sse('content_block_delta', {
+                    'type': 'content_block_delta', 'index': 0,
+                    'delta': {'type': 'text_delta', 'text': chunk}}))
+                self.wfile.flush()
+                STUB.sent += 1
+                if STUB.sent == STUB.cancel_after and STUB.on_cancel:
+                    STUB.on_cancel()
+                time.sleep(0.05)
+            self.wfile.write(_sse('content_block_stop', {'type': 'content_block_stop', 'index': 0}))
+            self.wfile.write(_sse('message_delta', {
+                'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                'usage': {'output_tokens': 50}}))
+            self.wfile.write(_sse('message_stop', {'type': 'message_stop'}))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 취소로 스트림을 닫음
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_queue_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "queue_test.db")}'
+os.environ['ANTHROPIC_BASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+os.environ['ANTHROPIC_API_KEY'] = 'stub-key'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB + 스텁 서버)')
+    from app import create_app
+    from app.models import db, User, Student, Essay, EssayVersion
+    from app.models.correction_job import CorrectionJob
+    from app.models.api_usage_log import ApiUsageLog
+    from app.essays.job_queue import (
+        JobStreamListener, enqueue_correction, cancel_jobs_for_essay, claim_next_job,
+        finish_job, heartbeat, requeue_expired_jobs, get_partial_output, run_job, _try_claim,
+        get_latency_stats, get_queue_state,
+    )
+    from sqlalchemy.exc import IntegrityError
+
+    app = create_app('production')
+    app.config['HTML_FOLDER'] = tmpdir
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['CORRECTION_CONCURRENCY'] = {'claude': 2, 'gemini': 1}
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    JobStreamListener.FLUSH_INTERVAL = 0  # 청크마다 기록 + 취소 확인
+    ok(f'스텁 서버 {os.environ["ANTHROPIC_BASE_URL"]}')
+
+    teacher = User(email='queue_teacher@test.com', name='큐강사', role='teacher')
+    teacher.set_password('test1234')
+    db.session.add(teacher)
+    db.session.flush()
+    student = Student(teacher_id=teacher.user_id, name='큐학생', grade='중1')
+    db.session.add(student)
+    db.session.commit()
+    teacher_id = teacher.user_id
+
+    def new_essay(api_provider='claude', **kwargs):
+        essay = Essay(student_id=student.student_id, user_id=teacher.user_id,
+                      original_text='학생 원문입니다.', grade='중1', status='processing',
+                      correction_model='standard', api_provider=api_provider, **kwargs)
+        db.session.add(essay)
+        db.session.commit()
+        return essay
+
+    base_time = datetime.utcnow() - timedelta(hours=1)
+
+    def queued_job(api_provider='claude', order=0):
+        """대기 작업 1건 (created_at을 order초 간격으로 고정 → 점유 순서 확정)"""
+        essay = new_essay(api_provider=api_provider)
+        job = enqueue_correction(essay, student_name=student.name, teacher_name=teacher.name)
+        job.created_at = base_time + timedelta(seconds=order)
+        db.session.commit()
+        return job.job_id
+
+    def claim_race(worker_ids):
+        """워커마다 스레드 1개: 동시에 출발해 빈 slot이 없을 때까지 점유"""
+        barrier = threading.Barrier(len(worker_ids))
+        claimed = {w: [] for w in worker_ids}
+        errors = []
+
+        def worker(worker_id):
+            with app.app_context():
+                try:
+                    barrier.wait()
+                    while True:
+                        job = claim_next_job(worker_id)
+                        if job is None:
+                            break
+                        claimed[worker_id].append((job.job_id, job.provider, job.slot))
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    db.session.remove()
+
+        threads = [threading.Thread(target=worker, args=(w,)) for w in worker_ids]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        return claimed, errors
+
+    def running_jobs():
+        db.session.expire_all()
+        return CorrectionJob.query.filter_by(status='running').order_by(CorrectionJob.created_at).all()
+
+    def finish_all_running():
+        for job in running_jobs():
+            finish_job(job.job_id, job.worker_id, 'done')
+
+    def cancel_after(n, essay_id, seen):
+        """스텁이 n번째 청크를 보낸 뒤: 중간 결과 확인 → api_cancel 과 같은 취소 요청"""
+        def on_cancel():
+            with app.app_context():
+                expected = ''.join(CHUNKS[:n])
+                deadline = time.monotonic() + 5
+                partial = get_partial_output(essay_id)
+                while (not partial or partial['length'] < len(expected)) and time.monotonic() < deadline:
+                    time.sleep(0.02)
+                    partial = get_partial_output(essay_id)
+                seen['partial'] = partial
+
+                client = app.test_client()
+                with client.session_transaction() as sess:
+                    sess['_user_id'] = teacher_id
+                    sess['_fresh'] = True
+                seen['api'] = client.get(f'/essays/api/partial/{essay_id}').get_json()
+                seen['api_tail'] = client.get(
+                    f'/essays/api/partial/{essay_id}?offset={len(CHUNKS[0])}').get_json()
+                seen['api_reset'] = client.get(f'/essays/api/partial/{essay_id}?offset=99999').get_json()
+
+                essay = db.session.get(Essay, essay_id)
+                essay.status = 'failed'
+                db.session.commit()
+                cancel_jobs_for_essay(essay_id)
+        STUB.cancel_after = n
+        STUB.on_cancel = on_cancel
+
+    # ════════════════════════════════════════════════════════
+    section('1. 작업 점유 — 두 워커 경쟁')
+    claude_ids = [queued_job(order=i) for i in range(5)]
+    claimed, errors = claim_race(['w-a', 'w-b'])
+    check(not errors, '점유 중 오류 없음', errors)
+    taken = claimed['w-a'] + claimed['w-b']
+    check(len(taken) == 2 and len({j for j, _, _ in taken}) == 2,
+          f'claude 한도 2건만 점유, 중복 없음 (w-a {len(claimed["w-a"])}건 / w-b {len(claimed["w-b"])}건)')
+    check(sorted(s for _, _, s in taken) == [0, 1], 'slot 0, 1 사용')
+    check({j for j, _, _ in taken} == set(claude_ids[:2]), '가장 오래된 대기 작업부터 점유')
+    running = running_jobs()
+    check(all(j.attempts == 1 and j.lease_expires_at > datetime.utcnow() for j in running),
+          'attempts 증가 + 리스 설정')
+    check({j.worker_id for j in running} == {w for w in claimed if claimed[w]},
+          'worker_id 기록')
+
+    finish_all_running()
+    claimed, errors = claim_race(['w-a', 'w-b'])
+    taken = claimed['w-a'] + claimed['w-b']
+    check(not errors and {j for j, _, _ in taken} == set(claude_ids[2:4]),
+          '완료로 slot 반환 → 다음 순서 2건 점유')
+
+    # ════════════════════════════════════════════════════════
+    section('2. provider별 slot 한도')
+    gemini_ids = [queued_job('gemini', order=10 + i) for i in range(2)]
+    check(claim_next_job('w-a').job_id == gemini_ids[0], 'claude가 가득 차도 gemini는 따로 점유')
+    check(claim_next_job('w-b') is None, 'gemini 한도 1 → 더 점유하지 않음')
+    counts = {}
+    for job in running_jobs():
+        counts[job.provider] = counts.get(job.provider, 0) + 1
+    check(counts == {'claude': 2, 'gemini': 1}, f'running: {counts}')
+    db.session.rollback()
+    try:
+        _try_claim(claude_ids[4], 0, 'w-stale')
+        fail('사용 중인 slot은 유니크 제약으로 거부')
+    except IntegrityError:
+        db.session.rollback()
+        ok('사용 중인 slot은 유니크 제약으로 거부')
+    check(db.session.get(CorrectionJob, claude_ids[4]).status == 'queued', '거부된 작업은 대기 유지')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 리스 만료 → 재대기 / 재시도 한도 초과 → 실패')
+    lost, alive = running_jobs()[:2]  # claude 2건
+    lost_id, lost_worker, alive_id = lost.job_id, lost.worker_id, alive.job_id
+    past = datetime.utcnow() - timedelta(seconds=5)
+    lost.lease_expires_at = past
+    alive.lease_expires_at = past
+    db.session.commit()
+    heartbeat([alive_id], alive.worker_id)
+    check(requeue_expired_jobs() == (1, 0), '리스 만료 1건 재대기 (하트비트로 연장한 작업 제외)')
+    db.session.expire_all()
+    lost = db.session.get(CorrectionJob, lost_id)
+    check(lost.status == 'queued' and lost.slot is None and lost.worker_id is None,
+          '재대기 작업은 slot/worker 해제')
+    finish_job(lost_id, lost_worker, 'done')
+    db.session.expire_all()
+    check(db.session.get(CorrectionJob, lost_id).status == 'queued', '리스를 잃은 워커의 완료 처리는 무시')
+    rerun = claim_next_job('w-b')
+    check(rerun is not None and rerun.job_id == lost_id and rerun.attempts == 2,
+          '빈 slot으로 재대기 작업 다시 점유 (attempts 2)')
+
+    rerun.attempts = rerun.max_attempts
+    rerun.lease_expires_at = past
+    db.session.commit()
+    check(requeue_expired_jobs() == (0, 1), '재시도 한도 초과 → 실패 처리')
+    db.session.expire_all()
+    rerun = db.session.get(CorrectionJob, lost_id)
+    check(rerun.status == 'failed' and rerun.slot is None and rerun.finished_at is not None, '작업 failed')
+    check(db.session.get(Essay, rerun.essay_id).status == 'failed', 'Essay failed')
+    check(requeue_expired_jobs() == (0, 0), '재호출 시 변화 없음')
+
+    # ════════════════════════════════════════════════════════
+    section('4. cancel_jobs_for_essay')
+    waiting = db.session.get(CorrectionJob, claude_ids[4])
+    check(cancel_jobs_for_essay(waiting.essay_id) == 1, '대기 작업 취소 건수 반환')
+    db.session.expire_all()
+    waiting = db.session.get(CorrectionJob, claude_ids[4])
+    check(waiting.status == 'cancelled' and waiting.finished_at is not None, '대기 작업 → cancelled')
+    active = db.session.get(CorrectionJob, alive_id)
+    check(cancel_jobs_for_essay(active.essay_id) == 0, '처리 중 작업은 취소 건수에 포함 안 됨')
+    db.session.expire_all()
+    active = db.session.get(CorrectionJob, alive_id)
+    check(active.status == 'running' and active.cancel_requested, '처리 중 작업 → cancel_requested (워커가 중단)')
+    check(db.session.get(CorrectionJob, gemini_ids[1]).status == 'queued', '다른 Essay 작업은 그대로')
+
+    finish_all_running()
+    cancel_jobs_for_essay(db.session.get(CorrectionJob, gemini_ids[1]).essay_id)
+    check(CorrectionJob.query.filter(CorrectionJob.status.in_(['queued', 'running'])).count() == 0,
+          '큐 비움')
+
+    # ════════════════════════════════════════════════════════
+    section('5. 스트리밍 중 취소 — 신규 첨삭')
+    essay = new_essay()
+    enqueue_correction(essay, student_name=student.name, teacher_name=teacher.name)
+    seen = {}
+    cancel_after(3, essay.essay_id, seen)
+    job = claim_next_job('w-stream')
+    check(job is not None and job.essay_id == essay.essay_id, '작업 점유')
+    run_job(job.job_id, 'w-stream')
+
+    expected = ''.join(CHUNKS[:3])
+    partial = seen.get('partial') or {}
+    check(partial.get('job_status') == 'running' and partial.get('html', '').startswith(expected),
+          '스트리밍 중 partial_output에 받은 청크 저장', partial)
+    api = seen.get('api') or {}
+    check(api.get('html', '').startswith(expected) and api.get('length', 0) >= len(expected),
+          '/essays/api/partial 미리보기 응답')
+    tail = seen.get('api_tail') or {}
+    check(tail.get('html', '').startswith(CHUNKS[1]) and not tail.get('reset'),
+          'offset 이후만 반환')
+    reset = seen.get('api_reset') or {}
+    check(reset.get('reset') and reset.get('html', '').startswith(CHUNKS[0]),
+          'offset이 길이보다 크면 처음부터 (reset)')
+
+    db.session.expire_all()
+    job = db.session.get(CorrectionJob, job.job_id)
+    check(job.status == 'cancelled' and job.slot is None, f'작업 cancelled + slot 반환 ({job.status})')
+    check(job.cancel_requested, 'cancel_requested 기록')
+    check(job.partial_output and job.partial_output.startswith(expected)
+          and CHUNKS[-1] not in job.partial_output,
+          '취소 시점까지의 중간 결과만 남음')
+    check(job.progress_dict.get('sections', 0) >= 2, f'섹션 진행 기록 ({job.progress_dict})')
+    essay = db.session.get(Essay, essay.essay_id)
+    check(essay.status == 'failed' and essay.current_version == 1, '취소된 Essay 상태/버전 유지')
+    check(EssayVersion.query.filter_by(essay_id=essay.essay_id).count() == 0, 'EssayVersion 생성 안 됨')
+    check(ApiUsageLog.query.filter_by(essay_id=essay.essay_id).count() == 0, '사용량 로그 없음')
+    check(STUB.sent < len(CHUNKS), f'업스트림 스트림 중단 ({STUB.sent}/{len(CHUNKS)} 청크 전송)')
+
+    # ════════════════════════════════════════════════════════
+    section('6. 스트리밍 중 취소 — 재생성 (버전 번호 복구)')
+    essay = new_essay(current_version=2)
+    enqueue_correction(essay, job_type='regenerate', student_name=student.name,
+                       teacher_name=teacher.name, revision_note='더 자세히')
+    seen = {}
+    cancel_after(2, essay.essay_id, seen)
+    job = claim_next_job('w-stream')
+    run_job(job.job_id, 'w-stream')
+
+    db.session.expire_all()
+    job = db.session.get(CorrectionJob, job.job_id)
+    essay = db.session.get(Essay, essay.essay_id)
+    check(job.status == 'cancelled', '재생성 작업 cancelled')
+    check(essay.current_version == 2, f'current_version 기준 버전으로 복구 ({essay.current_version})')
+    check(EssayVersion.query.filter_by(essay_id=essay.essay_id).count() == 0, 'EssayVersion 생성 안 됨')
+    check(get_partial_output(essay.essay_id) is None, '종료된 작업은 미리보기 없음')
+
+    # ════════════════════════════════════════════════════════
+    section('7. 끝까지 스트리밍 — 완료 시 중간 결과 비움')
+    essay = new_essay()
+    enqueue_correction(essay, student_name=student.name, teacher_name=teacher.name)
+    STUB.cancel_after = None
+    job = claim_next_job('w-stream')
+    run_job(job.job_id, 'w-stream')
+
+    db.session.expire_all()
+    job = db.session.get(CorrectionJob, job.job_id)
+    essay = db.session.get(Essay, essay.essay_id)
+    check(job.status == 'done', f'작업 done ({job.status}: {job.error_message})')
+    check(job.partial_output is None, 'partial_output 비움 (완성본은 EssayVersion)')
+    check(EssayVersion.query.filter_by(essay_id=essay.essay_id).count() == 1, 'EssayVersion 1건 생성')
+
+    # ════════════════════════════════════════════════════════
+    section('8. 대기 순번 / 예상 완료 시간 (claude slot 2개)')
+    # 이전 섹션의 완료 이력을 지우고 소요 시간을 알려진 값으로 채운다
+    CorrectionJob.query.delete()
+    db.session.commit()
+    now = datetime.utcnow()
+    history_essay = new_essay()
+
+    def add_job(essay_id=None, created=0, provider='claude', correction_model='standard', **kwargs):
+        job = CorrectionJob(essay_id=essay_id or history_essay.essay_id, provider=provider,
+                            correction_model=correction_model,
+                            created_at=base_time + timedelta(seconds=created), **kwargs)
+        db.session.add(job)
+        db.session.commit()
+        return job.job_id
+
+    def add_done(model, seconds):
+        finished = now - timedelta(minutes=5)
+        add_job(correction_model=model, status='done',
+                started_at=finished - timedelta(seconds=seconds), finished_at=finished)
+
+    for seconds in (100, 120, 140, 160, 400):   # standard p50=140, p95=400 (nearest-rank)
+        add_done('standard', seconds)
+    for _ in range(3):                          # harkness p50=p95=300
+        add_done('harkness', 300)
+    for _ in range(2):                          # elementary 2건 → 이력 부족, 기본값 120/240
+        add_done('elementary', 10)
+    stats = get_latency_stats(force=True)
+    check(stats[('claude', 'standard')]['p50'] == 140 and stats[('claude', 'standard')]['p95'] == 400,
+          'standard 이력 p50 140초 / p95 400초')
+
+    def essay_job(created, model='standard', provider='claude', **kwargs):
+        essay = new_essay(api_provider=provider)
+        return essay.essay_id, add_job(essay.essay_id, created, provider=provider,
+                                       correction_model=model, **kwargs)
+
+    # 처리 중: standard 40초 경과 (slot 0), harkness 100초 경과 (slot 1)
+    r1_essay, _ = essay_job(0, status='running', slot=0, worker_id='w-a', started_at=now - timedelta(seconds=40))
+    r2_essay, _ = essay_job(1, 'harkness', status='running', slot=1, worker_id='w-b',
+                            started_at=now - timedelta(seconds=100))
+    # 대기: gemini(다른 provider) → elementary → standard → 대상 standard → 나중 등록 standard
+    g1_essay, _ = essay_job(2, provider='gemini', status='queued')
+    q1_essay, _ = essay_job(3, 'elementary', status='queued')
+    essay_job(4, status='queued')
+    target_essay, _ = essay_job(5, status='queued')
+    essay_job(6, status='queued')
+    g2_essay, _ = essay_job(7, provider='gemini', status='queued')
+
+    def near(actual, expected):
+        return actual is not None and abs(actual - expected) <= 1
+
+    state = get_queue_state(target_essay)
+    check(state['job_status'] == 'queued' and state['ahead'] == 2 and state['position'] == 3,
+          f'대기 3번째 — 같은 provider의 앞선 대기만 셈 (ahead {state["ahead"]})')
+    check(state['running'] == 2 and state['queued'] == 6, f'전체 처리 중 2 / 대기 6 ({state["running"]}/{state["queued"]})')
+    # p50: slot 비는 시각 [100, 200] → elementary 100~220, standard 200~340 → 대상 220 시작 + 140 = 360
+    check(near(state['eta_seconds'], 360), f'p50 ETA 360초 ({state["eta_seconds"]})')
+    # p95: [360, 200] → elementary 200~440, standard 360~760 → 대상 440 시작 + 400 = 840
+    check(near(state['eta_p95_seconds'], 840), f'p95 ETA 840초 ({state["eta_p95_seconds"]})')
+
+    state = get_queue_state(q1_essay)
+    check(state['position'] == 1 and near(state['eta_seconds'], 220) and near(state['eta_p95_seconds'], 440),
+          f'첫 대기 작업: 먼저 비는 slot에서 시작 (p50 {state["eta_seconds"]} / p95 {state["eta_p95_seconds"]})')
+
+    state = get_queue_state(r2_essay)
+    check(state['job_status'] == 'running' and state['position'] == 0 and near(state['elapsed_seconds'], 100)
+          and near(state['eta_seconds'], 200), f'처리 중 작업: 남은 시간 = p50 - 경과 ({state["eta_seconds"]})')
+    state = get_queue_state(r1_essay)
+    check(near(state['eta_seconds'], 100) and near(state['eta_p95_seconds'], 360),
+          f'처리 중 standard: p50 100 / p95 360 ({state["eta_seconds"]}/{state["eta_p95_seconds"]})')
+
+    # gemini slot 1개, 이력 없음 → 기본 standard 180/300을 순서대로 더함
+    state = get_queue_state(g2_essay)
+    check(state['position'] == 2 and near(state['eta_seconds'], 360) and near(state['eta_p95_seconds'], 600),
+          f'gemini(slot 1개): 앞선 1건 + 본인 (p50 {state["eta_seconds"]} / p95 {state["eta_p95_seconds"]})')
+    check(get_queue_state(g1_essay)['position'] == 1, 'gemini 첫 대기 1번째')
+    check(get_queue_state(history_essay.essay_id)['job_status'] is None, '대기/처리 중 작업 없는 Essay')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""일괄 첨삭 (Message Batches) 테스트 스크립트
+
+로컬 스텁 서버(Anthropic Message Batches API 흉내)와 임시 SQLite DB로
+등록 → 배치 제출 → 결과 반영(EssayVersion/EssayScore) → 실패/취소 처리를 검증한다.
+실제 API 키나 운영 DB가 필요 없다.
+
+사용법:
+    python test_message_batch.py
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+# 점수 파서가 읽을 수 있는 최소 리포트 (스탠다드 형식)
+REPORT_HTML = """<!DOCTYPE html>
+<html lang="ko"><head><title>MOMOAI</title></head>
+<body>
+<div class="info-item"><span class="info-label">최종점수</span><span class="info-value">85.5점</span></div>
+<div class="info-item"><span class="info-label">등급</span><span class="info-value">B+</span></div>
+<div class="chart-card"><div class="chart-title">📚 사고유형 분석</div>
+<svg class="radar-svg">
+  <text class="radar-label">요약</text><text class="radar-score thinking">8.5</text>
+  <text class="radar-label">비교</text><text class="radar-score thinking">7.0</text>
+</svg></div>
+</body></html>"""
+
+
+# ════════════════════════════════════════════════════════
+# 스텁 서버 (POST/GET /v1/messages/batches ...)
+# ════════════════════════════════════════════════════════
+
+class StubState:
+    def __init__(self):
+        self.batches = {}      # id → {'requests': [...], 'status': str}
+        self.fail_ids = set()  # errored 로 응답할 custom_id
+        self.lock = threading.Lock()
+
+    def end_all(self):
+        with self.lock:
+            for b in self.batches.values():
+                b['status'] = 'ended'
+
+
+STUB = StubState()
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _batch_json(batch_id, base_url):
+    b = STUB.batches[batch_id]
+    ended = b['status'] == 'ended'
+    n = len(b['requests'])
+    return {
+        'id': batch_id,
+        'type': 'message_batch',
+        'processing_status': b['status'],
+        'request_counts': {'processing': 0 if ended else n, 'succeeded': n if ended else 0,
+                           'errored': 0, 'canceled': 0, 'expired': 0},
+        'created_at': _now_iso(),
+        'expires_at': _now_iso(),
+        'ended_at': _now_iso() if ended else None,
+        'archived_at': None,
+        'cancel_initiated_at': None,
+        'results_url': f'{base_url}/v1/messages/batches/{batch_id}/results' if ended else None,
+    }
+
+
+def _result_line(req):
+    custom_id = req['custom_id']
+    if custom_id in STUB.fail_ids:
+        result = {'type': 'errored',
+                  'error': {'type': 'error',
+                            'error': {'type': 'invalid_request_error', 'message': 'stub error'}}}
+    else:
+        result = {'type': 'succeeded', 'message': {
+            'id': f'msg_{custom_id[:8]}', 'type': 'message', 'role': 'assistant',
+            'model': req['params']['model'],
+            'content': [{'type': 'text', 'text': f'```html\n{REPORT_HTML}\n```'}],
+            'stop_reason': 'end_turn', 'stop_sequence': None,
+            'usage': {'input_tokens': 1200, 'output_tokens': 3400,
+                      'cache_read_input_tokens': 20000, 'cache_creation_input_tokens': 0},
+        }}
+    return json.dumps({'custom_id': custom_id, 'result': result}, ensure_ascii=False)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    @property
+    def base_url(self):
+        return f'http://{self.server.server_address[0]}:{self.server.server_address[1]}'
+
+    def _send(self, code, body, content_type='application/json'):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        path = self.path.split('?')[0]
+        if path == '/v1/messages/batches':
+            batch_id = f'msgbatch_stub{len(STUB.batches) + 1:04d}'
+            with STUB.lock:
+                STUB.batches[batch_id] = {'requests': body['requests'], 'status': 'in_progress'}
+            return self._send(200, _batch_json(batch_id, self.base_url))
+        if path.endswith('/cancel'):
+            batch_id = path.split('/')[-2]
+            with STUB.lock:
+                STUB.batches[batch_id]['status'] = 'canceling'
+            return self._send(200, _batch_json(batch_id, self.base_url))
+        self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': path}})
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        parts = path.strip('/').split('/')
+        if len(parts) == 4 and parts[:3] == ['v1', 'messages', 'batches']:
+            return self._send(200, _batch_json(parts[3], self.base_url))
+        if len(parts) == 5 and parts[4] == 'results':
+            lines = [_result_line(r) for r in STUB.batches[parts[3]]['requests']]
+            return self._send(200, ('\n'.join(lines) + '\n').encode(), 'application/binary')
+        self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': path}})
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_batch_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "batch_test.db")}'
+os.environ['ANTHROPIC_BASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+os.environ['ANTHROPIC_API_KEY'] = 'stub-key'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB + 스텁 서버)')
+    from app import create_app
+    from app.models import db, User, Student, Essay, EssayVersion, EssayScore
+    from app.models.correction_job import CorrectionJob
+    from app.models.api_usage_log import ApiUsageLog
+    from app.essays.job_queue import enqueue_correction, get_queue_state, claim_next_job, BATCH_PROVIDER
+    from app.essays.message_batch import submit_pending_batch, poll_batches
+    from app.utils import essay_store
+
+    app = create_app('production')
+    app.config['HTML_FOLDER'] = tmpdir
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    ok(f'스텁 서버 {os.environ["ANTHROPIC_BASE_URL"]}')
+
+    teacher = User(email='batch_teacher@test.com', name='배치강사', role='teacher')
+    teacher.set_password('test1234')
+    db.session.add(teacher)
+    db.session.flush()
+    student = Student(teacher_id=teacher.user_id, name='배치학생', grade='중1')
+    db.session.add(student)
+    db.session.flush()
+
+    def new_essay(model='standard'):
+        essay = Essay(student_id=student.student_id, user_id=teacher.user_id,
+                      original_text='학생 원문입니다.', grade='중1', status='processing',
+                      correction_model=model, api_provider='claude')
+        db.session.add(essay)
+        db.session.commit()
+        enqueue_correction(essay, student_name=student.name, teacher_name=teacher.name,
+                           notify=True, batch=True)
+        return essay
+
+    # ════════════════════════════════════════════════════════
+    section('1. 등록 — 실시간 큐와 분리')
+    essays = [new_essay() for _ in range(3)] + [new_essay('elementary')]
+    failing = new_essay()
+    cancelled = new_essay()
+    jobs = CorrectionJob.query.filter_by(provider=BATCH_PROVIDER).all()
+    check(len(jobs) == 6 and all(j.status == 'queued' for j in jobs), '배치 작업 6건 queued')
+    check(claim_next_job('test-worker') is None, '실시간 워커는 배치 작업을 점유하지 않음')
+    state = get_queue_state(essays[0].essay_id)
+    check(state['batch'] and state['eta_seconds'] is not None, f'배치 ETA 표시 ({state["eta_seconds"]}초)')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 제출 — 하나의 Message Batch')
+    batch_id, submitted = submit_pending_batch()
+    check(batch_id is not None and submitted == 6, f'{batch_id} 제출 {submitted}건')
+    stub_requests = STUB.batches[batch_id]['requests']
+    check(all(r['params']['system'][0].get('cache_control') for r in stub_requests),
+          'system 블록에 cache_control 포함')
+    running = CorrectionJob.query.filter_by(worker_id=f'batch:{batch_id}', status='running').count()
+    check(running == 6, '작업 running + worker_id=batch:<id>')
+    check(submit_pending_batch() == (None, 0), '재호출 시 중복 제출 없음')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 진행 중 — 결과 반영 없음 / 취소')
+    check(poll_batches() == 0, '처리 중 배치는 반영하지 않음')
+    cancelled.status = 'failed'          # api_cancel 과 동일
+    db.session.commit()
+    STUB.fail_ids.add(CorrectionJob.query.filter_by(essay_id=failing.essay_id).first().job_id)
+
+    # ════════════════════════════════════════════════════════
+    section('4. 종료 — EssayVersion / EssayScore 반영')
+    STUB.end_all()
+    done = poll_batches()
+    check(done == 4, f'성공 4건 반영 (반영 {done}건)')
+    for essay in essays:
+        db.session.refresh(essay)
+    check(all(e.status == 'completed' for e in essays), '성공 Essay → completed (notify=True)')
+    check(EssayVersion.query.filter(EssayVersion.essay_id.in_([e.essay_id for e in essays])).count() == 4,
+          'EssayVersion 4건 생성')
+    std_scores = EssayScore.query.filter_by(essay_id=essays[0].essay_id).count()
+    check(std_scores > 0, f'EssayScore 저장 ({std_scores}개 지표)')
+    version = EssayVersion.query.filter_by(essay_id=essays[0].essay_id).first()
+    check('첨삭: 배치강사' in essay_store.load_html(version), '첨삭자 사인 삽입')
+    elem_version = EssayVersion.query.filter_by(essay_id=essays[3].essay_id).first()
+    elem_html = essay_store.load_html(elem_version)
+    check(elem_html.startswith('<!DOCTYPE html>') and '<style>' in elem_html,
+          '초등 모델 CSS 래핑')
+
+    db.session.refresh(failing)
+    check(failing.status == 'failed', 'errored 결과 → Essay failed')
+    fjob = CorrectionJob.query.filter_by(essay_id=failing.essay_id).first()
+    check(fjob.status == 'failed' and 'stub error' in (fjob.error_message or ''), '실패 사유 기록')
+    cjob = CorrectionJob.query.filter_by(essay_id=cancelled.essay_id).first()
+    check(cjob.status == 'cancelled', '취소된 Essay → 작업 cancelled')
+    check(CorrectionJob.query.filter_by(status='running').count() == 0, 'running 작업 없음')
+
+    logs = ApiUsageLog.query.filter(ApiUsageLog.essay_id == essays[0].essay_id).all()
+    full_cost = ApiUsageLog.calc_claude_cost(1200, 3400, 20000, 0)
+    check(len(logs) == 1 and abs(logs[0].cost_usd - full_cost / 2) < 1e-6, '사용량 로그 (배치 50% 단가)')
+    check(poll_batches() == 0, '재호출 시 중복 반영 없음')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""PDF 브라우저 풀 (pdf_generator.BrowserPool) 테스트 스크립트
+
+Playwright 대신 가짜 브라우저/탭(비동기, 렌더 지연·실패 주입 가능)으로
+대기열 자리 제한, 탭 동시 사용 수, MAX_RENDERS_PER_PAGE 이후 탭 교체,
+실패한 탭 폐기·브라우저 재실행, generate_batch의 순차 처리(풀 없음) 경로를 검증한다.
+실제 Chromium이 필요 없다.
+
+사용법:
+    python test_pdf_generator.py
+"""
+import asyncio
+import io
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+import config
+import pdf_generator
+from pdf_generator import BrowserPool, PDFGenerator
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+# ════════════════════════════════════════════════════════
+# 가짜 Playwright (chromium.launch → browser → context → page)
+# ════════════════════════════════════════════════════════
+
+class FakeStats:
+    def __init__(self):
+        self.launches = 0
+        self.pages_opened = 0
+        self.pages_closed = 0
+        self.active = 0
+        self.max_active = 0
+        self.renders = []          # (page_id, html 파일명)
+        self.render_delay = 0.0
+        self.gate = threading.Event()
+        self.gate.set()
+
+
+class FakePage:
+    def __init__(self, browser, stats, page_id):
+        self.browser = browser
+        self.stats = stats
+        self.page_id = page_id
+        self.url = None
+        self._closed = False
+
+    async def set_content(self, html, **kwargs):
+        pass
+
+    async def evaluate(self, script):
+        return True
+
+    async def goto(self, url, **kwargs):
+        if not self.browser.connected:
+            raise Exception('Target page, context or browser has been closed')
+        self.url = url
+
+    async def pdf(self, path, **kwargs):
+        stats = self.stats
+        stats.active += 1
+        stats.max_active = max(stats.max_active, stats.active)
+        try:
+            while not stats.gate.is_set():
+                await asyncio.sleep(0.005)
+            if stats.render_delay:
+                await asyncio.sleep(stats.render_delay)
+            if 'fail' in self.url:
+                raise Exception('렌더 실패 (주입)')
+            Path(path).write_bytes(b'%PDF-1.4 fake')
+            stats.renders.append((self.page_id, Path(self.url).name))
+        finally:
+            stats.active -= 1
+
+    def is_closed(self):
+        return self._closed
+
+    async def close(self):
+        if not self._closed:
+            self._closed = True
+            self.stats.pages_closed += 1
+
+
+class FakeContext:
+    def __init__(self, browser, stats):
+        self.browser = browser
+        self.stats = stats
+
+    async def new_page(self):
+        self.stats.pages_opened += 1
+        return FakePage(self.browser, self.stats, self.stats.pages_opened)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self, stats):
+        self.stats = stats
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        return FakeContext(self, self.stats)
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self, stats):
+        self.stats = stats
+        self.browsers = []
+
+    async def launch(self):
+        self.stats.launches += 1
+        browser = FakeBrowser(self.stats)
+        self.browsers.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self, stats):
+        self.chromium = FakeChromium(stats)
+
+    async def stop(self):
+        pass
+
+
+class FakePool(BrowserPool):
+    """Playwright 시작만 가짜로 바꾼 BrowserPool (나머지 로직은 그대로)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = FakeStats()
+        self.fake = FakePlaywright(self.stats)
+
+    async def _start_playwright(self):
+        return self.fake
+
+
+tmpdir = Path(tempfile.mkdtemp(prefix='momoai_pdfpool_'))
+
+
+def html_file(name):
+    path = tmpdir / f'{name}.html'
+    path.write_text('<html><body>첨삭 결과</body></html>', encoding='utf-8')
+    return str(path)
+
+
+def main():
+    out = tmpdir / 'pdf'
+    out.mkdir()
+
+    # ════════════════════════════════════════════════════════
+    section('1. 대기열 자리 제한 / 탭 동시 사용 수')
+    pool = FakePool(pages=1, queue_size=2)
+    pool.start()
+    try:
+        check(pool.stats.launches == 1 and pool.stats.pages_opened == 1, '시작 시 브라우저 1개 + 탭 1개 예열')
+        pool.stats.gate.clear()
+        first = pool.submit(html_file('slot_a'), out / 'slot_a.pdf')
+        second = pool.submit(html_file('slot_b'), out / 'slot_b.pdf')
+        saved_timeout, pdf_generator.QUEUE_TIMEOUT = pdf_generator.QUEUE_TIMEOUT, 0.2
+        try:
+            started = time.monotonic()
+            try:
+                pool.submit(html_file('slot_c'), out / 'slot_c.pdf')
+                fail('대기열이 가득 차면 submit()이 거절')
+            except Exception as e:
+                check('대기열이 가득' in str(e) and time.monotonic() - started >= 0.2,
+                      'queue_size(2)건이 차 있으면 QUEUE_TIMEOUT 후 거절', str(e))
+        finally:
+            pdf_generator.QUEUE_TIMEOUT = saved_timeout
+        pool.stats.gate.set()
+        check(first.result(5) and second.result(5), '대기 중이던 2건 완료')
+        third = pool.submit(html_file('slot_c'), out / 'slot_c.pdf')
+        check(third.result(5) == str(out / 'slot_c.pdf'), '완료 후 자리 반환 → 다시 제출 가능')
+    finally:
+        pool.close()
+
+    pool = FakePool(pages=2, queue_size=8)
+    pool.stats.render_delay = 0.03
+    try:
+        futures = [pool.submit(html_file(f'par_{i}'), out / f'par_{i}.pdf') for i in range(8)]
+        done = [f.result(5) for f in futures]
+        check(len(done) == 8 and all(Path(p).exists() for p in done), 'PDF 8건 생성')
+        check(pool.stats.max_active == 2, f'동시 렌더는 탭 수(2)까지 (최대 {pool.stats.max_active})')
+    finally:
+        pool.close()
+    check(not pool._running and not pool._thread.is_alive(), 'close() 후 전용 스레드 종료')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 탭 교체 (MAX_RENDERS_PER_PAGE)')
+    saved_max, pdf_generator.MAX_RENDERS_PER_PAGE = pdf_generator.MAX_RENDERS_PER_PAGE, 3
+    pool = FakePool(pages=1, queue_size=4)
+    try:
+        for i in range(7):
+            pool.submit(html_file(f'recycle_{i}'), out / f'recycle_{i}.pdf').result(5)
+        per_page = {}
+        for page_id, _ in pool.stats.renders:
+            per_page[page_id] = per_page.get(page_id, 0) + 1
+        check(sorted(per_page.values(), reverse=True) == [3, 3, 1], f'탭마다 최대 3건 ({per_page})')
+        check(pool.stats.pages_opened == 3 and pool.stats.pages_closed == 2,
+              f'3건마다 탭 닫고 새로 열기 (열기 {pool.stats.pages_opened} / 닫기 {pool.stats.pages_closed})')
+        check(len(pool._renders) == 1, '닫은 탭은 렌더 횟수 기록에서 제거')
+    finally:
+        pool.close()
+        pdf_generator.MAX_RENDERS_PER_PAGE = saved_max
+
+    # ════════════════════════════════════════════════════════
+    section('3. 실패한 탭 폐기 / 브라우저 재실행')
+    pool = FakePool(pages=1, queue_size=4)
+    try:
+        pool.submit(html_file('ok_1'), out / 'ok_1.pdf').result(5)
+        try:
+            pool.submit(html_file('fail_1'), out / 'fail_1.pdf').result(5)
+            fail('렌더 실패는 Future 예외로 전달')
+        except Exception as e:
+            check('렌더 실패' in str(e), '렌더 실패는 Future 예외로 전달')
+        pool.submit(html_file('ok_2'), out / 'ok_2.pdf').result(5)
+        pages_used = [page_id for page_id, _ in pool.stats.renders]
+        check(pool.stats.pages_closed == 1 and pages_used[0] != pages_used[-1],
+              f'실패한 탭은 닫고 다음 작업은 새 탭 (탭 {pages_used})')
+        check(pool.stats.launches == 1, '브라우저가 살아 있으면 재실행 안 함')
+
+        # 브라우저가 죽은 경우: 렌더 실패 → 탭 폐기 → 다음 작업에서 브라우저 다시 실행
+        pool.fake.chromium.browsers[-1].connected = False
+        try:
+            pool.submit(html_file('crash'), out / 'crash.pdf').result(5)
+            fail('브라우저 종료 시 렌더 실패')
+        except Exception:
+            ok('브라우저 종료 시 렌더 실패')
+        path = pool.submit(html_file('after_crash'), out / 'after_crash.pdf').result(5)
+        check(Path(path).exists() and pool.stats.launches == 2, f'브라우저 재실행 후 렌더 (실행 {pool.stats.launches}회)')
+    finally:
+        pool.close()
+
+    # ════════════════════════════════════════════════════════
+    section('4. generate_batch — 풀 사용 / 풀 없이 순차 처리')
+    batch = [
+        {'index_num': 1, 'html_path': html_file('batch_1')},
+        {'index_num': 2, 'html_path': None},
+        {'index_num': 3, 'html_path': html_file('batch_fail_3')},
+        {'index_num': 4, 'html_path': html_file('batch_4')},
+    ]
+    pool = FakePool(pages=2, queue_size=4)
+    try:
+        pooled = PDFGenerator(pool=pool, output_dir=out).generate_batch(batch)
+    finally:
+        pool.close()
+    check([r['index_num'] for r in pooled] == [1, 3, 4], 'HTML 없는 항목 제외, 입력 순서 유지')
+    check(pooled[0]['pdf_path'] == str(out / 'batch_1.pdf') and pooled[2]['error'] is None, '성공 항목 PDF 경로')
+    check(pooled[1]['pdf_path'] is None and 'PDF 생성 중 오류' in pooled[1]['error'], '실패 항목은 error만')
+
+    calls = []
+    active = [0, 0]  # 현재, 최대
+
+    def fake_render_once(html_path, pdf_path):
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        try:
+            calls.append(Path(html_path).name)
+            if 'fail' in html_path:
+                raise Exception('렌더 실패 (주입)')
+            Path(pdf_path).write_bytes(b'%PDF-1.4 fake')
+            return str(pdf_path)
+        finally:
+            active[0] -= 1
+
+    saved_pages, config.PDF_BROWSER_PAGES = config.PDF_BROWSER_PAGES, 0
+    saved_render, pdf_generator.render_once = pdf_generator.render_once, fake_render_once
+    try:
+        generator = PDFGenerator(output_dir=out)
+        check(generator.pool is None, 'PDF_BROWSER_PAGES=0 → 풀 없음')
+        sequential = generator.generate_batch(batch)
+        check([r['index_num'] for r in sequential] == [1, 3, 4] and
+              calls == ['batch_1.html', 'batch_fail_3.html', 'batch_4.html'],
+              '호출마다 render_once를 입력 순서대로 순차 실행')
+        check(active[1] == 1, '동시 실행 없음')
+        check(sequential[0]['error'] is None and sequential[1]['error'] and sequential[2]['pdf_path'],
+              '실패 항목만 error, 나머지는 계속 처리')
+        check(generator.generate_pdf(html_file('single')) == str(out / 'single.pdf'), 'generate_pdf도 render_once 사용')
+    finally:
+        config.PDF_BROWSER_PAGES = saved_pages
+        pdf_generator.render_once = saved_render
+
+    # ════════════════════════════════════════════════════════
+    section('5. 풀 처리량 (가짜 탭, 렌더 1건 50ms)')
+    n_docs, delay = 40, 0.05
+    docs = [{'index_num': i, 'html_path': html_file(f'tp_{i}')} for i in range(n_docs)]
+    pool = FakePool(pages=4, queue_size=16)
+    pool.stats.render_delay = delay
+    try:
+        pool.start()
+        started = time.perf_counter()
+        tp = PDFGenerator(pool=pool, output_dir=out).generate_batch(docs)
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.close()
+    ideal = n_docs * delay / 4
+    print(f'     탭 4개: {elapsed:.2f}s ({n_docs / elapsed * 60:.0f} PDFs/min, 이론치 {ideal:.2f}s)')
+    check(all(r['error'] is None for r in tp) and elapsed < ideal * 1.5,
+          f'풀 오버헤드 50% 미만 ({elapsed / ideal:.2f}배)')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
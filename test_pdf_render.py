@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""PDF 렌더 서비스 / 캐시 테스트 스크립트
+
+임시 SQLite DB와 임시 PDF 폴더로 첨삭 HTML PDF가 내용 해시로 캐싱되는지(같은 내용은
+다시 렌더링하지 않고, 내용이 바뀌면 새로 렌더링), 사용 설명서가 첫 요청 때 미리 생성되어
+/help/pdf가 캐시 파일을 내려주는지, 첨삭 완료 커밋 후 결과 PDF가 미리 렌더링되어
+다운로드 시 렌더링이 일어나지 않는지, 롤백 시 렌더링하지 않는지 검증한다.
+
+사용법:
+    python test_pdf_render.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_pdf_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "pdf_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+
+ESSAY_HTML = '<html><body><h1>첨삭 결과</h1><p>{body}</p></body></html>'
+
+
+def _wait(predicate, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB / PDF 폴더)')
+    from app import create_app
+    from app.models import db, User, Student, Essay, EssayVersion, EssayResult
+    from app.utils import pdf_render
+    from app.utils.pdf_utils import MANUALS
+
+    app = create_app('production')
+    app.config['PDF_FOLDER'] = os.path.join(tmpdir, 'pdf')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    teacher = User(email='pdf_teacher@test.com', name='PDF강사', role='teacher', role_level=1)
+    teacher.set_password('test1234')
+    db.session.add(teacher)
+    db.session.flush()
+    student = Student(teacher_id=teacher.user_id, name='PDF학생', grade='중1')
+    db.session.add(student)
+    db.session.commit()
+    ok('앱/DB 준비')
+
+    def _cached():
+        folder = pdf_render.cache_dir()
+        return {name: os.path.getmtime(folder / name) for name in os.listdir(folder) if name.endswith('.pdf')}
+
+    # ════════════════════════════════════════════════════════
+    section('1. 첨삭 HTML 캐시')
+    html = ESSAY_HTML.format(body='첫 번째 글')
+    started = time.time()
+    path = pdf_render.render_html(html)
+    first = time.time() - started
+    with open(path, 'rb') as f:
+        check(f.read(5) == b'%PDF-', f'렌더 워커에서 PDF 생성 ({first:.2f}s)')
+
+    mtime = os.path.getmtime(path)
+    started = time.time()
+    again = pdf_render.render_html(html)
+    check(again == path and os.path.getmtime(again) == mtime,
+          f'같은 내용 → 캐시 재사용 ({time.time() - started:.3f}s)')
+
+    other = pdf_render.render_html(ESSAY_HTML.format(body='고친 글'))
+    check(other != path and other.exists(), '내용이 바뀌면 새 키로 렌더링')
+
+    concurrent = [pdf_render.prerender_html(ESSAY_HTML.format(body='동시 요청')) for _ in range(3)]
+    check(concurrent[0] is not None and all(f is concurrent[0] for f in concurrent),
+          '렌더링 중인 같은 키는 작업 1개를 공유')
+    concurrent[0].result(timeout=60)
+    check(not pdf_render._inflight, '완료 후 진행 중 목록 비움')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 사용 설명서 미리 생성')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = teacher.user_id
+        sess['_fresh'] = True
+
+    manual_paths = {role: pdf_render.cache_path(pdf_render.manual_key(role)) for role in MANUALS}
+    check(not any(p.exists() for p in manual_paths.values()), '요청 전에는 사용 설명서 없음')
+    client.get('/')
+    check(_wait(lambda: all(p.exists() for p in manual_paths.values())),
+          f'첫 요청 후 사용 설명서 {len(MANUALS)}종 미리 생성')
+
+    before = _cached()
+    res = client.get('/teacher/help/pdf')
+    with open(manual_paths['teacher'], 'rb') as f:
+        cached_bytes = f.read()
+    check(res.status_code == 200 and res.mimetype == 'application/pdf' and res.data == cached_bytes,
+          f'/help/pdf → 캐시 파일 그대로 전송 ({len(res.data) // 1024}KB)')
+    check(_cached() == before, '다운로드 시 다시 렌더링하지 않음')
+    check(pdf_render.manual_key('teacher') != pdf_render.manual_key('student'), '역할별 키 분리')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 첨삭 완료 → 미리 렌더링 → 다운로드')
+    from app.essays.momoai_service import MOMOAIService
+    service = MOMOAIService.__new__(MOMOAIService)
+
+    def _essay(body):
+        essay = Essay(student_id=student.student_id, user_id=teacher.user_id, title='PDF 글',
+                      original_text='본문', grade='중1', status='reviewing')
+        db.session.add(essay)
+        db.session.flush()
+        html_path = os.path.join(tmpdir, f'essay_{essay.essay_id}.html')
+        html_content = ESSAY_HTML.format(body=body)
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        version = EssayVersion(essay_id=essay.essay_id, version_number=1,
+                               html_content=html_content, html_path=html_path)
+        db.session.add(version)
+        db.session.flush()
+        db.session.add(EssayResult(essay_id=essay.essay_id, version_id=version.version_id, html_path=html_path))
+        db.session.commit()
+        return essay, html_path
+
+    essay, html_path = _essay('완료된 글')
+    with open(html_path, encoding='utf-8') as f:
+        expected = pdf_render.cache_path(pdf_render.html_key(f.read()))
+    check(not expected.exists(), '완료 전에는 렌더링하지 않음')
+
+    service.finalize_essay(essay)
+    check(_wait(expected.exists), '완료 커밋 후 백그라운드에서 미리 렌더링')
+
+    before = _cached()
+    res = client.get(f'/essays/download-pdf/{essay.essay_id}')
+    disposition = res.headers.get('Content-Disposition', '')
+    check(res.status_code == 200 and res.data == expected.read_bytes(), '다운로드 = 미리 렌더링된 파일')
+    check(_cached() == before, '다운로드 요청에서는 렌더링하지 않음')
+    check(os.path.basename(html_path).replace('.html', '.pdf') in disposition, f'파일명 유지: {disposition}')
+    db.session.expire_all()
+    check(db.session.get(Essay, essay.essay_id).result.pdf_path == str(expected), 'EssayResult.pdf_path 기록')
+
+    rolled, rolled_path = _essay('롤백된 글')
+    with open(rolled_path, encoding='utf-8') as f:
+        rolled_pdf = pdf_render.cache_path(pdf_render.html_key(f.read()))
+    rolled.is_finalized = True
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+    time.sleep(1)
+    check(not rolled_pdf.exists(), '롤백된 완료 처리는 렌더링하지 않음')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
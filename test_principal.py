@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""현재 사용자 범위(Principal) 테스트 스크립트
+
+임시 SQLite DB로 학생 계정의 학생 레코드(user_id → email 순) / 학부모 자녀 / 수강 수업 /
+강사 담당 학생이 요청마다 한 번만 계산되고 요청 사이에는 캐시되는지,
+수강·자녀 연결 변경 커밋 시 캐시가 비워지는지(롤백은 유지),
+can_access_content / 하크니스 게시판 / 포털 화면이 캐시된 범위로 같은 결과를 내는지 검증한다.
+
+사용법:
+    python test_principal.py
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_principal_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "principal_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from flask import g
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User, Student, Course, CourseEnrollment, ParentStudent, HarknessBoard
+    from app.models.student_profile import StudentProfile
+    from app.utils import principal as principal_mod
+    from app.utils.principal import get_principal, enrolled_courses
+    from app.utils.content_access import can_access_content
+    from app.utils.enrollment_utils import get_active_student_ids_for_teacher
+    from app.utils.harkness_utils import get_accessible_harkness_boards, can_access_harkness_board
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    teacher = User(email='p_teacher@test.com', name='범위강사', role='teacher', role_level=3)
+    stu_user = User(email='p_student@test.com', name='범위학생', role='student', role_level=5)
+    mail_user = User(email='p_mail@test.com', name='이메일학생', role='student', role_level=5)
+    parent = User(email='p_parent@test.com', name='범위학부모', role='parent', role_level=4)
+    other_parent = User(email='p_parent2@test.com', name='다른학부모', role='parent', role_level=4)
+    users = (teacher, stu_user, mail_user, parent, other_parent)
+    for u in users:
+        u.set_password('test1234')
+    db.session.add_all(users)
+    db.session.flush()
+
+    today = date.today()
+
+    def _course(name, grade, course_type='정규'):
+        return Course(course_name=name, course_code=name, teacher_id=teacher.user_id, grade=grade,
+                      course_type=course_type, weekday=today.weekday(), max_students=10,
+                      start_date=today - timedelta(days=30), end_date=today + timedelta(days=60))
+
+    regular = _course('범위정규', '초6')
+    harkness = _course('범위하크니스', '중1', '하크니스')
+    extra = _course('범위추가', '고1')
+    db.session.add_all([regular, harkness, extra])
+    me = Student(teacher_id=teacher.user_id, user_id=stu_user.user_id, name='범위학생', grade='중1')
+    by_mail = Student(teacher_id=teacher.user_id, email=mail_user.email, name='이메일학생', grade='초5')
+    child1 = Student(teacher_id=teacher.user_id, name='자녀1', grade='초4')
+    child2 = Student(teacher_id=teacher.user_id, name='자녀2', grade='중2')
+    db.session.add_all([me, by_mail, child1, child2])
+    db.session.flush()
+    db.session.add_all([
+        CourseEnrollment(course_id=regular.course_id, student_id=me.student_id),
+        CourseEnrollment(course_id=harkness.course_id, student_id=me.student_id),
+        CourseEnrollment(course_id=regular.course_id, student_id=child1.student_id),
+        ParentStudent(parent_id=parent.user_id, student_id=child1.student_id, created_at=datetime(2026, 1, 1)),
+        ParentStudent(parent_id=parent.user_id, student_id=child2.student_id, created_at=datetime(2026, 1, 2)),
+        HarknessBoard(board_type='harkness_all', title='하크니스 전체', created_by=teacher.user_id),
+        HarknessBoard(board_type='course', course_id=harkness.course_id, title='하크니스 수업',
+                      created_by=teacher.user_id),
+    ])
+    db.session.commit()
+    principal_mod.invalidate()
+    ok('강사 / 학생 계정 2 / 학부모 2 / 수업 3 (하크니스 1) / 자녀 연결 2')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 학생 레코드 / 수강 수업')
+    p = get_principal(stu_user)
+    check(p.student_id == me.student_id and p.student is me, 'user_id로 연결된 학생 레코드')
+    check(p.course_ids() == {regular.course_id, harkness.course_id}, 'active 수강 수업 2개')
+    check(p.harkness_course_ids() == {harkness.course_id}, '하크니스 수업 구분')
+    check(get_principal(mail_user).student_id == by_mail.student_id, 'user_id 연결이 없으면 email 일치')
+
+    statements.clear()
+    again = get_principal(stu_user)
+    check(again is p and not statements, f'같은 요청 안에서는 재사용 (SQL {len(statements)}회)')
+    g.pop('_principals', None)
+    statements.clear()
+    fresh = get_principal(stu_user)
+    check(fresh is not p and fresh.course_ids() == p.course_ids() and not statements,
+          f'다음 요청은 프로세스 캐시에서 (SQL {len(statements)}회)')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 학부모 자녀 / 강사 담당 학생')
+    pp = get_principal(parent)
+    check(pp.child_ids == (child1.student_id, child2.student_id), '자녀 ID (연결 순서)')
+    statements.clear()
+    children = pp.children
+    check([c.name for c in children] == ['자녀1', '자녀2'] and len(statements) <= 1,
+          f'자녀 Student 목록 한 번에 (SQL {len(statements)}회)')
+    check(pp.is_parent_of(child2.student_id) and not pp.is_parent_of(me.student_id), 'is_parent_of')
+    check(pp.course_ids(child1.student_id) == {regular.course_id}, '자녀 수강 수업도 범위에 포함')
+
+    tp = get_principal(teacher)
+    check(tp.taught_student_ids == set(get_active_student_ids_for_teacher(teacher.user_id)),
+          f'담당 학생 = get_active_student_ids_for_teacher ({len(tp.taught_student_ids)}명)')
+    check(tp.taught_harkness_course_ids == {harkness.course_id}, '담당 하크니스 수업')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 커밋 시 무효화 / 롤백은 유지')
+    g.pop('_principals', None)
+    get_principal(other_parent)
+    db.session.add(CourseEnrollment(course_id=extra.course_id, student_id=me.student_id))
+    db.session.rollback()
+    check(extra.course_id not in get_principal(stu_user).course_ids(), '롤백한 수강은 반영 안 됨')
+
+    check(by_mail.student_id not in get_principal(teacher).taught_student_ids, '수강 전 — 강사 담당 학생 아님')
+    db.session.add_all([CourseEnrollment(course_id=extra.course_id, student_id=me.student_id),
+                        CourseEnrollment(course_id=extra.course_id, student_id=by_mail.student_id)])
+    db.session.commit()
+    check(extra.course_id in get_principal(stu_user).course_ids(), '수강 추가 커밋 → 다음 조회에 반영')
+    check(by_mail.student_id in get_principal(teacher).taught_student_ids, '강사 담당 학생 범위도 다시 계산')
+
+    get_principal(other_parent)
+    link = ParentStudent.query.filter_by(parent_id=parent.user_id, student_id=child2.student_id).first()
+    link.is_active = False
+    db.session.commit()
+    check(other_parent.user_id in principal_mod._cache, '자녀 연결 변경은 해당 학부모 캐시만 비움')
+    check(get_principal(parent).child_ids == (child1.student_id,), '비활성 연결은 자녀에서 제외')
+
+    CourseEnrollment.query.filter_by(course_id=extra.course_id).update({'status': 'dropped'})
+    db.session.commit()
+    check(not principal_mod._cache and extra.course_id not in get_principal(stu_user).course_ids(),
+          'Query.update() 일괄 변경 → 전체 무효화')
+
+    # ════════════════════════════════════════════════════════
+    section('4. can_access_content')
+    def _content(target):
+        return SimpleNamespace(is_public=True, publish_date=None, end_date=None,
+                               target_audience=json.dumps(target))
+
+    get_principal(stu_user)
+    _ = (me.grade, stu_user.role_level, parent.role_level, teacher.role_level, child1.grade, harkness.course_id)
+    statements.clear()
+    check(can_access_content(_content({'type': 'grade', 'grades': ['초6']}), stu_user, me),
+          '수강 수업 학년(초6) 교재 허용')
+    check(not can_access_content(_content({'type': 'grade', 'grades': ['고2']}), stu_user, me),
+          '관계없는 학년 거부')
+    check(can_access_content(_content({'type': 'course', 'course_ids': [harkness.course_id]}), stu_user, me),
+          '수강 수업 지정 교재 허용')
+    check(not statements, f'본인 학생은 캐시된 범위로 판단 (SQL {len(statements)}회)')
+
+    check(can_access_content(_content({'type': 'course', 'course_ids': [regular.course_id]}), parent, child1),
+          '학부모 — 자녀 수강 수업 교재 허용')
+    get_principal(teacher)
+    statements.clear()
+    check(enrolled_courses(child1.student_id, teacher)[0][0] == regular.course_id and len(statements) == 1,
+          '범위 밖 학생은 한 번 조회')
+
+    # ════════════════════════════════════════════════════════
+    section('5. 하크니스 게시판')
+    boards = get_accessible_harkness_boards(stu_user)
+    check(len(boards) == 2, f'학생 — 전체 + 수강 하크니스 게시판 ({len(boards)})')
+    course_board = HarknessBoard.query.filter_by(board_type='course').first()
+    check(can_access_harkness_board(stu_user, course_board), '학생 — 수강 수업 게시판 접근')
+    check(get_accessible_harkness_boards(mail_user) == [], '하크니스 미수강 학생 → 빈 목록')
+    check(len(get_accessible_harkness_boards(teacher)) == 2, '강사 — 담당 하크니스 게시판 포함')
+
+    # ════════════════════════════════════════════════════════
+    section('6. 포털 화면')
+    client = app.test_client()
+
+    def _login(user):
+        g.pop('_login_user', None)
+        g.pop('_principals', None)
+        with client.session_transaction() as sess:
+            sess['_user_id'] = user.user_id
+            sess['_fresh'] = True
+
+    me.status = 'withdrawn'
+    me.status_changed_at = datetime.utcnow() - timedelta(days=10)
+    db.session.commit()
+    _login(stu_user)
+    res = client.get('/student/courses')
+    check(res.status_code == 302 and res.headers['Location'].rstrip('/').endswith('/student'),
+          '퇴원 7일 경과 학생 → 대시보드로 (before_request)', f'{res.status_code}')
+    me.status = 'active'
+    db.session.commit()
+
+    _login(parent)
+    res = client.get('/parent/courses')
+    check(res.status_code == 302 and child1.student_id in res.headers['Location'],
+          '자녀 1명 → 바로 자녀 수업 목록', f'{res.status_code} {res.headers.get("Location")}')
+
+    with app.test_request_context():
+        from flask_login import login_user
+        login_user(parent)
+        survey = app.template_context_processors[None]
+        values = {}
+        for fn in survey:
+            if fn.__name__ == 'inject_parent_survey_status':
+                values = fn()
+        check(values.get('parent_survey_completed') is False, '설문 없는 자녀 → 설문 필요')
+        db.session.add(StudentProfile(student_id=child1.student_id))
+        db.session.commit()
+        values = [fn() for fn in survey if fn.__name__ == 'inject_parent_survey_status'][0]
+        check(values.get('parent_survey_completed') is True, '모든 자녀 설문 완료')
+
+    # ════════════════════════════════════════════════════════
+    section('7. 권한 판단 — user_id 연결만 (email 일치 제외)')
+    from werkzeug.exceptions import Forbidden
+    from app.payment.routes import _can_pay
+    from app.utils.decorators import requires_tier
+    from app.utils.principal import linked_student_id, linked_student
+
+    principal_mod.invalidate()
+    with app.test_request_context():
+        from flask_login import login_user
+        login_user(stu_user)
+        check(linked_student_id() == me.student_id and linked_student() is me, 'user_id로 연결된 학생 레코드')
+        statements.clear()
+        linked_student_id()
+        check(not statements, f'요청 안에서는 다시 조회하지 않음 (SQL {len(statements)}회)')
+        check(_can_pay(SimpleNamespace(student_id=me.student_id)), '본인 청구서 결제 가능')
+        check(not _can_pay(SimpleNamespace(student_id=by_mail.student_id)), '다른 학생 청구서 결제 불가')
+
+    with app.test_request_context():
+        login_user(mail_user)
+        check(get_principal().student_id == by_mail.student_id, '포털 표시는 email 일치 유지')
+        check(linked_student_id() is None, 'email만 같은 학생 레코드는 권한 판단에서 제외')
+        check(not _can_pay(SimpleNamespace(student_id=by_mail.student_id)),
+              'email만 같은 학생 레코드의 청구서 → 결제 불가')
+        try:
+            requires_tier('A')(lambda: 'ok')()
+            fail('email만 같은 학생 → 티어 콘텐츠 403')
+        except Forbidden:
+            ok('email만 같은 학생 → 티어 콘텐츠 403')
+
+    _login(mail_user)
+    res = client.get('/zoom/preview/any-token')
+    check(res.status_code == 302 and res.headers['Location'].rstrip('/').endswith('/student'),
+          'email만 같은 학생 → 줌 미리보기 불가', f'{res.status_code} {res.headers.get("Location")}')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""규칙 문서 / 시스템 프롬프트 캐시 (app.essays.prompt_cache) 테스트 스크립트
+
+임시 문서 파일로 mtime/size가 그대로면 디스크를 다시 읽지 않고 캐시(같은 객체)를 돌려주고,
+파일을 교체하거나 touch해서 mtime이 바뀌면 다음 조회 때 다시 읽는지 검증한다.
+
+사용법:
+    python test_prompt_cache.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_prompt_')
+
+ELEM_DOC = """# 초등 첨삭 규칙 v1
+```css
+.report { color: #111; }
+```
+"""
+
+
+def write_doc(name, text, mtime=None):
+    path = os.path.join(tmpdir, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def main():
+    from flask import Flask
+    from app.essays import prompt_cache
+
+    app = Flask(__name__)
+    full_path = write_doc('full.md', '하크니스 규칙 v1', mtime=1_700_000_000)
+    app.config['MOMOAI_DOC_PATH'] = full_path
+    app.config['MOMOAI_STANDARD_DOC_PATH'] = write_doc('standard.md', '스탠다드 규칙 v1')
+    elem_path = write_doc('elementary.md', ELEM_DOC, mtime=1_700_000_000)
+    app.config['MOMOAI_ELEM_DOC_PATH'] = elem_path
+
+    reads = []
+
+    def counting_open(path, *args, **kwargs):
+        reads.append(os.path.basename(path))
+        return open(path, *args, **kwargs)
+
+    prompt_cache.open = counting_open  # 모듈 전역 open → 디스크 읽기 횟수 집계
+    try:
+        with app.app_context():
+            # ════════════════════════════════════════════════════════
+            section('1. 변경 없음 → 캐시')
+            check(prompt_cache.get_document('full') == '하크니스 규칙 v1', '첫 조회는 파일에서 읽음')
+            blocks = prompt_cache.get_system_blocks('full')
+            check(blocks[0]['text'] == '하크니스 규칙 v1' and blocks[0]['cache_control'] == {'type': 'ephemeral'},
+                  'system 블록 (cache_control 포함)')
+            for _ in range(5):
+                prompt_cache.get_document('full')
+            check(prompt_cache.get_system_blocks('full') is blocks, '같은 system 블록 객체 재사용')
+            check(reads.count('full.md') == 1, f'mtime 그대로면 다시 읽지 않음 (읽기 {reads.count("full.md")}회)')
+
+            # 내용만 바꾸고 크기·mtime을 그대로 두면 캐시 값이 유지된다 (stat만 비교)
+            write_doc('full.md', '하크니스 규칙 v2', mtime=1_700_000_000)
+            check(prompt_cache.get_document('full') == '하크니스 규칙 v1' and reads.count('full.md') == 1,
+                  'mtime/size가 같으면 디스크를 읽지 않고 캐시 반환')
+
+            # ════════════════════════════════════════════════════════
+            section('2. touch (새 mtime) → 다시 읽음')
+            os.utime(full_path, (1_700_000_100, 1_700_000_100))
+            check(prompt_cache.get_document('full') == '하크니스 규칙 v2', '새 mtime → 파일 내용 다시 읽음')
+            check(reads.count('full.md') == 2, f'읽기 1회 추가 ({reads.count("full.md")}회)')
+            new_blocks = prompt_cache.get_system_blocks('full')
+            check(new_blocks is not blocks and new_blocks[0]['text'] == '하크니스 규칙 v2',
+                  'system 블록도 새 내용으로 다시 생성')
+            check(prompt_cache.get_system_blocks('full') is new_blocks and reads.count('full.md') == 2,
+                  '이후 조회는 다시 캐시')
+
+            # ════════════════════════════════════════════════════════
+            section('3. 파일 교체 (크기 변경) → 파생 결과 갱신')
+            check(prompt_cache.get_elem_css() == '.report { color: #111; }', '초등 CSS 추출')
+            write_doc('elementary.md', ELEM_DOC.replace('#111', '#2563eb'), mtime=1_700_000_000)
+            check(prompt_cache.get_elem_css() == '.report { color: #2563eb; }',
+                  '크기가 바뀌면 mtime이 같아도 다시 읽고 CSS 재추출')
+            elem_reads = reads.count('elementary.md')
+            prompt_cache.get_elem_css()
+            prompt_cache.get_document('elementary')
+            check(reads.count('elementary.md') == elem_reads, '교체 후 재조회는 캐시')
+
+            try:
+                prompt_cache.get_document('unknown')
+                fail('알 수 없는 문서 종류 → ValueError')
+            except ValueError:
+                ok('알 수 없는 문서 종류 → ValueError')
+    finally:
+        del prompt_cache.open
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""알림 일괄 생성 / Push 발송기 테스트 스크립트
+
+로컬 스텁 Push 서비스와 임시 SQLite DB로
+Notification.create_bulk → 커밋 후 발송 → 묶음 발송 / 연결 재사용 / 만료 구독 정리를 검증한다.
+
+사용법:
+    python test_push_dispatcher.py
+"""
+import base64
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+# ════════════════════════════════════════════════════════
+# 스텁 Push 서비스 (/gone/* → 410, 나머지 201)
+# ════════════════════════════════════════════════════════
+
+class StubState:
+    def __init__(self):
+        self.hits = []           # (path, 클라이언트 포트)
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.hits.clear()
+
+
+STUB = StubState()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with STUB.lock:
+            STUB.hits.append((self.path, self.client_address[1]))
+        self.send_response(410 if self.path.startswith('/gone/') else 201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_push_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "push_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def _subscription_keys():
+    """브라우저 구독 키 (p256dh, auth) 생성"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    key = ec.generate_private_key(ec.SECP256R1())
+    pub = key.public_key().public_bytes(serialization.Encoding.X962,
+                                        serialization.PublicFormat.UncompressedPoint)
+    b64 = lambda raw: base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+    return b64(pub), b64(os.urandom(16))
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB + 스텁 Push 서비스)')
+    from py_vapid import Vapid
+    from app import create_app
+    from app.models import db, User
+    from app.models.notification import Notification
+    from app.models.push_subscription import PushSubscription
+    from app.utils import push_utils
+
+    vapid = Vapid()
+    vapid.generate_keys()
+    vapid.save_key(os.path.join(tmpdir, 'vapid.pem'))
+
+    app = create_app('production')
+    app.config['VAPID_PRIVATE_KEY'] = os.path.join(tmpdir, 'vapid.pem')
+    app.config['PUSH_DISPATCH_WORKERS'] = 2
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    ok(f'스텁 Push 서비스 {base_url}')
+
+    parents = []
+    for i in range(120):
+        u = User(email=f'push_parent{i}@test.com', name=f'학부모{i}', role='parent')
+        u.set_password('test1234')
+        parents.append(u)
+    db.session.add_all(parents)
+    db.session.flush()
+    for i, u in enumerate(parents):
+        p256dh, auth = _subscription_keys()
+        path = 'gone' if i < 5 else 'ok'
+        db.session.add(PushSubscription(user_id=u.user_id, endpoint=f'{base_url}/{path}/{i}',
+                                        p256dh=p256dh, auth=auth))
+    db.session.commit()
+    user_ids = [u.user_id for u in parents]
+    ok(f'학부모 {len(parents)}명 / 구독 {len(parents)}건 (만료 5건)')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 롤백 시 알림/Push 없음')
+    Notification.create_bulk(user_ids, 'test', '제목', '본문', commit=False)
+    db.session.rollback()
+    dispatcher = push_utils.get_dispatcher(app)
+    dispatcher.join()
+    check(Notification.query.count() == 0, '알림 행 없음')
+    check(not STUB.hits, 'Push 발송 없음', f'{len(STUB.hits)}건')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 일괄 생성 → 커밋 후 발송')
+    created = Notification.create_bulk(user_ids + user_ids[:3], 'test', '제목', '본문',
+                                       link_url='/parent/attendance')
+    check(len(created) == 120 and Notification.query.count() == 120, '중복 제거 후 120건 생성')
+    dispatcher.join()
+    check(len(STUB.hits) == 120, '구독 120건 모두 발송', f'{len(STUB.hits)}건')
+    conns = {port for _, port in STUB.hits}
+    check(len(conns) <= 2, f'워커 2개 · 연결 재사용 (클라이언트 연결 {len(conns)}개)')
+    check(len(dispatcher._threads) == 2, '발송 스레드 수 고정')
+    check(PushSubscription.query.count() == 115, '만료 구독(410) 5건 삭제')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 단건 API 호환')
+    STUB.reset()
+    n = Notification.create_notification(user_ids[10], 'test', '단건', '본문')
+    dispatcher.join()
+    check(isinstance(n, Notification) and n.user_id == user_ids[10], 'create_notification 반환값')
+    check(len(STUB.hits) == 1, '단건 Push 1건 발송')
+    check(push_utils.get_dispatcher(app) is dispatcher, '발송기 재사용 (프로세스당 1개)')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""어휘/스키마 퀴즈 출제·채점 엔진 테스트 스크립트
+
+임시 SQLite DB로 세션 시작 시 문제 세트가 고정되어 풀이 화면마다 같은 순서로 나오는지,
+풀이 화면이 문제 테이블을 다시 읽지 않는지(문제은행 캐시), 답안 일괄 제출이 한 요청·한 커밋으로
+채점되는지, 중복/순서 어긋난 제출이 집계되지 않는지, 문제 변경 시 캐시가 비워지는지 검증한다.
+
+사용법:
+    python test_quiz_engine.py
+"""
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_quiz_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "quiz_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def _page_questions(res):
+    """풀이 화면에 내려준 문제 세트 (const questions = [...])"""
+    m = re.search(r'const questions = (\[.*?\]);\n', res.get_data(as_text=True), re.S)
+    return json.loads(m.group(1)) if m else []
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from flask import g
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User, Student
+    from app.models.vocabulary_quiz import VocabularyQuiz, VocabularyQuizSession, VocabularyQuizResult
+    from app.models.schema_quiz import SchemaQuiz, SchemaQuizSession, SchemaQuizResult
+    from app.utils import quiz_engine
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    teacher = User(email='quiz_teacher@test.com', name='퀴즈강사', role='teacher', role_level=1)
+    teacher.set_password('test1234')
+    users = [User(email=f'quiz_student{i}@test.com', name=f'퀴즈학생{i}', role='student', role_level=1)
+             for i in range(2)]
+    for u in users:
+        u.set_password('test1234')
+    db.session.add_all([teacher] + users)
+    db.session.flush()
+    students = [Student(teacher_id=teacher.user_id, user_id=u.user_id, name=u.name, grade='초5') for u in users]
+    db.session.add_all(students)
+
+    for i in range(25):
+        db.session.add(VocabularyQuiz(word=f'어휘{i}', meaning=f'뜻{i}', level=1, grade_start='초5', grade_end='초6',
+                                      options=json.dumps([f'정답{i}', f'오답{i}a', f'오답{i}b', f'오답{i}c']),
+                                      correct_answer=f'정답{i}'))
+    terms = ['민주주의', '삼권 분립', '광합성', '지구 온난화', '산업 혁명', '문화재', '인권', '헌법',
+             '세계화', '국제 연합', '지방 자치', '시장 경제', '무역', '기후', '자원']
+    for term in terms:
+        db.session.add(SchemaQuiz(term=term, definition=f'{term}의 정의', subject='social',
+                                  grade_start='초5', grade_end='초6', correct_answer=f'{term}에 대한 설명'))
+    db.session.commit()
+    student_ids = [s.student_id for s in students]
+    ok('학생 2명 / 어휘 25문제 / 스키마 15문제')
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = users[0].user_id
+        sess['_fresh'] = True
+
+    statements = []
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    commits = [0]
+
+    @event.listens_for(db.session, 'after_commit')
+    def _count_commit(session):
+        commits[0] += 1
+
+    # ════════════════════════════════════════════════════════
+    section('1. 세션 시작 시 문제 세트 고정')
+    res = client.get('/student/vocabulary-quiz/start/1')
+    session_id = res.headers['Location'].rstrip('/').split('/')[-1]
+    vocab = db.session.get(VocabularyQuizSession, session_id)
+    check(res.status_code == 302 and len(vocab.question_ids) == 10 and len(set(vocab.question_ids)) == 10,
+          '시작 → 서로 다른 10문제 고정')
+
+    first = _page_questions(client.get(f'/student/vocabulary-quiz/take/{session_id}'))
+    statements.clear()
+    second = _page_questions(client.get(f'/student/vocabulary-quiz/take/{session_id}'))
+    check([q['quiz_id'] for q in first] == vocab.question_ids and first == second,
+          '새로고침해도 같은 문제 · 같은 선택지 순서')
+    check(not any('FROM vocabulary_quizzes' in s for s in statements),
+          f'풀이 화면은 문제 테이블 조회 없음 (쿼리 {len(statements)}회)')
+    check(all(set(q) == {'quiz_id', 'word', 'options'} for q in first), '풀이 화면 문제에 정답·뜻풀이 없음')
+    key = {quiz_id: item['correct_answer'] for quiz_id, item in quiz_engine.get_bank(quiz_engine.VOCABULARY, 1).items()}
+
+    res = client.get('/student/vocabulary-quiz/start/9')
+    check(res.status_code == 302 and res.headers['Location'].endswith('/vocabulary-quiz')
+          and VocabularyQuizSession.query.filter_by(level=9).count() == 0, '문제 없는 레벨 → 세션 만들지 않음')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 일괄 제출 (한 요청 · 한 커밋)')
+    answers = {q['quiz_id']: (key[q['quiz_id']] if n % 2 == 0 else
+                              q['options'][0] if q['options'][0] != key[q['quiz_id']] else q['options'][1])
+               for n, q in enumerate(first)}
+    commits[0] = 0
+    res = client.post(f'/student/vocabulary-quiz/submit/{session_id}', json={'answers': answers})
+    data = res.get_json()
+    db.session.expire_all()
+    vocab = db.session.get(VocabularyQuizSession, session_id)
+    check(data['success'] and data['completed'] and len(data['results']) == 10 and commits[0] == 1,
+          f'10문제 채점 · 커밋 {commits[0]}회')
+    check(vocab.correct_count == 5 and vocab.score == 50 and vocab.completed_at is not None,
+          f'점수 {vocab.score} / 정답 {vocab.correct_count}')
+    check(VocabularyQuizResult.query.filter_by(student_id=student_ids[0]).count() == 10, '결과 10행')
+
+    res = client.post(f'/student/vocabulary-quiz/submit/{session_id}', json={'answers': answers})
+    check(not res.get_json()['success'] and VocabularyQuizResult.query.count() == 10, '재제출 → 중복 집계 없음')
+    res = client.get(f'/student/vocabulary-quiz/take/{session_id}')
+    check(res.status_code == 302 and 'result' in res.headers['Location'], '완료된 세션 풀이 화면 → 결과로 이동')
+    res = client.get(f'/student/vocabulary-quiz/result/{session_id}')
+    check(res.status_code == 200 and '50' in res.get_data(as_text=True), '결과 화면')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 단건 제출 호환 / 순서 · 권한')
+    session_id = client.get('/student/vocabulary-quiz/start/1').headers['Location'].rstrip('/').split('/')[-1]
+    questions = _page_questions(client.get(f'/student/vocabulary-quiz/take/{session_id}'))
+    res = client.post(f'/student/vocabulary-quiz/submit/{session_id}',
+                      data={'quiz_id': questions[1]['quiz_id'], 'answer': key[questions[1]['quiz_id']]})
+    check(not res.get_json()['success'], '순서를 건너뛴 문제는 채점하지 않음')
+    res = client.post(f'/student/vocabulary-quiz/submit/{session_id}',
+                      data={'quiz_id': questions[0]['quiz_id'], 'answer': key[questions[0]['quiz_id']]})
+    data = res.get_json()
+    check(data['success'] and data['is_correct'] and not data['completed'], '폼 단건 제출 → 채점')
+    wrong = next(o for o in questions[1]['options'] if o != key[questions[1]['quiz_id']])
+    res = client.post(f'/student/vocabulary-quiz/submit/{session_id}',
+                      json={'answers': {questions[1]['quiz_id']: wrong}})
+    graded = res.get_json()['results']
+    check(len(graded) == 1 and not graded[0]['is_correct'] and graded[0]['correct_answer'] == key[questions[1]['quiz_id']],
+          '풀이 화면의 답안별 제출 → 서버가 정답 여부와 정답을 돌려줌')
+    page = client.get(f'/student/vocabulary-quiz/take/{session_id}').get_data(as_text=True)
+    check('start_index' not in page and 'let currentIndex = 2;' in page, '이어 풀기: 다음 문제부터')
+
+    other = client.application.test_client()
+    with other.session_transaction() as sess:
+        sess['_user_id'] = users[1].user_id
+        sess['_fresh'] = True
+    g.pop('_login_user', None)     # 테스트 앱 컨텍스트를 요청이 공유하므로 로그인 사용자 캐시 비움
+    res = other.post(f'/student/vocabulary-quiz/submit/{session_id}', json={'answers': {}})
+    g.pop('_login_user', None)
+    check(res.status_code == 403, '다른 학생 세션 제출 → 403', f'{res.status_code}')
+
+    legacy = VocabularyQuizSession(student_id=student_ids[0], level=1, grade='초5')
+    db.session.add(legacy)
+    db.session.commit()
+    legacy_id = legacy.session_id
+    questions = _page_questions(client.get(f'/student/vocabulary-quiz/take/{legacy_id}'))
+    db.session.expire_all()
+    check(len(questions) == 10 and db.session.get(VocabularyQuizSession, legacy_id).question_ids ==
+          [q['quiz_id'] for q in questions], '도입 이전 세션 → 풀이 화면 진입 시 고정')
+
+    # ════════════════════════════════════════════════════════
+    section('4. 스키마퀴즈')
+    session_id = client.get('/student/schema-quiz/start/social').headers['Location'].rstrip('/').split('/')[-1]
+    questions = _page_questions(client.get(f'/student/schema-quiz/take/{session_id}'))
+    check(len(questions) == 10 and all(q['chosung_hint'] and q['question'] for q in questions), '10문제 + 초성 힌트')
+    check(not any('term' in q or 'correct_answer' in q for q in questions), '풀이 화면 문제에 정답(용어) 없음')
+    terms_by_id = {quiz_id: item['term'] for quiz_id, item in quiz_engine.get_bank(quiz_engine.SCHEMA, 'social').items()}
+    answers = {q['quiz_id']: (terms_by_id[q['quiz_id']].replace(' ', '') if n < 7 else '모름')
+               for n, q in enumerate(questions)}
+    data = client.post(f'/student/schema-quiz/submit/{session_id}', json={'answers': answers}).get_json()
+    check(data['completed'] and sum(r['is_correct'] for r in data['results']) == 7,
+          '띄어쓰기 없는 답안도 정답 (유사도 채점) 7/10')
+    check([r['correct_answer'] for r in data['results']] == [terms_by_id[q['quiz_id']] for q in questions],
+          '제출 응답에 문제별 정답(용어)')
+    rows = SchemaQuizResult.query.filter_by(session_id=session_id).count()
+    page = client.get(f'/student/schema-quiz/result/{session_id}').get_data(as_text=True)
+    positions = [page.find(terms_by_id[q['quiz_id']]) for q in questions[7:]]
+    check(rows == 10 and all(p >= 0 for p in positions) and positions == sorted(positions),
+          '결과 화면: 출제 순서대로 답안 비교')
+
+    # ════════════════════════════════════════════════════════
+    section('5. 문제은행 캐시 무효화')
+    bank = quiz_engine.get_bank(quiz_engine.VOCABULARY, 1)
+    check(quiz_engine.get_bank(quiz_engine.VOCABULARY, 1) is bank, '캐시 재사용')
+    db.session.add(VocabularyQuiz(word='새어휘', meaning='새뜻', level=1, grade_start='초5', grade_end='초6',
+                                  options=json.dumps(['새정답', 'x', 'y', 'z']), correct_answer='새정답'))
+    db.session.commit()
+    check(len(quiz_engine.get_bank(quiz_engine.VOCABULARY, 1)) == 26, '문제 추가 커밋 → 반영')
+    VocabularyQuiz.query.filter_by(word='새어휘').update({'correct_answer': '바뀐정답'})
+    db.session.commit()
+    new_item = [q for q in quiz_engine.get_bank(quiz_engine.VOCABULARY, 1).values() if q['word'] == '새어휘']
+    check(new_item and new_item[0]['correct_answer'] == '바뀐정답', 'Query.update() 일괄 변경 → 반영')
+    schema_bank = quiz_engine.get_bank(quiz_engine.SCHEMA, 'social')
+    db.session.add(SchemaQuiz(term='롤백', definition='x', subject='social', grade_start='초5', grade_end='초6',
+                              correct_answer='x'))
+    db.session.flush()
+    db.session.rollback()
+    check(quiz_engine.get_bank(quiz_engine.SCHEMA, 'social') is schema_bank, '롤백 → 캐시 유지')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""학년별 첨삭 점수 분포 집계 테스트 스크립트
+
+임시 SQLite DB로 score_cohort_stats가 원본(완료 첨삭의 최신 버전 점수)과 일치하는지,
+parse_and_save_scores / 새 버전 / 첨삭 삭제 / 학년 변경 / 롤백 시 증분 갱신되는지,
+동급생 평균·백분위·지표별 비교가 원본 계산과 같은지, 리포트 화면 쿼리 수가
+첨삭 수와 무관한지 검증한다.
+
+사용법:
+    python test_score_cohorts.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_cohort_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "cohort_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+INDICATORS = ['요약', '비교', '결론']
+SCORE_HTML = '<div><span class="info-label">최종점수</span><span class="info-value">{score}점</span></div>'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User, Student, Essay, EssayVersion, EssayResult, EssayScore, ScoreCohortStat
+    from app.utils.report_generator import ReportGenerator
+    from app.utils.score_cohorts import cohort_distributions, find_mismatches, percentile, rebuild
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    teacher = User(email='cohort_teacher@test.com', name='분포강사', role='teacher', role_level=1)
+    teacher.set_password('test1234')
+    db.session.add(teacher)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    students = [Student(teacher_id=teacher.user_id, name=f'분포학생{i}', grade='중1' if i % 3 else '중2')
+                for i in range(9)]
+    db.session.add_all(students)
+    db.session.flush()
+
+    def _essay(student, days_ago, totals, status='completed', indicators=True):
+        essay = Essay(student_id=student.student_id, user_id=teacher.user_id, title=f'{student.name} 글',
+                      original_text='본문', grade=student.grade, status=status,
+                      created_at=now - timedelta(days=days_ago, hours=1))
+        db.session.add(essay)
+        db.session.flush()
+        for n, total in enumerate(totals, start=1):
+            version = EssayVersion(essay_id=essay.essay_id, version_number=n, html_content='<p></p>')
+            db.session.add(version)
+            db.session.flush()
+            db.session.add(EssayResult(essay_id=essay.essay_id, version_id=version.version_id, total_score=total))
+            if indicators:
+                for k, name in enumerate(INDICATORS):
+                    db.session.add(EssayScore(essay_id=essay.essay_id, version_id=version.version_id,
+                                              category='사고유형', indicator_name=name,
+                                              score=round((total / 10 + k) % 10, 1)))
+        return essay
+
+    essays = []
+    for i, student in enumerate(students):
+        for j in range(4):
+            totals = [50 + (i * 7 + j * 11) % 45] if j % 2 else [40 + j, 60 + (i * 3 + j) % 38]
+            essays.append(_essay(student, days_ago=3 + j * 12 + i, totals=totals,
+                                 status='reviewing' if (i + j) % 5 == 0 else 'completed'))
+    db.session.commit()
+    check(not find_mismatches(), f'첨삭 {len(essays)}건 생성 → 집계 {ScoreCohortStat.query.count()}행 일치')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 동급생 비교 = 원본 계산')
+
+    def _raw_totals(grade, start, end):
+        """기존 _get_peer_comparison 방식: 첨삭마다 최신 버전 점수 조회"""
+        peer_ids = [s.student_id for s in Student.query.filter_by(grade=grade)]
+        values = []
+        for essay in Essay.query.filter(Essay.student_id.in_(peer_ids), Essay.created_at >= start,
+                                        Essay.created_at <= end, Essay.status == 'completed'):
+            latest = EssayVersion.query.filter_by(essay_id=essay.essay_id)\
+                .order_by(EssayVersion.version_number.desc()).first()
+            result = EssayResult.query.filter_by(version_id=latest.version_id).first() if latest else None
+            if result and result.total_score:
+                values.append(float(result.total_score))
+        return values
+
+    day_start = (now - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+    for grade in ('중1', '중2'):
+        raw = _raw_totals(grade, day_start, now)
+        dist = cohort_distributions(grade, day_start, now)['total']
+        check(dist['count'] == len(raw) and abs(dist['mean'] - sum(raw) / len(raw)) < 1e-6,
+              f'{grade} 30일: {len(raw)}편 평균 {dist["mean"]:.2f}', f'{dist["count"]} vs {len(raw)}')
+
+    raw = sorted(_raw_totals('중1', day_start, now))
+    dist = cohort_distributions('중1', day_start, now)['total']
+    mean = sum(raw) / len(raw)
+    std = (sum((v - mean) ** 2 for v in raw) / len(raw)) ** 0.5
+    check(abs(dist['std'] - std) < 1e-6, f'표준편차 {dist["std"]:.2f}')
+    target = raw[len(raw) // 2]
+    exact = (sum(1 for v in raw if int(v) < int(target)) +
+             sum(1 for v in raw if int(v) == int(target)) / 2) / len(raw) * 100
+    check(percentile(dist, target) == round(exact, 1), f'백분위 {percentile(dist, target)} (1점 구간)')
+    check(percentile(dist, 0) == 0 and percentile(dist, 100) == 100, '백분위 경계 0 / 100')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 증분 갱신')
+    from app.essays.momoai_service import MOMOAIService
+    service = MOMOAIService.__new__(MOMOAIService)
+
+    essay = _essay(students[1], days_ago=1, totals=[70], status='reviewing', indicators=False)
+    db.session.commit()
+    version = essay.versions[-1]
+    saved = service.parse_and_save_scores(SCORE_HTML.format(score=88.5), essay.essay_id, version.version_id)
+    service.finalize_essay(essay)
+    dist = cohort_distributions('중1', now - timedelta(days=1), now)['total']
+    check(saved and not find_mismatches() and 88 in dist['buckets'],
+          'parse_and_save_scores + 완료 처리 → 총점 반영')
+
+    v2 = EssayVersion(essay_id=essay.essay_id, version_number=2, html_content='<p></p>')
+    db.session.add(v2)
+    db.session.commit()
+    check(not find_mismatches() and 'total' not in cohort_distributions('중1', now - timedelta(days=1), now),
+          '점수 없는 새 버전 → 최신 버전 기준으로 제외')
+    db.session.add(EssayResult(essay_id=essay.essay_id, version_id=v2.version_id, total_score=91))
+    db.session.commit()
+    check(not find_mismatches(), '새 버전 점수 → 반영')
+
+    db.session.delete(essays[4])
+    db.session.commit()
+    check(not find_mismatches(), '첨삭 삭제 → 반영')
+
+    students[2].grade = '중2'
+    db.session.commit()
+    check(not find_mismatches(), '학년 변경 → 이전/새 학년 모두 반영')
+
+    before = ScoreCohortStat.query.count()
+    _essay(students[5], days_ago=2, totals=[99])
+    db.session.flush()
+    db.session.rollback()
+    check(not find_mismatches() and ScoreCohortStat.query.count() == before, '롤백 → 집계도 롤백')
+
+    db.session.query(ScoreCohortStat).filter_by(grade='중2').delete()
+    db.session.commit()
+    check(len(find_mismatches()) > 0, '어긋난 집계 감지')
+    rebuild()
+    db.session.commit()
+    check(not find_mismatches(), 'rebuild() 후 일치')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 리포트')
+    me = students[1]
+    report = ReportGenerator(me.student_id, start_date=now - timedelta(days=30)).generate_report()
+    comparison = report['comparison']
+    check(report['essays']['avg_score'] == comparison['my_avg'] and comparison['peer_count'] > 0,
+          f"내 평균 {comparison['my_avg']} / 동급생 {comparison['peer_avg']} ({comparison['peer_count']}편)")
+    check(set(comparison['indicators']) == set(INDICATORS) and
+          all(v['percentile'] is not None for v in comparison['indicators'].values()), '지표별 비교 3개')
+    check(report['attendance']['total_sessions'] == 0, '출석 통계 (출결 집계 테이블)')
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = teacher.user_id
+        sess['_fresh'] = True
+    res = client.get(f'/students/{me.student_id}/report?period=quarter')
+    check(res.status_code == 200 and '백분위' in res.get_data(as_text=True), '리포트 화면 200 + 백분위')
+
+    queries = [0]
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count(*args):
+        queries[0] += 1
+
+    db.session.commit()
+    queries[0] = 0
+    client.get(f'/students/{me.student_id}/report?period=quarter')
+    first = queries[0]
+    for i in range(12):
+        _essay(students[(i % 4) * 2 + 1], days_ago=i + 1, totals=[60 + i, 70 + i])
+    db.session.commit()
+    queries[0] = 0
+    client.get(f'/students/{me.student_id}/report?period=quarter')
+    check(queries[0] == first, f'첨삭 12건 추가 전후 리포트 쿼리 {first}회 → {queries[0]}회')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""통합 검색 역색인 테스트 스크립트
+
+임시 SQLite DB로 한글 2-gram/초성 토큰화, 모델 변경 시 증분 색인(생성/수정/삭제/롤백),
+쿼리 안 권한 필터(LIMIT 이후 누락 없음), 관련도 순위, 자동완성,
+rebuild_index 결과와 증분 색인 결과 일치를 검증한다.
+
+사용법:
+    python test_search_index.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_search_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "search_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User, Student, Course, CourseEnrollment, SearchToken
+    from app.models.material import Material
+    from app.models.community import Post
+    from app.models.assignment import Assignment
+    from app.utils.search_index import query_tokens, rebuild_index, search
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    admin = User(email='search_admin@test.com', name='검색관리자', role='admin', role_level=1)
+    teacher = User(email='search_teacher@test.com', name='박선생', role='teacher')
+    other_teacher = User(email='search_other@test.com', name='최선생', role='teacher')
+    student_user = User(email='minsu@test.com', name='김민수', role='student')
+    for u in (admin, teacher, other_teacher, student_user):
+        u.set_password('test1234')
+    db.session.add_all([admin, teacher, other_teacher, student_user])
+    db.session.flush()
+
+    minsu = Student(teacher_id=teacher.user_id, name='김민수', grade='중2', email='minsu@test.com', tier='B')
+    others = [Student(teacher_id=teacher.user_id, name=name, grade='중1')
+              for name in ('김민지', '이민수', '박지훈')]
+    db.session.add_all([minsu] + others)
+
+    my_course = Course(course_name='독서 논술 심화반', course_code='SRCH-1', teacher_id=teacher.user_id,
+                       description='비문학 독해와 논술', start_date=date(2026, 3, 1), end_date=date(2026, 12, 31))
+    other_course = Course(course_name='독서 토론반', course_code='SRCH-2', teacher_id=other_teacher.user_id,
+                          description='토론 수업', start_date=date(2026, 3, 1), end_date=date(2026, 12, 31))
+    db.session.add_all([my_course, other_course])
+    db.session.flush()
+    db.session.add(CourseEnrollment(course_id=my_course.course_id, student_id=minsu.student_id))
+
+    def _material(title, **kw):
+        return Material(title=title, file_name='a.pdf', file_path='/tmp/a.pdf', file_size=1,
+                        file_type='pdf', uploaded_by=teacher.user_id, **kw)
+
+    # 접근 불가 자료 12건 + 접근 가능 자료 3건 (예전 방식은 LIMIT 10 후 필터링으로 누락)
+    hidden = [_material(f'논술 기출 {i}', access_level='course', course_id=other_course.course_id)
+              for i in range(12)]
+    visible = [_material('논술 기출 공개', access_level='all'),
+               _material('논술 기출 수강반', access_level='course', course_id=my_course.course_id),
+               _material('논술 기출 B등급', access_level='tier', tier_restriction='A, B')]
+    unpublished = _material('논술 기출 비공개', access_level='all', is_published=False)
+    db.session.add_all(hidden + visible + [unpublished])
+
+    db.session.add_all([
+        Post(user_id=teacher.user_id, title='논술 대회 안내', content='이번 주 공지입니다', category='notice'),
+        Post(user_id=teacher.user_id, title='공지', content='논술 대회 신청은 다음 주까지', category='notice'),
+    ])
+    db.session.add(Assignment(title='논술 과제 1', description='비문학 요약', teacher_id=teacher.user_id,
+                              course_id=my_course.course_id, due_date=datetime(2026, 12, 1)))
+    db.session.add(Assignment(title='논술 과제 2', description='토론 준비', teacher_id=other_teacher.user_id,
+                              course_id=other_course.course_id, due_date=datetime(2026, 12, 1)))
+    db.session.commit()
+    ok(f'색인 토큰 {SearchToken.query.count()}개 (커밋과 함께 증분 색인)')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 토큰화')
+    check(query_tokens('김민수') == {'김민', '민수'}, "'김민수' → 2-gram", str(query_tokens('김민수')))
+    check(query_tokens('ㄱㅁㅅ') == {'ㄱㅁ', 'ㅁㅅ'}, "'ㄱㅁㅅ' → 초성 2-gram")
+    check(query_tokens('김ㅁ') == {'ㄱㅁ'}, "'김ㅁ' (입력 중) → 초성 2-gram")
+    check(query_tokens('Essay') == {'es', 'ss', 'sa', 'ay'}, '영문 소문자 2-gram')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 검색 + 권한 필터')
+    names = [s.name for s in search('student', '민수', admin)]
+    check(set(names) == {'김민수', '이민수'}, "학생 '민수' → 김민수/이민수", str(names))
+    names = [s.name for s in search('student', 'ㄱㅁ', admin)]
+    check(set(names) == {'김민수', '김민지'}, "초성 'ㄱㅁ' → 김민수/김민지", str(names))
+    check(search('student', '김', teacher) and search('student', '민수', student_user) == [],
+          '1글자 검색 / 학생 계정은 학생 검색 불가')
+    check([c.course_code for c in search('course', '독서', teacher)] == ['SRCH-1'], '강사는 본인 수업만')
+    check(len(search('course', '독서', admin)) == 2, '관리자는 전체 수업')
+    check([c.course_code for c in search('course', '독서', student_user)] == ['SRCH-1'], '학생은 수강 수업만')
+
+    titles = {m.title for m in search('material', '논술 기출', student_user)}
+    check(titles == {m.title for m in visible}, '학생 자료: 공개/수강반/등급 자료 3건 (LIMIT 후 누락 없음)',
+          str(titles))
+    check(len(search('material', '논술 기출', teacher, limit=50)) == 15, '강사는 게시된 자료 전체 (비공개 제외)')
+    check([a.title for a in search('assignment', '논술', student_user)] == ['논술 과제 1'], '학생 과제: 수강 수업만')
+    check(search('user', '선생', teacher) == [] and len(search('user', '선생', admin)) == 2, '사용자 검색은 관리자만')
+
+    posts = search('post', '논술 대회', teacher)
+    check([p.title for p in posts] == ['논술 대회 안내', '공지'], '제목 일치가 본문 일치보다 상위')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 증분 색인')
+    others[2].name = '박서준'
+    db.session.commit()
+    check(search('student', '지훈', admin) == [] and search('student', '서준', admin), '이름 변경 → 재색인')
+
+    db.session.delete(others[1])
+    db.session.commit()
+    check([s.name for s in search('student', '민수', admin)] == ['김민수'], '삭제 → 색인 제거')
+
+    db.session.add(Student(teacher_id=teacher.user_id, name='정하늘', grade='중3'))
+    db.session.flush()
+    flushed = SearchToken.query.filter_by(token='하늘').count()
+    db.session.rollback()
+    check(flushed and search('student', '하늘', admin) == [] and
+          SearchToken.query.filter_by(token='하늘').count() == 0, '롤백 → 색인도 롤백')
+
+    incremental = sorted((t.token, t.entity_type, t.entity_id, t.field, t.weight)
+                         for t in SearchToken.query.all())
+    rebuild_index()
+    db.session.commit()
+    rebuilt = sorted((t.token, t.entity_type, t.entity_id, t.field, t.weight)
+                     for t in SearchToken.query.all())
+    check(incremental == rebuilt, f'rebuild_index 결과 = 증분 색인 ({len(rebuilt)}개)')
+
+    # ════════════════════════════════════════════════════════
+    section('4. 라우트')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = student_user.user_id
+        sess['_fresh'] = True
+    html = client.get('/search/?q=논술 기출').get_data(as_text=True)
+    check('논술 기출 공개' in html and '논술 기출 3' not in html, '통합 검색 화면 (학생)')
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = teacher.user_id
+        sess['_fresh'] = True
+    client.get('/search/api/autocomplete?q=독서')
+
+    queries = [0]
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count(*args):
+        queries[0] += 1
+
+    t0 = time.time()
+    data = client.get('/search/api/autocomplete?q=독서').get_json()
+    elapsed = (time.time() - t0) * 1000
+    texts = [s['text'] for s in data['suggestions']]
+    check(texts == ['독서 논술 심화반'], '자동완성: 강사 본인 수업', str(texts))
+    check(queries[0] <= 6, f'자동완성 쿼리 {queries[0]}회 / {elapsed:.1f}ms')
+    check(client.get('/search/api/autocomplete?q=ㄷㅅ').get_json()['suggestions'][0]['text'] == '독서 논술 심화반',
+          '자동완성 초성')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""주간 세션 일괄 생성 테스트 스크립트
+
+임시 SQLite DB로 generate_sessions_bulk가 기간 안의 누락된 (수업, 날짜)만 계산해
+세션·출석 레코드를 일괄 INSERT하는지(기존 날짜·1회성·종료 수업 제외, 회차 이어 붙이기,
+입반일/비활성 수강생 규칙), dry-run은 DB를 바꾸지 않는지, 다시 실행해도 중복되지 않는지,
+출결 집계가 원본과 일치하는지, 쿼리 수가 수업 수와 무관한지 검증한다.
+
+사용법:
+    python test_session_generator.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_sessions_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "sessions_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User, Student, Course, CourseSession, CourseEnrollment, Attendance
+    from app.utils import attendance_rollup
+    from app.utils.course_utils import generate_sessions_bulk, extend_sessions_for_course
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    teacher = User(email='sessions_teacher@test.com', name='세션강사', role='teacher', role_level=1)
+    teacher.set_password('test1234')
+    db.session.add(teacher)
+    db.session.flush()
+
+    today = date.today()
+    monday = today - timedelta(days=today.weekday())
+    from_date, to_date = monday - timedelta(days=14), monday + timedelta(days=13)   # 지난 2주 + 이번/다음 주
+
+    def _course(code, weekday, **fields):
+        values = dict(course_name=f'{code}반', course_code=code, teacher_id=teacher.user_id,
+                      schedule_type='weekly', weekday=weekday, start_time=time(16, 0), end_time=time(18, 0),
+                      start_date=today - timedelta(days=60), end_date=today + timedelta(days=60),
+                      status='active')
+        values.update(fields)
+        course = Course(**values)
+        db.session.add(course)
+        db.session.flush()
+        return course
+
+    main_course = _course('GEN-MAIN', 0, total_sessions=1)
+    late_start = _course('GEN-LATE', 2, start_date=monday + timedelta(days=7))
+    excluded = [
+        _course('GEN-ONCE', today.weekday(), start_date=today, end_date=today),
+        _course('GEN-CUSTOM', 1, schedule_type='custom'),
+        _course('GEN-DONE', 3, status='completed'),
+        _course('GEN-TERM', 4, is_terminated=True),
+    ]
+
+    students = [Student(teacher_id=teacher.user_id, name=f'세션학생{i}', grade='중1') for i in range(4)]
+    db.session.add_all(students)
+    db.session.flush()
+    enrolled = lambda days_ago: datetime.combine(monday - timedelta(days=days_ago), time(9, 0))
+    db.session.add_all([
+        CourseEnrollment(course_id=main_course.course_id, student_id=students[0].student_id, enrolled_at=enrolled(30)),
+        CourseEnrollment(course_id=main_course.course_id, student_id=students[1].student_id, enrolled_at=enrolled(30)),
+        # 지난주 월요일에 입반 → 2주 전 세션은 제외
+        CourseEnrollment(course_id=main_course.course_id, student_id=students[2].student_id, enrolled_at=enrolled(7)),
+        CourseEnrollment(course_id=main_course.course_id, student_id=students[3].student_id, enrolled_at=enrolled(30),
+                         status='dropped'),
+    ])
+    # 지난주 세션은 이미 있음 (5회차)
+    db.session.add(CourseSession(course_id=main_course.course_id, session_number=5,
+                                 session_date=monday - timedelta(days=7), status='completed'))
+    db.session.commit()
+    ok('주간 수업 2개 + 제외 대상 4개 (1회성/custom/완료/종료)')
+
+    # ════════════════════════════════════════════════════════
+    section('1. dry-run')
+    plan = generate_sessions_bulk(from_date, to_date, dry_run=True)
+    by_course = {}
+    for s in plan['sessions']:
+        by_course.setdefault(s['course_id'], []).append(s)
+    main_dates = [s['session_date'] for s in by_course.get(main_course.course_id, [])]
+    check(main_dates == [monday - timedelta(days=14), monday, monday + timedelta(days=7)],
+          '기존 날짜를 뺀 월요일 3개', str(main_dates))
+    check([s['session_number'] for s in by_course[main_course.course_id]] == [6, 7, 8], '회차는 최대 회차 다음부터')
+    check([s['session_date'] for s in by_course.get(late_start.course_id, [])] == [monday + timedelta(days=9)],
+          '수업 시작일 이후만 계획')
+    check(not any(c.course_id in by_course for c in excluded), '1회성/custom/완료/종료 수업 제외')
+    expected_attendance = 2 + 3      # 2주 전(입반 전 1명 제외) + 이번 주 월요일
+    check(plan['attendance'] == expected_attendance,
+          f'출석 레코드 {plan["attendance"]}건 계획 (과거 세션·활성 수강생·입반일 이후)')
+    check(CourseSession.query.count() == 1 and Attendance.query.count() == 0, 'dry-run은 DB 변경 없음')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 일괄 생성')
+    statements.clear()
+    result = generate_sessions_bulk(from_date, to_date)
+    db.session.commit()
+    writes = [s for s in statements if not s.lstrip().upper().startswith('SELECT')]
+    check(len(result['sessions']) == 4 and result['courses'] == 2, f'세션 {len(result["sessions"])}개 생성')
+    check(len(statements) <= 12, f'SQL {len(statements)}회 (INSERT/UPDATE {len(writes)}회)')
+
+    rows = CourseSession.query.filter_by(course_id=main_course.course_id).order_by(CourseSession.session_date).all()
+    check([(s.session_date, s.session_number, s.status) for s in rows][1:] ==
+          [(monday - timedelta(days=7), 5, 'completed'), (monday, 7, 'scheduled'), (monday + timedelta(days=7), 8, 'scheduled')],
+          '기존 세션 유지 + 새 세션 회차/상태')
+    check(rows[0].start_time == time(16, 0) and rows[0].attendance_checked is False, '수업 시간 복사 + 컬럼 기본값')
+    check(db.session.get(Course, main_course.course_id).total_sessions == 4, 'total_sessions 증가 (1 → 4)')
+
+    first = rows[0]
+    first_students = {a.student_id for a in Attendance.query.filter_by(session_id=first.session_id)}
+    check(first_students == {students[0].student_id, students[1].student_id},
+          '입반 전·중도 하차 수강생은 출석 레코드 없음')
+    future = [s for s in rows if s.session_date > today]
+    check(not Attendance.query.filter(Attendance.session_id.in_([s.session_id for s in future])).count(),
+          '미래 세션은 출석 레코드 없음')
+    check(Attendance.query.count() == expected_attendance, f'출석 레코드 {Attendance.query.count()}건')
+    check(not attendance_rollup.find_mismatches(), '출결 집계 = 원본')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 재실행 / 단일 수업 / 주간 작업')
+    again = generate_sessions_bulk(from_date, to_date)
+    db.session.commit()
+    check(not again['sessions'] and CourseSession.query.count() == 5, '다시 실행해도 중복 없음')
+
+    created = extend_sessions_for_course(main_course, to_date + timedelta(days=1), to_date + timedelta(days=14))
+    db.session.commit()
+    check(len(created) == 2 and {s['course_id'] for s in created} == {main_course.course_id},
+          'extend_sessions_for_course — 해당 수업만 생성')
+
+    for i in range(40):
+        _course(f'GEN-MANY-{i}', i % 7)
+    db.session.commit()
+    statements.clear()
+    many = generate_sessions_bulk(from_date, to_date)
+    db.session.commit()
+    check(len(many['sessions']) >= 40 * 4 and len(statements) <= 12,
+          f'수업 40개 추가 → 세션 {len(many["sessions"])}개, SQL {len(statements)}회')
+
+    from app.utils.scheduler import generate_weekly_sessions
+    week = (today + timedelta(days=1), today + timedelta(days=7))
+    generate_weekly_sessions(app)
+    db.session.expire_all()
+    weekly = Course.query.filter(Course.schedule_type == 'weekly', Course.status == 'active',
+                                 Course.is_terminated == False, Course.start_date != Course.end_date).all()
+    covered = {c for (c,) in db.session.query(CourseSession.course_id).filter(
+        CourseSession.session_date.between(*week))}
+    check(covered >= {c.course_id for c in weekly if c.start_date <= week[1]},
+          f'주간 작업 — 다음 7일 세션 생성 (수업 {len(covered)}개)')
+    before = CourseSession.query.count()
+    generate_weekly_sessions(app)
+    check(CourseSession.query.count() == before, '주간 작업 재실행 시 추가 없음')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
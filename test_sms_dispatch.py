@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""청구서 일괄 문자 발송 테스트 스크립트
+
+로컬 가짜 알리고 서버와 임시 SQLite DB로
+일괄 발송 요청(즉시 반환) → 500건 단위 send_mass 묶음 전송 → 발송 이력/진행률 폴링,
+일시적 오류 재시도, 알리고 오류 응답 처리, 같은 청구서의 중복 발송 방지(대기/발송 중 배치),
+중단된 배치(queued / sending에 멈춘 건) 복구를 검증한다. 실제 문자는 발송되지 않는다.
+
+사용법:
+    python test_sms_dispatch.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+# ════════════════════════════════════════════════════════
+# 가짜 알리고 서버 (/send/, /send_mass/)
+# ════════════════════════════════════════════════════════
+
+class FakeAligo:
+    def __init__(self):
+        self.requests = []        # (path, form dict)
+        self.fail_next = 0        # 다음 N번 요청에 503 응답
+        self.error_code = None    # 설정 시 result_code 오류 응답
+        self.lock = threading.Lock()
+
+
+ALIGO = FakeAligo()
+
+
+class AligoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        import json
+        length = int(self.headers.get('Content-Length', 0))
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        with ALIGO.lock:
+            if ALIGO.fail_next > 0:
+                ALIGO.fail_next -= 1
+                return self._send(503, '{}')
+            ALIGO.requests.append((self.path, form))
+            error_code = ALIGO.error_code
+        if error_code:
+            return self._send(200, json.dumps({'result_code': error_code, 'message': '인증오류입니다.'}))
+        cnt = int(form.get('cnt', 1))
+        self._send(200, json.dumps({
+            'result_code': '1', 'message': 'success', 'msg_id': str(1000 + len(ALIGO.requests)),
+            'success_cnt': cnt, 'error_cnt': 0, 'msg_type': form.get('msg_type'),
+        }))
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), AligoHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_sms_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "sms_test.db")}'
+os.environ['SMS_API_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+os.environ['SMS_API_KEY'] = 'fake-key'
+os.environ['SMS_USER_ID'] = 'fake-user'
+os.environ['SMS_SENDER'] = '0212345678'
+os.environ['SMS_RETRY_BACKOFF'] = '0.05'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def _wait_done(client, batch_id, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f'/admin/billing/sms-batch/{batch_id}').get_json()
+        if data.get('done'):
+            return data
+        time.sleep(0.1)
+    return data
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB + 가짜 알리고)')
+    from app import create_app
+    from app.models import db, User, Student, Course, CourseEnrollment, Payment, ParentStudent
+    from app.models.sms_delivery_log import SmsDeliveryLog
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    ok(f'가짜 알리고 {os.environ["SMS_API_URL"]}')
+
+    admin = User(email='sms_admin@test.com', name='문자관리자', role='admin', role_level=1)
+    parent = User(email='sms_parent@test.com', name='문자학부모', role='parent', phone='01011112222')
+    for u in (admin, parent):
+        u.set_password('test1234')
+    db.session.add_all([admin, parent])
+    db.session.flush()
+
+    with_parent = Student(teacher_id=admin.user_id, name='학부모연결', grade='중1')
+    own_phone = Student(teacher_id=admin.user_id, name='본인번호', grade='중2', phone='01033334444')
+    no_phone = Student(teacher_id=admin.user_id, name='번호없음', grade='중3')
+    db.session.add_all([with_parent, own_phone, no_phone])
+    db.session.flush()
+    db.session.add(ParentStudent(parent_id=parent.user_id, student_id=with_parent.student_id))
+
+    course = Course(course_name='문자테스트반', course_code='SMS-T1',
+                    start_date=date(2026, 3, 1), end_date=date(2026, 12, 31))
+    db.session.add(course)
+    db.session.flush()
+
+    def _payment(student, sent=False):
+        enr = CourseEnrollment(course_id=course.course_id, student_id=student.student_id)
+        db.session.add(enr)
+        db.session.flush()
+        p = Payment(enrollment_id=enr.enrollment_id, course_id=course.course_id,
+                    student_id=student.student_id, amount=320000,
+                    period_start=date(2026, 10, 1), period_end=date(2026, 10, 31))
+        if sent:
+            from datetime import datetime
+            p.sms_sent_at = datetime(2026, 10, 1)
+        db.session.add(p)
+        return p
+
+    bulk = [_payment(own_phone) for _ in range(503)]
+    special = [_payment(with_parent), _payment(no_phone), _payment(own_phone, sent=True)]
+    db.session.commit()
+    ok(f'청구서 {len(bulk) + len(special)}건')
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = admin.user_id
+        sess['_fresh'] = True
+
+    # ════════════════════════════════════════════════════════
+    section('1. 일괄 발송 요청 → 백그라운드 발송')
+    ALIGO.fail_next = 1   # 첫 요청은 503 → 재시도
+    ids = [p.payment_id for p in bulk + special] + ['missing-payment']
+    t0 = time.time()
+    res = client.post('/admin/billing/send-sms-batch', json={'payment_ids': ids})
+    data = res.get_json()
+    check(res.status_code == 202 and data['batch_id'], f'즉시 반환 202 ({time.time() - t0:.2f}s)')
+    check(data['queued'] == 504 and data['skipped'] == 1 and data['failed'] == 2,
+          '대기 504 / 이미발송 1 / 실패 2 (번호 없음 + 청구서 없음)', str({k: data[k] for k in ('queued', 'skipped', 'failed')}))
+
+    status = _wait_done(client, data['batch_id'])
+    check(status.get('done'), '발송 완료', str(status.get('counts')))
+    check(status['counts']['sent'] == 504, '발송 504건', str(status['counts']))
+
+    mass = [form for path, form in ALIGO.requests if path == '/send_mass/']
+    check(sorted(int(f['cnt']) for f in mass) == [4, 500], 'send_mass 2회 (500 + 4건)',
+          str([f['cnt'] for f in mass]))
+    receivers = {f[f'rec_{i}'] for f in mass for i in range(1, int(f['cnt']) + 1)}
+    check(receivers == {'01011112222', '01033334444'}, '학부모 우선 / 학생 번호 수신자')
+    retried = SmsDeliveryLog.query.filter(SmsDeliveryLog.batch_id == data['batch_id'],
+                                          SmsDeliveryLog.attempts == 2).count()
+    check(retried in (4, 500), f'503 후 재시도 성공 (attempts=2: {retried}건)')
+    db.session.expire_all()
+    check(Payment.query.filter(Payment.sms_sent_at.isnot(None)).count() == 505,
+          'Payment.sms_sent_at 기록')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 알리고 오류 응답 → 실패 기록')
+    ALIGO.error_code = '-101'
+    p = _payment(own_phone)
+    db.session.commit()
+    data = client.post('/admin/billing/send-sms-batch', json={'payment_ids': [p.payment_id]}).get_json()
+    status = _wait_done(client, data['batch_id'])
+    item = status['items'][0]
+    check(item['status'] == 'failed' and '인증오류' in (item['reason'] or ''), '실패 사유 기록', str(item))
+    db.session.expire_all()
+    check(Payment.query.get(p.payment_id).sms_sent_at is None, '실패 시 sms_sent_at 미기록')
+
+    res = client.get('/admin/billing/sms-batch/unknown')
+    check(res.status_code == 404, '없는 배치 → 404')
+    ALIGO.error_code = None
+
+    # ════════════════════════════════════════════════════════
+    section('3. 중복 요청 (대기/발송 중 배치가 있는 청구서)')
+    from datetime import datetime, timedelta
+    from app.utils.sms_dispatch import create_batch, get_batch_status, recover_stale_batches, run_batch
+
+    dup = [_payment(own_phone) for _ in range(3)]
+    db.session.commit()
+    dup_ids = [p.payment_id for p in dup]
+    first = create_batch([{'payment_id': pid, 'receiver': '01033334444', 'message': '청구서'}
+                          for pid in dup_ids])   # 발송 스레드가 아직 가져가지 않은 상태
+    sent_before = len(ALIGO.requests)
+    data = client.post('/admin/billing/send-sms-batch', json={'payment_ids': dup_ids}).get_json()
+    check(data['queued'] == 0 and data['skipped'] == 3, '두 번째 클릭 → 3건 모두 건너뜀',
+          str({k: data[k] for k in ('queued', 'skipped', 'failed')}))
+    status = _wait_done(client, data['batch_id'])
+    check({i['reason'] for i in status['items']} == {'발송 대기/진행 중'}, '건너뜀 사유: 발송 대기/진행 중')
+    check(len(ALIGO.requests) == sent_before, '중복 배치는 알리고 요청 없음')
+
+    run_batch(app, first)
+    db.session.expire_all()
+    check(SmsDeliveryLog.query.filter_by(batch_id=first, status='sent').count() == 3, '첫 배치만 발송')
+    data = client.post('/admin/billing/send-sms-batch', json={'payment_ids': dup_ids}).get_json()
+    check(data['skipped'] == 3, '발송 후 재요청 → 이미 발송됨')
+
+    # 대기 중에 다른 배치가 먼저 보낸 청구서 (동시 요청 경합)
+    late = _payment(own_phone)
+    db.session.commit()
+    raced = create_batch([{'payment_id': late.payment_id, 'receiver': '01033334444', 'message': '청구서'}])
+    late.sms_sent_at = datetime.utcnow()
+    db.session.commit()
+    sent_before = len(ALIGO.requests)
+    run_batch(app, raced)
+    db.session.expire_all()
+    log = SmsDeliveryLog.query.filter_by(batch_id=raced).one()
+    check(log.status == 'skipped' and len(ALIGO.requests) == sent_before,
+          '발송 직전 sms_sent_at 확인 → 건너뜀', f'{log.status} {log.reason}')
+
+    # ════════════════════════════════════════════════════════
+    section('4. 중단된 배치 복구 (queued / sending에 멈춘 건)')
+    stuck = [_payment(own_phone) for _ in range(5)]
+    db.session.commit()
+    stuck_batch = create_batch([{'payment_id': p.payment_id, 'receiver': '01033334444', 'message': '청구서'}
+                                for p in stuck])
+    fresh_batch = create_batch([{'payment_id': _payment(own_phone).payment_id,
+                                 'receiver': '01033334444', 'message': '청구서'}])
+    old = datetime.utcnow() - timedelta(hours=1)
+    logs = SmsDeliveryLog.query.filter_by(batch_id=stuck_batch).order_by(SmsDeliveryLog.log_id).all()
+    for log in logs:
+        log.created_at = old
+    logs[0].status, logs[0].claimed_at = 'sending', old          # 발송 도중 프로세스 종료
+    logs[1].status, logs[1].claimed_at = 'sending', old
+    db.session.get(Payment, logs[1].payment_id).sms_sent_at = old   # 알리고 접수 후 기록까지 된 건
+    # logs[2]: queued로 남은 건
+    logs[3].status, logs[3].claimed_at = 'sending', datetime.utcnow()  # 오래 대기했다가 방금 가져간 건
+    logs[4].status = 'sending'                                  # claimed_at 없는 옛 데이터
+    db.session.commit()
+    stuck_log_ids = [log.log_id for log in logs]
+
+    sent_before = len(ALIGO.requests)
+    recovered = recover_stale_batches(app)
+    db.session.expire_all()
+    check(recovered == [stuck_batch], '오래된 queued 건의 배치만 재발송 (방금 만든 배치 제외)', str(recovered))
+    stuck_logs = [db.session.get(SmsDeliveryLog, lid) for lid in stuck_log_ids]
+    statuses = [log.status for log in stuck_logs]
+    check(statuses == ['unknown', 'sent', 'sent', 'sending', 'unknown'], f'멈춘 건 상태 정리 {statuses}')
+    check(stuck_logs[0].attempts == 0 and '확인 필요' in (stuck_logs[0].reason or ''),
+          '발송 기록 없는 sending 건 → 다시 보내지 않고 unknown (수동 확인)')
+    check(stuck_logs[3].reason is None and stuck_logs[3].attempts == 0,
+          'created_at은 오래됐어도 최근에 가져간 sending 건은 그대로')
+    mass = [form for _, form in ALIGO.requests[sent_before:]]
+    check(len(mass) == 1 and int(mass[0].get('cnt', 1)) == 1, 'queued 건만 다시 전송 (1건)',
+          str([f.get('cnt') for f in mass]))
+    check(SmsDeliveryLog.query.filter_by(batch_id=fresh_batch, status='queued').count() == 1,
+          '진행 중일 수 있는 최근 건은 그대로')
+    check(recover_stale_batches(app) == [], '복구 후 다시 실행 → 대상 없음')
+    status = get_batch_status(stuck_batch)
+    check(status['counts']['unknown'] == 2 and not status['done'],
+          f"배치 상태에 unknown 집계 {status['counts']}")
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
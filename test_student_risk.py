@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""학생 위험도 일괄 분석 / 스냅샷 테스트 스크립트
+
+임시 SQLite DB로 일괄 분석(analyze_students) 결과가 학생별 기존 분석
+(generate_student_insights + 학생별 조회)과 같은지, 대시보드 쿼리 수가 학생 수와 무관한지,
+출결/상담/학부모/세션 일정 변경 시 해당 학생 스냅샷만 무효화되는지(롤백 포함),
+새벽 스케줄러 작업이 전체 스냅샷을 갱신하는지 검증한다.
+
+사용법:
+    python test_student_risk.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_risk_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "risk_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event, update
+    from app import create_app
+    from app.models import (db, User, Student, Course, CourseEnrollment, CourseSession,
+                            Attendance, ParentStudent, StudentRiskSnapshot)
+    from app.models.student_profile import StudentProfile
+    from app.models.consultation import ConsultationRecord
+    from app.models.reading_mbti import (ReadingMBTITest, ReadingMBTIType, ReadingMBTIResponse,
+                                         ReadingMBTIResult)
+    from app.utils.student_insights import (analyze_students, generate_student_insights,
+                                            get_recent_attendance_trend, refresh_risk_snapshots)
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    admin = User(email='risk_admin@test.com', name='위험도관리자', role='admin', role_level=1)
+    teacher = User(email='risk_teacher@test.com', name='위험도강사', role='teacher')
+    parent = User(email='risk_parent@test.com', name='위험도학부모', role='parent')
+    for u in (admin, teacher, parent):
+        u.set_password('test1234')
+    db.session.add_all([admin, teacher, parent])
+    db.session.flush()
+
+    today = date.today()
+    course = Course(course_name='위험도반', course_code='RISK-1', teacher_id=teacher.user_id,
+                    start_date=today - timedelta(days=90), end_date=today + timedelta(days=90))
+    db.session.add(course)
+    students = [Student(teacher_id=teacher.user_id, name=f'위험도학생{i:02d}', grade='중1') for i in range(24)]
+    db.session.add_all(students)
+    db.session.flush()
+
+    # 최근 2주 경계일(14일 전) 포함 8회차: 5일 간격
+    sessions = []
+    for n in range(8):
+        s = CourseSession(course_id=course.course_id, session_number=n + 1,
+                          session_date=today - timedelta(days=35 - 5 * n))
+        db.session.add(s)
+        sessions.append(s)
+    db.session.flush()
+
+    mbti_test = ReadingMBTITest(title='읽기 성향')
+    mbti_types = [ReadingMBTIType(type_code=f'R{i}', type_key=key, type_name=f'유형{i}')
+                  for i, key in enumerate(('vocab-textual-summary', 'analyze-lead-logic'))]
+    db.session.add_all([mbti_test] + mbti_types)
+    db.session.flush()
+
+    keywords = ['', '요즘 스트레스가 많음', '집중력 저하', '진로고민 상담']
+    for i, student in enumerate(students):
+        e = CourseEnrollment(course_id=course.course_id, student_id=student.student_id)
+        db.session.add(e)
+        db.session.flush()
+        if i % 6 != 5:  # 일부 학생은 출결 없음
+            for n, s in enumerate(sessions):
+                status = 'present' if (n * 7 + i) % (i % 4 + 2) else ('absent' if i % 3 else 'late')
+                if i % 5 == 0 and n >= 5:
+                    status = 'absent'
+                db.session.add(Attendance(session_id=s.session_id, student_id=student.student_id,
+                                          enrollment_id=e.enrollment_id, status=status))
+        for k in range(i % 4 * 4):  # 상담 0~12건 (10건 초과 포함)
+            db.session.add(ConsultationRecord(
+                consultation_date=today - timedelta(days=(i % 3) * 60 + k * 3),
+                counselor_id=teacher.user_id, student_id=student.student_id,
+                major_category='분기별상담', title=f'상담 {k}', content=keywords[(i + k) % 4] or '특이사항 없음'))
+        if i % 2 == 0:
+            db.session.add(StudentProfile(student_id=student.student_id, reading_competency=i % 5 + 1,
+                                          academic_goals='["과학고"]' if i % 4 == 0 else None))
+        if i % 3 == 0:
+            db.session.add(ParentStudent(parent_id=parent.user_id, student_id=student.student_id,
+                                         is_active=i % 6 == 0))
+        for r in range(i % 3):
+            response = ReadingMBTIResponse(student_id=student.student_id, test_id=mbti_test.test_id, responses={})
+            db.session.add(response)
+            db.session.flush()
+            t = mbti_types[(i + r) % 2]
+            read_type, speech_type, write_type = t.type_key.split('-')
+            db.session.add(ReadingMBTIResult(
+                response_id=response.response_id, student_id=student.student_id, test_id=mbti_test.test_id,
+                type_id=t.type_id, scores={}, read_type=read_type, speech_type=speech_type,
+                write_type=write_type, created_at=datetime.now() - timedelta(days=10 - r)))
+
+    # 양호 학생: 전부 출석 + 학부모 연결 + 최근 상담
+    good = Student(teacher_id=teacher.user_id, name='위험도학생99', grade='중1')
+    db.session.add(good)
+    db.session.flush()
+    e = CourseEnrollment(course_id=course.course_id, student_id=good.student_id)
+    db.session.add(e)
+    db.session.flush()
+    db.session.add_all([Attendance(session_id=s.session_id, student_id=good.student_id,
+                                   enrollment_id=e.enrollment_id, status='present') for s in sessions])
+    db.session.add(ParentStudent(parent_id=parent.user_id, student_id=good.student_id))
+    db.session.add(ConsultationRecord(consultation_date=today, counselor_id=teacher.user_id,
+                                      student_id=good.student_id, major_category='분기별상담',
+                                      title='정기', content='특이사항 없음'))
+    students.append(good)
+    db.session.commit()
+    ok(f'학생 {len(students)}명 / 출결 {Attendance.query.count()}건 / 상담 {ConsultationRecord.query.count()}건')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 일괄 분석 = 학생별 기존 분석')
+
+    def _scalar(student):
+        """기존 get_all_students_risk_analysis의 학생별 조회 경로"""
+        enrollments = CourseEnrollment.query.filter_by(student_id=student.student_id).all()
+        profile = StudentProfile.query.filter_by(student_id=student.student_id).first()
+        consultations = ConsultationRecord.query.filter_by(student_id=student.student_id)\
+            .order_by(ConsultationRecord.consultation_date.desc(), ConsultationRecord.consultation_id.desc())\
+            .limit(10).all()
+        mbti_result = ReadingMBTIResult.query.filter_by(student_id=student.student_id)\
+            .order_by(ReadingMBTIResult.created_at.desc()).first()
+        mbti_type = db.session.get(ReadingMBTIType, mbti_result.type_id) if mbti_result else None
+        insights = generate_student_insights(student, enrollments, profile, mbti_result, mbti_type, consultations)
+        return insights, get_recent_attendance_trend(student.student_id)[0]
+
+    def _key(insights, recent):
+        return (insights['risk_score'], insights['overall_status'], len(insights['risk_factors']),
+                len(insights['warning_factors']), [f['description'] for f in insights['warning_factors']],
+                [f['description'] for f in insights['strengths']], recent)
+
+    batch = analyze_students()
+    diffs = [s.name for s in students if _key(*batch[s.student_id]) != _key(*_scalar(s))]
+    check(not diffs, f'전체 {len(students)}명 점수/요인/최근 출석률 일치', str(diffs))
+    statuses = {insights['overall_status'] for insights, _ in batch.values()}
+    check(len(statuses) == 3, f'세 등급 모두 등장 {sorted(statuses)}')
+    subset = analyze_students(students[:5])
+    check(set(subset) == {s.student_id for s in students[:5]} and
+          all(_key(*subset[sid]) == _key(*batch[sid]) for sid in subset), '일부 학생만 분석 (IN 조건)')
+
+    queries = [0]
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count(*args):
+        queries[0] += 1
+
+    queries[0] = 0
+    analyze_students()
+    check(queries[0] <= 8, f'일괄 분석 쿼리 {queries[0]}회 (기존 학생당 7~9회)')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 대시보드 + 스냅샷')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = admin.user_id
+        sess['_fresh'] = True
+
+    res = client.get('/admin/student-risk-analysis')
+    check(res.status_code == 200 and StudentRiskSnapshot.query.count() == len(students),
+          '첫 조회 → 전체 스냅샷 생성')
+    queries[0] = 0
+    html = client.get('/admin/student-risk-analysis').get_data(as_text=True)
+    warm_queries = queries[0]
+    check(students[0].name in html and warm_queries <= 6, f'스냅샷 조회 쿼리 {warm_queries}회')
+
+    more = [Student(teacher_id=teacher.user_id, name=f'추가학생{i}', grade='중2') for i in range(10)]
+    db.session.add_all(more)
+    db.session.commit()
+    client.get('/admin/student-risk-analysis')
+    queries[0] = 0
+    client.get('/admin/student-risk-analysis')
+    check(queries[0] == warm_queries, f'학생 10명 추가 후에도 {queries[0]}회 (학생 수와 무관)')
+
+    db.session.execute(update(StudentRiskSnapshot).values(computed_at=datetime.now() - timedelta(days=1))
+                       .where(StudentRiskSnapshot.student_id == students[1].student_id))
+    db.session.commit()
+    client.get('/admin/student-risk-analysis')
+    snap = db.session.get(StudentRiskSnapshot, students[1].student_id)
+    check(snap.computed_at.date() == today, '어제 계산된 스냅샷 → 재계산')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 변경 시 학생 단위 무효화')
+
+    def _has_snapshot(student):
+        db.session.expire_all()
+        return db.session.get(StudentRiskSnapshot, student.student_id) is not None
+
+    att = Attendance.query.filter_by(student_id=students[2].student_id).first()
+    att.status = 'absent' if att.status != 'absent' else 'present'
+    db.session.commit()
+    check(not _has_snapshot(students[2]) and _has_snapshot(students[3]), '출결 변경 → 해당 학생만 무효화')
+
+    client.get('/admin/student-risk-analysis')
+    db.session.add(ConsultationRecord(consultation_date=today, counselor_id=teacher.user_id,
+                                      student_id=students[3].student_id, major_category='기타',
+                                      title='긴급', content='불안 호소'))
+    db.session.flush()
+    db.session.rollback()
+    check(_has_snapshot(students[3]), '롤백 → 스냅샷 유지')
+
+    db.session.add(ParentStudent(parent_id=parent.user_id, student_id=students[4].student_id))
+    db.session.commit()
+    check(not _has_snapshot(students[4]), '학부모 연결 → 무효화')
+
+    client.get('/admin/student-risk-analysis')
+    sessions[7].session_date = sessions[7].session_date - timedelta(days=30)
+    db.session.commit()
+    check(not _has_snapshot(students[0]) and not _has_snapshot(students[6]),
+          '수업일 변경 → 해당 세션 출결 학생 무효화')
+
+    client.get('/admin/student-risk-analysis')
+    diffs = []
+    for s in students:
+        snap = db.session.get(StudentRiskSnapshot, s.student_id)
+        insights, recent = _scalar(s)
+        if (snap.risk_score, snap.status, snap.recent_attendance) != (insights['risk_score'],
+                                                                      insights['overall_status'], recent):
+            diffs.append(s.name)
+    check(not diffs, '재조회 후 스냅샷 = 학생별 기존 분석', str(diffs))
+
+    # ════════════════════════════════════════════════════════
+    section('4. 새벽 스케줄러 작업')
+    from app.utils.scheduler import refresh_student_risk_snapshots
+    students_names = [s.name for s in students]
+    db.session.execute(update(StudentRiskSnapshot).values(risk_score=99))
+    db.session.commit()
+    ctx.pop()
+    refresh_student_risk_snapshots(app)
+    ctx = app.app_context()
+    ctx.push()
+    check(StudentRiskSnapshot.query.filter_by(risk_score=99).count() == 0 and
+          StudentRiskSnapshot.query.count() == len(students) + len(more), '전체 스냅샷 재계산')
+
+    first = Student.query.filter_by(name=students_names[0]).one()
+    refreshed = refresh_risk_snapshots([first])
+    db.session.commit()
+    check(list(refreshed) == [first.student_id], 'refresh_risk_snapshots 부분 갱신')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
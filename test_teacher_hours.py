@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""강사 월별 시수 일괄 계산 / 스냅샷 테스트 스크립트
+
+임시 SQLite DB로 build_monthly_data가 여러 강사의 한 달치 시수를 1쿼리로 계산하는지
+(완료·출결 입력 세션만, 같은 시간 보강 병합, 별도 수당 분리, 주차별 합계),
+get_monthly_data가 마감된 달은 고정 스냅샷을 쓰고 이번 달은 TTL/무효화된 강사만
+다시 계산하는지, 출결 변경 시 해당 (강사, 월) 스냅샷만 지워지는지, 보정이 위에 더해지는지,
+관리자/강사 시수 화면이 정상 렌더링되는지 검증한다.
+
+사용법:
+    python test_teacher_hours.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_hours_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "hours_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from flask import g
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import (db, User, Student, Course, CourseSession, CourseEnrollment, Attendance,
+                            TeacherHoursCorrection, TeacherHoursSnapshot)
+    from app.utils import hours_calculator
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    admin = User(email='hours_admin@test.com', name='시수관리자', role='admin', role_level=1)
+    teachers = [User(email=f'hours_t{i}@test.com', name=f'시수강사{i}', role='teacher', role_level=4)
+                for i in range(3)]
+    for u in [admin] + teachers:
+        u.set_password('test1234')
+    db.session.add_all([admin] + teachers)
+    db.session.flush()
+    t1, t2, t3 = (t.user_id for t in teachers)
+
+    students = [Student(teacher_id=t1, name=f'시수학생{i}', grade='중1') for i in range(6)]
+    db.session.add_all(students)
+    db.session.flush()
+
+    today = date.today()
+    this_month = today.replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    day = last_month.replace(day=8)           # 지난달 2주차 안쪽 날짜
+
+    enrollments = {}
+
+    def _course(code, teacher_id, course_type, grade='중1'):
+        course = Course(course_name=f'{code}반', course_code=code, teacher_id=teacher_id, course_type=course_type,
+                        grade=grade, start_date=last_month - timedelta(days=60),
+                        end_date=today + timedelta(days=60))
+        db.session.add(course)
+        db.session.flush()
+        enrollments[course.course_id] = [CourseEnrollment(course_id=course.course_id, student_id=st.student_id)
+                                         for st in students]
+        db.session.add_all(enrollments[course.course_id])
+        db.session.flush()
+        return course
+
+    def _session(course, session_date, start, status='completed', marks=(), checked=True):
+        s = CourseSession(course_id=course.course_id, session_number=1, session_date=session_date,
+                          start_time=start, status=status)
+        db.session.add(s)
+        db.session.flush()
+        for enrollment, mark in zip(enrollments[course.course_id], marks):
+            db.session.add(Attendance(session_id=s.session_id, student_id=enrollment.student_id,
+                                      enrollment_id=enrollment.enrollment_id, status=mark,
+                                      checked_at=datetime.combine(session_date, start) if checked else None))
+        return s
+
+    regular = _course('HRS-REG', t1, '정규반')
+    makeup = _course('HRS-MKP', t1, '보강(정규반)')
+    signature = _course('HRS-SIG', t1, '시그니처')
+    premium = _course('HRS-PRE', t2, '프리미엄')
+    elem = _course('HRS-ELEM', t2, '정규반', grade='초4')
+
+    # 강사1 지난달: 정규반 3명 출석(+지각 1, 결석 1) + 같은 시간 보강 1명 → 5명 병합 = 2.5+1.5 = 4.0
+    base = _session(regular, day, time(16, 0), marks=('present', 'present', 'late', 'present', 'absent'))
+    _session(makeup, day, time(16, 0), marks=('present',))
+    # 완료 버튼은 안 눌렀지만 출결 입력됨 → 1명 = 1.0 (다음 주)
+    _session(regular, day + timedelta(days=7), time(16, 0), status='scheduled', marks=('present',))
+    # 제외: 출결 미입력 예정 세션 / 휴강
+    _session(regular, day + timedelta(days=14), time(16, 0), status='scheduled', marks=('present',), checked=False)
+    _session(regular, day + timedelta(days=1), time(16, 0), status='cancelled', marks=('present', 'present'))
+    # 별도 수당
+    _session(signature, day + timedelta(days=2), time(10, 0), marks=('present', 'present'))
+    # 강사2 지난달: 프리미엄 1.0 + 초등 정규반 2명 = 2.0
+    _session(premium, day, time(18, 0), marks=('present',))
+    _session(elem, day, time(14, 0), marks=('present', 'late'))
+    # 이번 달
+    _session(premium, this_month, time(18, 0), marks=('present',))
+    db.session.commit()
+    ok('강사 3명 / 지난달·이번 달 세션')
+
+    # ════════════════════════════════════════════════════════
+    section('1. 여러 강사 1쿼리 계산')
+    statements.clear()
+    data = hours_calculator.build_monthly_data([t1, t2, t3], last_month.year, last_month.month)
+    check(len(statements) == 1, f'세션+출석 집계 쿼리 {len(statements)}회 (강사 3명)')
+    check('extract' not in statements[0].lower() and 'BETWEEN' in statements[0].upper(),
+          '날짜 범위 비교 (session_date 인덱스 사용)')
+
+    d1 = data[t1]
+    week = hours_calculator._week_of_month(day)
+    check(abs(d1['auto_total'] - 5.0) < 1e-9, f'강사1 자동 시수 5.0 ({d1["auto_total"]})')
+    check(len(d1['sessions']) == 2 and d1['sessions'][0]['attended'] == 5,
+          '같은 시간 보강은 원 수업에 병합 (출석 4 + 보강 1)')
+    check(d1['by_type']['정규반'][week] == 4.0 and d1['by_type']['정규반'][week + 1] == 1.0,
+          '유형/주차별 집계')
+    check(d1['weekly_totals'][week] == 4.0 and '보강(정규반)' not in d1['by_type'], '주간 합계 (병합된 보강 제외)')
+    check(len(d1['special']) == 1 and d1['special'][0]['course']['course_type'] == '시그니처'
+          and d1['by_type']['시그니처']['total'] == 0.0, '별도 수당 분리')
+    check(abs(data[t2]['auto_total'] - 3.0) < 1e-9, f'강사2 자동 시수 3.0 ({data[t2]["auto_total"]})')
+    check(data[t3]['auto_total'] == 0 and not data[t3]['sessions'], '세션 없는 강사는 빈 결과')
+    single = hours_calculator.build_teacher_monthly_data(t1, last_month.year, last_month.month)
+    check(single['auto_total'] == d1['auto_total'], 'build_teacher_monthly_data 호환')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 스냅샷 + 보정')
+    db.session.add(TeacherHoursCorrection(teacher_id=t1, year=last_month.year, month=last_month.month,
+                                          hours_delta=-0.5, note='조정', created_by=admin.user_id))
+    db.session.commit()
+
+    got = hours_calculator.get_monthly_data([t1, t2, t3], last_month.year, last_month.month)
+    snaps = TeacherHoursSnapshot.query.filter_by(year=last_month.year, month=last_month.month).all()
+    check(len(snaps) == 3 and all(s.is_closed for s in snaps), '마감된 달 스냅샷 3건 저장 (고정)')
+    check(got[t1]['correction_total'] == -0.5 and got[t1]['final_total'] == 4.5, '보정은 스냅샷 위에 더함')
+
+    statements.clear()
+    cached = hours_calculator.get_monthly_data([t1, t2, t3], last_month.year, last_month.month,
+                                               now=datetime.now() + timedelta(days=30))
+    check(not any('course_sessions' in s for s in statements), '마감된 달은 TTL과 무관하게 스냅샷 사용')
+    row = cached[t1]['sessions'][0]
+    check(row['session']['session_date'] == day and row['session']['start_time'] == time(16, 0)
+          and cached[t1]['by_type']['정규반'][week] == 4.0 and cached[t1]['weekly_totals'][week] == 4.0,
+          '스냅샷 복원 (날짜/시간/주차 키)')
+    check(cached[t1]['auto_total'] == got[t1]['auto_total'], '스냅샷 = 계산 결과')
+
+    # ════════════════════════════════════════════════════════
+    section('3. 무효화 / 이번 달')
+    absent = Attendance.query.filter_by(session_id=base.session_id, status='absent').first()
+    absent.status = 'present'
+    db.session.commit()
+    remaining = {s.teacher_id for s in TeacherHoursSnapshot.query.filter_by(year=last_month.year,
+                                                                          month=last_month.month)}
+    check(remaining == {t2, t3}, '출결 변경 → 해당 강사·월 스냅샷만 삭제')
+    statements.clear()
+    updated = hours_calculator.get_monthly_data([t1, t2, t3], last_month.year, last_month.month)
+    check(updated[t1]['auto_total'] == 5.5, f'변경된 강사만 다시 계산 ({updated[t1]["auto_total"]})')
+    check(sum('course_sessions' in s for s in statements) == 1, '재계산 쿼리 1회')
+
+    current = hours_calculator.get_monthly_data([t2], this_month.year, this_month.month)
+    snap = db.session.get(TeacherHoursSnapshot, (t2, this_month.year, this_month.month))
+    check(current[t2]['auto_total'] == 1.0 and snap and not snap.is_closed, '이번 달 스냅샷은 고정하지 않음')
+    statements.clear()
+    hours_calculator.get_monthly_data([t2], this_month.year, this_month.month)
+    check(not any('course_sessions' in s for s in statements), 'TTL 안에서는 스냅샷 사용')
+    statements.clear()
+    hours_calculator.get_monthly_data([t2], this_month.year, this_month.month,
+                                      now=datetime.now() + timedelta(seconds=app.config['HOURS_SNAPSHOT_TTL'] + 1))
+    check(any('course_sessions' in s for s in statements), 'TTL이 지나면 다시 계산')
+
+    premium.teacher_id = t3
+    db.session.commit()
+    check(not TeacherHoursSnapshot.query.filter(TeacherHoursSnapshot.teacher_id.in_([t2, t3])).count(),
+          '수업 담당 강사 변경 → 이전/새 강사 스냅샷 삭제')
+
+    # ════════════════════════════════════════════════════════
+    section('4. 화면')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = admin.user_id
+        sess['_fresh'] = True
+    res = client.get(f'/admin/teacher-hours?year={last_month.year}&month={last_month.month}')
+    html = res.get_data(as_text=True)
+    check(res.status_code == 200 and '시수강사0' in html and 'HRS-REG반' in html,
+          f'관리자 시수 화면 ({res.status_code})')
+
+    g.pop('_login_user', None)
+    with client.session_transaction() as sess:
+        sess['_user_id'] = t1
+        sess['_fresh'] = True
+    res = client.get(f'/teacher/my-hours?year={last_month.year}&month={last_month.month}')
+    html = res.get_data(as_text=True)
+    check(res.status_code == 200 and '5.0' in html and '조정' in html, f'강사 본인 시수 화면 ({res.status_code})')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""네비게이션 미읽음 카운트 캐시 테스트 스크립트
+
+임시 SQLite DB로 GROUP BY 집계 결과, 캐시 적중(쿼리 0회),
+알림 생성/읽음 처리/회원 승인 시 캐시 무효화를 검증한다.
+
+사용법:
+    python test_unread_counts.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+PASS = '✅'
+FAIL = '❌'
+
+results = []
+
+
+def ok(msg):
+    results.append(PASS)
+    print(f'  {PASS} {msg}')
+
+
+def fail(msg, detail=''):
+    results.append(FAIL)
+    print(f'  {FAIL} {msg}')
+    if detail:
+        print(f'     → {detail}')
+
+
+def check(cond, msg, detail=''):
+    ok(msg) if cond else fail(msg, detail)
+
+
+def section(title):
+    print(f'\n{"─"*55}')
+    print(f'  {title}')
+    print(f'{"─"*55}')
+
+
+tmpdir = tempfile.mkdtemp(prefix='momoai_unread_')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmpdir, "unread_test.db")}'
+os.environ['CORRECTION_WORKER_MODE'] = 'external'
+os.environ['PDF_PREBUILD_MANUALS'] = 'false'
+os.environ['PDF_PRERENDER_ESSAYS'] = 'false'
+
+
+def main():
+    # ════════════════════════════════════════════════════════
+    section('0. Flask 앱 초기화 (임시 DB)')
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db, User
+    from app.models.notification import Notification
+    from app.utils.unread_counts import get_unread_counts, compute_unread_counts
+
+    app = create_app('production')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+
+    teacher = User(email='unread_teacher@test.com', name='배지강사', role='teacher')
+    admin = User(email='unread_admin@test.com', name='배지관리자', role='admin', role_level=1)
+    pending = [User(email=f'unread_pending{i}@test.com', name=f'대기{i}', role='parent')
+               for i in range(4)]
+    for u in [teacher, admin] + pending:
+        u.set_password('test1234')
+    for u in pending:
+        u.is_active = False
+    db.session.add_all([teacher, admin] + pending)
+    db.session.commit()
+    ok('강사 1명 / 관리자 1명 / 승인 대기 4명')
+
+    for ntype in ('homework_assignment', 'teacher_feedback', 'consultation', 'essay_submitted'):
+        Notification.create_bulk([teacher.user_id], ntype, ntype, '본문', push=False)
+    Notification.create_bulk([pending[0].user_id], 'account_rejected', '거절', '본문', push=False)
+
+    queries = [0]
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def _count(*args):
+        queries[0] += 1
+
+    # ════════════════════════════════════════════════════════
+    section('1. 집계 + 캐시')
+    counts = get_unread_counts(teacher)
+    check(counts['homework'] == 1 and counts['feedback'] == 2 and counts['new_submission'] == 1,
+          '유형별 개수', str(counts))
+    check(counts['assignments'] == 1 and counts['total'] == 4, 'assignments / total', str(counts))
+    check(counts == compute_unread_counts(teacher), '캐시 값 = 직접 계산 값')
+    queries[0] = 0
+    get_unread_counts(teacher)
+    check(queries[0] == 0, '캐시 적중 시 쿼리 없음', f'{queries[0]}회')
+    check(get_unread_counts(admin)['pending_users'] == 3, '승인 대기 수 (거절 사용자 제외)')
+    check(counts['pending_users'] == 0, '강사에게는 승인 대기 수 미표시')
+
+    # ════════════════════════════════════════════════════════
+    section('2. 커밋 시 무효화')
+    Notification.create_bulk([teacher.user_id], 'essay_complete', '완료', '본문', push=False)
+    check(get_unread_counts(teacher)['essay'] == 1, '알림 생성 → 즉시 반영')
+
+    Notification.query.filter_by(user_id=teacher.user_id,
+                                 notification_type='homework_assignment').update({'is_read': True})
+    db.session.commit()
+    check(get_unread_counts(teacher)['homework'] == 0, 'Query.update 읽음 처리 → 반영')
+
+    Notification.mark_all_as_read(teacher.user_id)
+    check(get_unread_counts(teacher)['total'] == 0, '모두 읽음 → 반영')
+
+    Notification.create_bulk([teacher.user_id], 'essay_complete', '롤백', '본문', push=False,
+                             commit=False)
+    db.session.rollback()
+    check(get_unread_counts(teacher)['total'] == 0, '롤백된 알림 미반영')
+
+    pending[1].is_active = True
+    db.session.commit()
+    check(get_unread_counts(admin)['pending_users'] == 2, '회원 승인 → 승인 대기 수 반영')
+
+    ctx.pop()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        fail(f'테스트 실행 오류: {e}')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    failed = results.count(FAIL)
+    print(f'\n{"═"*55}')
+    print(f'  ✅ 통과: {results.count(PASS)}건   ❌ 실패: {failed}건')
+    print(f'{"═"*55}\n')
+    sys.exit(0 if failed == 0 else 1)